@@ -4,6 +4,22 @@ from config.config_postgres import Config
 from database import db
 import re
 
+def start_background_workers(app):
+    """
+    Start the threads that run queued background work: AI answer jobs,
+    outgoing email and notification dispatch. Each process serving the app runs its own; they claim
+    work with conditional updates, so any number of processes can share it.
+
+    Args:
+        app (Flask): The application.
+    """
+    from services.job_queue import start_job_workers
+    start_job_workers(app)
+    from services.email_outbox import start_email_sender
+    start_email_sender(app)
+    from services.notification_dispatcher import start_notification_dispatcher
+    start_notification_dispatcher(app)
+
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
@@ -13,6 +29,37 @@ def create_app():
         app.config['SQLALCHEMY_DATABASE_URI'] = os.environ['DATABASE_URL']
     
     db.init_app(app)
+
+    from services.gemini_client_pool import init_gemini_pool
+    init_gemini_pool(app)
+
+    from services.job_queue import init_job_queue
+    from services.ai_answer_jobs import register_ai_jobs
+    register_ai_jobs(init_job_queue(app))
+
+    from middleware.principal_cache import init_principal_cache
+    init_principal_cache(app)
+
+    from services.password_hasher import init_password_hasher
+    init_password_hasher(app)
+
+    from middleware.rate_limiter import init_rate_limiter, trust_proxy_headers
+    init_rate_limiter(app)
+    trust_proxy_headers(app)
+
+    from services.email_outbox import init_email_outbox
+    init_email_outbox(app)
+
+    from services.notification_stream import init_notification_hub
+    init_notification_hub(app)
+
+    from services.notification_dispatcher import init_notification_dispatcher
+    from services.notification_fanout import register_fanout_handlers
+    register_fanout_handlers(init_notification_dispatcher(app))
+
+    # Maintenance commands (flask --app app <command>)
+    from services.ai_backfill import ai_backfill_command
+    app.cli.add_command(ai_backfill_command)
     app.url_map.strict_slashes = False
     
     # Don't use Flask-CORS at all - we'll handle it manually
@@ -76,6 +123,10 @@ def create_app():
     # Create all database tables
     with app.app_context():
         db.create_all()
+
+    # Under python app.py, flask run or each gunicorn worker alike
+    if app.config.get('BACKGROUND_WORKERS_ENABLED'):
+        start_background_workers(app)
     
     return app
 
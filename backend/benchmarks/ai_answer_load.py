@@ -0,0 +1,79 @@
+"""
+Description: Offline load test for POST /api/ai/answer.
+Drives the full route through the shared Gemini pool with the fake
+transport, reporting throughput and latency percentiles.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with threaded load against the fake client.
+    2026-10-19 - Added --error-rate and --unique to exercise the circuit breaker.
+
+Usage (from backend/):
+    python -m benchmarks.ai_answer_load [--requests N] [--threads N]
+                                        [--latency-ms N] [--concurrency N]
+                                        [--error-rate F] [--unique]
+"""
+import argparse
+import sys
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from app import create_app
+from services.gemini_client_pool import GeminiClientPool, set_gemini_pool
+from services.fake_gemini import FakeGeminiClient
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    index = min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))
+    return samples[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline load test for /api/ai/answer')
+    parser.add_argument('--requests', type=int, default=200, help='total requests')
+    parser.add_argument('--threads', type=int, default=16, help='client threads')
+    parser.add_argument('--latency-ms', type=int, default=50, help='simulated Gemini latency')
+    parser.add_argument('--concurrency', type=int, default=8, help='pool call slots')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of Gemini calls that fail')
+    parser.add_argument('--unique', action='store_true', help='distinct question per request (no cache hits)')
+    args = parser.parse_args()
+
+    app = create_app()
+    pool = GeminiClientPool(
+        FakeGeminiClient(latency=args.latency_ms / 1000, error_rate=args.error_rate),
+        max_concurrency=args.concurrency,
+        acquire_timeout=60
+    )
+    set_gemini_pool(app, pool)
+    payload = {'title': 'How do I reverse a list?', 'body': 'In Python, without copying.'}
+
+    def one_request(index):
+        client = app.test_client()
+        body = dict(payload, title=f"{payload['title']} #{index}") if args.unique else payload
+        start = time.perf_counter()
+        response = client.post('/api/ai/answer', json=body)
+        return response.status_code, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(one_request, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(duration * 1000 for _, duration in results)
+    errors = sum(1 for status, _ in results if status != 200)
+    print(f"requests: {args.requests}  errors: {errors}  elapsed: {elapsed:.2f}s  "
+          f"throughput: {args.requests / elapsed:.1f} req/s")
+    print(f"status codes: {dict(Counter(status for status, _ in results))}")
+    print(f"latency ms  p50: {percentile(latencies, 0.5):.1f}  "
+          f"p95: {percentile(latencies, 0.95):.1f}  max: {latencies[-1]:.1f}")
+    print(f"pool: {pool.stats()}")
+
+
+if __name__ == '__main__':
+    main()
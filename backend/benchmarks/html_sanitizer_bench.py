@@ -0,0 +1,84 @@
+"""
+Description: Throughput benchmark for utils/html_sanitizer.
+Times sanitize_content on small, large and adversarial inputs, with the
+memo cache cleared (cold) and primed (warm).
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with small, large and adversarial cases.
+
+Usage (from backend/):
+    python -m benchmarks.html_sanitizer_bench [--repeat N]
+"""
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_sanitizer import sanitize_content, clear_sanitize_cache, sanitize_cache_info
+
+
+def build_cases():
+    """
+    Build the benchmark inputs.
+
+    Returns:
+        list[tuple[str, str]]: (case name, HTML content) pairs.
+    """
+    small = '<p>How do I reverse a <b>list</b> in Python?</p><pre><code>x[::-1]</code></pre>'
+    code_line = 'for i in range(10):\n    print(i)  # &lt;loop&gt;\n'
+    large = '<p>Pasted code:</p><pre><code class="language-python">' + code_line * 4000 + '</code></pre>'
+    paragraphs = ''.join(f'<p>Paragraph {i} with <em>some</em> <a href="https://dal.ca">links</a>.</p>' for i in range(2000))
+    return [
+        ('small', small),
+        ('large_code_block', large),
+        ('many_paragraphs', paragraphs),
+        ('deeply_nested', '<blockquote>' * 500 + 'deep' + '</blockquote>' * 500),
+        ('unclosed_script_run', '<script>' * 5000 + 'tail'),
+        ('script_blocks', '<p>a</p><script>alert(1)</script>' * 2000),
+        ('disallowed_tags', '<div><span onclick="x()"><img src="x">text</span></div>' * 2000),
+    ]
+
+
+def time_call(content, repeat, warm):
+    """
+    Time sanitize_content on one input.
+
+    Args:
+        content (str): HTML input.
+        repeat (int): Number of timed calls.
+        warm (bool): Prime the memo cache first instead of clearing it per call.
+
+    Returns:
+        float: Best time per call in milliseconds.
+    """
+    best = float('inf')
+    if warm:
+        sanitize_content(content)
+    for _ in range(repeat):
+        if not warm:
+            clear_sanitize_cache()
+        start = time.perf_counter()
+        sanitize_content(content)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark utils/html_sanitizer')
+    parser.add_argument('--repeat', type=int, default=5, help='timed calls per case')
+    args = parser.parse_args()
+
+    print(f"{'case':<22}{'size (chars)':>14}{'cold (ms)':>12}{'warm (ms)':>12}{'MB/s cold':>12}")
+    for name, content in build_cases():
+        cold = time_call(content, args.repeat, warm=False)
+        warm = time_call(content, args.repeat, warm=True)
+        throughput = (len(content) / 1_000_000) / (cold / 1000) if cold else float('inf')
+        print(f"{name:<22}{len(content):>14}{cold:>12.2f}{warm:>12.3f}{throughput:>12.2f}")
+
+    print(f"cache: {sanitize_cache_info()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,110 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret")
+
+    # Shared Gemini client: 'genai' for the real API, 'fake' for offline runs
+    GEMINI_TRANSPORT = os.environ.get("GEMINI_TRANSPORT", "genai")
+    GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", 8))
+    GEMINI_TIMEOUT_SECONDS = float(os.environ.get("GEMINI_TIMEOUT_SECONDS", 60))
+    GEMINI_ACQUIRE_TIMEOUT_SECONDS = float(os.environ.get("GEMINI_ACQUIRE_TIMEOUT_SECONDS", 10))
+    GEMINI_KEEPALIVE_SECONDS = float(os.environ.get("GEMINI_KEEPALIVE_SECONDS", 30))
+    GEMINI_FAKE_LATENCY_MS = int(os.environ.get("GEMINI_FAKE_LATENCY_MS", 0))
+    GEMINI_FAKE_ERROR_RATE = float(os.environ.get("GEMINI_FAKE_ERROR_RATE", 0))
+    # Circuit breaker: consecutive failures that open it, seconds before a trial call
+    GEMINI_BREAKER_FAILURES = int(os.environ.get("GEMINI_BREAKER_FAILURES", 5))
+    GEMINI_BREAKER_RESET_SECONDS = float(os.environ.get("GEMINI_BREAKER_RESET_SECONDS", 30))
+    # Longest time one answer or summary may take across all its requests
+    GEMINI_DEADLINE_SECONDS = float(os.environ.get("GEMINI_DEADLINE_SECONDS", 90))
+    # Continuation of truncated output: requests and output tokens per answer
+    GEMINI_MAX_ROUNDS = int(os.environ.get("GEMINI_MAX_ROUNDS", 3))
+    GEMINI_TOKEN_BUDGET = int(os.environ.get("GEMINI_TOKEN_BUDGET", 12000))
+    # Largest amount of answer text per summarization request
+    GEMINI_SUMMARY_CHUNK_CHARS = int(os.environ.get("GEMINI_SUMMARY_CHUNK_CHARS", 24000))
+    # Prompt input budgets in estimated tokens (answers kept by acceptance and score)
+    GEMINI_SUMMARY_INPUT_TOKENS = int(os.environ.get("GEMINI_SUMMARY_INPUT_TOKENS", 8000))
+    GEMINI_QUESTION_INPUT_TOKENS = int(os.environ.get("GEMINI_QUESTION_INPUT_TOKENS", 4000))
+
+    # Persistent AI response cache
+    AI_CACHE_TTL_SECONDS = int(os.environ.get("AI_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    AI_CACHE_MAX_ENTRIES = int(os.environ.get("AI_CACHE_MAX_ENTRIES", 10000))
+    # Expired entries kept this long, served only when Gemini fails
+    AI_CACHE_STALE_SECONDS = int(os.environ.get("AI_CACHE_STALE_SECONDS", 24 * 3600))
+
+    # Authenticated-user cache of the auth middleware (keep below the 7 day token lifetime)
+    PRINCIPAL_CACHE_TTL_SECONDS = int(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", 300))
+    PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+    # Revocation is seen by other worker processes within this many seconds (0 reads it every request)
+    TOKEN_VERSION_CACHE_SECONDS = float(os.environ.get("TOKEN_VERSION_CACHE_SECONDS", 2))
+
+    # Password hashing pool: bcrypt cost factor, worker threads (default one per CPU),
+    # work allowed to queue before sign-ins get 503, and seconds a caller waits
+    BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 0))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", 32))
+    PASSWORD_HASH_TIMEOUT_SECONDS = float(os.environ.get("PASSWORD_HASH_TIMEOUT_SECONDS", 10))
+
+    # Rate limits of the auth endpoints: 'memory' counts per process, 'database'
+    # shares counters across processes. RATE_LIMITS overrides the declared
+    # limits, e.g. {'login': {'ip': '20/60', 'email': '5/300'}}
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", 100000))
+    RATE_LIMITS = {}
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted for
+    # the client IP (1 behind the ngrok tunnel); 0 when clients connect directly
+    TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", 0))
+
+    # Background threads (job workers, email sender) started by create_app in
+    # every process serving the app; tests turn them off
+    BACKGROUND_WORKERS_ENABLED = os.environ.get("BACKGROUND_WORKERS_ENABLED", "true").lower() == "true"
+
+    # Outgoing email: SMTP server and the outbox sender threads. The sender
+    # does not start without SMTP_PASSWORD while SMTP_USERNAME is set. For local
+    # development run `python -m services.local_smtp` and set SMTP_HOST=localhost,
+    # SMTP_PORT=1025, SMTP_USE_SSL=false, SMTP_USERNAME= (empty)
+    SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT = int(os.environ.get("SMTP_PORT", 465))
+    SMTP_USE_SSL = os.environ.get("SMTP_USE_SSL", "true").lower() == "true"
+    SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "false").lower() == "true"
+    SMTP_USERNAME = os.environ.get("SMTP_USERNAME", "daloverflow@gmail.com")
+    SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD")
+    SMTP_IDLE_SECONDS = float(os.environ.get("SMTP_IDLE_SECONDS", 60))
+    MAIL_SENDER = os.environ.get("MAIL_SENDER", "daloverflow@gmail.com")
+    EMAIL_WORKERS = int(os.environ.get("EMAIL_WORKERS", 1))
+    EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", 20))
+    EMAIL_POLL_SECONDS = float(os.environ.get("EMAIL_POLL_SECONDS", 2))
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", 5))
+    EMAIL_BACKOFF_SECONDS = float(os.environ.get("EMAIL_BACKOFF_SECONDS", 10))
+
+    # Email one-time codes (registration, password reset)
+    OTP_TTL_SECONDS = int(os.environ.get("OTP_TTL_SECONDS", 600))
+    OTP_MAX_ATTEMPTS = int(os.environ.get("OTP_MAX_ATTEMPTS", 5))
+
+    # Notification push streams (server-sent events): 'memory' delivers within
+    # one process, 'database' shares new notifications across processes by
+    # polling the notifications table every NOTIFICATION_POLL_SECONDS
+    NOTIFICATION_BROKER = os.environ.get("NOTIFICATION_BROKER", "memory")
+    NOTIFICATION_POLL_SECONDS = float(os.environ.get("NOTIFICATION_POLL_SECONDS", 1))
+    NOTIFICATION_HEARTBEAT_SECONDS = float(os.environ.get("NOTIFICATION_HEARTBEAT_SECONDS", 15))
+    NOTIFICATION_STREAM_MAX_SECONDS = float(os.environ.get("NOTIFICATION_STREAM_MAX_SECONDS", 300))
+    NOTIFICATION_STREAM_MAX_CONNECTIONS = int(os.environ.get("NOTIFICATION_STREAM_MAX_CONNECTIONS", 1000))
+    NOTIFICATION_REPLAY_LIMIT = int(os.environ.get("NOTIFICATION_REPLAY_LIMIT", 50))
+    # Notification outbox dispatcher threads (started by app.py)
+    NOTIFICATION_DISPATCH_WORKERS = int(os.environ.get("NOTIFICATION_DISPATCH_WORKERS", 1))
+    NOTIFICATION_DISPATCH_BATCH_SIZE = int(os.environ.get("NOTIFICATION_DISPATCH_BATCH_SIZE", 100))
+    NOTIFICATION_DISPATCH_POLL_SECONDS = float(os.environ.get("NOTIFICATION_DISPATCH_POLL_SECONDS", 1))
+    NOTIFICATION_DISPATCH_MAX_ATTEMPTS = int(os.environ.get("NOTIFICATION_DISPATCH_MAX_ATTEMPTS", 5))
+    NOTIFICATION_INSERT_CHUNK_SIZE = int(os.environ.get("NOTIFICATION_INSERT_CHUNK_SIZE", 500))
+    # Answers/comments on a question within this window notify followers once
+    NOTIFICATION_COALESCE_SECONDS = float(os.environ.get("NOTIFICATION_COALESCE_SECONDS", 30))
+
+    # Background job queue (started by app.py)
+    JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+    JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", 1))
+    JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 5))
+    JOB_BACKOFF_SECONDS = float(os.environ.get("JOB_BACKOFF_SECONDS", 5))
+    JOB_BACKOFF_MAX_SECONDS = float(os.environ.get("JOB_BACKOFF_MAX_SECONDS", 600))
+    JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", 300))
     
     @classmethod
     def print_db_uri(cls):
@@ -3,12 +3,139 @@ Description: User routes for handling user-related API endpoints.
 Created By: Devang
 Created: 2025-11-01
 Last Modified: Saayonee @ 12.28 AM Nov 9
-    
+    2026-10-19 - Users resolved through the principal cache instead of a
+                 query per request (Bryan Vela).
+    2026-10-19 - Version 2 tokens authenticate from their claims; the user is
+                 loaded only when used, and revoked tokens are rejected (Bryan Vela).
+    2026-10-19 - Debug prints replaced with logging.debug; headers and tokens
+                 are no longer written out (Bryan Vela).
+    2026-10-19 - stream_login_required, taking the token from the query string
+                 for EventSource (Bryan Vela).
+    2026-10-19 - The query string takes only short-lived stream tickets, never
+                 login tokens (Bryan Vela).
 """
 from functools import wraps
-from flask import request, redirect, url_for, session, jsonify, current_app
-from models.user import User
+from flask import request, redirect, url_for, session, jsonify, current_app, g
+from werkzeug.local import LocalProxy
+from middleware.principal_cache import load_principal, current_token_version
+import datetime
 import jwt
+import logging
+
+# Lifetime of a stream ticket; EventSource needs it only to open the stream
+STREAM_TICKET_SECONDS = 60
+STREAM_TICKET_SCOPE = 'notification_stream'
+
+
+class TokenRevokedError(jwt.InvalidTokenError):
+    """Token was issued before the user's tokens were revoked"""
+
+
+def decode_token(token):
+    """
+    Decode a bearer token into the caller's identity.
+
+    Tokens with claims version 2 carry user_id, username and is_admin and are
+    checked against the user's token version (one cached column), so no user
+    row is loaded. Older tokens carry only a username and are resolved
+    through the principal cache.
+
+    Args:
+        token (str): Authorization header value, with or without 'Bearer '.
+
+    Returns:
+        dict: user_id, username, is_admin and, for older tokens, the loaded user.
+
+    Raises:
+        jwt.InvalidTokenError: If the token is invalid, expired, revoked or its
+                               user no longer exists.
+    """
+    token = token.replace('Bearer ', '').strip()
+    data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+    if 'scope' in data:
+        # Stream tickets open a stream and nothing else
+        raise jwt.InvalidTokenError('Not a login token')
+
+    if data.get('ver', 1) >= 2:
+        version = current_token_version(data['user_id'])
+        if version is None:
+            raise jwt.InvalidTokenError('User not found')
+        if data.get('tv', 0) != version:
+            raise TokenRevokedError('Token has been revoked')
+        return {
+            'user_id': data['user_id'],
+            'username': data['username'],
+            'is_admin': bool(data.get('is_admin', False)),
+            'user': None
+        }
+
+    user = load_principal(data.get('username'))
+    if not user:
+        raise jwt.InvalidTokenError('User not found')
+    return {
+        'user_id': user.id,
+        'username': user.username,
+        'is_admin': bool(getattr(user, 'is_admin', False)),
+        'user': user
+    }
+
+
+def request_identity():
+    """
+    Identity of the request's bearer token, for endpoints that work without
+    logging in but do more for a logged in user.
+
+    Returns:
+        dict|None: As decode_token, or None if no valid token was sent.
+    """
+    token = request.headers.get('Authorization')
+    if not token:
+        return None
+    try:
+        return decode_token(token)
+    except jwt.InvalidTokenError:
+        return None
+
+
+def _current_user():
+    """Load the authenticated user on first use in a request"""
+    if 'auth_user' not in g:
+        g.auth_user = load_principal(request.user_id)
+    return g.auth_user
+
+
+def _authenticate(token):
+    """
+    Set request.user_id, username, is_admin and user from a bearer token.
+
+    Returns:
+        None if the token is valid, else the 401 response to send.
+    """
+    try:
+        identity = decode_token(token)
+
+        # Set user information; the full user is loaded only if a view uses it
+        request.user_id = identity['user_id']
+        request.username = identity['username']
+        request.is_admin = identity['is_admin']
+        if identity['user'] is not None:
+            g.auth_user = identity['user']
+        request.user = LocalProxy(_current_user)
+        logging.debug(f"Authenticated user_id={request.user_id}")
+        return None
+
+    except jwt.ExpiredSignatureError:
+        logging.debug("Auth failed: token expired")
+        return jsonify({'error': 'Token has expired. Please log in again.'}), 401
+    except TokenRevokedError:
+        logging.debug("Auth failed: token revoked")
+        return jsonify({'error': 'Token has been revoked. Please log in again.'}), 401
+    except jwt.InvalidTokenError as e:
+        logging.debug(f"Auth failed: invalid token: {e}")
+        return jsonify({'error': f'Invalid token: {str(e)}'}), 401
+    except Exception as e:
+        logging.exception(f"Unexpected authentication error: {e}")
+        return jsonify({'error': 'Authentication failed'}), 401
 
 
 def login_required(view_func):
@@ -21,9 +148,8 @@ def login_required(view_func):
     """
     @wraps(view_func)
     def wrapped_view(*args, **kwargs):
-        print(f"DEBUG: Path={request.path}")
-        print(f"DEBUG: Headers={dict(request.headers)}")
-    
+        logging.debug(f"Auth check for {request.path}")
+
         # Check if this is an API request
         is_api_request = (
             'Authorization' in request.headers or 
@@ -31,59 +157,104 @@ def login_required(view_func):
             request.content_type == 'application/json'
         )
         
-        print(f"DEBUG: is_api_request={is_api_request}")
-        
         if is_api_request:
             token = request.headers.get('Authorization')
-            print(f"DEBUG: Token={token[:50] if token else None}...")
-            
             if not token:
-                print("DEBUG: No token found!")
+                logging.debug("Auth failed: no token")
                 return jsonify({'error': 'Authentication required. No token provided.'}), 401
-            
-            try:
-                token = token.replace('Bearer ', '').strip()
-                data = jwt.decode(
-                    token, 
-                    current_app.config['SECRET_KEY'], 
-                    algorithms=['HS256']
-                )
-                
-                print(f"DEBUG: Token decoded, username={data.get('username')}")
-                
-                user = User.query.filter_by(username=data.get('username')).first()
-                
-                if not user:
-                    print("DEBUG: User not found in database!")
-                    return jsonify({'error': 'User not found'}), 401
-                
-                # Set user information
-                request.user_id = user.id
-                request.username = user.username
-                request.user = user
-                request.is_admin = getattr(user, 'is_admin', False)
-                
-                print(f"DEBUG: Set request.user_id={request.user_id}")
-                
-            except jwt.ExpiredSignatureError:
-                print("DEBUG: Token expired!")
-                return jsonify({'error': 'Token has expired. Please log in again.'}), 401
-            except jwt.InvalidTokenError as e:
-                print(f"DEBUG: Invalid token: {e}")
-                return jsonify({'error': f'Invalid token: {str(e)}'}), 401
-            except Exception as e:
-                print(f"DEBUG: Unexpected error: {e}")
-                import traceback
-                traceback.print_exc()
-                return jsonify({'error': 'Authentication failed'}), 401
-        
-        print("DEBUG: About to call view function")
+            error = _authenticate(token)
+            if error is not None:
+                return error
+
         return view_func(*args, **kwargs)
     return wrapped_view
 
 
 
+def admin_required(view_func):
+    """
+    Decorator for endpoints only administrators may use, such as internal
+    metrics: login_required, then 403 unless the user is an admin.
+    """
+    @wraps(view_func)
+    def check_admin(*args, **kwargs):
+        if not getattr(request, 'is_admin', False):
+            return jsonify({'error': 'Administrator access required'}), 403
+        return view_func(*args, **kwargs)
+    return login_required(check_admin)
+
+
+def issue_stream_ticket(user_id):
+    """
+    Sign a short-lived ticket that opens the user's notification stream.
+    EventSource cannot set an Authorization header, so the ticket goes in the
+    URL instead of the login token, which would end up in access logs.
+
+    Args:
+        user_id (int): The logged in user.
+
+    Returns:
+        str: Ticket valid for STREAM_TICKET_SECONDS.
+    """
+    now = datetime.datetime.utcnow()
+    return jwt.encode({
+        'scope': STREAM_TICKET_SCOPE,
+        'user_id': user_id,
+        'tv': current_token_version(user_id) or 0,
+        'iat': now,
+        'exp': now + datetime.timedelta(seconds=STREAM_TICKET_SECONDS)
+    }, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def _authenticate_ticket(ticket):
+    """
+    Set request.user_id from a stream ticket.
+
+    Returns:
+        None if the ticket is valid, else the 401 response to send.
+    """
+    try:
+        data = jwt.decode(ticket, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        if data.get('scope') != STREAM_TICKET_SCOPE:
+            raise jwt.InvalidTokenError('Not a stream ticket')
+        if data.get('tv', 0) != current_token_version(data['user_id']):
+            raise TokenRevokedError('Token has been revoked')
+    except jwt.ExpiredSignatureError:
+        return jsonify({'error': 'Stream ticket has expired. Request a new one.'}), 401
+    except jwt.InvalidTokenError as e:
+        logging.debug(f"Stream ticket rejected: {e}")
+        return jsonify({'error': 'Invalid stream ticket'}), 401
+
+    request.user_id = data['user_id']
+    request.is_admin = False
+    request.user = LocalProxy(_current_user)
+    return None
+
+
+def stream_login_required(view_func):
+    """
+    Decorator for server-sent event endpoints: as login_required, or with a
+    stream ticket from issue_stream_ticket in the token query parameter,
+    since EventSource cannot set an Authorization header.
+    """
+    @wraps(view_func)
+    def wrapped_view(*args, **kwargs):
+        token = request.headers.get('Authorization')
+        if token:
+            error = _authenticate(token)
+        elif request.args.get('token'):
+            error = _authenticate_ticket(request.args['token'])
+        else:
+            logging.debug("Auth failed: no token")
+            return jsonify({'error': 'Authentication required. No token provided.'}), 401
+        if error is not None:
+            return error
+        return view_func(*args, **kwargs)
+    return wrapped_view
+
+
 def token_required(f):
+    @wraps(f)
     def wrapper(*args, **kwargs):
         token = request.headers.get('Authorization')
         # print(f"Token: {token}")  
@@ -91,16 +262,15 @@ def token_required(f):
         if not token: return jsonify({'error': 'No token'}), 401
         
         try:
-            token = token.replace('Bearer ', '')
-            # print(f"Cleaned token: {token}")  
-
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            # print(f"Decoded data: {data}")
+            identity = decode_token(token)
+            # print(f"Decoded identity: {identity}")
             
-            user = User.query.filter_by(username=data['username']).first()
+            user = identity['user'] or load_principal(identity['user_id'])
             # print(f"User found: {user}")
+            if user is None:
+                raise jwt.InvalidTokenError('User not found')
         except Exception as e:
-            print(f"Error: {e}")
+            logging.debug(f"Token rejected: {e}")
             return jsonify({'error':'Invalid token'}), 401
         
         return f(user, *args, **kwargs)
@@ -0,0 +1,293 @@
+"""
+Description: Cache of authenticated principals for the auth middleware.
+Maps a token subject (user id, or username for older tokens) to a snapshot of
+the user's identity columns, so an authenticated request is decode, cache
+hit, done - no user query. A second, compact cache holds each user's current
+token version for revocation checks, for only a few seconds: revoking clears
+it in the revoking process alone, so its TTL bounds how long other worker
+processes accept a revoked token.
+Snapshots are re-attached to the request's session without SQL; columns left
+out of the snapshot (password, reputation) load from the DB if accessed.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with a bounded, TTL'd LRU and invalidation.
+    2026-10-19 - Subjects may be user ids; added the token version cache.
+    2026-10-19 - Token versions cached for TOKEN_VERSION_CACHE_SECONDS only.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy.orm import make_transient_to_detached
+from database import db
+from models.user import User
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_TOKEN_VERSION_TTL_SECONDS = 2.0
+DEFAULT_MAX_ENTRIES = 10000
+
+EXTENSION_KEY = 'principal_cache'
+TOKEN_VERSIONS_KEY = 'token_versions'
+
+# Identity columns kept in a snapshot; others load lazily when accessed
+PRINCIPAL_FIELDS = (
+    'id', 'username', 'email', 'display_name', 'profile_picture_url',
+    'university', 'registration_date', 'created_at', 'updated_at',
+    'is_admin', 'token_version'
+)
+
+
+class PrincipalCache:
+    """
+    Thread-safe LRU of user snapshots with a time-to-live.
+
+    Attributes:
+        ttl (float): Seconds an entry is served; keep well below the token lifetime.
+        max_entries (int): Entries kept; the least recently used are evicted.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._subjects_by_user = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a cache from PRINCIPAL_CACHE_TTL_SECONDS and PRINCIPAL_CACHE_MAX_ENTRIES.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            PrincipalCache: The new cache.
+        """
+        return cls(
+            ttl_seconds=float(config.get('PRINCIPAL_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+            max_entries=int(config.get('PRINCIPAL_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+        )
+
+    def _drop(self, key):
+        """Remove an entry and its user index (lock held)"""
+        values, _ = self._entries.pop(key)
+        subjects = self._subjects_by_user.get(values['id'])
+        if subjects is not None:
+            subjects.discard(key)
+            if not subjects:
+                del self._subjects_by_user[values['id']]
+
+    def get(self, key):
+        """
+        Look up a live snapshot.
+
+        Args:
+            key (Hashable): Token subject.
+
+        Returns:
+            dict|None: Snapshot of the user's identity columns.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None:
+                    self._drop(key)
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, values):
+        """
+        Store a snapshot, evicting the least recently used beyond max_entries.
+
+        Args:
+            key (Hashable): Token subject.
+            values (dict): Snapshot from snapshot_user.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (values, self._clock() + self.ttl)
+            self._subjects_by_user.setdefault(values['id'], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def invalidate(self, user_id):
+        """
+        Drop every entry of a user, e.g. after their profile changed.
+
+        Args:
+            user_id (int): User id.
+        """
+        with self._lock:
+            for key in list(self._subjects_by_user.get(user_id, ())):
+                self._drop(key)
+                self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._subjects_by_user.clear()
+
+    def stats(self):
+        """
+        Get cache metrics.
+
+        Returns:
+            dict: hits, misses, evictions, invalidations, entries and max_entries.
+        """
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), max_entries=self.max_entries)
+
+
+def snapshot_user(user):
+    """
+    Copy a user's identity columns for caching.
+
+    Args:
+        user (User): Loaded user.
+
+    Returns:
+        dict: PRINCIPAL_FIELDS values.
+    """
+    return {field: getattr(user, field) for field in PRINCIPAL_FIELDS}
+
+
+def attach_user(values):
+    """
+    Turn a snapshot into a User in the current session without running SQL.
+
+    Args:
+        values (dict): Snapshot from snapshot_user.
+
+    Returns:
+        User: Persistent user; columns not in the snapshot load on access.
+    """
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def init_principal_cache(app):
+    """
+    Create the app's principal cache and token version cache.
+
+    Args:
+        app (Flask): The application.
+
+    Returns:
+        PrincipalCache: The principal cache.
+    """
+    cache = PrincipalCache.from_config(app.config)
+    app.extensions[EXTENSION_KEY] = cache
+    app.extensions[TOKEN_VERSIONS_KEY] = PrincipalCache(
+        ttl_seconds=float(app.config.get('TOKEN_VERSION_CACHE_SECONDS', DEFAULT_TOKEN_VERSION_TTL_SECONDS)),
+        max_entries=cache.max_entries
+    )
+    return cache
+
+
+def clear_principal_caches(app):
+    """
+    Empty both caches of an app, e.g. after its users table was wiped.
+
+    Args:
+        app (Flask): The application.
+    """
+    for key in (EXTENSION_KEY, TOKEN_VERSIONS_KEY):
+        cache = app.extensions.get(key)
+        if cache is not None:
+            cache.clear()
+
+
+def get_principal_cache(app=None):
+    """
+    Get the app's principal cache.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        PrincipalCache|None: The cache, or None if the app has none.
+    """
+    app = app or current_app._get_current_object()
+    return app.extensions.get(EXTENSION_KEY)
+
+
+def load_principal(subject):
+    """
+    Get the user a token was issued to, from the cache when possible.
+
+    Args:
+        subject (int|str): User id, or username (tokens without claims version 2).
+
+    Returns:
+        User|None: The user, or None if no such user exists.
+    """
+    cache = get_principal_cache()
+    if cache is not None:
+        values = cache.get(subject)
+        if values is not None:
+            return attach_user(values)
+
+    if isinstance(subject, int):
+        user = db.session.get(User, subject)
+    else:
+        user = User.query.filter_by(username=subject).first()
+    if user is not None and cache is not None:
+        cache.put(subject, snapshot_user(user))
+    return user
+
+
+def current_token_version(user_id):
+    """
+    Get a user's current token version, reading only that column on a miss.
+    Cached for TOKEN_VERSION_CACHE_SECONDS, so a token revoked by another
+    process is refused here within that time.
+
+    Args:
+        user_id (int): User id.
+
+    Returns:
+        int|None: The version, or None if no such user exists.
+    """
+    app = current_app._get_current_object()
+    versions = app.extensions.get(TOKEN_VERSIONS_KEY)
+    if versions is not None and versions.ttl <= 0:
+        versions = None
+    if versions is not None:
+        values = versions.get(user_id)
+        if values is not None:
+            return values['token_version']
+
+    version = db.session.query(User.token_version).filter(User.id == user_id).scalar()
+    if version is not None and versions is not None:
+        versions.put(user_id, {'id': user_id, 'token_version': version})
+    return version
+
+
+def invalidate_principal(user_id):
+    """
+    Drop a user's cached principal and token version. Safe to call outside
+    a request or app.
+
+    Args:
+        user_id (int): User id.
+    """
+    try:
+        app = current_app._get_current_object()
+    except RuntimeError:
+        # No application context
+        return
+    for key in (EXTENSION_KEY, TOKEN_VERSIONS_KEY):
+        cache = app.extensions.get(key)
+        if cache is not None:
+            cache.invalidate(user_id)
@@ -0,0 +1,419 @@
+"""
+Description: Sliding-window rate limiting for abuse-prone endpoints.
+Limits are declared per blueprint endpoint and keyed by client IP and by the
+email in the request body, so a single client cannot hammer login, sign-up
+or OTP emails, and neither can many clients aimed at one account. Counters
+live in-process by default; the database backend shares them across worker
+processes, and any RateLimitBackend can be plugged in.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with memory and database backends.
+    2026-10-19 - Client IP taken from trusted proxy headers (TRUSTED_PROXY_HOPS);
+                 RateLimitBackend is an abstract base class.
+"""
+import abc
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, jsonify, request
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models.rate_limit_counter import RateLimitCounter
+
+DEFAULT_MAX_KEYS = 100000
+# Share of database hits that also delete counters of finished windows
+DEFAULT_CLEANUP_RATE = 0.01
+
+EXTENSION_KEY = 'rate_limiter'
+
+SCOPE_IP = 'ip'
+SCOPE_EMAIL = 'email'
+
+
+def parse_limit(spec):
+    """
+    Parse a limit written as '<requests>/<seconds>', e.g. '5/60'.
+
+    Args:
+        spec (str|tuple): Limit string, or an already parsed (requests, seconds).
+
+    Returns:
+        tuple: (requests, seconds).
+
+    Raises:
+        ValueError: If the limit is malformed or not positive.
+    """
+    if isinstance(spec, tuple):
+        requests_, seconds = spec
+    else:
+        requests_, _, seconds = str(spec).partition('/')
+    requests_, seconds = int(requests_), int(seconds)
+    if requests_ < 1 or seconds < 1:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return requests_, seconds
+
+
+def sliding_window(previous, current, limit, window, elapsed):
+    """
+    Decide one request with the sliding window counter algorithm.
+
+    The previous window's hits are weighted by how much of it still overlaps
+    the sliding window, which approximates a true sliding log in O(1) space.
+
+    Args:
+        previous (int): Hits let through in the previous window.
+        current (int): Hits let through so far in the current window.
+        limit (int): Requests allowed per window.
+        window (int): Window length in seconds.
+        elapsed (float): Seconds since the current window started.
+
+    Returns:
+        tuple: (allowed, retry_after) where retry_after is 0 when allowed,
+               else the seconds until a request would be let through.
+    """
+    if previous * (1 - elapsed / window) + current + 1 <= limit:
+        return True, 0.0
+    if current + 1 <= limit:
+        # Wait until enough of the previous window has slid out
+        return False, window * (1 - (limit - 1 - current) / previous) - elapsed
+    # Wait for the next window, then for this one to slide out far enough
+    return False, (window - elapsed) + window * (1 - (limit - 1) / current)
+
+
+class RateLimitBackend(abc.ABC):
+    """
+    Storage of rate limit counters. Subclass and implement `hit` to keep them
+    elsewhere (e.g. a shared cache).
+    """
+
+    @abc.abstractmethod
+    def hit(self, key, limit, window, now):
+        """
+        Count one request against a key if the limit allows it.
+
+        Args:
+            key (str): Opaque key (limit name, scope and client key).
+            limit (int): Requests allowed per window.
+            window (int): Window length in seconds.
+            now (float): Current epoch time in seconds.
+
+        Returns:
+            tuple: (allowed, retry_after) as from sliding_window.
+        """
+
+    def reset(self):
+        """Forget every counter"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Counters in a bounded in-process LRU. Each worker process limits on its
+    own, so the effective limit is multiplied by the number of processes.
+
+    Attributes:
+        max_keys (int): Keys kept; the least recently used are dropped.
+    """
+
+    def __init__(self, max_keys=DEFAULT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._counters = OrderedDict()
+
+    def hit(self, key, limit, window, now):
+        index = int(now // window)
+        with self._lock:
+            start, previous, current = self._counters.get(key, (index, 0, 0))
+            if start != index:
+                # Roll the windows forward; anything older than one window is gone
+                previous, current = (current if start == index - 1 else 0), 0
+            allowed, retry_after = sliding_window(previous, current, limit, window, now - index * window)
+            if allowed:
+                current += 1
+            self._counters[key] = (index, previous, current)
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        return allowed, retry_after
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class DatabaseRateLimitBackend(RateLimitBackend):
+    """
+    Counters in the rate_limit_counters table, shared by every process using
+    the database. Costs a read and a write per limited request.
+
+    Attributes:
+        cleanup_rate (float): Share of hits that also delete finished windows.
+    """
+
+    def __init__(self, cleanup_rate=DEFAULT_CLEANUP_RATE):
+        self.cleanup_rate = cleanup_rate
+
+    def hit(self, key, limit, window, now):
+        index = int(now // window)
+        counts = dict(db.session.execute(
+            select(RateLimitCounter.window, RateLimitCounter.hits)
+            .where(RateLimitCounter.bucket_key == key, RateLimitCounter.window.in_((index - 1, index)))
+        ).all())
+        allowed, retry_after = sliding_window(
+            counts.get(index - 1, 0), counts.get(index, 0), limit, window, now - index * window
+        )
+        if allowed:
+            self._increment(key, index)
+        if random.random() < self.cleanup_rate:
+            db.session.execute(delete(RateLimitCounter).where(
+                RateLimitCounter.bucket_key == key, RateLimitCounter.window < index - 1
+            ))
+        db.session.commit()
+        return allowed, retry_after
+
+    def _increment(self, key, index):
+        """Add one hit to a window, creating its row on first use"""
+        result = db.session.execute(
+            update(RateLimitCounter)
+            .where(RateLimitCounter.bucket_key == key, RateLimitCounter.window == index)
+            .values(hits=RateLimitCounter.hits + 1)
+        )
+        if result.rowcount:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(RateLimitCounter(bucket_key=key, window=index, hits=1))
+        except IntegrityError:
+            # Another process created the row first
+            db.session.execute(
+                update(RateLimitCounter)
+                .where(RateLimitCounter.bucket_key == key, RateLimitCounter.window == index)
+                .values(hits=RateLimitCounter.hits + 1)
+            )
+
+    def reset(self):
+        db.session.execute(delete(RateLimitCounter))
+        db.session.commit()
+
+
+class RateLimiter:
+    """
+    Applies declared limits to requests.
+
+    Attributes:
+        backend (RateLimitBackend): Where counters are kept.
+        enabled (bool): When False every request is let through.
+        overrides (dict): Config overrides by limit name, e.g.
+                          {'login': {'ip': '20/60', 'email': '5/300'}}.
+    """
+
+    def __init__(self, backend=None, enabled=True, overrides=None, clock=time.time):
+        self.backend = backend or MemoryRateLimitBackend()
+        self.enabled = enabled
+        self.overrides = overrides or {}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats = {'allowed': 0, 'limited': 0, 'errors': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a limiter from RATE_LIMIT_ENABLED, RATE_LIMIT_BACKEND ('memory'
+        or 'database'), RATE_LIMIT_MAX_KEYS and RATE_LIMITS (overrides).
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            RateLimiter: The new limiter.
+        """
+        if config.get('RATE_LIMIT_BACKEND', 'memory') == 'database':
+            backend = DatabaseRateLimitBackend()
+        else:
+            backend = MemoryRateLimitBackend(int(config.get('RATE_LIMIT_MAX_KEYS', DEFAULT_MAX_KEYS)))
+        return cls(
+            backend=backend,
+            enabled=bool(config.get('RATE_LIMIT_ENABLED', True)),
+            overrides=config.get('RATE_LIMITS') or {}
+        )
+
+    def limits_for(self, name, defaults):
+        """
+        Resolve the limits of a named rule, config overrides first.
+
+        Args:
+            name (str): Rule name, e.g. 'login'.
+            defaults (dict): Limit per scope, e.g. {'ip': '20/60'}.
+
+        Returns:
+            dict: (requests, seconds) per scope.
+        """
+        merged = dict(defaults, **self.overrides.get(name, {}))
+        return {scope: parse_limit(spec) for scope, spec in merged.items() if spec}
+
+    def check(self, name, limits, client_keys):
+        """
+        Count a request against every applicable limit.
+
+        Args:
+            name (str): Rule name.
+            limits (dict): (requests, seconds) per scope.
+            client_keys (dict): Client key per scope, e.g. {'ip': '1.2.3.4'};
+                                scopes without a key are skipped.
+
+        Returns:
+            float: 0 if the request may proceed, else seconds to wait.
+        """
+        if not self.enabled:
+            return 0.0
+        now = self._clock()
+        wait = 0.0
+        for scope, (limit, window) in limits.items():
+            client_key = client_keys.get(scope)
+            if not client_key:
+                continue
+            key = hashlib.sha256(f"{name}|{scope}|{client_key}".encode('utf-8')).hexdigest()
+            try:
+                allowed, retry_after = self.backend.hit(key, limit, window, now)
+            except Exception as e:
+                # Fail open: a broken counter store must not lock everyone out
+                logging.error(f"Rate limit backend error: {str(e)}")
+                with self._lock:
+                    self._stats['errors'] += 1
+                continue
+            if not allowed:
+                wait = max(wait, retry_after)
+        with self._lock:
+            self._stats['limited' if wait else 'allowed'] += 1
+        return wait
+
+    def reset(self):
+        """Forget every counter, e.g. between tests"""
+        self.backend.reset()
+
+    def stats(self):
+        """
+        Get limiter counters.
+
+        Returns:
+            dict: allowed, limited, errors, enabled and the backend class name.
+        """
+        with self._lock:
+            return dict(self._stats, enabled=self.enabled, backend=type(self.backend).__name__)
+
+
+def init_rate_limiter(app, backend=None):
+    """
+    Create the app's rate limiter.
+
+    Args:
+        app (Flask): The application.
+        backend (RateLimitBackend|None): Backend to use instead of the configured one.
+
+    Returns:
+        RateLimiter: The limiter.
+    """
+    limiter = RateLimiter.from_config(app.config)
+    if backend is not None:
+        limiter.backend = backend
+    app.extensions[EXTENSION_KEY] = limiter
+    return limiter
+
+
+def get_rate_limiter(app=None):
+    """
+    Get the app's rate limiter.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        RateLimiter|None: The limiter, or None if the app has none.
+    """
+    app = app or current_app._get_current_object()
+    return app.extensions.get(EXTENSION_KEY)
+
+
+def trust_proxy_headers(app):
+    """
+    Take the client address from X-Forwarded-For (and the scheme and host
+    from X-Forwarded-Proto/-Host) when TRUSTED_PROXY_HOPS proxies, such as
+    the ngrok tunnel, sit in front of the app. Without it every request
+    seems to come from the proxy and per-IP limits apply site-wide. Leave it
+    at 0 when clients reach the app directly, or they could pick their IP.
+
+    Args:
+        app (Flask): The application.
+    """
+    hops = int(app.config.get('TRUSTED_PROXY_HOPS', 0))
+    if hops > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
+
+def _client_keys():
+    """IP and (normalized) email of the current request"""
+    data = request.get_json(silent=True) or {}
+    email = data.get('email') if isinstance(data, dict) else None
+    return {
+        SCOPE_IP: request.remote_addr,
+        SCOPE_EMAIL: email.strip().lower() if isinstance(email, str) else None
+    }
+
+
+def too_many_requests(retry_after):
+    """
+    429 response telling the client when to try again.
+
+    Args:
+        retry_after (float): Seconds until a request would be let through.
+
+    Returns:
+        Response: JSON error with a Retry-After header.
+    """
+    seconds = max(1, math.ceil(retry_after))
+    response = jsonify({
+        'success': False,
+        'message': f'Too many attempts. Please try again in {seconds} seconds.',
+        'retry_after': seconds
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+
+def rate_limit_blueprint(blueprint, rules):
+    """
+    Declare rate limits for endpoints of a blueprint.
+
+    Args:
+        blueprint (Blueprint): Blueprint whose endpoints are limited.
+        rules (dict): Per view function name, the HTTP methods limited and a
+                      limit per scope, e.g.
+                      {'login': {'methods': ('POST',), 'ip': '20/60', 'email': '5/300'}}.
+                      The view name is also the rule name used by RATE_LIMITS.
+    """
+    declared = {}
+    for view, rule in rules.items():
+        rule = dict(rule)
+        methods = tuple(rule.pop('methods', ('POST',)))
+        declared[f"{blueprint.name}.{view}"] = (view, methods, rule)
+
+    @blueprint.before_request
+    def apply_rate_limits():
+        entry = declared.get(request.endpoint)
+        if entry is None:
+            return None
+        name, methods, defaults = entry
+        limiter = get_rate_limiter()
+        if limiter is None or request.method not in methods:
+            return None
+        wait = limiter.check(name, limiter.limits_for(name, defaults), _client_keys())
+        if wait:
+            return too_many_requests(wait)
+        return None
@@ -1,5 +1,7 @@
 from .base_model import BaseModel
 from .notification import Notification
+from .notification_counter import NotificationCounter
+from .notification_outbox import NotificationOutbox
 from .questiontag import QuestionTag
 from .user import User
 from .vote import Vote
@@ -7,5 +9,13 @@ from .tag import Tag
 from .answer import Answer
 from .question import Question
 from .comment import Comment
+from .question_follow import QuestionFollow
+from .ai_response import AIResponse
+from .background_job import BackgroundJob
+from .answer_summary import AnswerSummary
+from .backfill_checkpoint import BackfillCheckpoint
+from .rate_limit_counter import RateLimitCounter
+from .email_outbox import EmailOutbox
+from .otp_code import OTPCode
 
-__all__ = ['BaseModel', 'Notification', 'QuestionTag', 'User', 'Tag', 'Vote', 'Question', 'Answer', 'Comment']
\ No newline at end of file
+__all__ = ['BaseModel', 'Notification', 'NotificationCounter', 'NotificationOutbox', 'QuestionTag', 'User', 'Tag', 'Vote', 'Question', 'Answer', 'Comment', 'QuestionFollow', 'AIResponse', 'BackgroundJob', 'AnswerSummary', 'BackfillCheckpoint', 'RateLimitCounter', 'EmailOutbox', 'OTPCode']
\ No newline at end of file
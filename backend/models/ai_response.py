@@ -0,0 +1,50 @@
+"""
+Description: Stored Gemini responses, addressed by a hash of their prompt inputs.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for the AI response cache.
+"""
+from .base_model import BaseModel
+from database import db
+
+
+class AIResponse(BaseModel):
+    """
+    AIResponse model holding one cached AI answer or summary.
+
+    Attributes:
+        id (int): Primary key.
+        cache_key (str): sha256 hex of model, prompt version and normalized inputs.
+        kind (str): 'answer' or 'summary'.
+        model_name (str): Gemini model that produced the response.
+        response (str): Generated text.
+        is_truncated (bool): Whether the stored text was cut off by the token limit.
+        hit_count (int): Times the entry was served from the cache.
+        last_used_at (datetime): Last time the entry was stored or served.
+        expires_at (datetime): When the entry stops being served.
+    """
+    __tablename__ = 'ai_responses'
+
+    cache_key = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    kind = db.Column(db.String(20), nullable=False)
+    model_name = db.Column(db.String(100), nullable=False)
+    response = db.Column(db.Text, nullable=False)
+    is_truncated = db.Column(db.Boolean, default=False)
+    hit_count = db.Column(db.Integer, default=0)
+    last_used_at = db.Column(db.DateTime, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def to_dict(self):
+        base_dict = super().to_dict()
+        base_dict.update({
+            'cache_key': self.cache_key,
+            'kind': self.kind,
+            'model_name': self.model_name,
+            'response': self.response,
+            'is_truncated': self.is_truncated,
+            'hit_count': self.hit_count or 0,
+            'last_used_at': self.last_used_at,
+            'expires_at': self.expires_at
+        })
+        return base_dict
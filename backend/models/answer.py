@@ -5,11 +5,15 @@ Created: 2025-10-25
 Last Modified: 
     2025-10-26 - File created and implemented basic CRUD operations.
     2025-12-02 - Added edit tracking fields and methods
+    2026-10-19 - Added covering index for paginated answer listings
+    2026-10-19 - update_answer reuses a single sanitize_content result
+    2026-10-19 - Added stored excerpt column
+    2026-10-19 - Edits queue a refresh of the question's AI summary
 """
 from .base_model import BaseModel
 from database import db
 from datetime import datetime, timedelta
-from utils.html_sanitizer import sanitize_html_body
+from utils.html_sanitizer import sanitize_content
 import logging
 
 
@@ -24,13 +28,20 @@ class Answer(BaseModel):
     body = body of the answer
     is_accepted = whether this answer is accepted by question author
     edit_count = number of times this answer has been edited
+    excerpt = short plain-text preview of the body
     """
 
     __tablename__ = "answers"
 
+    # Covers the accepted-first answer listing for a question
+    __table_args__ = (
+        db.Index('ix_answers_question_accepted_created', 'question_id', 'is_accepted', 'created_at'),
+    )
+
     question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     body = db.Column(db.Text)
+    excerpt = db.Column(db.String(255))
     is_accepted = db.Column(db.Boolean, default=False)
     edit_count = db.Column(db.Integer, default=0)
     
@@ -60,27 +71,37 @@ class Answer(BaseModel):
             return True
         
         return False
-  
-       
 
-    def update_answer(self, body):
+    def set_body_content(self, content):
+        """
+        Store a sanitized body together with its derived excerpt.
+
+        Args:
+            content: SanitizedContent returned by sanitize_content
+        """
+        self.body = content.html
+        self.excerpt = content.excerpt
+
+    def update_answer(self, body, content=None):
         """
         Update answer content (AC 1, AC 2)
         
         Args:
             body: New content
+            content: sanitize_content(body) result, if the caller already has one
             
         Raises:
             ValueError: If validation fails
         """
+        # Sanitize and extract plain text in one pass
+        if content is None:
+            content = sanitize_content(body)
+
         # Validate
-        from bs4 import BeautifulSoup
-        plain_text = BeautifulSoup(body, 'html.parser').get_text()
-        if len(plain_text.strip()) < 20:
+        if len(content.text) < 20:
             raise ValueError("Answer body must be at least 20 characters")
         
-        # Sanitize
-        sanitized_body = sanitize_html_body(body)
+        sanitized_body = content.html
         
         # Check if content actually changed
         if sanitized_body == self.body:
@@ -93,12 +114,15 @@ class Answer(BaseModel):
             logging.info(f"Answer {self.id}: Acceptance removed due to edit")
         
         # Update content
-        self.body = sanitized_body
+        self.set_body_content(content)
         self.edit_count = (self.edit_count or 0) + 1
         
         # updated_at is automatically set by BaseModel's onupdate
         db.session.commit()
 
+        from services.answer_summary_service import enqueue_summary_refresh
+        enqueue_summary_refresh(self.question_id)
+
     def to_dict(self, include_edit_info=False, current_user_id=None):
         """
         Convert answer to dictionary
@@ -116,6 +140,7 @@ class Answer(BaseModel):
             'question_id': self.question_id,
             'user_id': self.user_id,
             'body': self.body,
+            'excerpt': self.excerpt or '',
             'is_accepted': self.is_accepted if hasattr(self, 'is_accepted') else False,
             'edit_count': self.edit_count or 0,
             'is_edited': (self.edit_count or 0) > 0,
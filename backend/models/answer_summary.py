@@ -0,0 +1,79 @@
+"""
+Description: Stored AI summary of a question's answers.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with answer coverage tracking.
+"""
+import json
+from .base_model import BaseModel
+from database import db
+
+
+class AnswerSummary(BaseModel):
+    """
+    AnswerSummary model holding the latest AI summary of a question's answers.
+
+    Attributes:
+        id (int): Primary key.
+        question_id (int): Foreign key to the summarized question (one summary per question).
+        summary (str): Generated summary text.
+        is_truncated (bool): Whether the summary was cut off by the token limit.
+        coverage (str): JSON object of answer id -> edit_count for the answers
+                        the summary was built from.
+    """
+    __tablename__ = 'answer_summaries'
+
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False, unique=True, index=True)
+    summary = db.Column(db.Text, nullable=False)
+    is_truncated = db.Column(db.Boolean, default=False)
+    coverage = db.Column(db.Text, nullable=False, default='{}')
+
+    @staticmethod
+    def coverage_of(rows):
+        """
+        Build a coverage mapping from (answer id, edit_count) rows.
+
+        Args:
+            rows (iterable): (answer_id, edit_count) pairs.
+
+        Returns:
+            dict: str(answer id) -> edit_count, the form stored in `coverage`.
+        """
+        return {str(answer_id): edit_count or 0 for answer_id, edit_count in rows}
+
+    def get_coverage(self):
+        """Decoded coverage mapping"""
+        return json.loads(self.coverage or '{}')
+
+    def set_coverage(self, coverage):
+        """
+        Store a coverage mapping.
+
+        Args:
+            coverage (dict): Result of coverage_of.
+        """
+        self.coverage = json.dumps(coverage, sort_keys=True)
+
+    @classmethod
+    def get_for_question(cls, question_id):
+        """
+        Get the stored summary of a question.
+
+        Args:
+            question_id (int): Question id.
+
+        Returns:
+            AnswerSummary or None
+        """
+        return cls.query.filter_by(question_id=question_id).first()
+
+    def to_dict(self):
+        base_dict = super().to_dict()
+        base_dict.update({
+            'question_id': self.question_id,
+            'summary': self.summary,
+            'is_truncated': self.is_truncated,
+            'answer_count': len(self.get_coverage())
+        })
+        return base_dict
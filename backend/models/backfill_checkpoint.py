@@ -0,0 +1,99 @@
+"""
+Description: Progress of a resumable backfill run (e.g. pre-generating AI answers).
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for the AI answer backfill.
+    2026-10-19 - Failed row ids kept for the next run to retry.
+"""
+import json
+from .base_model import BaseModel
+from database import db
+
+
+class BackfillCheckpoint(BaseModel):
+    """
+    BackfillCheckpoint model recording how far a named backfill has got.
+
+    Attributes:
+        id (int): Primary key.
+        name (str): Backfill name, e.g. 'ai_answers'.
+        last_id (int): Highest row id fully handled; a resumed run starts after it.
+        processed (int): Rows handled so far.
+        generated (int): Rows filled by a new AI call.
+        cached (int): Rows filled from the AI response cache.
+        failed (int): Rows that could not be filled, awaiting a retry.
+        failed_ids (str): JSON list of those rows' ids; the next run retries them first.
+        status (str): 'running', 'paused' (stopped early, resumable) or 'done'.
+        last_error (str): Error that stopped or failed the last row.
+    """
+    __tablename__ = 'backfill_checkpoints'
+
+    RUNNING = 'running'
+    PAUSED = 'paused'
+    DONE = 'done'
+
+    name = db.Column(db.String(50), nullable=False, unique=True, index=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    generated = db.Column(db.Integer, nullable=False, default=0)
+    cached = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default=RUNNING)
+    last_error = db.Column(db.Text)
+    failed_ids = db.Column(db.Text)
+
+    @classmethod
+    def get_or_create(cls, name):
+        """
+        Get the checkpoint of a backfill, creating an empty one if needed.
+
+        Args:
+            name (str): Backfill name.
+
+        Returns:
+            BackfillCheckpoint: The checkpoint (committed).
+        """
+        checkpoint = cls.query.filter_by(name=name).first()
+        if checkpoint is None:
+            checkpoint = cls(name=name, last_id=0, processed=0, generated=0, cached=0, failed=0,
+                             status=cls.RUNNING)
+            db.session.add(checkpoint)
+            db.session.commit()
+        return checkpoint
+
+    def get_failed_ids(self):
+        """Decoded ids of the rows awaiting a retry"""
+        return json.loads(self.failed_ids or '[]')
+
+    def set_failed_ids(self, ids):
+        """
+        Store the ids of the rows awaiting a retry, and their count in failed.
+
+        Args:
+            ids (Iterable[int]): Row ids.
+        """
+        ids = sorted(set(ids))
+        self.failed_ids = json.dumps(ids)
+        self.failed = len(ids)
+
+    def to_dict(self):
+        """
+        Convert checkpoint to dictionary.
+
+        Returns:
+            dict: Progress counters and status.
+        """
+        base_dict = super().to_dict()
+        base_dict.update({
+            'name': self.name,
+            'last_id': self.last_id,
+            'processed': self.processed,
+            'generated': self.generated,
+            'cached': self.cached,
+            'failed': self.failed,
+            'failed_ids': self.get_failed_ids(),
+            'status': self.status,
+            'last_error': self.last_error
+        })
+        return base_dict
@@ -0,0 +1,66 @@
+"""
+Description: Background job model for work run outside the request cycle.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for the DB-backed job queue.
+"""
+import json
+from .base_model import BaseModel
+from database import db
+
+
+class BackgroundJob(BaseModel):
+    """
+    BackgroundJob model representing one queued unit of work.
+
+    Attributes:
+        id (int): Primary key.
+        job_type (str): Name of the registered handler that runs the job.
+        dedupe_key (str): Jobs sharing a key are not queued twice while one is
+                          pending or running (e.g. 'ai_answer:42').
+        payload (str): JSON arguments for the handler.
+        status (str): 'pending', 'running', 'done' or 'failed'.
+        attempts (int): Times the job has been started.
+        max_attempts (int): Attempts allowed before the job is marked failed.
+        run_after (datetime): Earliest time the job may run (backoff on retry).
+        locked_at (datetime): When a worker claimed the job.
+        last_error (str): Error message of the last failed attempt.
+    """
+    __tablename__ = 'background_jobs'
+    __table_args__ = (
+        db.Index('ix_background_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    job_type = db.Column(db.String(50), nullable=False)
+    dedupe_key = db.Column(db.String(255), index=True)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, nullable=False)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+    def get_payload(self):
+        """Decoded handler arguments"""
+        return json.loads(self.payload or '{}')
+
+    def to_dict(self):
+        base_dict = super().to_dict()
+        base_dict.update({
+            'job_type': self.job_type,
+            'dedupe_key': self.dedupe_key,
+            'payload': self.get_payload(),
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_after': self.run_after,
+            'last_error': self.last_error
+        })
+        return base_dict
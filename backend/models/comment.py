@@ -4,9 +4,11 @@ Last Modified By: Bryan
 Created: 2025-10-25
 Last Modified: 
     2025-11-24 - File created and implemented basic CRUD operations.
+    2026-10-19 - Added batched first-N comment loading for many answers.
 """
 from .base_model import BaseModel
 from database import db
+from sqlalchemy import func
 
 class Comment(BaseModel):
     """
@@ -23,6 +25,10 @@ class Comment(BaseModel):
 
     __tablename__ = "comments"
 
+    # Serves per-answer comment threads in creation order
+    __table_args__ = (
+        db.Index('ix_comments_answer_created', 'answer_id', 'created_at'),
+    )
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     answer_id = db.Column(db.Integer, db.ForeignKey('answers.id'), nullable=False)
@@ -43,4 +49,48 @@ class Comment(BaseModel):
             'answer_id':self.answer_id,
             'content':self.content
         })
-        return base_dict
\ No newline at end of file
+        return base_dict
+
+    @classmethod
+    def get_first_for_answers(cls, answer_ids, per_answer):
+        """
+        Get the oldest comments of several answers with a single query.
+
+        Uses ROW_NUMBER() OVER (PARTITION BY answer_id) so only the first
+        per_answer comments of each answer are returned, along with the
+        total number of comments on that answer.
+
+        Args:
+            answer_ids (list[int]): Answers to load comments for.
+            per_answer (int): Maximum number of comments per answer.
+
+        Returns:
+            dict: answer_id -> {'comments': list[Comment], 'total': int}.
+                  Every requested answer id is present.
+        """
+        threads = {answer_id: {'comments': [], 'total': 0} for answer_id in answer_ids}
+        if not threads:
+            return threads
+
+        ranked = db.session.query(
+                cls.id.label('id'),
+                func.row_number().over(
+                    partition_by=cls.answer_id,
+                    order_by=(cls.created_at, cls.id)
+                ).label('position'),
+                func.count(cls.id).over(partition_by=cls.answer_id).label('total')
+            ) \
+            .filter(cls.answer_id.in_(list(threads))) \
+            .subquery()
+
+        rows = db.session.query(cls, ranked.c.total) \
+            .join(ranked, ranked.c.id == cls.id) \
+            .filter(ranked.c.position <= per_answer) \
+            .order_by(cls.answer_id, ranked.c.position) \
+            .all()
+
+        for comment, total in rows:
+            thread = threads[comment.answer_id]
+            thread['comments'].append(comment)
+            thread['total'] = total
+        return threads
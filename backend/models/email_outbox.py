@@ -0,0 +1,71 @@
+"""
+Description: Outbox of emails waiting to be sent by the background email sender.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for queued OTP and password reset emails.
+"""
+from .base_model import BaseModel
+from database import db
+
+
+class EmailOutbox(BaseModel):
+    """
+    EmailOutbox model holding one rendered email.
+
+    Attributes:
+        id (int): Primary key.
+        kind (str): Template the email was rendered from, e.g. 'verify_email'.
+        recipient (str): Destination address.
+        subject (str): Subject line.
+        html_body (str): Rendered HTML body.
+        status (str): 'pending', 'sending', 'sent' or 'failed'.
+        attempts (int): Send attempts so far.
+        max_attempts (int): Attempts allowed before the email is marked failed.
+        send_after (datetime): Earliest time of the next attempt (backoff on retry).
+        send_before (datetime): After this the email is dropped unsent (e.g. an
+                                expired one-time code); None to keep trying.
+        claim_token (str): Batch that claimed the email while it is 'sending'.
+        locked_at (datetime): When the email was claimed.
+        sent_at (datetime): When the SMTP server accepted it.
+        last_error (str): Error of the last failed attempt.
+    """
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_send_after', 'status', 'send_after'),
+    )
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    kind = db.Column(db.String(50), nullable=False)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    send_after = db.Column(db.DateTime, nullable=False)
+    send_before = db.Column(db.DateTime)
+    claim_token = db.Column(db.String(32), index=True)
+    locked_at = db.Column(db.DateTime)
+    sent_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+    def to_dict(self):
+        base_dict = super().to_dict()
+        base_dict.update({
+            'kind': self.kind,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'send_after': self.send_after,
+            'send_before': self.send_before,
+            'sent_at': self.sent_at,
+            'last_error': self.last_error
+        })
+        return base_dict
@@ -2,11 +2,18 @@
 Description: Notification model for managing user notifications and alerts.
 Last Modified By: Bryan Vela
 Created: 2025-10-25
-Last Modified: 
+Last Modified:
     2025-10-26 - File created with notification system functionality.
+    2026-10-19 - Added the read flag, unread counter, cursor-paginated feed
+                 and batch mark-read.
 """
+from sqlalchemy import update
 from .base_model import BaseModel
+from .notification_counter import NotificationCounter
 from database import db
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE, encode_cursor, decode_cursor, keyset_filter, order_by_clauses
+)
 
 class Notification(BaseModel):
     """
@@ -17,24 +24,121 @@ class Notification(BaseModel):
         user_id (int): Foreign key to User table.
         header (str): Notification header/title.
         body (str): Notification body/content.
+        is_read (bool): Whether the user has marked it read.
     """
     __tablename__ = 'notifications'
-    
+    __table_args__ = (
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at', 'id'),
+    )
+
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     header = db.Column(db.String(255), nullable=False)
     body = db.Column(db.Text, nullable=False)
-    
+    is_read = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
     def to_dict(self):
         base_dict = super().to_dict()
         base_dict.update({
             'id': self.id,
             'user_id': self.user_id,
             'header': self.header,
-            'body': self.body
+            'body': self.body,
+            'is_read': bool(self.is_read)
         })
         return base_dict
-    
+
+    @classmethod
+    def create(cls, data):
+        """
+        Create and save a notification, counting it as unread.
+
+        Args:
+            data (dict): Dictionary of fields to set.
+
+        Returns:
+            Notification: The created notification.
+        """
+        notification = cls(**data)
+        db.session.add(notification)
+        db.session.flush()
+        if not notification.is_read:
+            NotificationCounter.add(notification.user_id, 1)
+        db.session.commit()
+        return notification
+
     # Method to get notifications for a specific user
     @classmethod
     def get_notifications_for_user(cls, user_id):
-        return cls.query.filter_by(user_id=user_id).all()
\ No newline at end of file
+        return cls.query.filter_by(user_id=user_id).all()
+
+    @classmethod
+    def feed(cls, user_id, limit=DEFAULT_PAGE_SIZE, cursor=None, unread_only=False):
+        """
+        Get one page of a user's notifications, newest first.
+
+        Args:
+            user_id (int): User the notifications belong to.
+            limit (int): Maximum number of notifications to return.
+            cursor (str): Cursor returned with the previous page, if any.
+            unread_only (bool): Leave out notifications already read.
+
+        Returns:
+            tuple[list, str|None]: Notifications of the page and the cursor of
+                                   the next page (None on the last page).
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        ordering = [(cls.created_at, True), (cls.id, True)]
+        query = cls.query.filter(cls.user_id == user_id)
+        if unread_only:
+            query = query.filter(cls.is_read.is_(False))
+        if cursor:
+            query = query.filter(keyset_filter(ordering, decode_cursor(cursor, len(ordering))))
+
+        # One extra row tells us whether another page exists
+        notifications = query.order_by(*order_by_clauses(ordering)).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            last = notifications[-1]
+            next_cursor = encode_cursor([last.created_at, last.id])
+        return notifications, next_cursor
+
+    @classmethod
+    def unread_count(cls, user_id):
+        """
+        Get the number of unread notifications of a user from its counter.
+
+        Args:
+            user_id (int): User to count for.
+
+        Returns:
+            int: Unread notifications.
+        """
+        return NotificationCounter.unread_for(user_id)
+
+    @classmethod
+    def mark_read(cls, user_id, ids=None):
+        """
+        Mark notifications of a user read with a single UPDATE.
+
+        Args:
+            user_id (int): User the notifications belong to.
+            ids (list[int]|None): Notifications to mark; None marks all of them.
+
+        Returns:
+            int: Notifications that were unread and are now read.
+        """
+        statement = update(cls).where(cls.user_id == user_id, cls.is_read.is_(False))
+        if ids is not None:
+            if not ids:
+                return 0
+            statement = statement.where(cls.id.in_(ids))
+        # Only rows this UPDATE flipped are taken off the counter, so
+        # concurrent mark-reads cannot count a notification twice
+        marked = db.session.execute(statement.values(is_read=True)).rowcount
+        NotificationCounter.add(user_id, -marked)
+        db.session.commit()
+        return marked
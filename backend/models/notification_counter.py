@@ -0,0 +1,132 @@
+"""
+Description: Per-user unread notification counter, kept in step with the
+notifications table so the bell badge is one primary key read.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for the unread notification count.
+    2026-10-19 - Batched counter updates for notification fan-out.
+"""
+from sqlalchemy import bindparam, case, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from .base_model import BaseModel
+from database import db
+
+
+class NotificationCounter(BaseModel):
+    """
+    NotificationCounter model holding one user's unread notification count.
+
+    Attributes:
+        id (int): Primary key.
+        user_id (int): Foreign key to User table, one row per user.
+        unread (int): Notifications of the user not yet marked read.
+    """
+    __tablename__ = 'notification_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+    unread = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    @classmethod
+    def _count_unread(cls, user_id):
+        from .notification import Notification
+        return db.session.query(func.count(Notification.id)) \
+            .filter(Notification.user_id == user_id, Notification.is_read.is_(False)) \
+            .scalar()
+
+    @classmethod
+    def add(cls, user_id, delta):
+        """
+        Change a user's unread count, in the caller's transaction (no commit).
+
+        A user without a counter row yet (notifications from before the
+        counter existed) gets one seeded from the notifications table, so the
+        notifications counted must already be flushed.
+
+        Args:
+            user_id (int): User whose count changes.
+            delta (int): Amount added; negative when notifications are read.
+        """
+        if not delta:
+            return
+        changed = db.session.execute(
+            update(cls).where(cls.user_id == user_id)
+            .values(unread=case((cls.unread + delta > 0, cls.unread + delta), else_=0))
+        ).rowcount
+        if changed:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(user_id=user_id, unread=cls._count_unread(user_id)))
+        except IntegrityError:
+            # Created concurrently by another transaction, which cannot see our rows
+            db.session.execute(
+                update(cls).where(cls.user_id == user_id)
+                .values(unread=case((cls.unread + delta > 0, cls.unread + delta), else_=0))
+            )
+
+    @classmethod
+    def add_many(cls, deltas):
+        """
+        Change the unread counts of many users, in the caller's transaction
+        (no commit): one batched UPDATE for users with a counter and one
+        INSERT seeding the rest.
+
+        Args:
+            deltas (dict): user_id -> amount added. Notifications counted must
+                           already be flushed, as for add.
+        """
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        existing = set(db.session.scalars(
+            db.select(cls.user_id).where(cls.user_id.in_(deltas))
+        ))
+        if existing:
+            table = cls.__table__
+            delta = bindparam('counter_delta')
+            db.session.execute(
+                update(table).where(table.c.user_id == bindparam('counter_user_id'))
+                .values(unread=case((table.c.unread + delta > 0, table.c.unread + delta), else_=0)),
+                [{'counter_user_id': user_id, 'counter_delta': deltas[user_id]} for user_id in existing]
+            )
+        missing = [user_id for user_id in deltas if user_id not in existing]
+        if not missing:
+            return
+        from .notification import Notification
+        unread = dict(db.session.query(Notification.user_id, func.count(Notification.id))
+                      .filter(Notification.user_id.in_(missing), Notification.is_read.is_(False))
+                      .group_by(Notification.user_id)
+                      .all())
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(cls), [{'user_id': user_id, 'unread': unread.get(user_id, 0)}
+                                                 for user_id in missing])
+        except IntegrityError:
+            # Some were created concurrently; fall back to one at a time
+            for user_id in missing:
+                cls.add(user_id, deltas[user_id])
+
+    @classmethod
+    def unread_for(cls, user_id):
+        """
+        Get a user's unread count, seeding the counter on first use.
+
+        Args:
+            user_id (int): User to count for.
+
+        Returns:
+            int: Unread notifications.
+        """
+        unread = db.session.query(cls.unread).filter(cls.user_id == user_id).scalar()
+        if unread is not None:
+            return unread
+        unread = cls._count_unread(user_id)
+        if unread:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(cls(user_id=user_id, unread=unread))
+            except IntegrityError:
+                pass
+            db.session.commit()
+        return unread
@@ -0,0 +1,62 @@
+"""
+Description: Outbox of notification events written in the same transaction as
+the action that caused them, turned into notifications by the dispatcher.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for transactional notification delivery.
+    2026-10-19 - Coalesce key merging bursts of events into one dispatch.
+"""
+import json
+from .base_model import BaseModel
+from database import db
+
+
+class NotificationOutbox(BaseModel):
+    """
+    NotificationOutbox model holding one event waiting to be dispatched.
+    Dispatched events are deleted in the transaction that inserts their
+    notifications.
+
+    Attributes:
+        id (int): Primary key.
+        kind (str): Event kind, selecting the dispatcher handler, e.g. 'direct'.
+        payload (str): JSON handler arguments.
+        status (str): 'pending', 'dispatching' or 'failed'.
+        attempts (int): Dispatch attempts so far.
+        max_attempts (int): Attempts allowed before the event is marked failed.
+        dispatch_after (datetime): Earliest time of the next attempt.
+        claim_token (str): Batch that claimed the event while it is 'dispatching'.
+        locked_at (datetime): When the event was claimed.
+        last_error (str): Error of the last failed attempt.
+        coalesce_key (str): Events sharing a key are dispatched together when
+                            the first of them is due, e.g. 'question:7:answer'.
+    """
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        db.Index('ix_notification_outbox_status_dispatch_after', 'status', 'dispatch_after'),
+    )
+
+    PENDING = 'pending'
+    DISPATCHING = 'dispatching'
+    FAILED = 'failed'
+
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    dispatch_after = db.Column(db.DateTime, nullable=False)
+    claim_token = db.Column(db.String(32), index=True)
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    coalesce_key = db.Column(db.String(100), index=True)
+
+    def get_payload(self):
+        """
+        Decode the JSON payload.
+
+        Returns:
+            dict: Handler arguments.
+        """
+        return json.loads(self.payload or '{}')
@@ -0,0 +1,42 @@
+"""
+Description: One-time codes sent by email for registration and password reset.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created to replace the OTP state kept on the
+                 registration service instance.
+"""
+from .base_model import BaseModel
+from database import db
+
+
+class OTPCode(BaseModel):
+    """
+    OTPCode model holding the current code of one email and purpose.
+
+    Attributes:
+        id (int): Primary key.
+        email (str): Address the code was sent to (lowercased).
+        purpose (str): 'register' or 'reset'.
+        code_hash (str): HMAC-SHA256 hex of the code; the code itself is not stored.
+        pending_password (str): bcrypt hash of the password chosen at
+                                registration, used once the code is verified.
+        attempts (int): Wrong codes entered so far.
+        max_attempts (int): Wrong codes allowed before the code is locked.
+        expires_at (datetime): When the code stops being accepted.
+    """
+    __tablename__ = 'otp_codes'
+    __table_args__ = (
+        db.UniqueConstraint('email', 'purpose', name='uq_otp_codes_email_purpose'),
+    )
+
+    REGISTER = 'register'
+    RESET = 'reset'
+
+    email = db.Column(db.String(255), nullable=False, index=True)
+    purpose = db.Column(db.String(20), nullable=False)
+    code_hash = db.Column(db.String(64), nullable=False)
+    pending_password = db.Column(db.String(255))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -6,10 +6,14 @@ Last Modified:
     2025-10-26 - File created and implemented basic CRUD operations.
     2025-11-02 - Added Sanitize body and create with sanitized body content functions.
     2025-12-02 - Added edit functionality with history tracking and permissions
+    2026-10-19 - Body updates reuse a single sanitize_content result
+    2026-10-19 - Added stored excerpt and list summary serialization
+    2026-10-19 - Queue AI answer generation once a question is created
+    2026-10-19 - create_with_tags can leave the commit to the caller
 """
 from .base_model import BaseModel
 from database import db
-from utils.html_sanitizer import sanitize_html_body
+from utils.html_sanitizer import sanitize_content
 from datetime import datetime, timedelta
 from sqlalchemy import event
 
@@ -29,6 +33,7 @@ class Question(BaseModel):
         accepted_answer_id = Accepted Answer
         ai_generated_ans = AI Generated Answer
         edit_count = Number of times edited
+        excerpt = Short plain-text preview of the body for list views
     """
     __tablename__ = 'questions'
 
@@ -36,6 +41,7 @@ class Question(BaseModel):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.Text, nullable=False)
     body = db.Column(db.Text, nullable=False)
+    excerpt = db.Column(db.String(255))
     
     # Many-to-many relationship with tags 
     tags = db.relationship(
@@ -83,7 +89,8 @@ class Question(BaseModel):
             'view_count': self.view_count or 0,
             'ai_generated_ans': self.ai_generated_ans,
             'edit_count': self.edit_count or 0,
-            'is_edited': self.edit_count > 0
+            'is_edited': self.edit_count > 0,
+            'excerpt': self.get_excerpt()
         })
         
         
@@ -100,10 +107,75 @@ class Question(BaseModel):
         
         return base_dict
     
+    def to_summary_dict(self, answer_count=None):
+        """
+        Convert question to the compact form used by list views and search.
+
+        The full HTML body and answers are left out; list views render the
+        stored excerpt instead.
+
+        Args:
+            answer_count: Precomputed answer count (see answer_counts); counted
+                          with a query when omitted
+        """
+        base_dict = super().to_dict()
+        base_dict.update({
+            'id': self.id,
+            'type': self.type,
+            'user_id': self.user_id,
+            'title': self.title,
+            'excerpt': self.get_excerpt(),
+            'tags': [tag.to_dict() for tag in self.tags.all()],
+            'answerCount': answer_count if answer_count is not None else self.answers.count(),
+            'voteCount': 0,
+            'status': self.status,
+            'view_count': self.view_count or 0,
+            'edit_count': self.edit_count or 0,
+            'is_edited': (self.edit_count or 0) > 0
+        })
+        return base_dict
+
+    @classmethod
+    def answer_counts(cls, question_ids):
+        """
+        Count answers for many questions with one grouped query.
+
+        Args:
+            question_ids: IDs of the questions to count answers for
+
+        Returns:
+            dict: question_id -> number of answers (0 when unanswered)
+        """
+        from models.answer import Answer
+        counts = {question_id: 0 for question_id in question_ids}
+        if counts:
+            rows = db.session.query(Answer.question_id, db.func.count(Answer.id)) \
+                .filter(Answer.question_id.in_(list(counts))) \
+                .group_by(Answer.question_id) \
+                .all()
+            counts.update(dict(rows))
+        return counts
+
+    def get_excerpt(self):
+        """Stored excerpt, derived from the body for rows written before it existed"""
+        if self.excerpt is None and self.body:
+            return sanitize_content(self.body).excerpt
+        return self.excerpt or ''
+
+    def set_body_content(self, content):
+        """
+        Store a sanitized body together with its derived excerpt.
+
+        Args:
+            content: SanitizedContent returned by sanitize_content
+        """
+        self.body = content.html
+        self.excerpt = content.excerpt
+
     def sanitize_body(self):
         """Sanitize the body content before saving"""
         if self.body:
-            self.body = sanitize_html_body(self.body)
+            self.set_body_content(sanitize_content(self.body))
 
     def increment_view_count(self):
         """Increment the view count for this question"""
@@ -163,12 +235,13 @@ class Question(BaseModel):
         self.title = title.strip()
         return True
     
-    def _validate_and_update_body(self, body):
+    def _validate_and_update_body(self, body, content=None):
         """
         Validate and update body if changed
         
         Args:
             body: New body content
+            content: sanitize_content(body) result, if the caller already has one
             
         Returns:
             bool: True if body was updated
@@ -179,16 +252,15 @@ class Question(BaseModel):
         if body is None:
             return False
             
-        sanitized_body = sanitize_html_body(body)
-        if sanitized_body == self.body:
+        if content is None:
+            content = sanitize_content(body)
+        if content.html == self.body:
             return False
             
-        from bs4 import BeautifulSoup
-        plain_text = BeautifulSoup(sanitized_body, 'html.parser').get_text()
-        if len(plain_text.strip()) < 20:
+        if len(content.text) < 20:
             raise ValueError("Body must be at least 20 characters")
             
-        self.body = sanitized_body
+        self.set_body_content(content)
         return True
     
     def _validate_tag_ids(self, tag_ids):
@@ -232,7 +304,7 @@ class Question(BaseModel):
         
         return True
     
-    def update_question(self, title=None, body=None, tag_ids=None):
+    def update_question(self, title=None, body=None, tag_ids=None, body_content=None):
         """
         Update question content
         
@@ -240,6 +312,7 @@ class Question(BaseModel):
             title: New title (optional)
             body: New body (optional)
             tag_ids: New tag IDs (optional)
+            body_content: sanitize_content(body) result, if the caller already has one
             
         Raises:
             ValueError: If validation fails
@@ -248,7 +321,7 @@ class Question(BaseModel):
         
         # Update each field using dedicated methods
         something_changed |= self._validate_and_update_title(title)
-        something_changed |= self._validate_and_update_body(body)
+        something_changed |= self._validate_and_update_body(body, body_content)
         something_changed |= self._update_tags(tag_ids)
         
         if something_changed:
@@ -258,44 +331,48 @@ class Question(BaseModel):
         db.session.commit()
 
     @classmethod
-    def create_with_sanitized_body(cls, data):
+    def create_with_sanitized_body(cls, data, commit=True):
         """Create question with sanitized body content"""
         question = cls(**data)
         question.sanitize_body()
         db.session.add(question)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return question
     
     @classmethod
-    def create_with_tags(cls, data, tag_ids=None):
-        """Create question with sanitized body and associate tags"""
+    def create_with_tags(cls, data, tag_ids=None, commit=True):
+        """Create question with sanitized body, associate tags and queue its AI answer.
+
+        Everything is written in one transaction; with commit=False the caller
+        adds to it (e.g. a notification) and commits.
+        """
+        from models.tag import Tag
+        from models.questiontag import QuestionTag
+        from services.ai_answer_jobs import enqueue_ai_answer
+
         try:
             # question creation
             question_data = {k: v for k, v in data.items() if k != 'tag_ids'}
-            question = cls.create_with_sanitized_body(question_data)
-            
-            # Refresh to ensure we have the ID
-            db.session.refresh(question)
-            
-            # associate tags
+            question = cls.create_with_sanitized_body(question_data, commit=False)
+            db.session.flush()  # Assigns the question id
+
+            # associate the tags that exist, looked up in one query
             if tag_ids:
-                from models.tag import Tag
-                from models.questiontag import QuestionTag
-                
-                for tag_id in tag_ids:
-                    tag = Tag.get_by_id(int(tag_id))
-                    if tag:
-                        QuestionTag.create({
-                            'question_id': question.id,
-                            'tag_id': int(tag_id)
-                        })
-                
+                wanted = [int(tag_id) for tag_id in tag_ids]
+                existing = {tag_id for (tag_id,) in db.session.query(Tag.id).filter(Tag.id.in_(wanted))}
+                for tag_id in dict.fromkeys(wanted):
+                    if tag_id in existing:
+                        db.session.add(QuestionTag(question_id=question.id, tag_id=tag_id))
+
+            # Generate the AI answer in the background once the question is committed
+            enqueue_ai_answer(question.id, commit=False)
+            if commit:
                 db.session.commit()
-            
-            return question
         except Exception as e:
             db.session.rollback()
             raise e
+        return question
 
 
 # Event listener to update updated_at timestamp
@@ -0,0 +1,99 @@
+"""
+Description: Users following a question, to be notified of its new answers
+and comments.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for question follower notifications.
+"""
+from sqlalchemy import select, union
+from sqlalchemy.exc import IntegrityError
+from .base_model import BaseModel
+from .question import Question
+from .answer import Answer
+from database import db
+
+
+class QuestionFollow(BaseModel):
+    """
+    QuestionFollow model holding one user's choice about a question.
+
+    A question's author and its answerers follow it without a row; a row
+    either adds another follower or, with muted set, opts one of them out.
+
+    Attributes:
+        id (int): Primary key.
+        user_id (int): Foreign key to User table.
+        question_id (int): Foreign key to Question table.
+        muted (bool): True when the user unfollowed the question.
+    """
+    __tablename__ = 'question_follows'
+    __table_args__ = (
+        db.UniqueConstraint('question_id', 'user_id', name='uq_question_follows_question_user'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
+    muted = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    @classmethod
+    def set_following(cls, user_id, question_id, following=True):
+        """
+        Follow or unfollow a question, and commit.
+
+        Args:
+            user_id (int): The user.
+            question_id (int): The question.
+            following (bool): False to unfollow.
+
+        Returns:
+            QuestionFollow: The user's row for the question.
+        """
+        follow = cls.query.filter_by(user_id=user_id, question_id=question_id).first()
+        if follow is None:
+            try:
+                with db.session.begin_nested():
+                    follow = cls(user_id=user_id, question_id=question_id, muted=not following)
+                    db.session.add(follow)
+            except IntegrityError:
+                # Created concurrently by another request of the same user
+                follow = cls.query.filter_by(user_id=user_id, question_id=question_id).one()
+        follow.muted = not following
+        db.session.commit()
+        return follow
+
+    @classmethod
+    def is_following(cls, user_id, question_id):
+        """
+        Check whether a user follows a question.
+
+        Args:
+            user_id (int): The user.
+            question_id (int): The question.
+
+        Returns:
+            bool: True if the user would be notified of the question's activity.
+        """
+        return user_id in cls.follower_ids(question_id)
+
+    @classmethod
+    def follower_ids(cls, question_id):
+        """
+        Get everyone following a question with one query: its author, its
+        answerers and users who followed it, less those who unfollowed it.
+
+        Args:
+            question_id (int): The question.
+
+        Returns:
+            list: User ids.
+        """
+        followers = union(
+            select(Question.user_id.label('user_id')).where(Question.id == question_id),
+            select(Answer.user_id).where(Answer.question_id == question_id),
+            select(cls.user_id).where(cls.question_id == question_id, cls.muted.is_(False))
+        ).subquery()
+        muted = select(cls.user_id).where(cls.question_id == question_id, cls.muted.is_(True))
+        return list(db.session.scalars(
+            select(followers.c.user_id).where(followers.c.user_id.not_in(muted))
+        ))
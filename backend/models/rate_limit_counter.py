@@ -0,0 +1,29 @@
+"""
+Description: Per-window hit counters of the shared (database) rate limit backend.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for rate limiting the auth endpoints.
+"""
+from .base_model import BaseModel
+from database import db
+
+
+class RateLimitCounter(BaseModel):
+    """
+    RateLimitCounter model counting the hits of one rate limit key in one window.
+
+    Attributes:
+        id (int): Primary key.
+        bucket_key (str): sha256 hex of the limit name, scope and client key (IP or email).
+        window (int): Window index, seconds since the epoch // window length.
+        hits (int): Requests let through in the window.
+    """
+    __tablename__ = 'rate_limit_counters'
+    __table_args__ = (
+        db.UniqueConstraint('bucket_key', 'window', name='uq_rate_limit_counters_bucket_window'),
+    )
+
+    bucket_key = db.Column(db.String(64), nullable=False, index=True)
+    window = db.Column(db.BigInteger, nullable=False, index=True)
+    hits = db.Column(db.Integer, nullable=False, default=0)
@@ -4,6 +4,8 @@ Last Modified By: Bryan Vela
 Created: 2025-10-25
 Last Modified: 
     2025-10-26 - File created with user authentication and profile management.
+    2026-10-19 - update_fields invalidates the user's cached auth principal.
+    2026-10-19 - Added is_admin and token_version (token revocation).
 """
 from .base_model import BaseModel
 from database import db
@@ -22,6 +24,9 @@ class User(BaseModel):
         reputation (int): User reputation score.
         registration_date (datetime): Registration timestamp.
         university (str): University name.
+        is_admin (bool): Whether the user is an administrator.
+        token_version (int): Version carried by the user's tokens; bumping it
+                             revokes every token issued before.
     """
     __tablename__ = 'users'
 
@@ -33,6 +38,8 @@ class User(BaseModel):
     reputation = db.Column(db.Integer, default=0)
     registration_date = db.Column(db.DateTime, nullable=False)
     university = db.Column(db.String(255), nullable=True)
+    is_admin = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     def to_dict(self):
         base_dict = super().to_dict()
@@ -53,6 +60,24 @@ class User(BaseModel):
         """Get a user by ID."""
         return cls.query.get(user_id)
 
+    @classmethod
+    def revoke_tokens(cls, user_id):
+        """
+        Revoke every token issued to a user so far by bumping token_version.
+
+        Args:
+            user_id (int): User id.
+
+        Returns:
+            bool: True if the user exists.
+        """
+        updated = cls.query.filter_by(id=user_id) \
+            .update({cls.token_version: cls.token_version + 1}, synchronize_session='fetch')
+        db.session.commit()
+        from middleware.principal_cache import invalidate_principal
+        invalidate_principal(user_id)
+        return bool(updated)
+
     @classmethod
     def update_fields(cls, user_id, data):
         """Update user fields."""
@@ -73,6 +98,8 @@ class User(BaseModel):
         try:
             db.session.commit()
             print(f"User {user_id} updated and committed.")
+            from middleware.principal_cache import invalidate_principal
+            invalidate_principal(user.id)
         except Exception as e:
             db.session.rollback()
             print(f"Error committing update for user {user_id}: {e}")
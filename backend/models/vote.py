@@ -22,6 +22,11 @@ class Vote(BaseModel):
     """
     __tablename__ = "votes"
 
+    # Vote scores are always aggregated per target
+    __table_args__ = (
+        db.Index('ix_votes_target', 'target_type', 'target_id'),
+    )
+
     target_id = db.Column(db.Integer, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     vote_type = db.Column(db.String(255)) # 'upvote' or 'downvote'
@@ -11,45 +11,67 @@ from flask import Blueprint, request, jsonify
 from datetime import datetime
 from middleware.auth_middleware import token_required, login_required
 from database import db
-from models import User
 from models.answer import Answer
 from models.comment import Comment
-from models.notification import Notification
-from utils.html_sanitizer import sanitize_html_body
+from services.notification_dispatcher import queue_notification
+from services.notification_fanout import queue_question_activity, ANSWER
+from utils.html_sanitizer import sanitize_content
+from utils.user_hydration import hydrate_users, author_summary
+from utils.pagination import parse_limit
 from services.answer_services import AnswerServices
+from services.answer_summary_service import enqueue_summary_refresh
 import logging
 
 answers_bp = Blueprint('answers', __name__)
 
+MAX_BATCH_ANSWERS = 100
+
 @answers_bp.route('/questions/<int:question_id>/answers', methods=['GET'])
 def get_answers(question_id):
-    """Get all answers for a question"""
+    """Get one page of answers for a question
+
+    Query parameters:
+        sort: Order after the accepted answer: score (default), newest or oldest
+        limit: Page size (default 20, max 100)
+        cursor: next_cursor value returned with the previous page
+    """
     try:
         answer_service = AnswerServices()
-        
-        # Get answers using service
-        answers = answer_service.get_answers_by_question(question_id)
+
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            answers, next_cursor = answer_service.get_answers_page(
+                question_id,
+                sort=request.args.get('sort', 'score'),
+                limit=limit,
+                cursor=request.args.get('cursor')
+            )
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+
+        authors = hydrate_users(answer.user_id for answer, _ in answers)
 
         answers_list = []
-        for answer in answers:
-            user = User.query.get(answer.user_id)
+        for answer, score in answers:
             answers_list.append({
                 'id': answer.id,
                 'question_id': answer.question_id,
                 'user_id': answer.user_id,
                 'content': answer.body,
                 'created_at': answer.created_at.isoformat() if answer.created_at else None,
-                'user': {
-                    'username': user.username if user else 'Unknown',
-                    'reputation': user.reputation if user else 0
-                },
+                'user': author_summary(authors, answer.user_id),
                 'updated_at': answer.updated_at.isoformat() if answer.updated_at else None,
                 'edit_count': answer.edit_count or 0,
                 'is_edited': (answer.edit_count or 0) > 0,
+                'isAccepted': bool(answer.is_accepted),
+                'score': score,
             })
 
-        # return jsonify({'answers': answers_list},), 200
-        return jsonify({'answers': answers_list},), 200
+        return jsonify({
+            'answers': answers_list,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }), 200
 
     except Exception as e:
         return jsonify({'message': f'Error fetching answers: {str(e)}'}), 500
@@ -93,33 +115,39 @@ def create_answer(current_user, question_id):
         if not answer_service.question_exists(question_id):
             return jsonify({'message': 'Question not found'}), 404
 
-        # Sanitize HTML content
-        sanitized_body = sanitize_html_body(body)
+        # Sanitize HTML content and derive its plain text
+        content = sanitize_content(body)
 
         # Create new answer using service
         new_answer = answer_service.create_answer(
             question_id=question_id,
             user_id=current_user.id,
-            body=sanitized_body
+            body=content.html
         )
 
         if not new_answer:
             return jsonify({'message': 'Failed to create answer'}), 400
 
+        new_answer.set_body_content(content)
+
         db.session.add(new_answer)
-        db.session.commit()
 
-         #Create Notification
-        notification_data = {
-            "user_id": current_user.id,
-            "header": "Answer Submitted",
-            "body": f"Your answer to question ID {question_id} has been posted."
-        }
-        Notification.create(notification_data)
+        # Keep a stored AI summary of this thread up to date
+        enqueue_summary_refresh(question_id, commit=False)
+
+        # Notification is delivered by the dispatcher once this commits
+        queue_notification(
+            current_user.id,
+            "Answer Submitted",
+            f"Your answer to question ID {question_id} has been posted."
+        )
+        # Followers of the question are notified, a burst at a time
+        queue_question_activity(question_id, current_user.id, ANSWER)
+        db.session.commit()
 
 
         # Fetch user data for response
-        user = User.query.get(current_user.id)
+        authors = hydrate_users([current_user.id])
 
         return jsonify({
             'message': 'Answer posted successfully',
@@ -131,14 +159,12 @@ def create_answer(current_user, question_id):
                 'created_at': new_answer.created_at.isoformat(),
                 'upvotes': 0,
                 'isAccepted': False,
-                'user': {
-                    'username': user.username,
-                    'reputation': user.reputation
-                }
+                'user': author_summary(authors, current_user.id)
             }
         }), 201
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'message': f'Error creating answer: {str(e)}'}), 500
 
 
@@ -187,10 +213,9 @@ def update_answer(answer_id):
         if not body:
             return jsonify({"errors": {"body": "Body is required"}}), 400
         
-        # Validate
-        from bs4 import BeautifulSoup
-        plain_text = BeautifulSoup(body, 'html.parser').get_text()
-        if len(plain_text.strip()) < 20:
+        # Sanitize once; the model reuses this result
+        content = sanitize_content(body)
+        if len(content.text) < 20:
             return jsonify({"errors": {"body": "Answer must be at least 20 characters"}}), 400
         
         # Track acceptance before edit
@@ -198,7 +223,7 @@ def update_answer(answer_id):
         
         # Update
         try:
-            answer.update_answer(body)
+            answer.update_answer(body, content=content)
             
             return jsonify({
                 "message": "Answer updated successfully",
@@ -216,6 +241,18 @@ def update_answer(answer_id):
         return jsonify({"error": "Failed to update answer", "details": str(e)}), 500
 
 
+def _comment_response(comment, authors):
+    """Serialize a comment with its embedded author"""
+    return {
+        'id': comment.id,
+        'answer_id': comment.answer_id,
+        'user_id': comment.user_id,
+        'content': comment.content,
+        'created_at': comment.created_at.isoformat() if comment.created_at else None,
+        'user': author_summary(authors, comment.user_id)
+    }
+
+
 @answers_bp.route('/<int:answer_id>/comments', methods=['GET'])
 def get_comments_for_answer(answer_id):
     """Get comments for answer"""
@@ -225,23 +262,58 @@ def get_comments_for_answer(answer_id):
             return jsonify({'message': 'Answer not found'}), 404
         
         comments = Comment.query.filter_by(answer_id=answer_id).all()
+        authors = hydrate_users(comment.user_id for comment in comments)
         
-        comments_list = []
-        for comment in comments:
-            user = User.query.get(comment.user_id)
-            comments_list.append({
-                'id': comment.id,
-                'answer_id': comment.answer_id,
-                'user_id': comment.user_id,
-                'content': comment.content,
-                'created_at': comment.created_at.isoformat() if comment.created_at else None,
-                'user': {
-                    'username': user.username if user else 'Unknown',
-                    'reputation': user.reputation if user else 0
-                }
-            })
+        comments_list = [_comment_response(comment, authors) for comment in comments]
         
         return jsonify({'answer_id': answer_id, 'comments': comments_list}), 200
         
     except Exception as e:
         return jsonify({'message': f'Error fetching comments: {str(e)}'}), 500
+
+
+@answers_bp.route('/comments', methods=['GET'])
+def get_comments_for_answers():
+    """Get the first comments of many answers in one request
+
+    Query parameters:
+        answer_ids: Comma separated answer ids (max 100)
+        per_answer: Comments returned per answer (default 3, max 50)
+    """
+    try:
+        raw_ids = request.args.get('answer_ids', '')
+        try:
+            answer_ids = list(dict.fromkeys(int(i) for i in raw_ids.split(',') if i.strip()))
+        except ValueError:
+            return jsonify({'message': 'answer_ids must be a comma separated list of integers'}), 400
+
+        if not answer_ids:
+            return jsonify({'message': 'answer_ids is required'}), 400
+        if len(answer_ids) > MAX_BATCH_ANSWERS:
+            return jsonify({'message': f'At most {MAX_BATCH_ANSWERS} answer ids are allowed'}), 400
+
+        try:
+            per_answer = parse_limit(request.args.get('per_answer'), default=3, maximum=50)
+        except ValueError:
+            return jsonify({'message': 'per_answer must be a positive integer'}), 400
+
+        threads = Comment.get_first_for_answers(answer_ids, per_answer)
+        authors = hydrate_users(
+            comment.user_id
+            for thread in threads.values()
+            for comment in thread['comments']
+        )
+
+        return jsonify({
+            'comments': {
+                str(answer_id): {
+                    'comments': [_comment_response(comment, authors) for comment in thread['comments']],
+                    'total': thread['total'],
+                    'has_more': thread['total'] > len(thread['comments'])
+                }
+                for answer_id, thread in threads.items()
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({'message': f'Error fetching comments: {str(e)}'}), 500
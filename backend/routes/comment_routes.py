@@ -4,9 +4,13 @@ Last Modified By: Bryan Vela
 Created: 2025-10-25
 Last Modified: 
     2025-11-27 - File created and CRUD operations implemented.
+    2026-10-19 - New comments notify the question's followers.
 """
 from flask import Blueprint, request, jsonify
+from database import db
+from models.answer import Answer
 from models.comment import Comment
+from services.notification_fanout import queue_question_activity, COMMENT
 import logging  # For logging purposes
 
 comment_bp = Blueprint('comments', __name__)
@@ -27,12 +31,23 @@ def create_comment():
             if field not in data:
                 return jsonify({'error': f'{field} is required'}), 400
 
-        comment = Comment.create(data)
+        question_id = db.session.query(Answer.question_id) \
+            .filter(Answer.id == data['answer_id']) \
+            .scalar()
+        if question_id is None:
+            return jsonify({'error': 'Answer not found'}), 404
+
+        comment = Comment(**data)
+        db.session.add(comment)
+        # Followers of the question are notified once this commits
+        queue_question_activity(question_id, data['user_id'], COMMENT)
+        db.session.commit()
         return jsonify({
             'message': 'Comment created successfully',
             'comment': comment.to_dict()
         }), 201
     except Exception as e:
+        db.session.rollback()
         logging.error(f"Error creating comment: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
     
@@ -4,20 +4,98 @@ Last Modified By: Bryan Vela
 Created: 2025-10-25
 Last Modified: 
     2025-11-29 - File created with AI response generation endpoint.
+    2026-10-19 - Use the app's shared Gemini client pool.
+    2026-10-19 - Serve answers and summaries through the AI response cache.
+    2026-10-19 - Added server-sent events streaming answer endpoint.
+    2026-10-19 - Added GET /stats with Gemini call, pool and cache metrics.
+    2026-10-19 - Added stored per-question answer summaries.
+    2026-10-19 - /summarize reports which answers fit the input token budget.
+    2026-10-19 - 503 with Retry-After while Gemini is busy or unavailable;
+                 stale cached answers served when generation fails.
+    2026-10-19 - Stored answers are generated from the stored question and
+                 saved only for logged in callers.
+    2026-10-19 - Cache and Gemini stats restricted to administrators.
 
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+import json
+import math
 from models.notification import Notification
 import logging  # For logging purposes
-from services.gemini_services import GeminiServices
+from services.gemini_services import GeminiServices, gemini_call_stats
+from services.gemini_client_pool import get_gemini_pool, GeminiUnavailableError
+from services.ai_response_cache import get_ai_cache, answer_cache_key
+from services.answer_summary_service import get_question_summary
+from models.question import Question
+from middleware.auth_middleware import request_identity, admin_required
+from database import db
 
 ai_bp = Blueprint('ai', __name__)
 
+
+def _question_prompt(data):
+    """
+    Resolve the title and body to answer. With a question_id they are read
+    from the stored question, whatever the client sent, so an answer saved
+    on the question is always an answer to that question.
+
+    Returns:
+        tuple: (question or None, title, body, error response or None)
+    """
+    question_id = data.get('question_id')
+    if question_id:
+        question = Question.get_by_id(question_id)
+        if not question:
+            return None, None, None, (jsonify({'error': 'Question not found'}), 404)
+        return question, (question.title or '').strip(), (question.body or '').strip(), None
+
+    title = (data.get('title') or '').strip()
+    body = (data.get('body') or '').strip()
+    if not title:
+        return None, None, None, (jsonify({'error': 'Question title is required'}), 400)
+    return None, title, body, None
+
+
+def _store_question_answer(question_id, ai_answer):
+    """Save an AI answer on its question; question_id is None when it is not to be saved"""
+    if not question_id:
+        return
+    question = Question.get_by_id(question_id)
+    if question and question.ai_generated_ans != ai_answer:
+        question.ai_generated_ans = ai_answer
+        db.session.commit()
+
+
+def _saved_question_id(question):
+    """Id of the question an answer is saved on: only for logged in callers"""
+    if question is None or request_identity() is None:
+        return None
+    return question.id
+
+
+def _unavailable(error):
+    """503 response for a Gemini call refused because the API is busy, failing or slow"""
+    logging.warning(f"AI service unavailable: {str(error)}")
+    response = jsonify({'error': str(error), 'retry_after': error.retry_after})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response
+
+
+def _sse(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @ai_bp.route('/answer', methods=['POST'])
 def generate_ai_answer():
     """Generate an AI answer for a question
 
+    Answers are served from the AI response cache when the same title and
+    body were answered before. When a question_id is given the stored
+    question's title and body are answered, and for a logged in caller the
+    answer is also stored on the question.
+
     Returns:
         JSON response containing the AI-generated answer.
     """
@@ -27,35 +105,118 @@ def generate_ai_answer():
         # Validate input
         if not data:
             return jsonify({'error': 'Request body is required'}), 400
-            
-        title = data.get('title', '').strip()
-        body = data.get('body', '').strip()
-        
-        if not title:
-            return jsonify({'error': 'Question title is required'}), 400
+
+        question, title, body, error = _question_prompt(data)
+        if error:
+            return error
         
-        # Generate answer using Gemini
-        gemini_service = GeminiServices()
-        ai_answer, is_truncated = gemini_service.generate_answer(title, body)
+        # Generate answer using Gemini, or reuse a cached one
+        gemini_service = GeminiServices.for_app()
+        ai_answer, is_truncated, cached = get_ai_cache().generate_answer(gemini_service, title, body)
+
+        _store_question_answer(_saved_question_id(question), ai_answer)
         
         return jsonify({
             'title': title,
             'body': body,
             'answer': ai_answer,
-            'is_truncated': is_truncated
+            'is_truncated': is_truncated,
+            'cached': cached
         }), 200
         
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except GeminiUnavailableError as e:
+        return _unavailable(e)
     except Exception as e:
         logging.error(f"AI generation error: {str(e)}")
         return jsonify({'error': 'Failed to generate AI response'}), 500
     
 
+@ai_bp.route('/answer/stream', methods=['POST'])
+def stream_ai_answer():
+    """Stream an AI answer for a question as server-sent events
+
+    Events:
+        chunk: {'text'} - next piece of the answer
+        continuation: {'round'} - the token limit was hit; more text follows
+        done: {'answer', 'is_truncated', 'cached'} - the full answer
+        error: {'error', 'retry_after'} - generation failed part way
+
+    A cached answer is sent as a single chunk, as is an expired cached answer
+    when generation fails before any text was sent. The finished answer is stored
+    in the AI response cache, and on the question when question_id is given
+    by a logged in caller (the stored question's title and body are answered).
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'Request body is required'}), 400
+
+    question, title, body, error = _question_prompt(data)
+    if error:
+        return error
+
+    try:
+        gemini_service = GeminiServices.for_app()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    cache = get_ai_cache()
+    question_id = _saved_question_id(question)
+
+    def generate():
+        key = answer_cache_key(gemini_service.model_name, title, body)
+        cached = cache.get(key)
+        if cached is not None:
+            answer, is_truncated = cached
+            _store_question_answer(question_id, answer)
+            yield _sse('chunk', {'text': answer})
+            yield _sse('done', {'answer': answer, 'is_truncated': is_truncated, 'cached': True})
+            return
+
+        sent = False
+        try:
+            for event in gemini_service.stream_answer(title, body):
+                if event['type'] == 'chunk':
+                    sent = True
+                    yield _sse('chunk', {'text': event['text']})
+                elif event['type'] == 'continuation':
+                    yield _sse('continuation', {'round': event['round']})
+                else:
+                    answer, is_truncated = event['text'], event['is_truncated']
+        except Exception as e:
+            logging.error(f"AI streaming error: {str(e)}")
+            stale = None if sent else cache.get_stale(key)
+            if stale is not None:
+                answer, is_truncated = stale
+                yield _sse('chunk', {'text': answer})
+                yield _sse('done', {'answer': answer, 'is_truncated': is_truncated, 'cached': True})
+                return
+            yield _sse('error', {
+                'error': 'Failed to generate AI response',
+                'retry_after': getattr(e, 'retry_after', None)
+            })
+            return
+
+        cache.put(key, 'answer', gemini_service.model_name, answer, is_truncated)
+        _store_question_answer(question_id, answer)
+        yield _sse('done', {'answer': answer, 'is_truncated': is_truncated, 'cached': False})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @ai_bp.route('/summarize', methods=['POST'])
 def summarize_top_answers():
     """
     Generate an AI summary of an answer and its comments.
+
+    Answers may carry 'is_accepted' and 'score'; when they exceed the input
+    token budget the most valuable are kept and the rest listed under
+    input.dropped.
     """
     try:
         data = request.get_json()
@@ -70,11 +231,70 @@ def summarize_top_answers():
         if not isinstance(answers, (list, dict)):
             return jsonify({'error': '"answers" must be a list or single answer dictionary'}), 400
 
-        gemini_service = GeminiServices()
-        summary, _ = gemini_service.summarize_answers(answers)
-        
-        return jsonify({'summary': summary}), 200
+        gemini_service = GeminiServices.for_app()
+        summary, _, cached = get_ai_cache().summarize_answers(gemini_service, answers)
+        # Which answers fit the prompt budget (computed locally, also for cache hits)
+        _, input_report = gemini_service.prepare_summary_input(answers if isinstance(answers, list) else [answers])
+
+        return jsonify({'summary': summary, 'cached': cached, 'input': input_report}), 200
 
+    except GeminiUnavailableError as e:
+        return _unavailable(e)
     except Exception as e:
         logging.error(f"AI summary generation error: {str(e)}")
-        return jsonify({'error': 'Failed to generate AI summary'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to generate AI summary'}), 500
+
+
+@ai_bp.route('/questions/<int:question_id>/summary', methods=['GET'])
+def get_question_answer_summary(question_id):
+    """
+    Get the AI summary of a question's answers.
+
+    The stored summary is returned as long as the answers it covered are
+    unchanged; otherwise it is regenerated (long threads in bounded chunks).
+    """
+    try:
+        if Question.get_by_id(question_id) is None:
+            return jsonify({'error': 'Question not found'}), 404
+
+        record, regenerated = get_question_summary(question_id)
+
+        response = record.to_dict()
+        response['regenerated'] = regenerated
+        return jsonify(response), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except GeminiUnavailableError as e:
+        return _unavailable(e)
+    except Exception as e:
+        logging.error(f"AI question summary error: {str(e)}")
+        return jsonify({'error': 'Failed to generate AI summary'}), 500
+
+
+@ai_bp.route('/cache/stats', methods=['GET'])
+@admin_required
+def ai_cache_stats():
+    """
+    Get AI response cache metrics (hits, misses, evictions, entries).
+    """
+    return jsonify(get_ai_cache().stats()), 200
+
+
+@ai_bp.route('/stats', methods=['GET'])
+@admin_required
+def ai_stats():
+    """
+    Get Gemini call statistics (rounds, tokens, latency per operation),
+    client pool counters with the circuit breaker state, and AI response
+    cache metrics.
+    """
+    try:
+        pool_stats = get_gemini_pool().stats()
+    except ValueError:
+        pool_stats = None
+    return jsonify({
+        'calls': gemini_call_stats(),
+        'pool': pool_stats,
+        'cache': get_ai_cache().stats()
+    }), 200
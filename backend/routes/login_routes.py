@@ -5,14 +5,36 @@ Created: 2025-10-30
 
 Last Modified By: Devang
 Last Modified: 2025-11-01
+    2026-10-19 - Added /logout-all to revoke every token of the user (Bryan Vela).
+    2026-10-19 - 503 when the password hashing pool sheds load; hashing stats (Bryan Vela).
+    2026-10-19 - Login rate limited by IP and email (Bryan Vela).
+    2026-10-19 - Hashing stats restricted to administrators (Bryan Vela).
 """
+import math
 from flask import Blueprint, request, jsonify, session
+from models.user import User
 from services.user_login import UserLoginServices
-from middleware.auth_middleware import token_required
+from services.password_hasher import get_password_hasher, PasswordHasherBusyError
+from middleware.auth_middleware import token_required, admin_required
+from middleware.rate_limiter import rate_limit_blueprint
 
 # Create Blueprint for login routes
 login_bp = Blueprint('login', __name__)
 
+# Each attempt costs a bcrypt check; limits are '<requests>/<seconds>'
+rate_limit_blueprint(login_bp, {
+    'login': {'methods': ('POST',), 'ip': '20/60', 'email': '10/300'},
+})
+
+
+def hashing_busy(error):
+    """503 response for a request shed by the password hashing pool"""
+    response = jsonify({'success': False, 'message': str(error), 'retry_after': error.retry_after})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response
+
+
 @login_bp.route('/login', methods=['POST'])
 def login():
     try:
@@ -38,6 +60,8 @@ def login():
         else:
             return jsonify({'success': False, 'message': 'Invalid email or password'})
             
+    except PasswordHasherBusyError as e:
+        return hashing_busy(e)
     except Exception as e:
         print(e)
         return jsonify({'success': False, 'message': 'Login failed'})
@@ -83,3 +107,22 @@ def validate_token(current_user):
             'email': current_user.email
         }
     })
+
+
+@login_bp.route('/logout-all', methods=['POST'])
+@token_required
+def logout_all(current_user):
+    """Revoke every token issued to the user, signing them out everywhere"""
+    User.revoke_tokens(current_user.id)
+    session.pop('user', None)
+    return jsonify({'success': True, 'message': 'Logged out of all sessions'})
+
+
+@login_bp.route('/password-hash/stats', methods=['GET'])
+@admin_required
+def password_hash_stats():
+    """
+    Get password hashing pool metrics (queue depth, rejections, timing).
+    Administrators only.
+    """
+    return jsonify(get_password_hasher().stats()), 200
@@ -2,37 +2,178 @@
 Description: Notification routes for handling notification-related API endpoints.
 Last Modified By: Bryan Vela
 Created: 2025-10-25
-Last Modified: 
+Last Modified:
     2025-10-26 - File created with notification CRUD operations.
     2025-10-28 - Added notification delivery and status management.
+    2026-10-19 - Cursor-paginated feed, unread count and batch mark-read.
+    2026-10-19 - Server-sent events stream of new notifications.
+    2026-10-19 - Stream limited to the logged in user; stream stats to admins.
+    2026-10-19 - Stream tickets, so login tokens stay out of stream URLs.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from middleware.auth_middleware import (
+    login_required, admin_required, stream_login_required, issue_stream_ticket, STREAM_TICKET_SECONDS
+)
 from models.notification import Notification
+from services.notification_stream import get_notification_hub
+from utils.pagination import parse_limit
 import logging  # For logging purposes
 
 notification_bp = Blueprint('notifications', __name__)
 
-@notification_bp.route('/<user_id>', methods=['GET'])
+MAX_MARK_READ_IDS = 500
+
+@notification_bp.route('/<int:user_id>', methods=['GET'])
 def get_notifications(user_id):
-    """Get notifications for a specific user.
+    """Get one page of notifications for a specific user, newest first.
 
     Args:
-        user_id (str): The ID of the user to retrieve notifications for.
+        user_id (int): The ID of the user to retrieve notifications for.
+
+    Query parameters:
+        limit: Page size (default 20, max 100)
+        cursor: next_cursor value returned with the previous page
+        unread: true to return only unread notifications
 
     Returns:
-        JSON response containing the user's notifications.
+        JSON response containing the page of notifications, the next page
+        cursor and the user's unread count.
     """
     try:
-        notifications = Notification.get_notifications_for_user(user_id)
-        if not notifications:
-            return jsonify({"message": "No notifications found"}), 404
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            notifications, next_cursor = Notification.feed(
+                user_id,
+                limit=limit,
+                cursor=request.args.get('cursor'),
+                unread_only=request.args.get('unread', '').lower() in ('1', 'true', 'yes')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         return jsonify({
-            "notifications": [notification.to_dict() for notification in notifications]
+            "notifications": [notification.to_dict() for notification in notifications],
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "unread_count": Notification.unread_count(user_id)
         })
     except Exception as e:
         logging.error(f"Error fetching notifications for user {user_id}: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
-    
+
+@notification_bp.route('/<int:user_id>/unread_count', methods=['GET'])
+def get_unread_count(user_id):
+    """Get the number of unread notifications of a user.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        JSON response containing unread_count.
+    """
+    try:
+        return jsonify({"unread_count": Notification.unread_count(user_id)})
+    except Exception as e:
+        logging.error(f"Error counting notifications for user {user_id}: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+@notification_bp.route('/<int:user_id>/stream', methods=['GET'])
+@stream_login_required
+def stream_notifications(user_id):
+    """Stream a user's new notifications as server-sent events.
+
+    Events:
+        notification: the new notification; its id is the event id
+        reset: more was missed than can be replayed; reload the feed
+
+    A heartbeat comment is sent when idle, and the stream ends after a few
+    minutes. EventSource then reconnects with Last-Event-ID (also accepted as
+    the last_event_id query parameter) and is replayed what it missed.
+
+    EventSource cannot send headers, so instead of the Authorization header
+    the token query parameter may carry a ticket from POST .../stream-ticket.
+
+    Args:
+        user_id (int): The ID of the user; must be the logged in user.
+    """
+    if request.user_id != user_id:
+        return jsonify({'error': 'You can only stream your own notifications'}), 403
+
+    hub = get_notification_hub()
+    if hub.is_full():
+        response = jsonify({'error': 'Too many open notification streams'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    raw_last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(raw_last_id) if raw_last_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID must be a notification id'}), 400
+
+    return Response(
+        stream_with_context(hub.stream(user_id, last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@notification_bp.route('/<int:user_id>/stream-ticket', methods=['POST'])
+@login_required
+def create_stream_ticket(user_id):
+    """Issue a short-lived ticket to open the logged in user's stream with.
+
+    Args:
+        user_id (int): The ID of the user; must be the logged in user.
+
+    Returns:
+        JSON response containing the ticket and its lifetime in seconds.
+    """
+    if request.user_id != user_id:
+        return jsonify({'error': 'You can only stream your own notifications'}), 403
+    return jsonify({'ticket': issue_stream_ticket(user_id), 'expires_in': STREAM_TICKET_SECONDS})
+
+@notification_bp.route('/stream/stats', methods=['GET'])
+@admin_required
+def notification_stream_stats():
+    """Get open notification stream and delivery metrics of this process."""
+    return jsonify(get_notification_hub().stats())
+
+@notification_bp.route('/<int:user_id>/read', methods=['POST'])
+@login_required
+def mark_notifications_read(user_id):
+    """Mark notifications of the logged in user read.
+
+    Body: {"ids": [1, 2, 3]} for specific notifications or {"all": true}.
+
+    Args:
+        user_id (int): The ID of the user; must be the logged in user.
+
+    Returns:
+        JSON response containing the number marked and the new unread count.
+    """
+    if request.user_id != user_id:
+        return jsonify({'error': 'You can only mark your own notifications read'}), 403
+
+    data = request.get_json(silent=True) or {}
+    if data.get('all'):
+        ids = None
+    else:
+        ids = data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({'error': 'ids must be a list of notification ids, or pass all: true'}), 400
+        if len(ids) > MAX_MARK_READ_IDS:
+            return jsonify({'error': f'At most {MAX_MARK_READ_IDS} ids per request'}), 400
+
+    try:
+        marked = Notification.mark_read(user_id, ids)
+        return jsonify({
+            'marked': marked,
+            'unread_count': Notification.unread_count(user_id)
+        })
+    except Exception as e:
+        logging.error(f"Error marking notifications read for user {user_id}: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @notification_bp.route('/', methods=['POST'])
 def create_notification():
     """Create a notification.
@@ -42,13 +183,13 @@ def create_notification():
     """
     try:
         data = request.get_json()
-        
+
         # Validate required fields
         required_fields = ['user_id', 'header', 'body']
         for field in required_fields:
             if field not in data:
                 return jsonify({'error': f'{field} is required'}), 400
-            
+
         notification = Notification.create(data)
         return jsonify({
             'message': 'Notification created successfully',
@@ -56,4 +197,4 @@ def create_notification():
         }), 201
     except Exception as e:
         logging.error(f"Error creating notification: {str(e)}")
-        return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
+        return jsonify({"error": "Internal server error"}), 500
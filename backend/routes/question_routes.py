@@ -5,12 +5,19 @@ Created: 2025-10-25
 Last Modified: 
     2025-10-26 - File created with user CRUD operations.
     2025-10-28 - Added error handling and logging functionality.
+    2026-10-19 - Follow and unfollow a question.
+    2026-10-19 - Edits that change the prompt queue a new AI answer on a cache miss.
 """
 from flask import Blueprint, request, jsonify
 from middleware.auth_middleware import login_required
 from models.question import Question
-from models.notification import Notification
+from models.question_follow import QuestionFollow
+from services.notification_dispatcher import queue_notification
 from utils.fuzzy_search import search_questions
+from utils.html_sanitizer import sanitize_content
+from services.ai_response_cache import fill_question_ai_answer
+from services.ai_answer_jobs import enqueue_ai_answer
+from database import db
 import logging  # For logging purposes
 from datetime import datetime,timedelta
 
@@ -27,8 +34,12 @@ def get_questions():
         questions = Question.get_all()
         if not questions:
             return jsonify({"message": "No questions found"}), 404
+        answer_counts = Question.answer_counts([question.id for question in questions])
         return jsonify({
-            "questions": [question.to_dict() for question in questions]
+            "questions": [
+                question.to_summary_dict(answer_count=answer_counts[question.id])
+                for question in questions
+            ]
         })
     except Exception as e:
         logging.error(f"Error fetching questions: {str(e)}")
@@ -167,11 +178,11 @@ def update_question(question_id):
             elif len(title) > 120:
                 errors['title'] = 'Title must not exceed 120 characters'
         
-        # Body validation
+        # Body validation (sanitized once; the model reuses this result)
+        body_content = None
         if body is not None:
-            from bs4 import BeautifulSoup
-            plain_text = BeautifulSoup(body, 'html.parser').get_text()
-            if not plain_text or len(plain_text.strip()) < 20:
+            body_content = sanitize_content(body)
+            if len(body_content.text) < 20:
                 errors['body'] = 'Body must be at least 20 characters'
         
         # Tag validation
@@ -190,13 +201,21 @@ def update_question(question_id):
         
         # Update question (no history tracking needed)
         try:
+            previous_prompt = (question.title, question.body)
             question.update_question(
                 title=title,
                 body=body,
-                tag_ids=tag_ids
+                tag_ids=tag_ids,
+                body_content=body_content
             )
-            
-            
+
+            # The stored AI answer belongs to the old title/body
+            if (question.title, question.body) != previous_prompt:
+                if fill_question_ai_answer(question):
+                    db.session.commit()
+                # No cached answer for the new title/body: generate one
+                if not question.ai_generated_ans:
+                    enqueue_ai_answer(question.id)
             
             return jsonify({
                 "message": "Question updated successfully",
@@ -239,15 +258,18 @@ def create_question():
                 return jsonify({'error': f'{field} is required'}), 400
 
         # Create question with tags
-        question = Question.create_with_tags(data, tag_ids)
+        question = Question.create_with_tags(data, tag_ids, commit=False)
+
+        # Reuse an AI answer already generated for the same title and body
+        fill_question_ai_answer(question)
 
-        #Create Notification
-        notification_data = {
-            "user_id": data['user_id'],
-            "header": "Question Created",
-            "body": f"Your question '{data['title']}' has been posted successfully."
-        }
-        Notification.create(notification_data)
+        # Notification is delivered by the dispatcher once this commits
+        queue_notification(
+            data['user_id'],
+            "Question Created",
+            f"Your question '{data['title']}' has been posted successfully."
+        )
+        db.session.commit()
         
         return jsonify({
             'message': 'Question created successfully',
@@ -255,10 +277,34 @@ def create_question():
         }), 201
     except Exception as e:
         import traceback
+        db.session.rollback()
         logging.error(f"Error creating question: {str(e)}")
         logging.error(traceback.format_exc())
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
+@question_bp.route('/<int:question_id>/follow', methods=['POST', 'DELETE'])
+@login_required
+def follow_question(question_id):
+    """
+    Follow (POST) or unfollow (DELETE) a question as the logged in user.
+    Followers are notified of new answers and comments; a question's author
+    and answerers follow it until they unfollow it.
+
+    Returns:
+        JSON response with the question id and whether the user follows it.
+    """
+    try:
+        if not Question.get_by_id(question_id):
+            return jsonify({"error": "Question not found"}), 404
+
+        following = request.method == 'POST'
+        QuestionFollow.set_following(request.user_id, question_id, following)
+        return jsonify({"question_id": question_id, "following": following}), 200
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error following question: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @question_bp.route('/search', methods=['GET'])
 def title_fuzzy_search():
     """Search questions using fuzzy matching.
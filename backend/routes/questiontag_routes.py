@@ -49,9 +49,14 @@ def get_questions_for_tag(tag_id):
             .filter(QuestionTag.tag_id == tag_id)\
             .all()
         
+        answer_counts = Question.answer_counts([question.id for question in questions])
+        
         return jsonify({
             'tag': tag.to_dict(),
-            'questions': [question.to_dict() for question in questions],
+            'questions': [
+                question.to_summary_dict(answer_count=answer_counts[question.id])
+                for question in questions
+            ],
             'count': len(questions)
         }), 200
         
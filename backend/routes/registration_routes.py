@@ -2,12 +2,27 @@
 Description: registration routes for handling requests related to registration
 Author: Saayonee Dhepe
 Created: 2025-10-31
+Last Modified:
+    2026-10-19 - 503 when the password hashing pool sheds load (Bryan Vela).
+    2026-10-19 - Rate limited register, resend-otp and forgot-password (Bryan Vela).
+    2026-10-19 - OTPs and pending registrations kept in the shared OTP store
+                 instead of on the service instance (Bryan Vela).
 """
 from flask import Blueprint, request, jsonify
 from services.user_registration import UserRegistrationService
+from services.password_hasher import PasswordHasherBusyError
+from routes.login_routes import hashing_busy
+from middleware.rate_limiter import rate_limit_blueprint
 
 registration_bp = Blueprint('registration', __name__)
 
+# Each request costs a bcrypt hash and/or an SMTP send; limits are '<requests>/<seconds>'
+rate_limit_blueprint(registration_bp, {
+    'register_user': {'methods': ('POST',), 'ip': '10/600', 'email': '3/600'},
+    'resend_otp': {'methods': ('POST',), 'ip': '10/600', 'email': '3/600'},
+    'forgot_password': {'methods': ('POST',), 'ip': '10/600', 'email': '3/600'},
+})
+
 register = UserRegistrationService()
 
 
@@ -27,6 +42,8 @@ def register_user():
         else:
             return jsonify({"success": False, "message": "User already exists! Please Log in!"}), 400
 
+    except PasswordHasherBusyError as e:
+        return hashing_busy(e)
     except Exception as e:
         print(e)
         return jsonify({"success": False, "message": "Server error"}), 500
@@ -40,7 +57,7 @@ def verify_otp():
 
     try:
 
-        if register.verify_and_create_user(otp):
+        if register.verify_and_create_user(email, otp):
             return jsonify({"success": True, "message": "Registration Completed!!"})
         else:
             return jsonify({"success": False, "message": "Invalid or expired OTP. Please try again."}), 400
@@ -82,6 +99,8 @@ def reset_password():
         else:
             return jsonify({"success": False, "message": "Invalid OTP or user not found"}), 400
             
+    except PasswordHasherBusyError as e:
+        return hashing_busy(e)
     except Exception as e:
         print(e)
         return jsonify({"success": False, "message": "Error resetting password"}), 500
@@ -93,7 +112,7 @@ def resend_otp():
     email = data.get("email")
     
     try:
-        if hasattr(register, 'pending_email') and register.pending_email == email:
+        if register.has_pending_registration(email):
             register.send_otp(email)
             return jsonify({"success": True, "message": "OTP resent to your email"})
         elif register.user_exists(email):
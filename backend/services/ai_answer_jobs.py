@@ -0,0 +1,85 @@
+"""
+Description: Background generation of AI answers for new questions.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with the ai_answer job handler.
+    2026-10-19 - Register the answer summary refresh job.
+    2026-10-19 - enqueue_ai_answer can join the caller's transaction.
+"""
+import logging
+from contextlib import nullcontext
+from database import db
+
+AI_ANSWER_JOB = 'ai_answer'
+
+
+def generate_question_ai_answer(payload):
+    """
+    Job handler: generate the AI answer of a question and store it in
+    Question.ai_generated_ans. Served from the AI response cache when possible.
+
+    Args:
+        payload (dict): {'question_id': int}
+
+    Raises:
+        Exception: Any generation failure, so the queue retries the job.
+    """
+    from models.question import Question
+    from services.gemini_services import GeminiServices
+    from services.ai_response_cache import get_ai_cache
+
+    question = Question.get_by_id(payload['question_id'])
+    if question is None or question.ai_generated_ans:
+        return
+
+    service = GeminiServices.for_app()
+    answer, _, _ = get_ai_cache().generate_answer(service, question.title, question.body)
+    question.ai_generated_ans = answer
+    db.session.commit()
+
+
+def enqueue_ai_answer(question_id, commit=True):
+    """
+    Queue AI answer generation for a question; a question already waiting
+    for its answer is not queued twice. Errors are logged, not raised, so a
+    queue problem never fails the write that triggered it.
+
+    Args:
+        question_id (int): Question to answer.
+        commit (bool): Commit now; False adds the job to the caller's
+                       transaction (in a savepoint, so a failure here
+                       leaves the rest of it intact).
+
+    Returns:
+        BackgroundJob|None: The queued (or already queued) job.
+    """
+    from services.job_queue import get_job_queue
+    try:
+        queue = get_job_queue()
+        if queue is None:
+            return None
+        with (nullcontext() if commit else db.session.begin_nested()):
+            return queue.enqueue(
+                AI_ANSWER_JOB,
+                {'question_id': question_id},
+                dedupe_key=f'{AI_ANSWER_JOB}:{question_id}',
+                commit=commit
+            )
+    except Exception as e:
+        if commit:
+            db.session.rollback()
+        logging.error(f"Failed to queue AI answer for question {question_id}: {str(e)}")
+        return None
+
+
+def register_ai_jobs(queue):
+    """
+    Register the AI job handlers on a queue.
+
+    Args:
+        queue (JobQueue): The app's job queue.
+    """
+    from services.answer_summary_service import ANSWER_SUMMARY_JOB, refresh_question_summary
+    queue.register(AI_ANSWER_JOB, generate_question_ai_answer)
+    queue.register(ANSWER_SUMMARY_JOB, refresh_question_summary)
@@ -0,0 +1,295 @@
+"""
+Description: Resumable backfill of AI answers for questions that have none.
+Questions are read in id-ordered pages; cached answers are reused, the rest
+are generated on a bounded thread pool under a rate limit, and each page's
+answers and checkpoint are written back in one transaction. Questions whose
+answer failed are recorded on the checkpoint and retried by the next run.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with paging, rate limit, checkpoints and the
+                 `flask ai-backfill` command.
+    2026-10-19 - Counters applied with the page commit; failed questions retried.
+
+Usage (from backend/):
+    flask --app app ai-backfill [--page-size N] [--concurrency N] [--rate N]
+                                [--limit N] [--restart]
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import or_, update
+from database import db
+from models.backfill_checkpoint import BackfillCheckpoint
+from models.question import Question
+from services.ai_response_cache import answer_cache_key, get_ai_cache
+from services.gemini_client_pool import GeminiUnavailableError
+
+AI_ANSWER_BACKFILL = 'ai_answers'
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE_PER_SECOND = 2.0
+
+
+class RateLimiter:
+    """
+    Spaces calls evenly so that at most `rate` start per second, across threads.
+
+    Attributes:
+        rate (float): Calls per second; 0 or None for no limit.
+    """
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self):
+        """Block until the caller may make its call"""
+        if not self.rate:
+            return
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next)
+            self._next = start + 1.0 / self.rate
+        if start > now:
+            self._sleep(start - now)
+
+
+class AIAnswerBackfill:
+    """
+    Fills Question.ai_generated_ans for questions without an AI answer.
+
+    Progress is kept in a BackfillCheckpoint, so an interrupted or paused run
+    resumes after the last finished question, and questions whose answer
+    failed are retried by the next run. A run pauses when Gemini is
+    unavailable (busy, circuit open, past its deadline) rather than marking
+    the rest of the backlog failed.
+
+    Attributes:
+        service (GeminiServices): Service generating the answers.
+        cache (AIResponseCache): Cache consulted before, and filled after, each call.
+        page_size (int): Questions read per page.
+        concurrency (int): Answers generated at once.
+        limiter (RateLimiter): Limits Gemini calls per second.
+        name (str): Checkpoint name.
+    """
+
+    def __init__(self, service, cache, page_size=DEFAULT_PAGE_SIZE, concurrency=DEFAULT_CONCURRENCY,
+                 rate_per_second=DEFAULT_RATE_PER_SECOND, name=AI_ANSWER_BACKFILL):
+        self.service = service
+        self.cache = cache
+        self.page_size = max(1, page_size)
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(rate_per_second)
+        self.name = name
+
+    @staticmethod
+    def _unanswered():
+        return or_(Question.ai_generated_ans.is_(None), Question.ai_generated_ans == '')
+
+    def _page(self, after_id, limit):
+        """Next questions without an AI answer, by id"""
+        return db.session.query(Question.id, Question.title, Question.body) \
+            .filter(Question.id > after_id, self._unanswered()) \
+            .order_by(Question.id.asc()) \
+            .limit(limit) \
+            .all()
+
+    def _generate(self, title, body):
+        """Generate one answer (runs on a pool thread, no DB access)"""
+        self.limiter.acquire()
+        return self.service.generate_answer(title, body)
+
+    def _fill(self, rows, executor):
+        """
+        Answer questions from the cache or Gemini and write the answers with
+        one batched UPDATE, in the current transaction (no commit).
+
+        Args:
+            rows (list): (id, title, body) of the questions.
+            executor (ThreadPoolExecutor): Pool running the Gemini calls.
+
+        Returns:
+            dict: cached and generated counts, ids answered, failed and
+                  unavailable (Gemini could not take them), and last_error.
+        """
+        outcome = {'cached': 0, 'generated': 0, 'answered': [], 'failed': [], 'unavailable': [],
+                   'last_error': None}
+        answers = {}
+        pending = {}
+        for question_id, title, body in rows:
+            key = answer_cache_key(self.service.model_name, title, body)
+            cached = self.cache.get(key)
+            if cached is not None:
+                answers[question_id] = cached[0]
+                outcome['cached'] += 1
+            else:
+                pending[question_id] = (key, executor.submit(self._generate, title, body))
+
+        for question_id, (key, future) in pending.items():
+            try:
+                answer, is_truncated = future.result()
+            except GeminiUnavailableError as e:
+                outcome['unavailable'].append(question_id)
+                outcome['last_error'] = str(e)
+                continue
+            except Exception as e:
+                logging.error(f"AI backfill failed for question {question_id}: {str(e)}")
+                outcome['failed'].append(question_id)
+                outcome['last_error'] = f"question {question_id}: {str(e)}"
+                continue
+            self.cache.put(key, 'answer', self.service.model_name, answer, is_truncated)
+            answers[question_id] = answer
+            outcome['generated'] += 1
+
+        if answers:
+            # One UPDATE ... WHERE id = ? batch for the whole page
+            db.session.execute(
+                update(Question),
+                [{'id': question_id, 'ai_generated_ans': answer} for question_id, answer in answers.items()]
+            )
+        outcome['answered'] = list(answers)
+        return outcome
+
+    @staticmethod
+    def _record(checkpoint, outcome, retried=()):
+        """Add a page's outcome to the checkpoint (committed with the page)"""
+        checkpoint.cached += outcome['cached']
+        checkpoint.generated += outcome['generated']
+        failed = (set(checkpoint.get_failed_ids()) - set(retried) - set(outcome['answered'])) \
+            | set(outcome['failed'])
+        checkpoint.set_failed_ids(failed)
+        if outcome['last_error']:
+            checkpoint.last_error = outcome['last_error']
+        if outcome['unavailable']:
+            checkpoint.status = BackfillCheckpoint.PAUSED
+
+    def retry_failed(self, checkpoint, executor):
+        """
+        Retry the questions that failed in earlier runs. Those answered or
+        deleted since are dropped from the list; those failing again stay.
+
+        Args:
+            checkpoint (BackfillCheckpoint): Progress holding the failed ids.
+            executor (ThreadPoolExecutor): Pool running the Gemini calls.
+
+        Returns:
+            bool: False if Gemini became unavailable and the run is paused.
+        """
+        failed_ids = checkpoint.get_failed_ids()
+        if not failed_ids:
+            return True
+        rows = db.session.query(Question.id, Question.title, Question.body) \
+            .filter(Question.id.in_(failed_ids), self._unanswered()) \
+            .order_by(Question.id.asc()) \
+            .all()
+        outcome = self._fill(rows, executor)
+        # Questions Gemini could not take now stay on the list like new failures
+        outcome['failed'] += outcome['unavailable']
+        self._record(checkpoint, outcome, retried=failed_ids)
+        db.session.commit()
+        return not outcome['unavailable']
+
+    def run_page(self, checkpoint, executor, limit=None):
+        """
+        Fill one page of questions and advance the checkpoint, committing the
+        answers, counters and position together.
+
+        Args:
+            checkpoint (BackfillCheckpoint): Progress to resume from and update.
+            executor (ThreadPoolExecutor): Pool running the Gemini calls.
+            limit (int|None): Most questions to take from this page.
+
+        Returns:
+            bool: True if there may be more to do; False when done or paused.
+        """
+        rows = self._page(checkpoint.last_id, min(self.page_size, limit or self.page_size))
+        if not rows:
+            checkpoint.status = BackfillCheckpoint.DONE
+            db.session.commit()
+            return False
+
+        outcome = self._fill(rows, executor)
+        unavailable = outcome['unavailable']
+        self._record(checkpoint, outcome)
+        checkpoint.processed += len(rows) - len(unavailable)
+        if unavailable:
+            # Resume at the first question Gemini could not take; later ones already
+            # filled are skipped on resume because they have an answer now
+            checkpoint.last_id = min(unavailable) - 1
+        else:
+            checkpoint.last_id = rows[-1][0]
+        db.session.commit()
+        return not unavailable
+
+    def run(self, limit=None, restart=False, progress=None):
+        """
+        Run (or resume) the backfill until every question has an answer, the
+        limit is reached or Gemini becomes unavailable. Questions that failed
+        in earlier runs are retried first.
+
+        Args:
+            limit (int|None): Most questions to handle in this run.
+            restart (bool): Start again from the first question.
+            progress (callable|None): Called with the checkpoint after each page.
+
+        Returns:
+            BackfillCheckpoint: The checkpoint after the run.
+        """
+        checkpoint = BackfillCheckpoint.get_or_create(self.name)
+        if restart:
+            # Every question is visited again, failed ones included
+            checkpoint.last_id = 0
+            checkpoint.set_failed_ids([])
+        checkpoint.status = BackfillCheckpoint.RUNNING
+        checkpoint.last_error = None
+        db.session.commit()
+
+        started = checkpoint.processed
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='ai-backfill') as executor:
+            if not self.retry_failed(checkpoint, executor):
+                if progress:
+                    progress(checkpoint)
+                return checkpoint
+            while True:
+                remaining = None if limit is None else limit - (checkpoint.processed - started)
+                if remaining is not None and remaining <= 0:
+                    break
+                more = self.run_page(checkpoint, executor, remaining)
+                if progress:
+                    progress(checkpoint)
+                if not more:
+                    break
+        return checkpoint
+
+
+@click.command('ai-backfill')
+@click.option('--page-size', default=DEFAULT_PAGE_SIZE, show_default=True, help='Questions read per page.')
+@click.option('--concurrency', default=DEFAULT_CONCURRENCY, show_default=True, help='Answers generated at once.')
+@click.option('--rate', default=DEFAULT_RATE_PER_SECOND, show_default=True, help='Gemini calls per second (0 for no limit).')
+@click.option('--limit', type=int, default=None, help='Most questions to handle in this run.')
+@click.option('--restart', is_flag=True, help='Start again from the first question instead of the checkpoint.')
+@with_appcontext
+def ai_backfill_command(page_size, concurrency, rate, limit, restart):
+    """Generate AI answers for questions that do not have one yet."""
+    from services.gemini_services import GeminiServices
+
+    backfill = AIAnswerBackfill(
+        GeminiServices.for_app(), get_ai_cache(),
+        page_size=page_size, concurrency=concurrency, rate_per_second=rate
+    )
+
+    def report(checkpoint):
+        click.echo(f"up to question {checkpoint.last_id}: processed {checkpoint.processed}, "
+                   f"generated {checkpoint.generated}, cached {checkpoint.cached}, failed {checkpoint.failed}")
+
+    checkpoint = backfill.run(limit=limit, restart=restart, progress=report)
+    click.echo(f"status: {checkpoint.status}")
+    if checkpoint.status == BackfillCheckpoint.PAUSED:
+        click.echo(f"paused: {checkpoint.last_error}; run again to resume")
@@ -0,0 +1,411 @@
+"""
+Description: Persistent, content-addressed cache for Gemini answers and summaries.
+Responses are stored in the ai_responses table under a sha256 of the model
+name, prompt template version and normalized prompt inputs, so regenerating
+an answer for an unchanged question is a single indexed lookup. The cache
+writes (hit counts, stores, eviction) on a connection of its own, so looking
+up or storing a response never flushes or commits the caller's session and
+the cache can be used inside a larger unit of work.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with TTL, size limit and hit/miss counters.
+    2026-10-19 - Summary keys include answer acceptance and score.
+    2026-10-19 - Expired entries kept for a grace period and served when
+                 Gemini fails.
+    2026-10-19 - Hits, stores and eviction are written on the cache's own
+                 connection; the caller's session is never committed.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models.ai_response import AIResponse
+from services.gemini_services import ANSWER_PROMPT_VERSION, SUMMARY_PROMPT_VERSION
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10000
+# How long past its TTL an entry is kept as a fallback for when Gemini fails
+DEFAULT_STALE_SECONDS = 24 * 3600
+
+EXTENSION_KEY = 'ai_response_cache'
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def normalize_text(text):
+    """
+    Normalize prompt input so trivially different submissions share a key.
+
+    Args:
+        text (str|None): Title, body or answer text.
+
+    Returns:
+        str: NFC-normalized text with whitespace runs collapsed and trimmed.
+    """
+    if not text:
+        return ''
+    return _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFC', str(text))).strip()
+
+
+def _digest(parts):
+    payload = json.dumps(parts, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def answer_cache_key(model_name, title, body):
+    """
+    Cache key of an AI answer.
+
+    Args:
+        model_name (str): Gemini model name.
+        title (str): Question title.
+        body (str): Question body.
+
+    Returns:
+        str: sha256 hex digest.
+    """
+    return _digest(['answer', model_name, ANSWER_PROMPT_VERSION, normalize_text(title), normalize_text(body)])
+
+
+def answer_bodies(answers):
+    """
+    Extract answer bodies in order, the way GeminiServices.summarize_answers reads them.
+
+    Args:
+        answers (list|dict): Answer dicts (or a single answer dict).
+
+    Returns:
+        list[str]: Bodies in the order given.
+    """
+    if isinstance(answers, dict):
+        answers = [answers]
+    return [ans.get('body', '') if isinstance(ans, dict) else str(ans) for ans in answers]
+
+
+def summary_cache_key(model_name, answers):
+    """
+    Cache key of an AI summary; the order of the answers is part of the key.
+
+    Args:
+        model_name (str): Gemini model name.
+        answers (list|dict): Answers passed to summarize_answers.
+
+    Returns:
+        str: sha256 hex digest.
+    """
+    bodies = [normalize_text(body) for body in answer_bodies(answers)]
+    # Acceptance and score decide which answers fit the prompt budget
+    ranking = [
+        [bool(ans.get('is_accepted', ans.get('isAccepted', False))), ans.get('score', 0)]
+        if isinstance(ans, dict) else [False, 0]
+        for ans in (answers if isinstance(answers, list) else [answers])
+    ]
+    return _digest(['summary', model_name, SUMMARY_PROMPT_VERSION, bodies, ranking])
+
+
+class AIResponseCache:
+    """
+    DB-backed cache of generated AI text.
+
+    Attributes:
+        ttl (timedelta): How long an entry is served after it is stored.
+        max_entries (int): Entries kept; the least recently used are evicted.
+        stale (timedelta): How long an expired entry is kept, to be served
+                           only when generating a fresh response fails.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES,
+                 stale_seconds=DEFAULT_STALE_SECONDS):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self.stale = timedelta(seconds=stale_seconds)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'fallbacks': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a cache from AI_CACHE_TTL_SECONDS, AI_CACHE_MAX_ENTRIES and
+        AI_CACHE_STALE_SECONDS.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            AIResponseCache: The new cache.
+        """
+        return cls(
+            ttl_seconds=int(config.get('AI_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+            max_entries=int(config.get('AI_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+            stale_seconds=int(config.get('AI_CACHE_STALE_SECONDS', DEFAULT_STALE_SECONDS))
+        )
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key):
+        """
+        Look up a live entry and record the hit.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            tuple[str, bool]|None: (text, is_truncated), or None on a miss.
+        """
+        with db.session.no_autoflush:
+            entry = db.session.query(AIResponse.id, AIResponse.response, AIResponse.is_truncated,
+                                     AIResponse.expires_at) \
+                .filter(AIResponse.cache_key == key) \
+                .first()
+        now = _utcnow()
+        if entry is None or entry.expires_at <= now:
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        table = AIResponse.__table__
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(table).where(table.c.id == entry.id)
+                .values(hit_count=table.c.hit_count + 1, last_used_at=now)
+            )
+        return entry.response, bool(entry.is_truncated)
+
+    def peek(self, key):
+        """
+        Look up a live entry without touching counters or usage time.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            str|None: Cached text.
+        """
+        with db.session.no_autoflush:
+            return db.session.query(AIResponse.response) \
+                .filter(AIResponse.cache_key == key, AIResponse.expires_at > _utcnow()) \
+                .scalar()
+
+    def get_stale(self, key):
+        """
+        Look up an entry that may be past its TTL (but within the stale grace
+        period), for use when a fresh response cannot be generated.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            tuple[str, bool]|None: (text, is_truncated).
+        """
+        with db.session.no_autoflush:
+            entry = db.session.query(AIResponse.response, AIResponse.is_truncated) \
+                .filter(AIResponse.cache_key == key, AIResponse.expires_at > _utcnow() - self.stale) \
+                .first()
+        if entry is None:
+            return None
+        self._count('fallbacks')
+        return entry.response, bool(entry.is_truncated)
+
+    def _fallback(self, key, kind, error):
+        """Stale entry to serve after a failed generation, or None"""
+        if isinstance(error, ValueError):
+            return None
+        stale = self.get_stale(key)
+        if stale is not None:
+            logging.warning(f"Serving stale cached AI {kind} after generation failed: {str(error)}")
+        return stale
+
+    def put(self, key, kind, model_name, text, is_truncated=False):
+        """
+        Store (or refresh) an entry, then enforce the size limit.
+
+        Args:
+            key (str): Cache key.
+            kind (str): 'answer' or 'summary'.
+            model_name (str): Model that produced the text.
+            text (str): Generated text.
+            is_truncated (bool): Whether the text was cut off.
+        """
+        if not text:
+            return
+
+        now = _utcnow()
+        table = AIResponse.__table__
+        values = {
+            'model_name': model_name,
+            'response': text,
+            'is_truncated': bool(is_truncated),
+            'last_used_at': now,
+            'expires_at': now + self.ttl,
+            'updated_at': now
+        }
+        try:
+            with db.engine.begin() as connection:
+                stored = connection.execute(
+                    update(table).where(table.c.cache_key == key).values(**values)
+                ).rowcount
+                if not stored:
+                    connection.execute(insert(table).values(cache_key=key, kind=kind, hit_count=0,
+                                                            created_at=now, **values))
+        except IntegrityError:
+            # Another worker stored the same key first; its entry is as good
+            return
+
+        self._count('stores')
+        self._evict()
+
+    def _evict(self):
+        """Drop entries past the stale grace period, then the least recently used above max_entries"""
+        table = AIResponse.__table__
+        with db.engine.begin() as connection:
+            removed = connection.execute(
+                delete(table).where(table.c.expires_at <= _utcnow() - self.stale)
+            ).rowcount
+
+            excess = connection.execute(select(func.count()).select_from(table)).scalar() - self.max_entries
+            if excess > 0:
+                oldest = select(table.c.id) \
+                    .order_by(table.c.last_used_at.asc(), table.c.id.asc()) \
+                    .limit(excess) \
+                    .subquery()
+                removed += connection.execute(
+                    delete(table).where(table.c.id.in_(select(oldest.c.id)))
+                ).rowcount
+
+        if removed:
+            self._count('evictions', removed)
+
+    def stats(self):
+        """
+        Get cache metrics.
+
+        Returns:
+            dict: hits, misses, stores, evictions, fallbacks (stale entries served
+                  because generation failed), hit_rate, entries and max_entries.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        with db.session.no_autoflush:
+            stats['entries'] = db.session.query(func.count(AIResponse.id)).scalar()
+        stats['max_entries'] = self.max_entries
+        return stats
+
+    def generate_answer(self, service, title, body):
+        """
+        Serve an AI answer from the cache, generating and storing it on a miss.
+        If generation fails, an expired entry still in its grace period is
+        served instead.
+
+        Args:
+            service (GeminiServices): Service used on a miss.
+            title (str): Question title.
+            body (str): Question body.
+
+        Returns:
+            tuple[str, bool, bool]: (answer, is_truncated, served_from_cache).
+
+        Raises:
+            RuntimeError: If the service produced no answer.
+        """
+        key = answer_cache_key(service.model_name, title, body)
+        cached = self.get(key)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        try:
+            result = service.generate_answer(title, body)
+        except Exception as e:
+            stale = self._fallback(key, 'answer', e)
+            if stale is None:
+                raise
+            return stale[0], stale[1], True
+        if not result or not result[0]:
+            raise RuntimeError("Failed to generate AI response")
+        answer, is_truncated = result
+        self.put(key, 'answer', service.model_name, answer, is_truncated)
+        return answer, is_truncated, False
+
+    def summarize_answers(self, service, answers):
+        """
+        Serve an AI summary from the cache, generating and storing it on a
+        miss, or serving an expired entry if generation fails.
+
+        Args:
+            service (GeminiServices): Service used on a miss.
+            answers (list|dict): Answers to summarize, in order.
+
+        Returns:
+            tuple[str, bool, bool]: (summary, is_truncated, served_from_cache).
+        """
+        key = summary_cache_key(service.model_name, answers)
+        cached = self.get(key)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        try:
+            summary, is_truncated = service.summarize_answers(answers)
+        except Exception as e:
+            stale = self._fallback(key, 'summary', e)
+            if stale is None:
+                raise
+            return stale[0], stale[1], True
+        self.put(key, 'summary', service.model_name, summary, is_truncated)
+        return summary, is_truncated, False
+
+
+def get_ai_cache(app=None):
+    """
+    Get the app's AI response cache, creating it from config on first use.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        AIResponseCache: The shared cache.
+    """
+    app = app or current_app._get_current_object()
+    cache = app.extensions.get(EXTENSION_KEY)
+    if cache is None:
+        cache = app.extensions.setdefault(EXTENSION_KEY, AIResponseCache.from_config(app.config))
+    return cache
+
+
+def fill_question_ai_answer(question, model_name=None):
+    """
+    Set Question.ai_generated_ans from the cache entry matching its title and
+    body, clearing it when there is none (e.g. after an edit). Does not commit.
+
+    Args:
+        question (Question): Question to update.
+        model_name (str|None): Model whose answers to use; defaults to GEMINI_MODEL.
+
+    Returns:
+        bool: True if ai_generated_ans changed.
+    """
+    from services.gemini_services import GEMINI_MODEL
+    key = answer_cache_key(model_name or GEMINI_MODEL, question.title, question.body)
+    try:
+        answer = get_ai_cache().peek(key)
+    except Exception as e:
+        logging.error(f"AI cache lookup failed for question {question.id}: {str(e)}")
+        return False
+    if answer == question.ai_generated_ans:
+        return False
+    question.ai_generated_ans = answer
+    return True
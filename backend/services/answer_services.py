@@ -9,7 +9,16 @@ Last Modified: 2025-11-23
 
 from models.question import Question
 from models.answer import Answer
+from models.vote import Vote
+from database import db
 from datetime import datetime
+from sqlalchemy import func, case
+from utils.pagination import (
+    DEFAULT_PAGE_SIZE, encode_cursor, decode_cursor, keyset_filter, order_by_clauses
+)
+
+ANSWER_SORTS = ('score', 'newest', 'oldest')
+
 class AnswerServices:
     def __init__(self):
         pass
@@ -60,4 +69,71 @@ class AnswerServices:
         count = Answer.query.filter_by(question_id=question_id).count()
         return count
 
-    
\ No newline at end of file
+    def _answer_score_subquery(self, question_id):
+        """Net vote score (upvotes - downvotes) of each answer of a question"""
+        question_answer_ids = db.session.query(Answer.id).filter(Answer.question_id == question_id)
+        vote_value = case(
+            (Vote.vote_type == 'upvote', 1),
+            (Vote.vote_type == 'downvote', -1),
+            else_=0
+        )
+        return db.session.query(
+                Vote.target_id.label('answer_id'),
+                func.sum(vote_value).label('score')
+            ) \
+            .filter(Vote.target_type == 'answer', Vote.target_id.in_(question_answer_ids)) \
+            .group_by(Vote.target_id) \
+            .subquery()
+
+    def get_answers_page(self, question_id, sort='score', limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        Get one page of answers for a question, accepted answer first.
+
+        Args:
+            question_id (int): Question the answers belong to.
+            sort (str): Secondary order after acceptance: 'score', 'newest' or 'oldest'.
+            limit (int): Maximum number of answers to return.
+            cursor (str): Cursor returned with the previous page, if any.
+
+        Returns:
+            tuple[list, str|None]: (answer, score) pairs for the page and the
+                                   cursor of the next page (None on the last page).
+
+        Raises:
+            ValueError: If the sort or cursor is invalid.
+        """
+        if sort not in ANSWER_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(ANSWER_SORTS)}")
+
+        scores = self._answer_score_subquery(question_id)
+        score = func.coalesce(scores.c.score, 0)
+        # Compared as 0/1 so the keyset filter can use < and >
+        accepted = case((Answer.is_accepted.is_(True), 1), else_=0)
+
+        if sort == 'score':
+            ordering = [(accepted, True), (score, True), (Answer.created_at, True), (Answer.id, True)]
+        elif sort == 'newest':
+            ordering = [(accepted, True), (Answer.created_at, True), (Answer.id, True)]
+        else:
+            ordering = [(accepted, True), (Answer.created_at, False), (Answer.id, False)]
+
+        query = db.session.query(Answer, score.label('score')) \
+            .outerjoin(scores, scores.c.answer_id == Answer.id) \
+            .filter(Answer.question_id == question_id)
+
+        if cursor:
+            query = query.filter(keyset_filter(ordering, decode_cursor(cursor, len(ordering))))
+
+        # One extra row tells us whether another page exists
+        rows = query.order_by(*order_by_clauses(ordering)).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_answer, last_score = rows[-1]
+            key_values = [1 if last_answer.is_accepted else 0, last_answer.created_at, last_answer.id]
+            if sort == 'score':
+                key_values.insert(1, last_score)
+            next_cursor = encode_cursor(key_values)
+
+        return [(answer, answer_score) for answer, answer_score in rows], next_cursor
@@ -0,0 +1,154 @@
+"""
+Description: Incrementally maintained AI summaries of a question's answers.
+Each stored summary records the answer ids and edit counts it covered, so
+it is only regenerated when an answer is added, removed or edited. Long
+threads are summarized hierarchically, reusing cached chunk summaries.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with coverage checks and background refresh.
+    2026-10-19 - Answers are sent with their acceptance and score, most valuable first.
+    2026-10-19 - enqueue_summary_refresh can join the caller's transaction.
+"""
+import logging
+from contextlib import nullcontext
+from flask import current_app
+from sqlalchemy import func
+from database import db
+from models.answer import Answer
+from services.answer_services import AnswerServices
+from models.answer_summary import AnswerSummary
+from services.gemini_services import SUMMARY_CHUNK_CHARS
+
+ANSWER_SUMMARY_JOB = 'answer_summary'
+
+
+def answer_coverage(question_id):
+    """
+    Get the current answer ids and edit counts of a question with one query.
+
+    Args:
+        question_id (int): Question id.
+
+    Returns:
+        dict: str(answer id) -> edit_count.
+    """
+    rows = db.session.query(Answer.id, Answer.edit_count) \
+        .filter(Answer.question_id == question_id) \
+        .all()
+    return AnswerSummary.coverage_of(rows)
+
+
+def _summary_answers(question_id):
+    """Answer dicts sent for summarization: accepted first, then by score, then posting order"""
+    scores = AnswerServices()._answer_score_subquery(question_id)
+    score = func.coalesce(scores.c.score, 0)
+    rows = db.session.query(Answer.id, Answer.body, Answer.is_accepted, score) \
+        .outerjoin(scores, scores.c.answer_id == Answer.id) \
+        .filter(Answer.question_id == question_id) \
+        .order_by(Answer.is_accepted.desc(), score.desc(), Answer.id.asc()) \
+        .all()
+    return [
+        {'id': answer_id, 'body': body or '', 'is_accepted': bool(is_accepted), 'score': int(answer_score)}
+        for answer_id, body, is_accepted, answer_score in rows
+    ]
+
+
+def get_question_summary(question_id, service=None, force=False):
+    """
+    Get the stored summary of a question's answers, regenerating it only when
+    the answers it covered have changed.
+
+    Args:
+        question_id (int): Question id.
+        service (GeminiServices|None): Service used when regenerating; built
+                                       for the current app when omitted.
+        force (bool): Regenerate even when the coverage is unchanged.
+
+    Returns:
+        tuple[AnswerSummary, bool]: The summary record and whether it was regenerated.
+
+    Raises:
+        ValueError: If the question has no answers.
+    """
+    from services.ai_response_cache import get_ai_cache
+    from services.gemini_services import GeminiServices
+
+    record = AnswerSummary.get_for_question(question_id)
+    coverage = answer_coverage(question_id)
+    if not coverage:
+        raise ValueError("Question has no answers to summarize")
+    if record is not None and not force and record.get_coverage() == coverage:
+        return record, False
+
+    service = service or GeminiServices.for_app()
+    cache = get_ai_cache()
+    chunk_chars = int(current_app.config.get('GEMINI_SUMMARY_CHUNK_CHARS', SUMMARY_CHUNK_CHARS))
+
+    def summarize(chunk):
+        summary, is_truncated, _ = cache.summarize_answers(service, chunk)
+        return summary, is_truncated
+
+    summary, is_truncated = service.summarize_hierarchical(
+        _summary_answers(question_id), chunk_chars=chunk_chars, summarize=summarize
+    )
+
+    if record is None:
+        record = AnswerSummary(question_id=question_id)
+        db.session.add(record)
+    record.summary = summary
+    record.is_truncated = is_truncated
+    record.set_coverage(coverage)
+    db.session.commit()
+    return record, True
+
+
+def refresh_question_summary(payload):
+    """
+    Job handler: bring an existing summary up to date with its answers.
+    Questions nobody has asked to summarize are skipped.
+
+    Args:
+        payload (dict): {'question_id': int}
+    """
+    question_id = payload['question_id']
+    if AnswerSummary.get_for_question(question_id) is None:
+        return
+    try:
+        get_question_summary(question_id)
+    except ValueError:
+        # Every answer was removed; the old summary no longer applies
+        AnswerSummary.query.filter_by(question_id=question_id).delete()
+        db.session.commit()
+
+
+def enqueue_summary_refresh(question_id, commit=True):
+    """
+    Queue a refresh of a question's summary after its answers changed. Does
+    nothing when the question has no stored summary. Errors are logged, not
+    raised, so they never fail the answer write that triggered them.
+
+    Args:
+        question_id (int): Question whose answers changed.
+        commit (bool): Commit now; False adds the job to the caller's
+                       transaction (in a savepoint, so a failure here
+                       leaves the rest of it intact).
+    """
+    from services.job_queue import get_job_queue
+    try:
+        queue = get_job_queue()
+        if queue is None:
+            return
+        with (nullcontext() if commit else db.session.begin_nested()):
+            if AnswerSummary.get_for_question(question_id) is None:
+                return
+            queue.enqueue(
+                ANSWER_SUMMARY_JOB,
+                {'question_id': question_id},
+                dedupe_key=f'{ANSWER_SUMMARY_JOB}:{question_id}',
+                commit=commit
+            )
+    except Exception as e:
+        if commit:
+            db.session.rollback()
+        logging.error(f"Failed to queue summary refresh for question {question_id}: {str(e)}")
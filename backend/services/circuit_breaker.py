@@ -0,0 +1,145 @@
+"""
+Description: Circuit breaker for calls to an unreliable external service.
+After a run of consecutive failures the circuit opens and calls fail fast
+instead of waiting on a service that is down. Once the reset timeout has
+passed, a limited number of trial calls are let through (half-open); a
+success closes the circuit again and a failure re-opens it.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with closed/open/half-open states and counters.
+"""
+import threading
+import time
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT_SECONDS = 30.0
+DEFAULT_HALF_OPEN_CALLS = 1
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker.
+
+    Callers ask allow() before a call and report the outcome with
+    record_success(), record_failure() or release() (no verdict, e.g. the
+    caller abandoned the call).
+
+    Attributes:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before trial calls.
+        half_open_calls (int): Trial calls allowed at once while half-open.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT_SECONDS,
+                 half_open_calls=DEFAULT_HALF_OPEN_CALLS, clock=time.monotonic):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = max(1, half_open_calls)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trials = 0
+        self._stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def _refresh(self):
+        """Move an open circuit to half-open once the reset timeout has passed (lock held)"""
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trials = 0
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._trials = 0
+        self._stats['opened'] += 1
+
+    @property
+    def state(self):
+        """Current state: 'closed', 'open' or 'half_open'"""
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def retry_after(self):
+        """
+        Seconds until trial calls are allowed again.
+
+        Returns:
+            float: 0 unless the circuit is open.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def allow(self):
+        """
+        Ask to make a call.
+
+        Returns:
+            bool: True if the call may go ahead; False if it should fail fast.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            self._stats['rejected'] += 1
+            return False
+
+    def record_success(self):
+        """Report a successful call; closes a half-open circuit"""
+        with self._lock:
+            self._stats['successes'] += 1
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._trials = 0
+
+    def record_failure(self):
+        """Report a failed call; may open the circuit"""
+        with self._lock:
+            self._stats['failures'] += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._open()
+
+    def release(self):
+        """Report a call that ended without a verdict, freeing its trial slot"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    def stats(self):
+        """
+        Get the state and counters.
+
+        Returns:
+            dict: state, consecutive_failures, retry_after, successes, failures,
+                  rejected and opened (times the circuit has opened).
+        """
+        with self._lock:
+            self._refresh()
+            retry_after = 0.0
+            if self._state == OPEN:
+                retry_after = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+            return dict(
+                self._stats,
+                state=self._state,
+                consecutive_failures=self._failures,
+                retry_after=round(retry_after, 1)
+            )
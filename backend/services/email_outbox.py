@@ -0,0 +1,509 @@
+"""
+Description: Email outbox and the background sender that drains it.
+Requests only insert a rendered email into the email_outbox table; sender
+threads claim due emails in batches, send them over one reused SMTP
+connection and retry failures with exponential backoff.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with the outbox, batching sender and pooled
+                 SMTP connection.
+    2026-10-19 - Sender refuses to start without SMTP credentials.
+"""
+import logging
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from database import db
+from models.email_outbox import EmailOutbox
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_WORKERS = 1
+DEFAULT_POLL_SECONDS = 2.0
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_SECONDS = 10
+DEFAULT_BACKOFF_MAX_SECONDS = 900
+DEFAULT_SMTP_TIMEOUT_SECONDS = 20
+DEFAULT_SMTP_IDLE_SECONDS = 60
+
+EXTENSION_KEY = 'email_outbox'
+
+# SMTP errors that will not go away on retry
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SMTPConnection:
+    """
+    One SMTP connection, opened and logged into on first use and then reused
+    for every message until it idles out or the server drops it.
+
+    Attributes:
+        host (str): SMTP server.
+        port (int): SMTP port.
+        username (str|None): Login, or None to send without AUTH.
+        password (str|None): Password.
+        use_ssl (bool): Connect over implicit TLS (port 465).
+        starttls (bool): Upgrade a plain connection with STARTTLS.
+        timeout (float): Socket timeout in seconds.
+        idle_seconds (float): Idle time after which the connection is checked
+                              with NOOP before use.
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_ssl=True, starttls=False,
+                 timeout=DEFAULT_SMTP_TIMEOUT_SECONDS, idle_seconds=DEFAULT_SMTP_IDLE_SECONDS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.connects = 0
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+        if self.username:
+            smtp.login(self.username, self.password or '')
+        self.connects += 1
+        return smtp
+
+    def _ensure(self):
+        """Connected SMTP client, reconnecting if an idle connection went stale"""
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self.close()
+            except smtplib.SMTPException:
+                self.close()
+            except OSError:
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def send(self, message):
+        """
+        Send one message, reconnecting once if the server dropped the connection.
+
+        Args:
+            message (EmailMessage|MIMEBase): Message with From and To set.
+        """
+        try:
+            self._ensure().send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            self._ensure().send_message(message)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        """Quit and forget the connection"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+class EmailOutboxSender:
+    """
+    Queue of EmailOutbox rows and the sender threads that deliver them.
+
+    Attributes:
+        sender (str): From address.
+        batch_size (int): Emails claimed and sent per batch.
+        poll_interval (float): Seconds an idle sender waits before polling again.
+        lease (timedelta): How long a claimed batch may take before its
+                           unsent emails may be claimed again.
+        max_attempts (int): Default attempts per email.
+        backoff_base (float): Delay in seconds before the first retry; doubles
+                              with each further attempt.
+        backoff_max (float): Longest retry delay in seconds.
+    """
+
+    def __init__(self, connection_factory, sender, batch_size=DEFAULT_BATCH_SIZE,
+                 poll_interval=DEFAULT_POLL_SECONDS, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, backoff_base=DEFAULT_BACKOFF_SECONDS,
+                 backoff_max=DEFAULT_BACKOFF_MAX_SECONDS):
+        self.connection_factory = connection_factory
+        self.sender = sender
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._local = threading.local()
+        self._connections = []
+        self._threads = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a sender from SMTP_* and EMAIL_* app configuration.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            EmailOutboxSender: The new sender.
+        """
+        def connection():
+            return SMTPConnection(
+                host=config.get('SMTP_HOST', 'smtp.gmail.com'),
+                port=int(config.get('SMTP_PORT', 465)),
+                username=config.get('SMTP_USERNAME') or None,
+                password=config.get('SMTP_PASSWORD') or None,
+                use_ssl=bool(config.get('SMTP_USE_SSL', True)),
+                starttls=bool(config.get('SMTP_STARTTLS', False)),
+                timeout=float(config.get('SMTP_TIMEOUT_SECONDS', DEFAULT_SMTP_TIMEOUT_SECONDS)),
+                idle_seconds=float(config.get('SMTP_IDLE_SECONDS', DEFAULT_SMTP_IDLE_SECONDS))
+            )
+
+        return cls(
+            connection,
+            sender=config.get('MAIL_SENDER') or config.get('SMTP_USERNAME') or 'daloverflow@gmail.com',
+            batch_size=int(config.get('EMAIL_BATCH_SIZE', DEFAULT_BATCH_SIZE)),
+            poll_interval=float(config.get('EMAIL_POLL_SECONDS', DEFAULT_POLL_SECONDS)),
+            max_attempts=int(config.get('EMAIL_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)),
+            backoff_base=float(config.get('EMAIL_BACKOFF_SECONDS', DEFAULT_BACKOFF_SECONDS))
+        )
+
+    def enqueue(self, template, recipient, ttl_seconds=None, max_attempts=None, **values):
+        """
+        Render an email and add it to the outbox. This is all a request does.
+
+        Args:
+            template (EmailTemplate): Pre-rendered template.
+            recipient (str): Destination address.
+            ttl_seconds (float|None): Drop the email if not sent within this time.
+            max_attempts (int|None): Attempts allowed; defaults to the sender's.
+            **values: Template placeholder values.
+
+        Returns:
+            EmailOutbox: The queued email (committed).
+        """
+        now = _utcnow()
+        email = EmailOutbox(
+            kind=template.kind,
+            recipient=recipient,
+            subject=template.subject,
+            html_body=template.render(**values),
+            status=EmailOutbox.PENDING,
+            attempts=0,
+            max_attempts=max_attempts or self.max_attempts,
+            send_after=now,
+            send_before=now + timedelta(seconds=ttl_seconds) if ttl_seconds else None
+        )
+        db.session.add(email)
+        db.session.commit()
+        self._wake.set()
+        return email
+
+    def _claimable(self, now):
+        """Emails that are due, or claimed by a batch that outlived its lease"""
+        return or_(
+            and_(EmailOutbox.status == EmailOutbox.PENDING, EmailOutbox.send_after <= now),
+            and_(EmailOutbox.status == EmailOutbox.SENDING, EmailOutbox.locked_at < now - self.lease)
+        )
+
+    def _expire(self, now):
+        """Fail emails whose send_before has passed without sending them"""
+        EmailOutbox.query \
+            .filter(EmailOutbox.status.in_([EmailOutbox.PENDING, EmailOutbox.SENDING]),
+                    EmailOutbox.send_before.isnot(None), EmailOutbox.send_before < now) \
+            .update({
+                EmailOutbox.status: EmailOutbox.FAILED,
+                EmailOutbox.last_error: 'Expired before it could be sent',
+                EmailOutbox.claim_token: None
+            }, synchronize_session=False)
+
+    def claim_batch(self):
+        """
+        Claim up to batch_size due emails.
+
+        The claim is one conditional UPDATE tagging the rows with a fresh
+        token, so concurrent senders never claim the same email.
+
+        Returns:
+            list: Claimed EmailOutbox rows, now 'sending'.
+        """
+        now = _utcnow()
+        self._expire(now)
+        candidates = db.session.query(EmailOutbox.id) \
+            .filter(self._claimable(now)) \
+            .order_by(EmailOutbox.send_after.asc(), EmailOutbox.id.asc()) \
+            .limit(self.batch_size) \
+            .all()
+        if not candidates:
+            db.session.commit()
+            return []
+
+        token = uuid.uuid4().hex
+        EmailOutbox.query \
+            .filter(EmailOutbox.id.in_([email_id for (email_id,) in candidates]), self._claimable(now)) \
+            .update({
+                EmailOutbox.status: EmailOutbox.SENDING,
+                EmailOutbox.claim_token: token,
+                EmailOutbox.locked_at: now,
+                EmailOutbox.attempts: EmailOutbox.attempts + 1
+            }, synchronize_session=False)
+        db.session.commit()
+        return EmailOutbox.query.filter_by(claim_token=token).order_by(EmailOutbox.id.asc()).all()
+
+    def backoff(self, attempts):
+        """
+        Delay before retrying an email that has failed `attempts` times.
+
+        Args:
+            attempts (int): Attempts made so far.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        return min(self.backoff_max, self.backoff_base * (2 ** max(attempts - 1, 0)))
+
+    def _connection(self):
+        """This thread's SMTP connection"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self.connection_factory()
+            self._local.connection = connection
+            self._connections.append(connection)
+        return connection
+
+    def _message(self, email):
+        msg = MIMEMultipart("alternative")
+        msg["From"] = self.sender
+        msg["To"] = email.recipient
+        msg["Subject"] = email.subject
+        msg.attach(MIMEText(email.html_body, "html"))
+        return msg
+
+    def send_batch(self, emails):
+        """
+        Send claimed emails over this thread's connection and record the
+        outcomes in one commit.
+
+        Args:
+            emails (list): Rows returned by claim_batch.
+
+        Returns:
+            int: Emails sent.
+        """
+        connection = self._connection()
+        now = _utcnow()
+        outcomes = []
+        sent = 0
+        for email in emails:
+            try:
+                connection.send(self._message(email))
+            except Exception as e:
+                permanent = isinstance(e, PERMANENT_ERRORS) or email.attempts >= email.max_attempts
+                outcome = {'id': email.id, 'claim_token': None, 'locked_at': None, 'last_error': str(e)[:2000]}
+                if permanent:
+                    outcome['status'] = EmailOutbox.FAILED
+                    logging.error(f"Email {email.id} ({email.kind}) to {email.recipient} failed permanently: {str(e)}")
+                else:
+                    outcome['status'] = EmailOutbox.PENDING
+                    outcome['send_after'] = now + timedelta(seconds=self.backoff(email.attempts))
+                    logging.warning(f"Email {email.id} ({email.kind}) attempt {email.attempts} failed, retrying: {str(e)}")
+                    if not isinstance(e, smtplib.SMTPResponseException):
+                        # Connection-level trouble: start the next email on a fresh one
+                        connection.close()
+                outcomes.append(outcome)
+                continue
+            sent += 1
+            outcomes.append({'id': email.id, 'status': EmailOutbox.SENT, 'claim_token': None,
+                             'locked_at': None, 'sent_at': now, 'last_error': None})
+
+        # Group rows by the keys they set; each group is one executemany UPDATE
+        groups = {}
+        for outcome in outcomes:
+            groups.setdefault(tuple(sorted(outcome)), []).append(outcome)
+        for rows in groups.values():
+            db.session.execute(update(EmailOutbox), rows)
+        db.session.commit()
+        return sent
+
+    def run_pending(self, limit=None):
+        """
+        Send due emails in the calling thread until none are left.
+
+        Args:
+            limit (int|None): Most batches to send.
+
+        Returns:
+            int: Emails sent.
+        """
+        sent = 0
+        batches = 0
+        while limit is None or batches < limit:
+            emails = self.claim_batch()
+            if not emails:
+                break
+            sent += self.send_batch(emails)
+            batches += 1
+        return sent
+
+    def stats(self):
+        """
+        Count outbox emails by status.
+
+        Returns:
+            dict: status -> number of emails, the live sender threads and
+                  SMTP connections opened.
+        """
+        rows = db.session.query(EmailOutbox.status, db.func.count(EmailOutbox.id)) \
+            .group_by(EmailOutbox.status) \
+            .all()
+        counts = {status: 0 for status in (EmailOutbox.PENDING, EmailOutbox.SENDING,
+                                           EmailOutbox.SENT, EmailOutbox.FAILED)}
+        counts.update(dict(rows))
+        counts['workers'] = sum(1 for thread in self._threads if thread.is_alive())
+        counts['smtp_connects'] = sum(connection.connects for connection in self._connections)
+        return counts
+
+    def _work(self, app):
+        while not self._stop.is_set():
+            sent = 0
+            with app.app_context():
+                try:
+                    sent = self.run_pending(limit=1)
+                except Exception as e:
+                    logging.error(f"Email sender error: {str(e)}")
+                finally:
+                    db.session.remove()
+            if not sent:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+
+    def start(self, app, workers=DEFAULT_WORKERS):
+        """
+        Start sender threads for an app.
+
+        Args:
+            app (Flask): Application whose context the senders run in.
+            workers (int): Number of threads (each keeps one SMTP connection).
+        """
+        self._stop.clear()
+        for index in range(workers):
+            thread = threading.Thread(target=self._work, args=(app,), name=f'email-sender-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        """
+        Stop the sender threads, letting the current batch finish.
+
+        Args:
+            timeout (float): Seconds to wait for each thread.
+        """
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def close(self):
+        """Close this thread's SMTP connection, e.g. after run_pending in a script or test"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+
+
+def init_email_outbox(app):
+    """
+    Create the app's email outbox sender. Sender threads are started
+    separately with start_email_sender, so tests and scripts run none.
+
+    Args:
+        app (Flask): The application.
+
+    Returns:
+        EmailOutboxSender: The sender.
+    """
+    outbox = EmailOutboxSender.from_config(app.config)
+    app.extensions[EXTENSION_KEY] = outbox
+    return outbox
+
+
+def get_email_outbox(app=None):
+    """
+    Get the app's email outbox sender.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        EmailOutboxSender|None: The sender, or None if the app has none.
+    """
+    app = app or current_app._get_current_object()
+    return app.extensions.get(EXTENSION_KEY)
+
+
+def enqueue_email(template, recipient, ttl_seconds=None, **values):
+    """
+    Queue an email on the current app's outbox.
+
+    Args:
+        template (EmailTemplate): Pre-rendered template.
+        recipient (str): Destination address.
+        ttl_seconds (float|None): Drop the email if not sent within this time.
+        **values: Template placeholder values.
+
+    Returns:
+        EmailOutbox: The queued email.
+    """
+    return get_email_outbox().enqueue(template, recipient, ttl_seconds=ttl_seconds, **values)
+
+
+def start_email_sender(app):
+    """
+    Start EMAIL_WORKERS sender threads (default 1) for the app's outbox.
+    Nothing starts when SMTP_USERNAME is set without SMTP_PASSWORD; emails
+    then stay queued until the sender is started with credentials.
+
+    Args:
+        app (Flask): The application.
+
+    Returns:
+        bool: True if sender threads were started.
+    """
+    if app.config.get('SMTP_USERNAME') and not app.config.get('SMTP_PASSWORD'):
+        logging.error("Email sender not started: SMTP_USERNAME is set but SMTP_PASSWORD is not. "
+                      "Set SMTP_PASSWORD, or for local development run services.local_smtp "
+                      "with SMTP_USERNAME empty.")
+        return False
+    workers = int(app.config.get('EMAIL_WORKERS', DEFAULT_WORKERS))
+    if workers <= 0:
+        return False
+    get_email_outbox(app).start(app, workers)
+    return True
@@ -0,0 +1,143 @@
+"""
+Description: Email templates, pre-rendered once at import.
+Each template's static HTML is split around its placeholders when the module
+loads, so rendering an email is a join of constant strings and escaped values.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with the verification and password reset emails
+                 moved out of UserRegistrationService.
+"""
+import html
+import re
+
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+class EmailTemplate:
+    """
+    Subject line and HTML body with {name} placeholders.
+
+    Attributes:
+        kind (str): Template name, stored with each queued email.
+        subject (str): Subject line.
+        fields (tuple): Placeholder names, in order of appearance.
+    """
+
+    def __init__(self, kind, subject, html_body):
+        self.kind = kind
+        self.subject = subject
+        parts = _PLACEHOLDER.split(html_body)
+        # Even indexes are static HTML, odd ones placeholder names
+        self._static = parts[0::2]
+        self.fields = tuple(parts[1::2])
+
+    def render(self, **values):
+        """
+        Render the HTML body.
+
+        Args:
+            **values: Value for every placeholder; HTML-escaped.
+
+        Returns:
+            str: The HTML body.
+
+        Raises:
+            KeyError: If a placeholder has no value.
+        """
+        rendered = [self._static[0]]
+        for field, static in zip(self.fields, self._static[1:]):
+            rendered.append(html.escape(str(values[field])))
+            rendered.append(static)
+        return ''.join(rendered)
+
+
+VERIFY_EMAIL = EmailTemplate('verify_email', "Email verification for DalOverflow Registration", """
+<html>
+    <body style="font-family: Arial, sans-serif; background-color: #f5f5f5; padding: 20px;">
+        <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 10px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
+            <!-- Header -->
+            <div style="background: linear-gradient(135deg, #fffacd 0%, #ffd700 100%); padding: 30px 20px; text-align: center;">
+                <h1 style="color: #333; margin: 0; font-size: 28px;">DalOverflow</h1>
+                <p style="color: #666; margin: 5px 0 0 0; font-size: 14px;">Welcome to our community!</p>
+            </div>
+            
+            <!-- Content -->
+            <div style="padding: 40px 30px;">
+                <h2 style="color: #333; margin: 0 0 20px 0; font-size: 20px;">Verify Your Email</h2>
+                <p style="color: #666; margin: 0 0 20px 0; font-size: 15px; line-height: 1.6;">
+                    Thank you for registering with DalOverflow! To complete your account setup, please use the verification code below:
+                </p>
+                
+                <!-- OTP Box -->
+                <div style="background-color: #f9f9f9; border: 2px solid #ffd700; border-radius: 8px; padding: 25px; text-align: center; margin: 30px 0;">
+                    <p style="color: #999; margin: 0 0 10px 0; font-size: 12px; text-transform: uppercase; letter-spacing: 2px;">Your Verification Code</p>
+                    <p style="color: #ffd700; margin: 0; font-size: 36px; font-weight: bold; letter-spacing: 3px; font-family: 'Courier New', monospace;">{code}</p>
+                </div>
+                
+                <p style="color: #666; margin: 20px 0; font-size: 14px;">
+                    This code will expire in 10 minutes. If you didn't request this verification, please ignore this email.
+                </p>
+                
+                <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
+                
+                <p style="color: #999; margin: 0; font-size: 12px;">
+                    If you have any questions, please contact our support team.
+                </p>
+            </div>
+            
+            <!-- Footer -->
+            <div style="background-color: #f9f9f9; padding: 20px 30px; text-align: center; border-top: 1px solid #eee;">
+                <p style="color: #999; margin: 0; font-size: 12px;">
+                    &copy; 2024 DalOverflow. All rights reserved.
+                </p>
+            </div>
+        </div>
+    </body>
+</html>
+""")
+
+PASSWORD_RESET = EmailTemplate('password_reset', "Password Reset - DalOverflow", """
+<html>
+    <body style="font-family: Arial, sans-serif; background-color: #f5f5f5; padding: 20px;">
+        <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 10px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
+            <!-- Header -->
+            <div style="background: linear-gradient(135deg, #fffacd 0%, #ffd700 100%); padding: 30px 20px; text-align: center;">
+                <h1 style="color: #333; margin: 0; font-size: 28px;">DalOverflow</h1>
+                <p style="color: #666; margin: 5px 0 0 0; font-size: 14px;">Password Reset Request</p>
+            </div>
+            
+            <!-- Content -->
+            <div style="padding: 40px 30px;">
+                <h2 style="color: #333; margin: 0 0 20px 0; font-size: 20px;">Reset Your Password</h2>
+                <p style="color: #666; margin: 0 0 20px 0; font-size: 15px; line-height: 1.6;">
+                    We received a request to reset your password. Use the code below to proceed:
+                </p>
+                
+                <!-- OTP Box -->
+                <div style="background-color: #f9f9f9; border: 2px solid #ffd700; border-radius: 8px; padding: 25px; text-align: center; margin: 30px 0;">
+                    <p style="color: #999; margin: 0 0 10px 0; font-size: 12px; text-transform: uppercase; letter-spacing: 2px;">Your Reset Code</p>
+                    <p style="color: #ffd700; margin: 0; font-size: 36px; font-weight: bold; letter-spacing: 3px; font-family: 'Courier New', monospace;">{code}</p>
+                </div>
+                
+                <p style="color: #666; margin: 20px 0; font-size: 14px;">
+                    This code will expire in 10 minutes. If you didn't request a password reset, please ignore this email and your account will remain secure.
+                </p>
+                
+                <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
+                
+                <p style="color: #999; margin: 0; font-size: 12px;">
+                    For security reasons, never share this code with anyone.
+                </p>
+            </div>
+            
+            <!-- Footer -->
+            <div style="background-color: #f9f9f9; padding: 20px 30px; text-align: center; border-top: 1px solid #eee;">
+                <p style="color: #999; margin: 0; font-size: 12px;">
+                    &copy; 2024 DalOverflow. All rights reserved.
+                </p>
+            </div>
+        </div>
+    </body>
+</html>
+""")
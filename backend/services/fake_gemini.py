@@ -0,0 +1,142 @@
+"""
+Description: In-process stand-in for the Gemini API client.
+Mirrors the parts of genai.Client used by GeminiServices so the AI
+endpoints can be exercised and load-tested without network access.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with canned responses and simulated latency.
+    2026-10-19 - Added generate_content_stream.
+    2026-10-19 - Responses report simulated usage_metadata token counts.
+    2026-10-19 - Injected errors: fail_next() and a random error_rate.
+"""
+import random
+import threading
+import time
+from types import SimpleNamespace
+from google.genai.types import FinishReason
+
+DEFAULT_FAKE_TEXT = "<p>This is a generated answer from the offline Gemini transport.</p>"
+
+
+class FakeGeminiError(Exception):
+    """Default error raised by injected failures"""
+
+
+class FakeCandidate:
+    """Candidate with the finish_reason GeminiServices inspects"""
+
+    def __init__(self, finish_reason):
+        self.finish_reason = finish_reason
+
+
+class FakeResponse:
+    """Minimal GenerateContentResponse: text, candidates and usage_metadata"""
+
+    def __init__(self, text, finish_reason=FinishReason.STOP, prompt_tokens=0):
+        self.text = text
+        self.candidates = [FakeCandidate(finish_reason)]
+        # Simulated counts at roughly four characters per token
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=len(text or '') // 4
+        )
+
+
+class _FakeModels:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content(self, model, contents, config=None):
+        return self._client._respond(model, contents, config)
+
+    def generate_content_stream(self, model, contents, config=None):
+        response = self._client._respond(model, contents, config)
+        return _stream_chunks(response, self._client.stream_chunk_size)
+
+
+class FakeGeminiClient:
+    """
+    Offline Gemini client returning canned responses.
+
+    Attributes:
+        latency (float): Seconds each call sleeps, to simulate the API.
+        responder (callable|None): Optional function (model, contents, config)
+                                   returning a str or a (str, FinishReason) pair.
+        stream_chunk_size (int): Characters per chunk from generate_content_stream.
+        error_rate (float): Probability (0-1) that a call raises FakeGeminiError.
+        calls (int): Number of generate_content calls served.
+    """
+
+    def __init__(self, latency=0.0, text=DEFAULT_FAKE_TEXT, responder=None, stream_chunk_size=16,
+                 error_rate=0.0, seed=None):
+        self.latency = latency
+        self.text = text
+        self.responder = responder
+        self.stream_chunk_size = stream_chunk_size
+        self.error_rate = error_rate
+        self.calls = 0
+        self.models = _FakeModels(self)
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._failures = []
+
+    def fail_next(self, times=1, error=None):
+        """
+        Make the next calls raise an error.
+
+        Args:
+            times (int): Number of calls to fail.
+            error (Exception|None): Error to raise; a FakeGeminiError by default.
+        """
+        with self._lock:
+            self._failures.extend([error or FakeGeminiError("Injected Gemini failure")] * times)
+
+    def _respond(self, model, contents, config):
+        with self._lock:
+            self.calls += 1
+            error = self._failures.pop(0) if self._failures else None
+            if error is None and self.error_rate and self._random.random() < self.error_rate:
+                error = FakeGeminiError("Injected Gemini failure")
+
+        if self.latency:
+            timeout = _timeout_seconds(config)
+            if timeout is not None and self.latency > timeout:
+                time.sleep(timeout)
+                raise TimeoutError("Fake Gemini call timed out")
+            time.sleep(self.latency)
+
+        if error is not None:
+            raise error
+
+        prompt_tokens = len(str(contents)) // 4
+        if self.responder is None:
+            return FakeResponse(self.text, prompt_tokens=prompt_tokens)
+        result = self.responder(model, contents, config)
+        if isinstance(result, tuple):
+            return FakeResponse(*result, prompt_tokens=prompt_tokens)
+        return FakeResponse(result, prompt_tokens=prompt_tokens)
+
+    def close(self):
+        """Nothing to release; present for parity with genai.Client"""
+
+
+def _stream_chunks(response, chunk_size):
+    """Split a response into chunks; only the last carries the finish reason and usage"""
+    text = response.text or ''
+    pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or ['']
+    finish_reason = response.candidates[0].finish_reason
+    for index, piece in enumerate(pieces):
+        last = index == len(pieces) - 1
+        chunk = FakeResponse(piece, finish_reason if last else None)
+        # Like the API, only the final chunk reports usage for the whole response
+        chunk.usage_metadata = response.usage_metadata if last else None
+        yield chunk
+
+
+def _timeout_seconds(config):
+    """Read the per-call timeout (ms) from a generate_content config dict"""
+    if not isinstance(config, dict):
+        return None
+    timeout_ms = (config.get('http_options') or {}).get('timeout')
+    return timeout_ms / 1000 if timeout_ms else None
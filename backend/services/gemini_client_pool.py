@@ -0,0 +1,325 @@
+"""
+Description: Process-wide Gemini client shared by all requests.
+One client (and its keep-alive HTTP connection pool) is built per app and
+reused; a bounded semaphore caps concurrent calls, every call carries a
+timeout and a circuit breaker fails calls fast while the API is unhealthy.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with shared client, concurrency limit and
+                 per-call timeouts.
+    2026-10-19 - Added generate_content_stream, holding a slot while streaming.
+    2026-10-19 - Added the circuit breaker and GeminiUnavailableError errors.
+"""
+import os
+import threading
+from contextlib import contextmanager
+import httpx
+from flask import current_app
+from google import genai
+from google.genai import errors, types
+from services.circuit_breaker import (
+    CircuitBreaker, DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT_SECONDS
+)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_CALL_TIMEOUT_SECONDS = 60.0
+DEFAULT_ACQUIRE_TIMEOUT_SECONDS = 10.0
+DEFAULT_KEEPALIVE_SECONDS = 30.0
+
+EXTENSION_KEY = 'gemini_pool'
+
+
+# Client errors that mean the API is overloaded rather than the request being bad
+RETRYABLE_CLIENT_CODES = (408, 429)
+
+
+class GeminiUnavailableError(Exception):
+    """
+    Raised when a Gemini call is refused or abandoned because the API is
+    busy, failing or too slow. Routes answer these with 503.
+
+    Attributes:
+        retry_after (float): Suggested seconds before trying again.
+    """
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class GeminiBusyError(GeminiUnavailableError):
+    """Raised when no Gemini call slot frees up within the acquire timeout"""
+
+
+class GeminiCircuitOpenError(GeminiUnavailableError):
+    """Raised without calling the API while the circuit breaker is open"""
+
+
+class GeminiDeadlineError(GeminiUnavailableError, TimeoutError):
+    """Raised when an answer or summary runs past its deadline"""
+
+
+def is_api_failure(error):
+    """
+    Whether an exception from a Gemini call says the API is unhealthy (and
+    should count against the circuit breaker), as opposed to a bad request.
+
+    Args:
+        error (Exception): Exception raised by the call.
+
+    Returns:
+        bool: True for timeouts, transport errors, 5xx, 408 and 429.
+    """
+    if isinstance(error, errors.ClientError):
+        return error.code in RETRYABLE_CLIENT_CODES
+    return not isinstance(error, (ValueError, TypeError))
+
+
+class _PooledModels:
+    """Stands in for client.models, routing calls through the pool's limits"""
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def generate_content(self, model, contents, config=None):
+        with self._pool.slot():
+            return self._pool.client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=self._pool.with_timeout(config)
+            )
+
+    def generate_content_stream(self, model, contents, config=None):
+        """Stream response chunks; the call slot is held until the stream ends or is closed"""
+        with self._pool.slot():
+            yield from self._pool.client.models.generate_content_stream(
+                model=model,
+                contents=contents,
+                config=self._pool.with_timeout(config)
+            )
+
+
+class GeminiClientPool:
+    """
+    Shared Gemini client with bounded concurrency.
+
+    Exposes the same `models.generate_content` call as genai.Client, so it
+    can be handed to GeminiServices in place of a per-request client.
+
+    Attributes:
+        client: The underlying genai.Client (or FakeGeminiClient).
+        api_key (str|None): Key the client was built with.
+        max_concurrency (int): Calls allowed in flight at once.
+        call_timeout (float): Seconds before a single API call is abandoned.
+        acquire_timeout (float): Seconds to wait for a free call slot.
+        breaker (CircuitBreaker): Tracks API failures across all calls.
+    """
+
+    def __init__(self, client, api_key=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 call_timeout=DEFAULT_CALL_TIMEOUT_SECONDS,
+                 acquire_timeout=DEFAULT_ACQUIRE_TIMEOUT_SECONDS, breaker=None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.client = client
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.call_timeout = call_timeout
+        self.acquire_timeout = acquire_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.models = _PooledModels(self)
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'in_flight': 0, 'peak_in_flight': 0, 'rejected': 0, 'failures': 0}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a pool from app configuration.
+
+        Config keys (all optional):
+            GEMINI_TRANSPORT: 'genai' (default) or 'fake' for the offline client.
+            GEMINI_MAX_CONCURRENCY, GEMINI_TIMEOUT_SECONDS,
+            GEMINI_ACQUIRE_TIMEOUT_SECONDS, GEMINI_KEEPALIVE_SECONDS,
+            GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_RESET_SECONDS,
+            GEMINI_FAKE_LATENCY_MS, GEMINI_FAKE_ERROR_RATE.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            GeminiClientPool: The new pool.
+
+        Raises:
+            ValueError: If the real transport is selected and GEMINI_API_KEY is unset.
+        """
+        max_concurrency = int(config.get('GEMINI_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+        call_timeout = float(config.get('GEMINI_TIMEOUT_SECONDS', DEFAULT_CALL_TIMEOUT_SECONDS))
+        acquire_timeout = float(config.get('GEMINI_ACQUIRE_TIMEOUT_SECONDS', DEFAULT_ACQUIRE_TIMEOUT_SECONDS))
+        breaker = CircuitBreaker(
+            failure_threshold=int(config.get('GEMINI_BREAKER_FAILURES', DEFAULT_FAILURE_THRESHOLD)),
+            reset_timeout=float(config.get('GEMINI_BREAKER_RESET_SECONDS', DEFAULT_RESET_TIMEOUT_SECONDS))
+        )
+
+        if config.get('GEMINI_TRANSPORT', 'genai') == 'fake':
+            from services.fake_gemini import FakeGeminiClient
+            latency = float(config.get('GEMINI_FAKE_LATENCY_MS', 0)) / 1000
+            error_rate = float(config.get('GEMINI_FAKE_ERROR_RATE', 0))
+            client = FakeGeminiClient(latency=latency, error_rate=error_rate)
+            return cls(client, max_concurrency=max_concurrency, call_timeout=call_timeout,
+                       acquire_timeout=acquire_timeout, breaker=breaker)
+
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY environment variable is required")
+
+        keepalive = float(config.get('GEMINI_KEEPALIVE_SECONDS', DEFAULT_KEEPALIVE_SECONDS))
+        http_options = types.HttpOptions(
+            timeout=int(call_timeout * 1000),
+            client_args={
+                'limits': httpx.Limits(
+                    max_connections=max_concurrency,
+                    max_keepalive_connections=max_concurrency,
+                    keepalive_expiry=keepalive
+                )
+            }
+        )
+        client = genai.Client(api_key=api_key, http_options=http_options)
+        return cls(client, api_key=api_key, max_concurrency=max_concurrency,
+                   call_timeout=call_timeout, acquire_timeout=acquire_timeout, breaker=breaker)
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one of the pool's call slots for the duration of the block and
+        report the block's outcome to the circuit breaker.
+
+        Raises:
+            GeminiCircuitOpenError: If the circuit breaker is open.
+            GeminiBusyError: If no slot frees up within acquire_timeout.
+        """
+        if not self.breaker.allow():
+            raise GeminiCircuitOpenError(
+                "AI service is temporarily unavailable, try again shortly",
+                retry_after=self.breaker.retry_after()
+            )
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self.breaker.release()
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise GeminiBusyError("Too many concurrent AI requests, try again shortly")
+
+        with self._lock:
+            self._stats['calls'] += 1
+            self._stats['in_flight'] += 1
+            self._stats['peak_in_flight'] = max(self._stats['peak_in_flight'], self._stats['in_flight'])
+        try:
+            yield
+        except Exception as e:
+            if is_api_failure(e):
+                self.breaker.record_failure()
+                with self._lock:
+                    self._stats['failures'] += 1
+            else:
+                self.breaker.release()
+            raise
+        except BaseException:
+            # Abandoned (e.g. a stream closed by the client): no verdict on the API
+            self.breaker.release()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            with self._lock:
+                self._stats['in_flight'] -= 1
+            self._slots.release()
+
+    def with_timeout(self, config):
+        """
+        Add the pool's per-call timeout to a generate_content config dict.
+
+        A shorter http_options timeout already in the config (e.g. the time
+        left before a deadline) is kept.
+
+        Args:
+            config (dict|None): generate_content config.
+
+        Returns:
+            dict: Config carrying http_options.timeout in milliseconds.
+        """
+        config = dict(config or {})
+        http_options = dict(config.get('http_options') or {})
+        call_timeout_ms = int(self.call_timeout * 1000)
+        http_options['timeout'] = min(http_options.get('timeout') or call_timeout_ms, call_timeout_ms)
+        config['http_options'] = http_options
+        return config
+
+    def stats(self):
+        """
+        Get call counters.
+
+        Returns:
+            dict: calls, in_flight, peak_in_flight, rejected, failures,
+                  max_concurrency and the circuit breaker's stats.
+        """
+        with self._lock:
+            stats = dict(self._stats, max_concurrency=self.max_concurrency)
+        stats['breaker'] = self.breaker.stats()
+        return stats
+
+    def close(self):
+        """Release the underlying client's connections"""
+        close = getattr(self.client, 'close', None)
+        if close:
+            close()
+
+
+def init_gemini_pool(app):
+    """
+    Register the app's Gemini pool slot. The pool itself is built on first
+    use, so apps without a GEMINI_API_KEY still start.
+
+    Args:
+        app (Flask): The application.
+    """
+    app.extensions[EXTENSION_KEY] = None
+    app.extensions[EXTENSION_KEY + '_lock'] = threading.Lock()
+
+
+def get_gemini_pool(app=None):
+    """
+    Get the app's shared Gemini pool, building it on first use.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        GeminiClientPool: The shared pool.
+
+    Raises:
+        ValueError: If the pool cannot be built (e.g. missing API key).
+    """
+    app = app or current_app._get_current_object()
+    pool = app.extensions.get(EXTENSION_KEY)
+    if pool is not None:
+        return pool
+
+    lock = app.extensions.setdefault(EXTENSION_KEY + '_lock', threading.Lock())
+    with lock:
+        pool = app.extensions.get(EXTENSION_KEY)
+        if pool is None:
+            pool = GeminiClientPool.from_config(app.config)
+            app.extensions[EXTENSION_KEY] = pool
+    return pool
+
+
+def set_gemini_pool(app, pool):
+    """
+    Install a pool on the app, e.g. one wrapping a FakeGeminiClient in tests.
+
+    Args:
+        app (Flask): The application.
+        pool (GeminiClientPool|None): Pool to use; None rebuilds from config on next use.
+    """
+    app.extensions[EXTENSION_KEY] = pool
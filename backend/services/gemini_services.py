@@ -4,22 +4,472 @@ Last Modified By: Bryan Vela
 Created: 2025-12-01
 Last Modified: 
     2025-12-01 - File created with AI response generation and summarization.
+    2026-10-19 - Accept a shared GeminiClientPool instead of building a client.
+    2026-10-19 - Model name and prompt versions exposed for the response cache.
+    2026-10-19 - Truncated output is continued and stitched instead of
+                 regenerated; per-call token and latency statistics.
+    2026-10-19 - Added hierarchical (map-reduce) summarization in bounded chunks.
+    2026-10-19 - Prompt inputs converted to compact text and kept within a token
+                 budget, ranking answers by acceptance and score.
+    2026-10-19 - Per-operation deadlines; generate_answer raises on API errors
+                 instead of returning None.
 """
 import os
+import re
+import html
+import math
 import logging
+import threading
+import time
+import bleach
 from google import genai
 # import google.generativeai as genai
 from google.genai.types  import FinishReason
+from services.gemini_client_pool import GeminiDeadlineError, GeminiUnavailableError
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Bump when a prompt template changes so cached responses are not reused
+ANSWER_PROMPT_VERSION = 2
+SUMMARY_PROMPT_VERSION = 2
+
+# Longest time one answer or summary may take, across all its rounds
+DEFAULT_DEADLINE_SECONDS = 90.0
+
+# Prompt input limits, in estimated tokens
+DEFAULT_SUMMARY_INPUT_TOKENS = 8000
+DEFAULT_QUESTION_INPUT_TOKENS = 4000
+# Rough size of a token for estimates
+CHARS_PER_TOKEN = 4
+# Smallest part of an answer worth sending when it has to be cut to fit
+MIN_ANSWER_SLICE_TOKENS = 100
+
+# Requests allowed per answer or summary: the first plus continuations
+DEFAULT_MAX_ROUNDS = 3
+# Output tokens allowed per answer or summary across all rounds
+DEFAULT_TOKEN_BUDGET = 12000
+# Output tokens requested per round
+ROUND_MAX_OUTPUT_TOKENS = 4000
+# Tail of the partial answer quoted back when asking for a continuation
+CONTINUATION_CONTEXT_CHARS = 2000
+# Longest repeated text trimmed where a continuation restates the previous tail
+MAX_STITCH_OVERLAP_CHARS = 300
+
+# Largest amount of answer text sent in one summarization request
+SUMMARY_CHUNK_CHARS = 24000
+# Map-reduce levels before the remaining partial summaries are cut to one chunk
+MAX_SUMMARY_LEVELS = 4
+
+_BLOCK_END_RE = re.compile(r'<br\s*/?>|</(?:p|div|li|pre|blockquote|h[1-6]|tr)\s*>', re.IGNORECASE)
+_TRAILING_SPACE_RE = re.compile(r'[ \t]+\n')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Aggregate statistics of every Gemini call made by this process
+_stats_lock = threading.Lock()
+_call_stats = {}
+
+
+def _token_count(usage, field):
+    """Read a token count from usage_metadata, ignoring missing or non-integer values"""
+    value = getattr(usage, field, None) if usage is not None else None
+    return value if isinstance(value, int) else None
+
+
+def _record_call(operation, stats):
+    with _stats_lock:
+        totals = _call_stats.setdefault(operation, {
+            'calls': 0, 'rounds': 0, 'truncated': 0,
+            'prompt_tokens': 0, 'output_tokens': 0, 'latency_ms': 0.0, 'max_latency_ms': 0.0
+        })
+        totals['calls'] += 1
+        totals['rounds'] += stats['rounds']
+        totals['truncated'] += 1 if stats['truncated'] else 0
+        totals['prompt_tokens'] += stats['prompt_tokens']
+        totals['output_tokens'] += stats['output_tokens']
+        totals['latency_ms'] += stats['latency_ms']
+        totals['max_latency_ms'] = max(totals['max_latency_ms'], stats['latency_ms'])
+
+
+def gemini_call_stats():
+    """
+    Get aggregate call statistics per operation ('answer', 'summary', 'stream').
+
+    Returns:
+        dict: operation -> calls, rounds, truncated, prompt/output tokens,
+              total, average and max latency in milliseconds.
+    """
+    with _stats_lock:
+        result = {}
+        for operation, totals in _call_stats.items():
+            entry = dict(totals)
+            entry['avg_latency_ms'] = round(totals['latency_ms'] / totals['calls'], 1) if totals['calls'] else 0.0
+            result[operation] = entry
+        return result
+
+
+def reset_gemini_call_stats():
+    """Clear the aggregate call statistics"""
+    with _stats_lock:
+        _call_stats.clear()
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a piece of prompt text.
+
+    Args:
+        text (str|None): Prompt text.
+
+    Returns:
+        int: Estimated tokens (about CHARS_PER_TOKEN characters each).
+    """
+    return -(-len(text or '') // CHARS_PER_TOKEN)
+
+
+def compact_text(content):
+    """
+    Convert HTML to compact plain text for a prompt.
+
+    Tags are dropped and entities decoded; block ends become line breaks and
+    blank runs are squeezed, while indentation inside code is kept.
+
+    Args:
+        content (str|None): HTML (or plain text).
+
+    Returns:
+        str: Plain text.
+    """
+    if not content:
+        return ''
+    text = _BLOCK_END_RE.sub('\n', content)
+    text = html.unescape(bleach.clean(text, tags=set(), strip=True))
+    text = _TRAILING_SPACE_RE.sub('\n', text)
+    return _BLANK_LINES_RE.sub('\n\n', text).strip()
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Cut text to about max_tokens, preferring a whitespace boundary.
+
+    Args:
+        text (str): Text to shorten.
+        max_tokens (int): Token limit.
+
+    Returns:
+        str: The text, cut if it was over the limit.
+    """
+    limit = max(max_tokens, 0) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(' ')
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip()
+
+
+def _answer_rank_key(item):
+    index, answer = item
+    if not isinstance(answer, dict):
+        return (0, 0, index)
+    accepted = answer.get('is_accepted', answer.get('isAccepted', False))
+    score = answer.get('score', answer.get('votes', 0))
+    return (0 if accepted else 1, -(score if isinstance(score, (int, float)) else 0), index)
+
+
+def budget_answers(answers, max_tokens):
+    """
+    Keep the most valuable answers within a prompt token budget.
+
+    Answers are ranked accepted first, then by score, then by their original
+    order, and converted to compact text. They are taken in rank order while
+    they fit; an answer that does not fit is cut to the remaining budget when
+    at least MIN_ANSWER_SLICE_TOKENS remain, otherwise dropped.
+
+    Args:
+        answers (list): Answer dicts with a 'body' and optionally 'id',
+                        'is_accepted'/'isAccepted' and 'score'.
+        max_tokens (int): Token budget for all answer bodies together.
+
+    Returns:
+        tuple[list[dict], dict]: Kept answers as {'body': text} in rank order,
+        and a report: budget_tokens, estimated_tokens, kept (original indexes),
+        dropped and truncated (each a list of {'index', 'id', 'tokens'}).
+    """
+    kept = []
+    report = {'budget_tokens': max_tokens, 'estimated_tokens': 0, 'kept': [], 'dropped': [], 'truncated': []}
+    remaining = max_tokens
+
+    for index, answer in sorted(enumerate(answers), key=_answer_rank_key):
+        body = answer.get('body', '') if isinstance(answer, dict) else str(answer)
+        text = compact_text(body)
+        tokens = estimate_tokens(text)
+        answer_id = answer.get('id') if isinstance(answer, dict) else None
+
+        if tokens > remaining:
+            if remaining < MIN_ANSWER_SLICE_TOKENS:
+                report['dropped'].append({'index': index, 'id': answer_id, 'tokens': tokens})
+                continue
+            text = truncate_to_tokens(text, remaining)
+            report['truncated'].append({'index': index, 'id': answer_id, 'tokens': tokens})
+            tokens = estimate_tokens(text)
+
+        kept.append({'body': text})
+        report['kept'].append(index)
+        remaining -= tokens
+
+    report['estimated_tokens'] = max_tokens - remaining
+    if report['dropped'] or report['truncated']:
+        logging.info(
+            f"Summary input over budget: dropped {len(report['dropped'])}, "
+            f"cut {len(report['truncated'])} of {len(answers)} answers."
+        )
+    return kept, report
+
+
+def chunk_answers(answers, chunk_chars):
+    """
+    Pack answers, in order, into chunks whose bodies total at most chunk_chars.
+
+    A single body longer than chunk_chars is cut to fit.
+
+    Args:
+        answers (list[dict]): Answer dicts with a 'body'.
+        chunk_chars (int): Largest total body length per chunk.
+
+    Returns:
+        list[list[dict]]: The chunks (at least one).
+    """
+    chunks = [[]]
+    size = 0
+    for answer in answers:
+        body = answer.get('body', '') if isinstance(answer, dict) else str(answer)
+        if len(body) > chunk_chars:
+            logging.warning(f"Answer body of {len(body)} characters cut to {chunk_chars} for summarization.")
+            body = body[:chunk_chars]
+        if chunks[-1] and size + len(body) > chunk_chars:
+            chunks.append([])
+            size = 0
+        # Keep acceptance and score so each chunk can still be ranked
+        chunks[-1].append(dict(answer, body=body) if isinstance(answer, dict) else {'body': body})
+        size += len(body)
+    return chunks
+
+
+def stitch_segments(existing, segment):
+    """
+    Append a continuation to partial text, dropping any restated overlap.
+
+    Args:
+        existing (str): Text generated so far.
+        segment (str): Continuation text.
+
+    Returns:
+        str: The combined text.
+    """
+    if not existing or not segment:
+        return (existing or '') + (segment or '')
+    longest = min(len(existing), len(segment), MAX_STITCH_OVERLAP_CHARS)
+    for size in range(longest, 0, -1):
+        if existing.endswith(segment[:size]):
+            # Ignore tiny coincidental overlaps such as a shared space
+            if size >= 8:
+                return existing + segment[size:]
+            break
+    return existing + segment
 
 class GeminiServices:
-    def __init__(self):
+    def __init__(self, pool=None, max_rounds=DEFAULT_MAX_ROUNDS, token_budget=DEFAULT_TOKEN_BUDGET,
+                 summary_input_tokens=DEFAULT_SUMMARY_INPUT_TOKENS,
+                 question_input_tokens=DEFAULT_QUESTION_INPUT_TOKENS,
+                 deadline_seconds=DEFAULT_DEADLINE_SECONDS):
+        """
+        Args:
+            pool (GeminiClientPool|None): Shared client to call through. When
+                                          omitted a dedicated client is built.
+            max_rounds (int): Requests allowed per answer or summary, counting
+                              continuations after a truncated response.
+            token_budget (int): Output tokens allowed per answer or summary
+                                across all rounds.
+            summary_input_tokens (int): Estimated tokens of answer text sent
+                                        per summarization request.
+            question_input_tokens (int): Estimated tokens of question body
+                                         sent when generating an answer.
+            deadline_seconds (float|None): Time allowed per answer or summary
+                                           across all rounds; None for no limit.
+        """
+        self.max_rounds = max(1, max_rounds)
+        self.token_budget = token_budget
+        self.summary_input_tokens = summary_input_tokens
+        self.question_input_tokens = question_input_tokens
+        self.deadline_seconds = deadline_seconds
+        # Statistics of the most recent answer or summary
+        self.last_call_stats = None
+        # budget_answers report of the most recent summary
+        self.last_input_report = None
+
+        if pool is not None:
+            self.api_key = pool.api_key
+            self.client = pool
+            self.model_name = GEMINI_MODEL
+            return
+
         self.api_key = os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
         
         self.client = genai.Client(api_key=self.api_key)
-        self.model_name = "gemini-2.5-flash"
+        self.model_name = GEMINI_MODEL
     
+    @classmethod
+    def for_app(cls, app=None):
+        """
+        Build a service on the app's shared client pool, configured from
+        GEMINI_MAX_ROUNDS, GEMINI_TOKEN_BUDGET, GEMINI_SUMMARY_INPUT_TOKENS,
+        GEMINI_QUESTION_INPUT_TOKENS and GEMINI_DEADLINE_SECONDS.
+
+        Args:
+            app (Flask|None): The application; defaults to current_app.
+
+        Returns:
+            GeminiServices: The service.
+
+        Raises:
+            ValueError: If the client pool cannot be built (e.g. missing API key).
+        """
+        from flask import current_app
+        from services.gemini_client_pool import get_gemini_pool
+        app = app or current_app._get_current_object()
+        return cls(
+            pool=get_gemini_pool(app),
+            max_rounds=int(app.config.get('GEMINI_MAX_ROUNDS', DEFAULT_MAX_ROUNDS)),
+            token_budget=int(app.config.get('GEMINI_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET)),
+            summary_input_tokens=int(app.config.get('GEMINI_SUMMARY_INPUT_TOKENS', DEFAULT_SUMMARY_INPUT_TOKENS)),
+            question_input_tokens=int(app.config.get('GEMINI_QUESTION_INPUT_TOKENS', DEFAULT_QUESTION_INPUT_TOKENS)),
+            deadline_seconds=float(app.config.get('GEMINI_DEADLINE_SECONDS', DEFAULT_DEADLINE_SECONDS))
+        )
+
+    def _generate_with_continuation(self, operation, prompt, temperature):
+        """
+        Generate text, continuing from the partial output whenever a round
+        stops on MAX_TOKENS, until it finishes, max_rounds is reached, the
+        token budget is spent or the deadline passes. Records the call statistics.
+
+        Args:
+            operation (str): Statistics label ('answer' or 'summary').
+            prompt (str): The full prompt.
+            temperature (float): Sampling temperature.
+
+        Returns:
+            tuple[str, bool]: Stitched text and whether it is still truncated.
+
+        Raises:
+            GeminiDeadlineError: If the deadline passes before any text arrives.
+        """
+        started = time.perf_counter()
+        deadline = self._deadline()
+        text = ''
+        truncated = False
+        stats = {'rounds': 0, 'prompt_tokens': 0, 'output_tokens': 0}
+        remaining = self.token_budget
+
+        try:
+            for round_number in range(self.max_rounds):
+                if round_number:
+                    if remaining <= 0:
+                        logging.warning(f"Gemini {operation} token budget spent after {round_number} rounds.")
+                        break
+                    logging.info(f"{operation.capitalize()} was truncated. Requesting continuation {round_number}.")
+                    contents = self._continuation_prompt(prompt, text)
+                else:
+                    contents = prompt
+
+                config = {
+                    "max_output_tokens": min(ROUND_MAX_OUTPUT_TOKENS, remaining),
+                    "temperature": temperature,
+                }
+                if deadline is not None:
+                    time_left = deadline - time.monotonic()
+                    if time_left <= 0:
+                        if not text:
+                            raise GeminiDeadlineError(f"Gemini {operation} deadline passed")
+                        logging.warning(f"Gemini {operation} deadline reached after {round_number} rounds.")
+                        break
+                    config["http_options"] = {"timeout": max(1, math.ceil(time_left * 1000))}
+
+                try:
+                    response = self.client.models.generate_content(
+                        model=self.model_name,
+                        contents=contents,
+                        config=config
+                    )
+                except Exception as e:
+                    if deadline is None or time.monotonic() < deadline:
+                        raise
+                    if not text:
+                        raise GeminiDeadlineError(f"Gemini {operation} deadline passed") from e
+                    # Keep the partial text rather than losing it to a late continuation
+                    logging.warning(f"Gemini {operation} continuation ran past the deadline: {str(e)}")
+                    break
+                segment = response.text or ''
+                usage = getattr(response, 'usage_metadata', None)
+                output_tokens = _token_count(usage, 'candidates_token_count')
+                if output_tokens is None:
+                    # Rough estimate (~4 characters per token) when usage is not reported
+                    output_tokens = len(segment) // 4
+                stats['rounds'] += 1
+                stats['prompt_tokens'] += _token_count(usage, 'prompt_token_count') or 0
+                stats['output_tokens'] += output_tokens
+                remaining -= output_tokens
+
+                text = stitch_segments(text, segment)
+                truncated = self.is_response_truncated(response)
+                if not truncated:
+                    break
+        finally:
+            stats['truncated'] = truncated
+            stats['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            self.last_call_stats = dict(stats, operation=operation)
+            _record_call(operation, stats)
+
+        return text, truncated
+
+    def _deadline(self):
+        """Monotonic time an operation starting now must finish by, or None"""
+        if not self.deadline_seconds:
+            return None
+        return time.monotonic() + self.deadline_seconds
+
+    def _answer_prompt(self, title, body):
+        """Build the answer prompt for a question (ANSWER_PROMPT_VERSION)"""
+        body = truncate_to_tokens(compact_text(body), self.question_input_tokens)
+
+        # Define context for programming questions
+        context = """You're an expert teacher providing that first identifies the difficulty of the content and provides clear and concise answers. Follow this guidelines:
+            1. If the question is simple, provide a direct answer without unnecessary elaboration.
+            2. Provide examples if the content requires it.
+            3. Use proper HTML formatting for code snippets.
+            4. Ensure to use bold for important terms."""
+
+        # creating the prompt
+        return f"""{context}
+
+                    Question: {title}
+
+                    Details: {body}
+
+                    Please provide a comprehensive answer with proper HTML formatting for any code examples:"""
+
+    def _continuation_prompt(self, prompt, partial_text):
+        """Build a prompt asking the model to carry on from where its answer was cut off"""
+        return f"""{prompt}
+
+                    Your previous response was cut off by the length limit. It ended with:
+
+                    {partial_text[-CONTINUATION_CONTEXT_CHARS:]}
+
+                    Continue the answer exactly where it stops. Do not repeat any of the text above or restart the answer:"""
+
     def generate_answer(self, title, body):
         """
         Generate an answer for a programming question
@@ -31,65 +481,124 @@ class GeminiServices:
         Returns:
             tuple[str, bool]: A tuple containing the generated answer text 
                               and a boolean indicating if it was truncated.
+
+        Raises:
+            ValueError: If the title is empty.
+            GeminiUnavailableError: If the API is busy, failing or too slow.
+            Exception: Any other API error (logged, then re-raised).
         """
         if not title or title.strip() == "":
             raise ValueError("Question title cannot be empty")
         
         try:
+            prompt = self._answer_prompt(title, body)
+            return self._generate_with_continuation('answer', prompt, temperature=0.7)
+            
+        except Exception as e:
+            logging.error(f"Gemini API error: {str(e)}")
+            raise
 
-            # Define context for programming questions
-            context = """You're an expert teacher providing that first identifies the difficulty of the content and provides clear and concise answers. Follow this guidelines:
-            1. If the question is simple, provide a direct answer without unnecessary elaboration.
-            2. Provide examples if the content requires it.
-            3. Use proper HTML formatting for code snippets.
-            4. Ensure to use bold for important terms."""
+    def stream_answer(self, title, body, max_continuations=None):
+        """
+        Stream an answer for a programming question as the model produces it.
 
-            # creating the prompt
-            prompt = f"""{context}
+        When the output hits the token limit, a continuation is requested and
+        streamed after the text already sent, instead of discarding it, while
+        the token budget and deadline allow.
 
-                    Question: {title}
+        Args:
+            title (str): Question title
+            body (str): Question details/body
+            max_continuations (int|None): Continuation requests allowed after
+                                          the first; defaults to max_rounds - 1.
 
-                    Details: {body}
+        Yields:
+            dict: {'type': 'chunk', 'text': str} for each piece of text,
+                  {'type': 'continuation', 'round': int} before each continuation,
+                  then one {'type': 'done', 'text': str, 'is_truncated': bool}
+                  with the full stitched answer.
+        """
+        if not title or title.strip() == "":
+            raise ValueError("Question title cannot be empty")
 
-                    Please provide a comprehensive answer with proper HTML formatting for any code examples:"""
-            
-            # Call Gemini API
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config={
-                    "max_output_tokens": 4000,
-                    "temperature": 0.7,
-                }
-            )
+        if max_continuations is None:
+            max_continuations = self.max_rounds - 1
+
+        prompt = self._answer_prompt(title, body)
+        contents = prompt
+        parts = []
+        truncated = False
+        started = time.perf_counter()
+        deadline = self._deadline()
+        stats = {'rounds': 0, 'prompt_tokens': 0, 'output_tokens': 0}
 
-            truncated = self.is_response_truncated(response)
+        remaining = self.token_budget
 
-            if truncated:
-                logging.info("Answer was truncated. Requesting a concise version.")
-                concise_prompt = f"""The previous answer was too long. Provide a more concise answer for the same question, focusing on the key points.
+        for round_number in range(max_continuations + 1):
+            if round_number and remaining <= 0:
+                logging.warning(f"Streamed answer token budget spent after {round_number} rounds.")
+                break
+            config = {"max_output_tokens": min(ROUND_MAX_OUTPUT_TOKENS, remaining), "temperature": 0.7}
+            if deadline is not None:
+                time_left = deadline - time.monotonic()
+                if time_left <= 0:
+                    # Only reached before a continuation, so text has been sent
+                    logging.warning(f"Streamed answer deadline reached after {round_number} rounds.")
+                    break
+                config["http_options"] = {"timeout": max(1, math.ceil(time_left * 1000))}
 
-                        Question: {title}
+            if round_number:
+                logging.info(f"Streamed answer was truncated. Requesting continuation {round_number}.")
+                yield {'type': 'continuation', 'round': round_number}
+                contents = self._continuation_prompt(prompt, ''.join(parts))
 
-                        Details: {body}
+            finish_reason = None
+            usage = None
+            round_chars = 0
+            for chunk in self.client.models.generate_content_stream(
+                model=self.model_name,
+                contents=contents,
+                config=config
+            ):
+                if chunk.text:
+                    parts.append(chunk.text)
+                    round_chars += len(chunk.text)
+                    yield {'type': 'chunk', 'text': chunk.text}
+                if chunk.candidates and chunk.candidates[0].finish_reason:
+                    finish_reason = chunk.candidates[0].finish_reason
+                usage = getattr(chunk, 'usage_metadata', None) or usage
 
-                        Please provide a concise answer with proper HTML formatting for any code examples:"""
+            stats['rounds'] += 1
+            stats['prompt_tokens'] += _token_count(usage, 'prompt_token_count') or 0
+            output_tokens = _token_count(usage, 'candidates_token_count')
+            if output_tokens is None:
+                # Rough estimate (~4 characters per token) when usage is not reported
+                output_tokens = round_chars // CHARS_PER_TOKEN
+            stats['output_tokens'] += output_tokens
+            remaining -= output_tokens
+            truncated = finish_reason == FinishReason.MAX_TOKENS
+            if not truncated:
+                break
 
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=concise_prompt,
-                    config={
-                        "max_output_tokens": 10000,
-                        "temperature": 0.5,
-                    }
-                )
-                # The new response is concise, so we assume it's not truncated.
-                return response.text, False
-            
-            return response.text, truncated
-            
-        except Exception as e:
-            logging.error(f"Gemini API error: {str(e)}")
+        if truncated:
+            logging.warning("Streamed answer still truncated after all continuations.")
+        stats['truncated'] = truncated
+        stats['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self.last_call_stats = dict(stats, operation='stream')
+        _record_call('stream', stats)
+        yield {'type': 'done', 'text': ''.join(parts), 'is_truncated': truncated}
+
+    def prepare_summary_input(self, answers):
+        """
+        Apply the summary input budget to a list of answers.
+
+        Args:
+            answers (list): Answer dicts (see budget_answers).
+
+        Returns:
+            tuple[list[dict], dict]: Kept answers and the budget report.
+        """
+        return budget_answers(answers, self.summary_input_tokens)
 
     def summarize_answers(self, answers):
         """
@@ -125,38 +634,64 @@ class GeminiServices:
             else:
                 raise ValueError("`answers` must be a list of answer dicts or a single answer dict")
 
+            # Keep the most valuable answers, as plain text, within the input budget
+            answers_list, self.last_input_report = self.prepare_summary_input(answers_list)
+
             # Build the content text focusing on bodies
             content_text = "Collected Answer Bodies:\n\n"
             for idx, ans in enumerate(answers_list, start=1):
-                body = ans.get('body', '') if isinstance(ans, dict) else str(ans)
-                content_text += f"Answer #{idx}: {body}\n\n"
+                content_text += f"Answer #{idx}: {ans['body']}\n\n"
 
             prompt = f"{context}\nHere are the collected answers to synthesize:\n\n{content_text}\nPlease provide a single, comprehensive summary based on the answers above:\n"
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config={"max_output_tokens": 4000, "temperature": 0.7}
-            )
-
-            truncated = self.is_response_truncated(response)
-
-            if truncated:
-                logging.info("Summary was truncated. Requesting a concise version.")
-                concise_prompt = f"The previous summary was too long. Provide a more concise summary of the same answers, focusing on the key points.\n\n{content_text}"
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=concise_prompt,
-                    config={"max_output_tokens": 4000, "temperature": 0.5}
-                )
-                return response.text, False
-
-            return response.text, truncated
+            return self._generate_with_continuation('summary', prompt, temperature=0.7)
 
+        except GeminiUnavailableError:
+            # Kept as is so callers can fall back or answer 503
+            raise
         except Exception as e:
             logging.error(f"Gemini API summary error: {str(e)}")
             raise Exception(f"Failed to generate summary: {str(e)}")
         
+    def summarize_hierarchical(self, answers, chunk_chars=SUMMARY_CHUNK_CHARS, summarize=None):
+        """
+        Summarize any number of answers in bounded requests (map-reduce).
+
+        Answers that fit in one chunk are summarized directly. Otherwise each
+        chunk is summarized on its own and the partial summaries are
+        summarized again, level by level, until they fit in one request.
+
+        Args:
+            answers (list|dict): Answer dicts with a 'body' (or a single answer dict).
+            chunk_chars (int): Largest amount of text per request.
+            summarize (callable|None): Function taking a list of answer dicts and
+                                       returning (text, is_truncated); defaults to
+                                       summarize_answers. Callers pass a cached
+                                       variant so unchanged chunks are not resent.
+
+        Returns:
+            tuple[str, bool]: The summary and whether any step was truncated.
+        """
+        summarize = summarize or self.summarize_answers
+        level = [answers] if isinstance(answers, dict) else list(answers)
+        any_truncated = False
+
+        for depth in range(MAX_SUMMARY_LEVELS):
+            chunks = chunk_answers(level, chunk_chars)
+            if len(chunks) == 1:
+                break
+            logging.info(f"Summarizing {len(level)} texts in {len(chunks)} chunks (level {depth + 1}).")
+            partials = [summarize(chunk) for chunk in chunks]
+            any_truncated = any_truncated or any(truncated for _, truncated in partials)
+            level = [{'body': text} for text, _ in partials]
+        else:
+            chunks = chunk_answers(level, chunk_chars)
+            if len(chunks) > 1:
+                logging.warning(f"Summary did not converge; dropping {len(chunks) - 1} chunks of partial summaries.")
+
+        summary, truncated = summarize(chunks[0])
+        return summary, any_truncated or truncated
+
     def is_response_truncated(self, response) -> bool:
         """
         Check if the Gemini API response was truncated due to token limits.
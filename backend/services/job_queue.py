@@ -0,0 +1,335 @@
+"""
+Description: DB-backed background job queue with in-process worker threads.
+Jobs live in the background_jobs table, so queued work survives restarts.
+Workers claim a job with a conditional UPDATE, run its registered handler and
+retry failures with exponential backoff.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with enqueue/dedupe, claiming, retries and workers.
+    2026-10-19 - enqueue can join the caller's transaction instead of committing.
+"""
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import and_, or_
+from database import db
+from models.background_job import BackgroundJob
+
+DEFAULT_WORKERS = 2
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_BACKOFF_SECONDS = 5
+DEFAULT_BACKOFF_MAX_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 5
+
+EXTENSION_KEY = 'job_queue'
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobQueue:
+    """
+    Queue of BackgroundJob rows and the workers that run them.
+
+    Attributes:
+        poll_interval (float): Seconds an idle worker waits before polling again.
+        lease (timedelta): How long a claimed job may run before another
+                           worker may take it over (e.g. after a crash).
+        backoff_base (float): Delay in seconds before the first retry; doubles
+                              with each further attempt.
+        backoff_max (float): Longest retry delay in seconds.
+        max_attempts (int): Default attempts per job.
+    """
+
+    def __init__(self, poll_interval=DEFAULT_POLL_SECONDS, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 backoff_base=DEFAULT_BACKOFF_SECONDS, backoff_max=DEFAULT_BACKOFF_MAX_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease_seconds)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts
+
+        self._handlers = {}
+        self._threads = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a queue from JOB_* app configuration.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            JobQueue: The new queue.
+        """
+        return cls(
+            poll_interval=float(config.get('JOB_POLL_SECONDS', DEFAULT_POLL_SECONDS)),
+            lease_seconds=int(config.get('JOB_LEASE_SECONDS', DEFAULT_LEASE_SECONDS)),
+            backoff_base=float(config.get('JOB_BACKOFF_SECONDS', DEFAULT_BACKOFF_SECONDS)),
+            backoff_max=float(config.get('JOB_BACKOFF_MAX_SECONDS', DEFAULT_BACKOFF_MAX_SECONDS)),
+            max_attempts=int(config.get('JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS))
+        )
+
+    def register(self, job_type, handler):
+        """
+        Register the function that runs jobs of a type.
+
+        Args:
+            job_type (str): Job type name.
+            handler (callable): Called with the decoded payload dict. Raising
+                                marks the attempt failed.
+        """
+        self._handlers[job_type] = handler
+
+    def enqueue(self, job_type, payload=None, dedupe_key=None, max_attempts=None, delay=0, commit=True):
+        """
+        Queue a job, unless one with the same dedupe_key is already waiting or running.
+
+        Args:
+            job_type (str): Registered job type.
+            payload (dict|None): JSON-serializable handler arguments.
+            dedupe_key (str|None): Key identifying duplicate work.
+            max_attempts (int|None): Attempts allowed; defaults to the queue's.
+            delay (float): Seconds before the job may first run.
+            commit (bool): Commit now; False leaves the job in the caller's
+                           transaction, queued only if that commits.
+
+        Returns:
+            BackgroundJob: The new job, or the existing duplicate.
+        """
+        if dedupe_key:
+            existing = BackgroundJob.query \
+                .filter(BackgroundJob.dedupe_key == dedupe_key,
+                        BackgroundJob.status.in_([BackgroundJob.PENDING, BackgroundJob.RUNNING])) \
+                .first()
+            if existing:
+                return existing
+
+        job = BackgroundJob(
+            job_type=job_type,
+            dedupe_key=dedupe_key,
+            payload=json.dumps(payload or {}),
+            status=BackgroundJob.PENDING,
+            attempts=0,
+            max_attempts=max_attempts or self.max_attempts,
+            run_after=_utcnow() + timedelta(seconds=delay)
+        )
+        db.session.add(job)
+        if commit:
+            db.session.commit()
+        self._wake.set()
+        return job
+
+    def _claimable(self, now):
+        """Jobs that are due, or running past their lease"""
+        return or_(
+            and_(BackgroundJob.status == BackgroundJob.PENDING, BackgroundJob.run_after <= now),
+            and_(BackgroundJob.status == BackgroundJob.RUNNING, BackgroundJob.locked_at < now - self.lease)
+        )
+
+    def claim_next(self):
+        """
+        Claim the next due job for this worker.
+
+        The claim is a conditional UPDATE, so two workers racing for the same
+        row cannot both win it.
+
+        Returns:
+            BackgroundJob|None: The claimed job, now 'running'.
+        """
+        now = _utcnow()
+        candidates = db.session.query(BackgroundJob.id) \
+            .filter(self._claimable(now)) \
+            .order_by(BackgroundJob.run_after.asc(), BackgroundJob.id.asc()) \
+            .limit(5) \
+            .all()
+
+        for (job_id,) in candidates:
+            claimed = BackgroundJob.query \
+                .filter(BackgroundJob.id == job_id, self._claimable(now)) \
+                .update({
+                    BackgroundJob.status: BackgroundJob.RUNNING,
+                    BackgroundJob.locked_at: now,
+                    BackgroundJob.attempts: BackgroundJob.attempts + 1
+                }, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return db.session.get(BackgroundJob, job_id)
+        return None
+
+    def backoff(self, attempts):
+        """
+        Delay before retrying a job that has failed `attempts` times.
+
+        Args:
+            attempts (int): Attempts made so far.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        return min(self.backoff_max, self.backoff_base * (2 ** max(attempts - 1, 0)))
+
+    def run_job(self, job):
+        """
+        Run a claimed job and record the outcome.
+
+        Args:
+            job (BackgroundJob): Job returned by claim_next.
+
+        Returns:
+            bool: True if the handler succeeded.
+        """
+        job_id = job.id
+        handler = self._handlers.get(job.job_type)
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job type '{job.job_type}'")
+            handler(job.get_payload())
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(BackgroundJob, job_id)
+            job.last_error = str(e)[:2000]
+            job.locked_at = None
+            if job.attempts >= job.max_attempts or handler is None:
+                job.status = BackgroundJob.FAILED
+                logging.error(f"Job {job_id} ({job.job_type}) failed permanently: {str(e)}")
+            else:
+                job.status = BackgroundJob.PENDING
+                job.run_after = _utcnow() + timedelta(seconds=self.backoff(job.attempts))
+                logging.warning(f"Job {job_id} ({job.job_type}) attempt {job.attempts} failed, retrying: {str(e)}")
+            db.session.commit()
+            return False
+
+        job = db.session.get(BackgroundJob, job_id)
+        job.status = BackgroundJob.DONE
+        job.locked_at = None
+        job.last_error = None
+        db.session.commit()
+        return True
+
+    def run_pending(self, limit=None):
+        """
+        Run due jobs in the calling thread until none are left (or limit is hit).
+
+        Args:
+            limit (int|None): Most jobs to run.
+
+        Returns:
+            int: Number of jobs run.
+        """
+        ran = 0
+        while limit is None or ran < limit:
+            job = self.claim_next()
+            if job is None:
+                break
+            self.run_job(job)
+            ran += 1
+        return ran
+
+    def stats(self):
+        """
+        Count jobs by status.
+
+        Returns:
+            dict: status -> number of jobs, plus the number of live workers.
+        """
+        rows = db.session.query(BackgroundJob.status, db.func.count(BackgroundJob.id)) \
+            .group_by(BackgroundJob.status) \
+            .all()
+        counts = {status: 0 for status in (BackgroundJob.PENDING, BackgroundJob.RUNNING,
+                                           BackgroundJob.DONE, BackgroundJob.FAILED)}
+        counts.update(dict(rows))
+        counts['workers'] = sum(1 for thread in self._threads if thread.is_alive())
+        return counts
+
+    def _work(self, app):
+        while not self._stop.is_set():
+            ran = 0
+            with app.app_context():
+                try:
+                    ran = self.run_pending(limit=1)
+                except Exception as e:
+                    logging.error(f"Job worker error: {str(e)}")
+                finally:
+                    db.session.remove()
+            if not ran:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def start(self, app, workers=DEFAULT_WORKERS):
+        """
+        Start worker threads for an app.
+
+        Args:
+            app (Flask): Application whose context the workers run in.
+            workers (int): Number of threads.
+        """
+        self._stop.clear()
+        for index in range(workers):
+            thread = threading.Thread(target=self._work, args=(app,), name=f'job-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        """
+        Stop the worker threads, letting running jobs finish.
+
+        Args:
+            timeout (float): Seconds to wait for each thread.
+        """
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+def init_job_queue(app):
+    """
+    Create the app's job queue. Workers are started separately with
+    start_job_workers, so tests and scripts importing the app run no threads.
+
+    Args:
+        app (Flask): The application.
+
+    Returns:
+        JobQueue: The queue.
+    """
+    queue = JobQueue.from_config(app.config)
+    app.extensions[EXTENSION_KEY] = queue
+    return queue
+
+
+def get_job_queue(app=None):
+    """
+    Get the app's job queue.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        JobQueue|None: The queue, or None if the app has none.
+    """
+    app = app or current_app._get_current_object()
+    return app.extensions.get(EXTENSION_KEY)
+
+
+def start_job_workers(app):
+    """
+    Start JOB_WORKERS worker threads (default 2) for the app's queue.
+
+    Args:
+        app (Flask): The application.
+    """
+    workers = int(app.config.get('JOB_WORKERS', DEFAULT_WORKERS))
+    if workers > 0:
+        get_job_queue(app).start(app, workers)
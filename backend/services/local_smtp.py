@@ -0,0 +1,167 @@
+"""
+Description: Minimal local SMTP server standing in for the real mail server in
+tests and local development. It accepts every message (and any AUTH login),
+keeps it in memory and, when run as a script, prints it.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for the email outbox sender.
+
+Usage (from backend/):
+    python -m services.local_smtp --port 1025
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_USE_SSL=false python app.py
+"""
+import argparse
+import email
+import socketserver
+import threading
+from email import policy
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """One SMTP session: greeting, envelope commands, DATA and QUIT"""
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode('utf-8'))
+
+    def handle(self):
+        server = self.server.owner
+        server._connected()
+        self._reply("220 localhost DalOverflow local SMTP")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self._reply("250-localhost")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif verb == 'HELO':
+                self._reply("250 localhost")
+            elif verb == 'AUTH':
+                if command.upper().startswith('AUTH LOGIN'):
+                    # Username then password prompts, both accepted
+                    self._reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                self._reply("235 Authentication succeeded")
+            elif verb == 'MAIL':
+                sender, recipients = command.split(':', 1)[1].strip(), []
+                self._reply("250 OK")
+            elif verb == 'RCPT':
+                recipient = command.split(':', 1)[1].strip().strip('<>')
+                if recipient in server.reject:
+                    self._reply("550 No such user")
+                else:
+                    recipients.append(recipient)
+                    self._reply("250 OK")
+            elif verb == 'DATA':
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    # Undo dot-stuffing
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                message = email.message_from_bytes(b"".join(lines), policy=policy.default)
+                server._received(sender, recipients, message)
+                self._reply("250 OK: queued")
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self._reply("250 OK")
+            elif verb == 'NOOP':
+                self._reply("250 OK")
+            elif verb == 'QUIT':
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """
+    In-memory SMTP server on a background thread.
+
+    Attributes:
+        host (str): Address listened on.
+        port (int): Port listened on (0 picks a free one; read it after start).
+        messages (list): Received (sender, recipients, EmailMessage) tuples.
+        connections (int): SMTP sessions opened so far.
+        reject (set): Recipients answered with 550.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, on_message=None):
+        self.host = host
+        self.port = port
+        self.messages = []
+        self.connections = 0
+        self.reject = set()
+        self._on_message = on_message
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _connected(self):
+        with self._lock:
+            self.connections += 1
+
+    def _received(self, sender, recipients, message):
+        with self._lock:
+            self.messages.append((sender, recipients, message))
+        if self._on_message:
+            self._on_message(sender, recipients, message)
+
+    def start(self):
+        """Start listening; returns self so it can be chained"""
+        self._server = _ThreadingTCPServer((self.host, self.port), _SMTPHandler)
+        self._server.owner = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                                        name='local-smtp', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop listening"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(5)
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local SMTP stand-in that prints received emails.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    args = parser.parse_args()
+
+    def show(sender, recipients, message):
+        print(f"--- from {sender} to {', '.join(recipients)}: {message['Subject']}", flush=True)
+
+    server = LocalSMTPServer(args.host, args.port, on_message=show).start()
+    print(f"Local SMTP listening on {server.host}:{server.port} (Ctrl+C to stop)", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
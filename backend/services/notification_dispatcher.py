@@ -0,0 +1,456 @@
+"""
+Description: Transactional outbox for notifications and the dispatcher that
+drains it. A write endpoint only adds a notification_outbox row to its own
+transaction, so the notification commits (or rolls back) with the answer or
+question that caused it, in a single commit. Dispatcher threads claim due
+events in batches, insert their notifications and update unread counters in
+one commit per batch, and the notification hub pushes them once committed.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with the outbox and batching dispatcher.
+    2026-10-19 - Coalesced event groups and chunked notification inserts.
+    2026-10-19 - A rolled back SAVEPOINT no longer cancels the wake-up.
+"""
+import json
+import logging
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from flask import current_app, has_app_context
+from sqlalchemy import and_, delete, event, insert, or_, update
+from database import db
+from models.notification import Notification
+from models.notification_counter import NotificationCounter
+from models.notification_outbox import NotificationOutbox
+from services.notification_stream import publish_after_commit
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_WORKERS = 1
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_SECONDS = 5
+DEFAULT_BACKOFF_MAX_SECONDS = 600
+DEFAULT_INSERT_CHUNK_SIZE = 500
+DEFAULT_COALESCE_SECONDS = 30
+
+EXTENSION_KEY = 'notification_dispatcher'
+_WAKE_KEY = 'wake_notification_dispatcher'
+
+# Event kinds
+DIRECT = 'direct'
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _direct(payload):
+    """Handler of 'direct' events: one notification, as given"""
+    return [payload]
+
+
+class NotificationDispatcher:
+    """
+    Turns outbox events into notifications.
+
+    Each event kind has a handler receiving the event payload and returning
+    the notifications to insert, as dicts of user_id, header and body.
+    Events added with a coalesce key wait coalesce_seconds, and every pending
+    event with that key is then dispatched with the first; the handler of a
+    coalesced kind receives the list of their payloads.
+
+    Attributes:
+        batch_size (int): Most events claimed per batch.
+        poll_interval (float): Idle seconds between checks for due events.
+        lease (timedelta): Time after which a claimed batch is taken over.
+        max_attempts (int): Attempts allowed per event.
+        insert_chunk_size (int): Most notifications per INSERT statement.
+        coalesce_seconds (float): Delay of events with a coalesce key.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, poll_interval=DEFAULT_POLL_SECONDS,
+                 lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 backoff_base=DEFAULT_BACKOFF_SECONDS, backoff_max=DEFAULT_BACKOFF_MAX_SECONDS,
+                 insert_chunk_size=DEFAULT_INSERT_CHUNK_SIZE, coalesce_seconds=DEFAULT_COALESCE_SECONDS):
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.insert_chunk_size = max(1, insert_chunk_size)
+        self.coalesce_seconds = coalesce_seconds
+        self._handlers = {DIRECT: _direct}
+        self._coalesced_kinds = set()
+        self._threads = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._dispatched = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a dispatcher from the NOTIFICATION_DISPATCH_*, NOTIFICATION_INSERT_CHUNK_SIZE
+        and NOTIFICATION_COALESCE_SECONDS settings.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            NotificationDispatcher: The new dispatcher.
+        """
+        return cls(
+            batch_size=int(config.get('NOTIFICATION_DISPATCH_BATCH_SIZE', DEFAULT_BATCH_SIZE)),
+            poll_interval=float(config.get('NOTIFICATION_DISPATCH_POLL_SECONDS', DEFAULT_POLL_SECONDS)),
+            max_attempts=int(config.get('NOTIFICATION_DISPATCH_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)),
+            insert_chunk_size=int(config.get('NOTIFICATION_INSERT_CHUNK_SIZE', DEFAULT_INSERT_CHUNK_SIZE)),
+            coalesce_seconds=float(config.get('NOTIFICATION_COALESCE_SECONDS', DEFAULT_COALESCE_SECONDS))
+        )
+
+    def register(self, kind, handler, coalesced=False):
+        """
+        Register the handler of an event kind.
+
+        Args:
+            kind (str): Event kind.
+            handler (callable): Called with the decoded payload; returns a list
+                                of notification dicts. Raising retries the event.
+            coalesced (bool): Call the handler once per coalesce key with the
+                              list of payloads of the events dispatched together.
+        """
+        self._handlers[kind] = handler
+        if coalesced:
+            self._coalesced_kinds.add(kind)
+        else:
+            self._coalesced_kinds.discard(kind)
+
+    def add(self, kind, payload, coalesce_key=None):
+        """
+        Add an event to the current transaction. Does not commit: the event
+        is dispatched only if the caller's transaction commits.
+
+        Args:
+            kind (str): Registered event kind.
+            payload (dict): JSON-serializable handler arguments.
+            coalesce_key (str|None): Key of events to dispatch together; the
+                                     event is then due after coalesce_seconds.
+
+        Returns:
+            NotificationOutbox: The pending event.
+        """
+        dispatch_after = _utcnow()
+        if coalesce_key is not None:
+            dispatch_after += timedelta(seconds=self.coalesce_seconds)
+        row = NotificationOutbox(
+            kind=kind,
+            payload=json.dumps(payload),
+            status=NotificationOutbox.PENDING,
+            attempts=0,
+            max_attempts=self.max_attempts,
+            dispatch_after=dispatch_after,
+            coalesce_key=coalesce_key
+        )
+        db.session.add(row)
+        db.session.info[_WAKE_KEY] = True
+        return row
+
+    def _claimable(self, now):
+        """Events that are due, or claimed by a batch that outlived its lease"""
+        return or_(
+            and_(NotificationOutbox.status == NotificationOutbox.PENDING,
+                 NotificationOutbox.dispatch_after <= now),
+            and_(NotificationOutbox.status == NotificationOutbox.DISPATCHING,
+                 NotificationOutbox.locked_at < now - self.lease)
+        )
+
+    def claim_batch(self):
+        """
+        Claim up to batch_size due events with one conditional UPDATE, so
+        concurrent dispatchers never claim the same event. Pending events
+        sharing a coalesce key with a due one are claimed with it, even if
+        not due yet.
+
+        Returns:
+            list: Claimed NotificationOutbox rows, now 'dispatching'.
+        """
+        now = _utcnow()
+        candidates = db.session.query(NotificationOutbox.id, NotificationOutbox.coalesce_key) \
+            .filter(self._claimable(now)) \
+            .order_by(NotificationOutbox.dispatch_after.asc(), NotificationOutbox.id.asc()) \
+            .limit(self.batch_size) \
+            .all()
+        if not candidates:
+            db.session.commit()
+            return []
+
+        token = uuid.uuid4().hex
+        claim = and_(NotificationOutbox.id.in_([event_id for event_id, _ in candidates]), self._claimable(now))
+        keys = {key for _, key in candidates if key is not None}
+        if keys:
+            claim = or_(claim, and_(NotificationOutbox.coalesce_key.in_(keys),
+                                    NotificationOutbox.status == NotificationOutbox.PENDING))
+        NotificationOutbox.query \
+            .filter(claim) \
+            .update({
+                NotificationOutbox.status: NotificationOutbox.DISPATCHING,
+                NotificationOutbox.claim_token: token,
+                NotificationOutbox.locked_at: now,
+                NotificationOutbox.attempts: NotificationOutbox.attempts + 1
+            }, synchronize_session=False)
+        db.session.commit()
+        return NotificationOutbox.query.filter_by(claim_token=token).order_by(NotificationOutbox.id.asc()).all()
+
+    def backoff(self, attempts):
+        """
+        Delay before retrying an event that has failed `attempts` times.
+
+        Args:
+            attempts (int): Attempts made so far.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        return min(self.backoff_max, self.backoff_base * (2 ** max(attempts - 1, 0)))
+
+    def _groups(self, events):
+        """Split claimed events into the groups handled by one handler call"""
+        groups = {}
+        for outbox_event in events:
+            if outbox_event.kind in self._coalesced_kinds and outbox_event.coalesce_key is not None:
+                key = (outbox_event.kind, outbox_event.coalesce_key)
+            else:
+                key = outbox_event.id
+            groups.setdefault(key, []).append(outbox_event)
+        return list(groups.values())
+
+    def _failure(self, outbox_event, error, now):
+        """Row rescheduling a failed event, or marking it failed for good"""
+        permanent = outbox_event.kind not in self._handlers or \
+            outbox_event.attempts >= outbox_event.max_attempts
+        failure = {'id': outbox_event.id, 'claim_token': None, 'locked_at': None,
+                   'last_error': str(error)[:2000]}
+        if permanent:
+            failure['status'] = NotificationOutbox.FAILED
+            logging.error(f"Notification event {outbox_event.id} ({outbox_event.kind}) failed permanently: {str(error)}")
+        else:
+            failure['status'] = NotificationOutbox.PENDING
+            failure['dispatch_after'] = now + timedelta(seconds=self.backoff(outbox_event.attempts))
+            logging.warning(f"Notification event {outbox_event.id} attempt {outbox_event.attempts} failed, retrying: {str(error)}")
+        return failure
+
+    def dispatch_batch(self, events):
+        """
+        Insert the notifications of claimed events, update unread counters and
+        delete the events, all in one commit. An event (or coalesced group)
+        whose handler fails is rescheduled without holding up the rest.
+
+        Args:
+            events (list): Rows returned by claim_batch.
+
+        Returns:
+            int: Notifications inserted.
+        """
+        now = _utcnow()
+        rows = []
+        done_ids = []
+        failures = []
+        for group in self._groups(events):
+            kind = group[0].kind
+            try:
+                handler = self._handlers.get(kind)
+                if handler is None:
+                    raise LookupError(f"No handler registered for notification event '{kind}'")
+                if kind in self._coalesced_kinds:
+                    notifications = handler([outbox_event.get_payload() for outbox_event in group])
+                else:
+                    notifications = handler(group[0].get_payload())
+            except Exception as e:
+                failures.extend(self._failure(outbox_event, e, now) for outbox_event in group)
+                continue
+            rows.extend({'user_id': n['user_id'], 'header': n['header'], 'body': n['body'], 'is_read': False}
+                        for n in notifications)
+            done_ids.extend(outbox_event.id for outbox_event in group)
+
+        inserted = []
+        # Multi-row INSERT ... RETURNING statements of at most insert_chunk_size
+        # rows; the hub pushes the rows after the commit
+        for start in range(0, len(rows), self.insert_chunk_size):
+            inserted.extend(db.session.scalars(
+                insert(Notification).returning(Notification), rows[start:start + self.insert_chunk_size]
+            ).all())
+        if inserted:
+            publish_after_commit(inserted)
+            NotificationCounter.add_many(Counter(row['user_id'] for row in rows))
+        if done_ids:
+            db.session.execute(delete(NotificationOutbox).where(NotificationOutbox.id.in_(done_ids)))
+        if failures:
+            groups = {}
+            for failure in failures:
+                groups.setdefault(tuple(sorted(failure)), []).append(failure)
+            for rows in groups.values():
+                db.session.execute(update(NotificationOutbox), rows)
+        db.session.commit()
+        self._dispatched += len(inserted)
+        return len(inserted)
+
+    def run_pending(self, limit=None):
+        """
+        Dispatch due events in the calling thread until none are left.
+
+        Args:
+            limit (int|None): Most batches to dispatch.
+
+        Returns:
+            int: Notifications inserted.
+        """
+        inserted = 0
+        batches = 0
+        while limit is None or batches < limit:
+            events = self.claim_batch()
+            if not events:
+                break
+            inserted += self.dispatch_batch(events)
+            batches += 1
+        return inserted
+
+    def stats(self):
+        """
+        Count outbox events by status.
+
+        Returns:
+            dict: status -> number of events, the live dispatcher threads and
+                  notifications inserted by this process.
+        """
+        rows = db.session.query(NotificationOutbox.status, db.func.count(NotificationOutbox.id)) \
+            .group_by(NotificationOutbox.status) \
+            .all()
+        counts = {status: 0 for status in (NotificationOutbox.PENDING, NotificationOutbox.DISPATCHING,
+                                           NotificationOutbox.FAILED)}
+        counts.update(dict(rows))
+        counts['workers'] = sum(1 for thread in self._threads if thread.is_alive())
+        counts['dispatched'] = self._dispatched
+        return counts
+
+    def wake(self):
+        """Wake idle dispatcher threads, e.g. after events were committed"""
+        self._wake.set()
+
+    def _work(self, app):
+        while not self._stop.is_set():
+            inserted = 0
+            with app.app_context():
+                try:
+                    inserted = self.run_pending(limit=1)
+                except Exception as e:
+                    db.session.rollback()
+                    logging.error(f"Notification dispatcher error: {str(e)}")
+                finally:
+                    db.session.remove()
+            if not inserted:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def start(self, app, workers=DEFAULT_WORKERS):
+        """
+        Start dispatcher threads for an app.
+
+        Args:
+            app (Flask): Application whose context the dispatchers run in.
+            workers (int): Number of threads.
+        """
+        self._stop.clear()
+        for index in range(workers):
+            thread = threading.Thread(target=self._work, args=(app,), name=f'notification-dispatcher-{index}',
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        """
+        Stop the dispatcher threads, letting the current batch finish.
+
+        Args:
+            timeout (float): Seconds to wait for each thread.
+        """
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+def _wake_after_commit(session):
+    if session.info.pop(_WAKE_KEY, False) and has_app_context():
+        dispatcher = current_app.extensions.get(EXTENSION_KEY)
+        if dispatcher is not None:
+            dispatcher.wake()
+
+
+def _forget_wake(session, previous_transaction):
+    # A rolled back SAVEPOINT leaves the outer transaction's events to commit
+    if not previous_transaction.nested:
+        session.info.pop(_WAKE_KEY, None)
+
+
+def init_notification_dispatcher(app):
+    """
+    Create the app's notification dispatcher. Dispatcher threads are started
+    separately with start_notification_dispatcher, so tests and scripts run none.
+
+    Args:
+        app (Flask): The application.
+
+    Returns:
+        NotificationDispatcher: The dispatcher.
+    """
+    dispatcher = NotificationDispatcher.from_config(app.config)
+    app.extensions[EXTENSION_KEY] = dispatcher
+    if not event.contains(db.session, 'after_commit', _wake_after_commit):
+        event.listen(db.session, 'after_commit', _wake_after_commit)
+        event.listen(db.session, 'after_soft_rollback', _forget_wake)
+    return dispatcher
+
+
+def get_notification_dispatcher(app=None):
+    """
+    Get the app's notification dispatcher.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        NotificationDispatcher|None: The dispatcher, or None if the app has none.
+    """
+    app = app or current_app._get_current_object()
+    return app.extensions.get(EXTENSION_KEY)
+
+
+def queue_notification(user_id, header, body):
+    """
+    Add a notification to the current transaction; the caller commits it
+    together with the change it is about.
+
+    Args:
+        user_id (int): User to notify.
+        header (str): Notification header.
+        body (str): Notification body.
+
+    Returns:
+        NotificationOutbox: The pending event.
+    """
+    return get_notification_dispatcher().add(DIRECT, {'user_id': user_id, 'header': header, 'body': body})
+
+
+def start_notification_dispatcher(app):
+    """
+    Start NOTIFICATION_DISPATCH_WORKERS dispatcher threads (default 1).
+
+    Args:
+        app (Flask): The application.
+    """
+    workers = int(app.config.get('NOTIFICATION_DISPATCH_WORKERS', DEFAULT_WORKERS))
+    if workers > 0:
+        get_notification_dispatcher(app).start(app, workers)
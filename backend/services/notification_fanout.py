@@ -0,0 +1,97 @@
+"""
+Description: Fan-out of question activity (new answers and comments) to the
+question's followers. The write endpoint adds one outbox event per answer or
+comment; the dispatcher merges the events of a question that arrive within
+NOTIFICATION_COALESCE_SECONDS and turns them into one notification per
+follower, e.g. "3 new answers on 'X'", inserted in bulk.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created for follower notifications.
+"""
+from collections import Counter
+from database import db
+from models.question import Question
+from models.question_follow import QuestionFollow
+from services.notification_dispatcher import get_notification_dispatcher
+
+# Event kind
+QUESTION_ACTIVITY = 'question_activity'
+
+# Activities
+ANSWER = 'answer'
+COMMENT = 'comment'
+
+_NOUNS = {ANSWER: ('answer', 'answers'), COMMENT: ('comment', 'comments')}
+
+
+def _message(activity, count, title):
+    """Header and body of a notification about `count` new answers or comments"""
+    singular, plural = _NOUNS[activity]
+    if count == 1:
+        return f"New {singular}", f"New {singular} on '{title}'"
+    return f"{count} new {plural}", f"{count} new {plural} on '{title}'"
+
+
+def question_activity_notifications(payloads):
+    """
+    Handler of coalesced 'question_activity' events of one question and
+    activity: one notification per follower, counting the others' activity.
+
+    Args:
+        payloads (list): Event payloads with question_id, activity and actor_id.
+
+    Returns:
+        list: Notification dicts of user_id, header and body.
+    """
+    question_id = payloads[0]['question_id']
+    activity = payloads[0]['activity']
+    title = db.session.query(Question.title).filter(Question.id == question_id).scalar()
+    if title is None:
+        return []
+
+    by_actor = Counter(payload['actor_id'] for payload in payloads)
+    total = sum(by_actor.values())
+    notifications = []
+    for user_id in QuestionFollow.follower_ids(question_id):
+        # Nobody is notified of their own answers or comments
+        count = total - by_actor.get(user_id, 0)
+        if count:
+            header, body = _message(activity, count, title)
+            notifications.append({'user_id': user_id, 'header': header, 'body': body})
+    return notifications
+
+
+def register_fanout_handlers(dispatcher):
+    """
+    Register the follower fan-out handler with a notification dispatcher.
+
+    Args:
+        dispatcher (NotificationDispatcher): The app's dispatcher.
+
+    Returns:
+        NotificationDispatcher: The same dispatcher.
+    """
+    dispatcher.register(QUESTION_ACTIVITY, question_activity_notifications, coalesced=True)
+    return dispatcher
+
+
+def queue_question_activity(question_id, actor_id, activity):
+    """
+    Add a new answer or comment on a question to the current transaction;
+    its followers are notified once it commits and the coalescing window of
+    the question passes.
+
+    Args:
+        question_id (int): The question.
+        actor_id (int): User who answered or commented.
+        activity (str): ANSWER or COMMENT.
+
+    Returns:
+        NotificationOutbox: The pending event.
+    """
+    return get_notification_dispatcher().add(
+        QUESTION_ACTIVITY,
+        {'question_id': question_id, 'activity': activity, 'actor_id': actor_id},
+        coalesce_key=f'question:{question_id}:{activity}'
+    )
@@ -0,0 +1,491 @@
+"""
+Description: Push channel for notifications over server-sent events.
+Committed notifications are handed to a broker, which delivers them to the
+hub of every worker process; each hub fans them out to the open streams of
+the notified user. Streams send heartbeats so dead connections are noticed,
+and a client reconnecting with Last-Event-ID is replayed what it missed from
+the notifications table. The memory broker serves a single process (and
+tests); the database broker shares events across processes by polling for
+new notification rows, and any NotificationBroker can be plugged in.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with the fan-out hub and memory and database brokers.
+    2026-10-19 - Push bulk inserted notifications after commit.
+    2026-10-19 - NotificationBroker is an abstract base class.
+    2026-10-19 - A rolled back SAVEPOINT drops only the events collected in it.
+"""
+import abc
+import json
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from database import db
+from models.notification import Notification
+
+DEFAULT_HEARTBEAT_SECONDS = 15.0
+DEFAULT_STREAM_MAX_SECONDS = 300.0
+DEFAULT_MAX_CONNECTIONS = 1000
+DEFAULT_REPLAY_LIMIT = 50
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_POLL_SECONDS = 1.0
+# Ids below the newest seen that the database broker checks again, since a
+# lower id can commit after a higher one
+DEFAULT_POLL_LOOKBACK = 200
+# Reconnect delay sent to EventSource clients, in milliseconds
+RETRY_MILLISECONDS = 3000
+
+EXTENSION_KEY = 'notification_hub'
+_PENDING_KEY = 'pending_notification_events'
+_SAVEPOINTS_KEY = 'notification_event_savepoints'
+
+
+def notification_event(notification):
+    """
+    Payload of the event pushed for a notification.
+
+    Args:
+        notification (Notification): The notification.
+
+    Returns:
+        dict: JSON-serializable notification fields.
+    """
+    payload = notification.to_dict()
+    for key, value in payload.items():
+        if isinstance(value, datetime):
+            payload[key] = value.isoformat()
+    return payload
+
+
+def _sse(event_name, data, event_id=None):
+    """Format one server-sent event"""
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+
+class NotificationBroker(abc.ABC):
+    """
+    Carries committed notification events to the hub of every process.
+    Subclasses implement publish and, when events arrive from elsewhere,
+    start and stop.
+    """
+
+    def start(self, app, deliver):
+        """
+        Begin delivering events to a hub.
+
+        Args:
+            app (Flask): Application the hub belongs to.
+            deliver (callable): Called with a list of event dicts.
+        """
+        self._deliver = deliver
+
+    @abc.abstractmethod
+    def publish(self, events):
+        """
+        Send events committed in this process.
+
+        Args:
+            events (list[dict]): Notification events.
+        """
+
+    def stop(self):
+        """Stop delivering events"""
+
+
+class MemoryNotificationBroker(NotificationBroker):
+    """Delivers events straight to the hub of this process"""
+
+    def __init__(self):
+        self._deliver = None
+
+    def publish(self, events):
+        if self._deliver is not None:
+            self._deliver(events)
+
+
+class DatabaseNotificationBroker(NotificationBroker):
+    """
+    Shares events across processes through the notifications table: each
+    process polls once for rows newer than the last it saw, however many
+    streams it has open. publish is a no-op since the committed row is the
+    event.
+
+    Attributes:
+        poll_interval (float): Seconds between polls.
+        lookback (int): Ids below the newest seen that are checked again.
+    """
+
+    def __init__(self, poll_interval=DEFAULT_POLL_SECONDS, lookback=DEFAULT_POLL_LOOKBACK):
+        self.poll_interval = poll_interval
+        self.lookback = lookback
+        self._deliver = None
+        self._floor = None
+        self._last_id = None
+        self._seen = OrderedDict()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self, events):
+        pass
+
+    def poll(self):
+        """
+        Deliver notification rows committed since the last poll.
+
+        Returns:
+            int: Events delivered.
+        """
+        if self._last_id is None:
+            # Only rows committed after the broker started are events
+            self._floor = self._last_id = db.session.query(func.max(Notification.id)).scalar() or 0
+            return 0
+        rows = Notification.query \
+            .filter(Notification.id > max(self._last_id - self.lookback, self._floor)) \
+            .order_by(Notification.id) \
+            .all()
+        events = []
+        for notification in rows:
+            if notification.id in self._seen:
+                continue
+            self._seen[notification.id] = True
+            events.append(notification_event(notification))
+        while len(self._seen) > self.lookback * 2:
+            self._seen.popitem(last=False)
+        if rows:
+            self._last_id = max(self._last_id, rows[-1].id)
+        if events and self._deliver is not None:
+            self._deliver(events)
+        return len(events)
+
+    def _work(self, app):
+        while not self._stop.is_set():
+            with app.app_context():
+                try:
+                    self.poll()
+                except Exception as e:
+                    logging.error(f"Notification broker poll error: {str(e)}")
+                finally:
+                    db.session.remove()
+            self._stop.wait(self.poll_interval)
+
+    def start(self, app, deliver):
+        self._deliver = deliver
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._work, args=(app,), name='notification-broker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+
+class _Subscription:
+    """One open stream: a bounded queue of events for one user"""
+
+    def __init__(self, user_id, size):
+        self.user_id = user_id
+        self.events = queue.Queue(maxsize=size)
+        self.overflowed = False
+
+
+class NotificationHub:
+    """
+    Fans notification events out to the open streams of this process.
+
+    Attributes:
+        broker (NotificationBroker): Carries events between processes.
+        heartbeat_seconds (float): Idle time after which a heartbeat is sent.
+        max_seconds (float): Lifetime of a stream before the client is asked
+                             to reconnect (which frees the server thread).
+        max_connections (int): Open streams allowed in this process.
+        replay_limit (int): Missed notifications replayed on reconnect; with
+                            more, the client is told to reload instead.
+        queue_size (int): Events buffered per stream; a stream that falls
+                          further behind is closed and resumes by replay.
+    """
+
+    def __init__(self, broker=None, heartbeat_seconds=DEFAULT_HEARTBEAT_SECONDS,
+                 max_seconds=DEFAULT_STREAM_MAX_SECONDS, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 replay_limit=DEFAULT_REPLAY_LIMIT, queue_size=DEFAULT_QUEUE_SIZE):
+        self.broker = broker or MemoryNotificationBroker()
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_seconds = max_seconds
+        self.max_connections = max_connections
+        self.replay_limit = replay_limit
+        self.queue_size = queue_size
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._delivered = 0
+        self._dropped = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a hub from the NOTIFICATION_* settings.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            NotificationHub: The new hub.
+
+        Raises:
+            ValueError: If NOTIFICATION_BROKER is unknown.
+        """
+        kind = config.get('NOTIFICATION_BROKER', 'memory')
+        if kind == 'memory':
+            broker = MemoryNotificationBroker()
+        elif kind == 'database':
+            broker = DatabaseNotificationBroker(
+                poll_interval=float(config.get('NOTIFICATION_POLL_SECONDS', DEFAULT_POLL_SECONDS))
+            )
+        else:
+            raise ValueError(f"Unknown NOTIFICATION_BROKER: {kind!r}")
+        return cls(
+            broker=broker,
+            heartbeat_seconds=float(config.get('NOTIFICATION_HEARTBEAT_SECONDS', DEFAULT_HEARTBEAT_SECONDS)),
+            max_seconds=float(config.get('NOTIFICATION_STREAM_MAX_SECONDS', DEFAULT_STREAM_MAX_SECONDS)),
+            max_connections=int(config.get('NOTIFICATION_STREAM_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)),
+            replay_limit=int(config.get('NOTIFICATION_REPLAY_LIMIT', DEFAULT_REPLAY_LIMIT))
+        )
+
+    def publish(self, events):
+        """
+        Publish committed notification events through the broker.
+
+        Args:
+            events (list[dict]): Notification events.
+        """
+        if events:
+            self.broker.publish(events)
+
+    def _deliver(self, events):
+        with self._lock:
+            for payload in events:
+                for subscription in self._subscriptions.get(payload['user_id'], ()):
+                    try:
+                        subscription.events.put_nowait(payload)
+                        self._delivered += 1
+                    except queue.Full:
+                        subscription.overflowed = True
+                        self._dropped += 1
+
+    def is_full(self):
+        """Whether this process already has max_connections open streams"""
+        with self._lock:
+            return sum(len(subs) for subs in self._subscriptions.values()) >= self.max_connections
+
+    def subscribe(self, user_id, app=None):
+        """
+        Open a subscription to a user's events, starting the broker on first use.
+
+        Args:
+            user_id (int): User whose notifications are wanted.
+            app (Flask|None): The application; defaults to current_app.
+
+        Returns:
+            _Subscription: The subscription; pass it to unsubscribe when done.
+        """
+        subscription = _Subscription(user_id, self.queue_size)
+        with self._lock:
+            if not self._started:
+                self.broker.start(app or current_app._get_current_object(), self._deliver)
+                self._started = True
+            self._subscriptions.setdefault(user_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Close a subscription.
+
+        Args:
+            subscription (_Subscription): Subscription from subscribe.
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.user_id, None)
+
+    def _missed(self, user_id, last_event_id):
+        """Notifications after last_event_id, or None if more than replay_limit"""
+        rows = Notification.query \
+            .filter(Notification.user_id == user_id, Notification.id > last_event_id) \
+            .order_by(Notification.id) \
+            .limit(self.replay_limit + 1) \
+            .all()
+        if len(rows) > self.replay_limit:
+            return None
+        return [notification_event(notification) for notification in rows]
+
+    def stream(self, user_id, last_event_id=None):
+        """
+        Server-sent events of a user's new notifications.
+
+        Events:
+            notification: the notification's fields; its id is the event id
+            reset: more was missed than can be replayed; reload the feed
+
+        Args:
+            user_id (int): User whose notifications are streamed.
+            last_event_id (int|None): Id of the last notification the client
+                                      got, to replay what it missed.
+
+        Yields:
+            str: Formatted events and heartbeat comments.
+        """
+        app = current_app._get_current_object()
+        subscription = self.subscribe(user_id, app)
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            replayed = set()
+            if last_event_id is not None:
+                # Subscribed first, so nothing committed during the replay is missed
+                missed = self._missed(user_id, last_event_id)
+                if missed is None:
+                    yield _sse('reset', {'reason': 'too many missed notifications'})
+                else:
+                    for payload in missed:
+                        replayed.add(payload['id'])
+                        yield _sse('notification', payload, payload['id'])
+            # Do not hold a database connection for the life of the stream
+            db.session.remove()
+
+            deadline = time.monotonic() + self.max_seconds
+            while True:
+                if subscription.overflowed and subscription.events.empty():
+                    # Sent everything it buffered; it resumes from there by replay
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    payload = subscription.events.get(timeout=min(self.heartbeat_seconds, remaining))
+                except queue.Empty:
+                    # A write to a closed connection fails here and ends the stream
+                    yield ": heartbeat\n\n"
+                    continue
+                if payload['id'] in replayed:
+                    continue
+                yield _sse('notification', payload, payload['id'])
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        """
+        Hub metrics.
+
+        Returns:
+            dict: Open streams, users with streams, events delivered and
+                  events dropped from streams that fell behind.
+        """
+        with self._lock:
+            return {
+                'connections': sum(len(subs) for subs in self._subscriptions.values()),
+                'users': len(self._subscriptions),
+                'delivered': self._delivered,
+                'dropped': self._dropped,
+                'broker': type(self.broker).__name__
+            }
+
+    def close(self):
+        """Stop the broker"""
+        self.broker.stop()
+        self._started = False
+
+
+def _collect_notifications(session, flush_context):
+    events = [notification_event(obj) for obj in session.new if isinstance(obj, Notification)]
+    if events:
+        session.info.setdefault(_PENDING_KEY, []).extend(events)
+
+
+def _publish_committed(session):
+    session.info.pop(_SAVEPOINTS_KEY, None)
+    events = session.info.pop(_PENDING_KEY, None)
+    if not events or not has_app_context():
+        return
+    hub = current_app.extensions.get(EXTENSION_KEY)
+    if hub is None:
+        return
+    try:
+        hub.publish(events)
+    except Exception as e:
+        # The notifications are committed; a client catches up by replay
+        logging.error(f"Error publishing notifications: {str(e)}")
+
+
+def publish_after_commit(notifications):
+    """
+    Push notifications written outside the unit of work (a bulk INSERT),
+    once the current transaction commits.
+
+    Args:
+        notifications (list[Notification]): Inserted notifications.
+    """
+    db.session.info.setdefault(_PENDING_KEY, []).extend(
+        notification_event(notification) for notification in notifications
+    )
+
+
+def _mark_savepoint(session, transaction):
+    # Remember how many events were pending when a SAVEPOINT began
+    if transaction.nested:
+        session.info.setdefault(_SAVEPOINTS_KEY, {})[transaction] = len(session.info.get(_PENDING_KEY, ()))
+
+
+def _discard_pending(session, previous_transaction):
+    # after_rollback also fires for a SAVEPOINT, whose rollback leaves the
+    # rest of the transaction (and its pending events) to commit
+    if previous_transaction.nested:
+        mark = session.info.get(_SAVEPOINTS_KEY, {}).pop(previous_transaction, None)
+        if mark is not None and _PENDING_KEY in session.info:
+            del session.info[_PENDING_KEY][mark:]
+        return
+    session.info.pop(_SAVEPOINTS_KEY, None)
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_notification_hub(app):
+    """
+    Create the app's notification hub and publish notifications as their
+    transaction commits.
+
+    Args:
+        app (Flask): The application.
+
+    Returns:
+        NotificationHub: The hub.
+    """
+    hub = NotificationHub.from_config(app.config)
+    app.extensions[EXTENSION_KEY] = hub
+    if not event.contains(db.session, 'after_flush', _collect_notifications):
+        event.listen(db.session, 'after_flush', _collect_notifications)
+        event.listen(db.session, 'after_commit', _publish_committed)
+        event.listen(db.session, 'after_transaction_create', _mark_savepoint)
+        event.listen(db.session, 'after_soft_rollback', _discard_pending)
+    return hub
+
+
+def get_notification_hub(app=None):
+    """
+    Get the app's notification hub.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        NotificationHub|None: The hub, or None if the app has none.
+    """
+    app = app or current_app._get_current_object()
+    return app.extensions.get(EXTENSION_KEY)
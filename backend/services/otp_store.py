@@ -0,0 +1,247 @@
+"""
+Description: Store of one-time email codes, shared by every worker process.
+Codes live in the otp_codes table keyed by email and purpose, hashed with the
+app's secret key, and expire after a few minutes or a few wrong guesses.
+Checks and consumption are conditional UPDATE/DELETE statements, so
+concurrent requests (in any process) cannot use one code twice or exceed
+the attempt limit.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created to replace per-instance registration state.
+    2026-10-19 - verify can leave the code for consume, in the caller's
+                 transaction, so a failed reset or registration keeps it.
+"""
+import hashlib
+import hmac
+import random
+import secrets
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models.otp_code import OTPCode
+
+DEFAULT_TTL_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 5
+# Share of issued codes that also delete every expired code
+PURGE_RATE = 0.01
+
+# Outcomes of OTPStore.verify
+VALID = 'valid'
+INVALID = 'invalid'
+EXPIRED = 'expired'
+LOCKED = 'locked'
+MISSING = 'missing'
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def normalize_email(email):
+    """Lowercased, trimmed email used as the store key"""
+    return (email or '').strip().lower()
+
+
+class OTPStore:
+    """
+    Issues and checks one-time codes.
+
+    Attributes:
+        ttl (timedelta): How long a code is accepted.
+        max_attempts (int): Wrong codes allowed per issued code.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS, secret=None):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_attempts = max_attempts
+        self._secret = secret
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a store from OTP_TTL_SECONDS, OTP_MAX_ATTEMPTS and SECRET_KEY.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            OTPStore: The new store.
+        """
+        return cls(
+            ttl_seconds=int(config.get('OTP_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+            max_attempts=int(config.get('OTP_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)),
+            secret=config.get('SECRET_KEY')
+        )
+
+    def _hash(self, email, purpose, code):
+        secret = (self._secret or current_app.config['SECRET_KEY']).encode('utf-8')
+        message = f"{purpose}|{email}|{code}".encode('utf-8')
+        return hmac.new(secret, message, hashlib.sha256).hexdigest()
+
+    def issue(self, email, purpose, pending_password=None, keep_pending_password=False):
+        """
+        Create a new code for an email and purpose, replacing any earlier one.
+
+        Args:
+            email (str): Address the code is sent to.
+            purpose (str): OTPCode.REGISTER or OTPCode.RESET.
+            pending_password (str|None): bcrypt hash to keep until the code is used.
+            keep_pending_password (bool): Keep the earlier code's pending
+                                          password (resending a registration code).
+
+        Returns:
+            str: The 6-digit code, to be emailed; only its hash is stored.
+        """
+        email = normalize_email(email)
+        code = f"{secrets.randbelow(900000) + 100000}"
+        values = {
+            'code_hash': self._hash(email, purpose, code),
+            'attempts': 0,
+            'max_attempts': self.max_attempts,
+            'expires_at': _utcnow() + self.ttl
+        }
+        if not keep_pending_password:
+            values['pending_password'] = pending_password
+
+        replaced = db.session.execute(
+            update(OTPCode).where(OTPCode.email == email, OTPCode.purpose == purpose).values(**values)
+        ).rowcount
+        if not replaced:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(OTPCode(email=email, purpose=purpose,
+                                           **dict(values, pending_password=pending_password)))
+            except IntegrityError:
+                # Issued concurrently by another request; ours replaces it
+                db.session.execute(
+                    update(OTPCode).where(OTPCode.email == email, OTPCode.purpose == purpose).values(**values)
+                )
+        if random.random() < PURGE_RATE:
+            db.session.execute(delete(OTPCode).where(OTPCode.expires_at <= _utcnow()))
+        db.session.commit()
+        return code
+
+    def has_pending(self, email, purpose):
+        """
+        Whether an unexpired code exists for an email and purpose.
+
+        Args:
+            email (str): Address.
+            purpose (str): Code purpose.
+
+        Returns:
+            bool: True if one does.
+        """
+        return db.session.query(OTPCode.id) \
+            .filter(OTPCode.email == normalize_email(email), OTPCode.purpose == purpose,
+                    OTPCode.expires_at > _utcnow()) \
+            .first() is not None
+
+    def verify(self, email, purpose, code, consume=True):
+        """
+        Check a code and consume it if right.
+
+        A wrong code counts an attempt; once max_attempts is reached the code
+        is locked and a new one must be requested.
+
+        Args:
+            email (str): Address the code was sent to.
+            purpose (str): Code purpose.
+            code (str): Code entered by the user.
+            consume (bool): False to leave a right code in place, to be used
+                            with consume once the work it guards is done.
+
+        Returns:
+            tuple: (outcome, pending_password) where outcome is VALID,
+                   INVALID, EXPIRED, LOCKED or MISSING and pending_password
+                   is set only for a VALID registration code.
+        """
+        email = normalize_email(email)
+        record = OTPCode.query.filter_by(email=email, purpose=purpose).first()
+        if record is None:
+            return MISSING, None
+        if record.expires_at <= _utcnow():
+            return EXPIRED, None
+
+        # Every guess first takes one attempt with a conditional UPDATE, so
+        # parallel guesses cannot get past max_attempts
+        counted = db.session.execute(
+            update(OTPCode)
+            .where(OTPCode.id == record.id, OTPCode.code_hash == record.code_hash,
+                   OTPCode.attempts < OTPCode.max_attempts)
+            .values(attempts=OTPCode.attempts + 1)
+        ).rowcount
+        if not counted:
+            db.session.commit()
+            return LOCKED, None
+
+        if hmac.compare_digest(record.code_hash, self._hash(email, purpose, str(code or '').strip())):
+            if not consume:
+                # A right code is not a wrong guess; its attempt is given back
+                db.session.execute(
+                    update(OTPCode).where(OTPCode.id == record.id, OTPCode.code_hash == record.code_hash)
+                    .values(attempts=OTPCode.attempts - 1)
+                )
+                pending_password = record.pending_password
+                db.session.commit()
+                return VALID, pending_password
+            # Deleting only the row we checked means a replaced or already used code fails
+            consumed = db.session.execute(
+                delete(OTPCode).where(OTPCode.id == record.id, OTPCode.code_hash == record.code_hash)
+            ).rowcount
+            pending_password = record.pending_password
+            db.session.commit()
+            return (VALID, pending_password) if consumed else (INVALID, None)
+
+        db.session.commit()
+        return INVALID, None
+
+    def consume(self, email, purpose, code):
+        """
+        Use up a code already checked with verify(consume=False), in the
+        caller's transaction (no commit), so it is gone exactly when the
+        caller's changes commit.
+
+        Args:
+            email (str): Address the code was sent to.
+            purpose (str): Code purpose.
+            code (str): Code entered by the user.
+
+        Returns:
+            bool: False if the code was used, replaced or expired meanwhile.
+        """
+        email = normalize_email(email)
+        return db.session.execute(
+            delete(OTPCode).where(OTPCode.email == email, OTPCode.purpose == purpose,
+                                  OTPCode.code_hash == self._hash(email, purpose, str(code or '').strip()),
+                                  OTPCode.expires_at > _utcnow())
+        ).rowcount > 0
+
+    def purge_expired(self):
+        """
+        Delete expired codes.
+
+        Returns:
+            int: Codes deleted.
+        """
+        deleted = db.session.execute(delete(OTPCode).where(OTPCode.expires_at <= _utcnow())).rowcount
+        db.session.commit()
+        return deleted
+
+
+def get_otp_store(app=None):
+    """
+    Get an OTP store configured for an app. The store keeps no state of its
+    own, so a new one per call is cheap.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        OTPStore: The store.
+    """
+    app = app or current_app._get_current_object()
+    return OTPStore.from_config(app.config)
@@ -0,0 +1,245 @@
+"""
+Description: Bounded executor for bcrypt password hashing and checking.
+bcrypt is deliberately CPU-heavy; running it on a small dedicated thread pool
+(bcrypt releases the GIL) keeps request threads free, and a cap on queued
+work sheds load with PasswordHasherBusyError instead of letting login
+latency climb without bound.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with the bounded executor, cost factor and
+                 queue metrics.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from flask import current_app
+
+DEFAULT_ROUNDS = 12
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_WAIT_TIMEOUT_SECONDS = 10.0
+
+EXTENSION_KEY = 'password_hasher'
+
+_default_hasher = None
+_default_lock = threading.Lock()
+
+
+def _default_workers():
+    """One worker per CPU, at least two"""
+    return max(2, os.cpu_count() or 1)
+
+
+class PasswordHasherBusyError(Exception):
+    """
+    Raised when hashing work is refused because the queue is full or the
+    work did not finish in time. Routes answer these with 503.
+
+    Attributes:
+        retry_after (float): Suggested seconds before trying again.
+    """
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded thread pool.
+
+    Attributes:
+        rounds (int): bcrypt cost factor for new hashes.
+        workers (int): Hashes computed at once.
+        max_queue (int): Work items allowed to wait for a worker; beyond
+                         that new work is refused.
+        wait_timeout (float): Seconds a caller waits for its result.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=None, max_queue=DEFAULT_MAX_QUEUE,
+                 wait_timeout=DEFAULT_WAIT_TIMEOUT_SECONDS):
+        if not 4 <= rounds <= 31:
+            raise ValueError("rounds must be between 4 and 31")
+        self.rounds = rounds
+        self.workers = max(1, workers or _default_workers())
+        self.max_queue = max(0, max_queue)
+        self.wait_timeout = wait_timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        self._stats = {
+            'hashes': 0, 'verifies': 0, 'queued': 0, 'in_flight': 0,
+            'peak_queued': 0, 'rejected': 0, 'timeouts': 0, 'total_ms': 0.0
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build a hasher from BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS,
+        PASSWORD_HASH_MAX_QUEUE and PASSWORD_HASH_TIMEOUT_SECONDS.
+
+        Args:
+            config (Mapping): Flask app config.
+
+        Returns:
+            PasswordHasher: The new hasher.
+        """
+        workers = config.get('PASSWORD_HASH_WORKERS')
+        return cls(
+            rounds=int(config.get('BCRYPT_ROUNDS', DEFAULT_ROUNDS)),
+            workers=int(workers) if workers else None,
+            max_queue=int(config.get('PASSWORD_HASH_MAX_QUEUE', DEFAULT_MAX_QUEUE)),
+            wait_timeout=float(config.get('PASSWORD_HASH_TIMEOUT_SECONDS', DEFAULT_WAIT_TIMEOUT_SECONDS))
+        )
+
+    def _retry_after(self, waiting):
+        """Rough seconds until the queue drains, assuming ~0.25 s per hash"""
+        return max(1.0, (waiting / self.workers) * 0.25)
+
+    def _run(self, kind, fn, *args):
+        """Queue fn on the pool and wait for its result"""
+        with self._lock:
+            waiting = self._stats['queued']
+            if waiting >= self.max_queue and self._stats['in_flight'] >= self.workers:
+                self._stats['rejected'] += 1
+                raise PasswordHasherBusyError(
+                    "Too many sign-in requests, try again shortly",
+                    retry_after=self._retry_after(waiting)
+                )
+            self._stats['queued'] += 1
+            self._stats['peak_queued'] = max(self._stats['peak_queued'], self._stats['queued'])
+
+        def task():
+            with self._lock:
+                self._stats['queued'] -= 1
+                self._stats['in_flight'] += 1
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._stats['in_flight'] -= 1
+                    self._stats[kind] += 1
+                    self._stats['total_ms'] += (time.perf_counter() - started) * 1000
+
+        future = self._executor.submit(task)
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            # Drop it if it has not started; otherwise it finishes unobserved
+            if future.cancel():
+                with self._lock:
+                    self._stats['queued'] -= 1
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise PasswordHasherBusyError("Sign-in is taking too long, try again shortly")
+
+    def hash(self, password):
+        """
+        Hash a password with the configured cost factor.
+
+        Args:
+            password (str): Plain-text password.
+
+        Returns:
+            str: bcrypt hash.
+
+        Raises:
+            PasswordHasherBusyError: If the queue is full or the hash timed out.
+        """
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run('hashes', bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password, hashed):
+        """
+        Check a password against a stored hash.
+
+        Args:
+            password (str): Plain-text password.
+            hashed (str): Stored bcrypt hash.
+
+        Returns:
+            bool: True if they match.
+
+        Raises:
+            PasswordHasherBusyError: If the queue is full or the check timed out.
+        """
+        return self._run('verifies', bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        """
+        Whether a stored hash uses a different cost factor than configured.
+
+        Args:
+            hashed (str): Stored bcrypt hash ('$2b$12$...').
+
+        Returns:
+            bool: True if the hash should be replaced on next sign-in.
+        """
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    def stats(self):
+        """
+        Get queue and timing metrics.
+
+        Returns:
+            dict: hashes, verifies, queued (current queue depth), in_flight,
+                  peak_queued, rejected, timeouts, avg_ms, rounds, workers
+                  and max_queue.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        done = stats['hashes'] + stats['verifies']
+        stats['avg_ms'] = round(stats.pop('total_ms') / done, 1) if done else 0.0
+        stats.update(rounds=self.rounds, workers=self.workers, max_queue=self.max_queue)
+        return stats
+
+    def shutdown(self):
+        """Stop the worker threads once queued work is done"""
+        self._executor.shutdown(wait=True)
+
+
+def init_password_hasher(app):
+    """
+    Create the app's password hasher.
+
+    Args:
+        app (Flask): The application.
+
+    Returns:
+        PasswordHasher: The hasher.
+    """
+    hasher = PasswordHasher.from_config(app.config)
+    app.extensions[EXTENSION_KEY] = hasher
+    return hasher
+
+
+def get_password_hasher(app=None):
+    """
+    Get the app's password hasher; outside an app (scripts, unit tests) a
+    process-wide hasher with default settings is used.
+
+    Args:
+        app (Flask|None): The application; defaults to current_app.
+
+    Returns:
+        PasswordHasher: The hasher.
+    """
+    global _default_hasher
+    try:
+        app = app or current_app._get_current_object()
+    except RuntimeError:
+        app = None
+    hasher = app.extensions.get(EXTENSION_KEY) if app is not None else None
+    if hasher is not None:
+        return hasher
+
+    with _default_lock:
+        if _default_hasher is None:
+            _default_hasher = PasswordHasher()
+        return _default_hasher
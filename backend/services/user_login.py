@@ -1,9 +1,14 @@
 from models.user import User
 from database import db
-import bcrypt
 import jwt
 import datetime
+import logging
 from flask import current_app
+from services.password_hasher import get_password_hasher, PasswordHasherBusyError
+
+# Version of the JWT claims layout issued by generate_token
+TOKEN_CLAIMS_VERSION = 2
+
 class UserLoginServices:
     def __init__(self):
         self.current_user = None
@@ -15,15 +20,35 @@ class UserLoginServices:
         if user:
             # Verify the password matches
             # if user.password == password:  #need to hash password #hashed
-            if bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
+            # Checked on the bounded hashing pool; raises PasswordHasherBusyError when overloaded
+            hasher = get_password_hasher()
+            if hasher.verify(password, user.password):
                 self.current_user = user
+                if hasher.needs_rehash(user.password):
+                    self._rehash(user, password)
                 return True
         return False
 
+    def _rehash(self, user, password):
+        # Bring the stored hash up to the configured cost factor; best effort
+        try:
+            user.password = get_password_hasher().hash(password)
+            db.session.commit()
+        except PasswordHasherBusyError:
+            logging.info(f"Skipped password rehash for user {user.id}: hashing pool busy")
+
     def generate_token(self):
+        # Claims version 2 carries what the auth middleware needs, so it can
+        # authenticate without loading the user; 'tv' is checked for revocation
+        now = datetime.datetime.utcnow()
         token = jwt.encode({
+            'ver': TOKEN_CLAIMS_VERSION,
+            'user_id': self.current_user.id,
             'username': self.current_user.username,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7)
+            'is_admin': bool(self.current_user.is_admin),
+            'tv': self.current_user.token_version or 0,
+            'iat': now,
+            'exp': now + datetime.timedelta(days=7)
         }, current_app.config['SECRET_KEY'], algorithm='HS256')
         return token
         
@@ -1,17 +1,19 @@
 from datetime import datetime
-import random
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from database import db
+from models.otp_code import OTPCode
 from models.user import User
-import bcrypt
+from services.password_hasher import get_password_hasher
+from services.email_outbox import enqueue_email
+from services.email_templates import VERIFY_EMAIL, PASSWORD_RESET
+from services.otp_store import get_otp_store, VALID
+
+# The emails say codes expire in 10 minutes; one not sent by then is dropped
+OTP_EMAIL_TTL_SECONDS = 600
 
 
 class UserRegistrationService:
-    def __init__(self):
-        #instance otp used in send_otp needs to be initialized
-        self.instance_otp = None
+    # Keeps no per-registrant state: pending registrations and codes live in
+    # the OTP store, so one instance serves every request in every worker
 
     def user_exists(self, email):
         user = User.query.filter_by(email=email).first()
@@ -24,28 +26,29 @@ class UserRegistrationService:
         else:
             #add verification of dal id functionality here
             if(self.validate_email(email)):
-                #send otp to the email for verification
-                self.send_otp(email)
-                self.pending_email = email  #so that the user isn't created without verification
-                # self.pending_password = password  #so that the user isn't created without verification
-                hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-                self.pending_password = hashed_password.decode('utf-8')
+                # Hash first so a request shed by the hashing pool sends no OTP
+                pending_password = get_password_hasher().hash(password)
+                #send otp to the email for verification; the user isn't created until it is verified
+                self.send_otp(email, pending_password=pending_password)
                 return True
             return False
 
-    def verify_and_create_user(self, otp):
-        if self.check_otp(otp):
+    def verify_and_create_user(self, email, otp):
+        store = get_otp_store()
+        # The code is used up in the same commit as the new user, so a failed INSERT keeps it
+        outcome, pending_password = store.verify(email, OTPCode.REGISTER, otp, consume=False)
+        if outcome == VALID:
             display_name = None
             profile_picture_url = None
             reputation = 0
             registration_date = datetime.now()
-            username = self.pending_email.split('@')[0]   #generate username from email for now
+            username = email.split('@')[0]   #generate username from email for now
             university = "Dalhousie University"
 
             new_user = User(
                 username=username,
-                email=self.pending_email,
-                password=self.pending_password,
+                email=email,
+                password=pending_password,
                 display_name=display_name,
                 profile_picture_url=profile_picture_url,
                 reputation=reputation,
@@ -53,6 +56,10 @@ class UserRegistrationService:
                 university=university
             )
             db.session.add(new_user)
+            if not store.consume(email, OTPCode.REGISTER, otp):
+                # Used by a concurrent request meanwhile
+                db.session.rollback()
+                return False
             db.session.commit()
             return True
         return False
@@ -62,149 +69,38 @@ class UserRegistrationService:
             return True
         return False
 
-    def send_otp(self, email):
-        sender = "daloverflow@gmail.com"
-        app_password = "oaif xgfq wowp tqyx"
-        receiver = email
-        #generate an OTP to send
-        self.instance_otp = self.generate_otp()
-
-        msg = MIMEMultipart("alternative")
-        msg["From"] = sender
-        msg["To"] = receiver
-        msg["Subject"] = "Email verification for DalOverflow Registration"
+    def has_pending_registration(self, email):
+        return get_otp_store().has_pending(email, OTPCode.REGISTER)
 
-        html_body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; background-color: #f5f5f5; padding: 20px;">
-                <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 10px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
-                    <!-- Header -->
-                    <div style="background: linear-gradient(135deg, #fffacd 0%, #ffd700 100%); padding: 30px 20px; text-align: center;">
-                        <h1 style="color: #333; margin: 0; font-size: 28px;">DalOverflow</h1>
-                        <p style="color: #666; margin: 5px 0 0 0; font-size: 14px;">Welcome to our community!</p>
-                    </div>
-                    
-                    <!-- Content -->
-                    <div style="padding: 40px 30px;">
-                        <h2 style="color: #333; margin: 0 0 20px 0; font-size: 20px;">Verify Your Email</h2>
-                        <p style="color: #666; margin: 0 0 20px 0; font-size: 15px; line-height: 1.6;">
-                            Thank you for registering with DalOverflow! To complete your account setup, please use the verification code below:
-                        </p>
-                        
-                        <!-- OTP Box -->
-                        <div style="background-color: #f9f9f9; border: 2px solid #ffd700; border-radius: 8px; padding: 25px; text-align: center; margin: 30px 0;">
-                            <p style="color: #999; margin: 0 0 10px 0; font-size: 12px; text-transform: uppercase; letter-spacing: 2px;">Your Verification Code</p>
-                            <p style="color: #ffd700; margin: 0; font-size: 36px; font-weight: bold; letter-spacing: 3px; font-family: 'Courier New', monospace;">{str(self.instance_otp)}</p>
-                        </div>
-                        
-                        <p style="color: #666; margin: 20px 0; font-size: 14px;">
-                            This code will expire in 10 minutes. If you didn't request this verification, please ignore this email.
-                        </p>
-                        
-                        <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-                        
-                        <p style="color: #999; margin: 0; font-size: 12px;">
-                            If you have any questions, please contact our support team.
-                        </p>
-                    </div>
-                    
-                    <!-- Footer -->
-                    <div style="background-color: #f9f9f9; padding: 20px 30px; text-align: center; border-top: 1px solid #eee;">
-                        <p style="color: #999; margin: 0; font-size: 12px;">
-                            &copy; 2024 DalOverflow. All rights reserved.
-                        </p>
-                    </div>
-                </div>
-            </body>
-        </html>
-        """
-        
-        msg.attach(MIMEText(html_body, "html"))
+    def send_otp(self, email, pending_password=None):
+        # A resend (no password given) keeps the password chosen at registration
+        code = get_otp_store().issue(email, OTPCode.REGISTER, pending_password=pending_password,
+                                     keep_pending_password=pending_password is None)
+        # Queued for the background email sender; the request does no SMTP
+        enqueue_email(VERIFY_EMAIL, email, ttl_seconds=OTP_EMAIL_TTL_SECONDS, code=code)
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender, app_password)
-            server.send_message(msg)
-            
     def reset_otp(self, email):
-        sender = "daloverflow@gmail.com"
-        app_password = "oaif xgfq wowp tqyx"
-        receiver = email
-        #generate an OTP to send
-        self.instance_otp = self.generate_otp()
-
-        msg = MIMEMultipart("alternative")
-        msg["From"] = sender
-        msg["To"] = receiver
-        msg["Subject"] = "Password Reset - DalOverflow"
+        code = get_otp_store().issue(email, OTPCode.RESET)
+        enqueue_email(PASSWORD_RESET, email, ttl_seconds=OTP_EMAIL_TTL_SECONDS, code=code)
 
-        html_body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; background-color: #f5f5f5; padding: 20px;">
-                <div style="max-width: 600px; margin: 0 auto; background-color: white; border-radius: 10px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
-                    <!-- Header -->
-                    <div style="background: linear-gradient(135deg, #fffacd 0%, #ffd700 100%); padding: 30px 20px; text-align: center;">
-                        <h1 style="color: #333; margin: 0; font-size: 28px;">DalOverflow</h1>
-                        <p style="color: #666; margin: 5px 0 0 0; font-size: 14px;">Password Reset Request</p>
-                    </div>
-                    
-                    <!-- Content -->
-                    <div style="padding: 40px 30px;">
-                        <h2 style="color: #333; margin: 0 0 20px 0; font-size: 20px;">Reset Your Password</h2>
-                        <p style="color: #666; margin: 0 0 20px 0; font-size: 15px; line-height: 1.6;">
-                            We received a request to reset your password. Use the code below to proceed:
-                        </p>
-                        
-                        <!-- OTP Box -->
-                        <div style="background-color: #f9f9f9; border: 2px solid #ffd700; border-radius: 8px; padding: 25px; text-align: center; margin: 30px 0;">
-                            <p style="color: #999; margin: 0 0 10px 0; font-size: 12px; text-transform: uppercase; letter-spacing: 2px;">Your Reset Code</p>
-                            <p style="color: #ffd700; margin: 0; font-size: 36px; font-weight: bold; letter-spacing: 3px; font-family: 'Courier New', monospace;">{str(self.instance_otp)}</p>
-                        </div>
-                        
-                        <p style="color: #666; margin: 20px 0; font-size: 14px;">
-                            This code will expire in 10 minutes. If you didn't request a password reset, please ignore this email and your account will remain secure.
-                        </p>
-                        
-                        <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-                        
-                        <p style="color: #999; margin: 0; font-size: 12px;">
-                            For security reasons, never share this code with anyone.
-                        </p>
-                    </div>
-                    
-                    <!-- Footer -->
-                    <div style="background-color: #f9f9f9; padding: 20px 30px; text-align: center; border-top: 1px solid #eee;">
-                        <p style="color: #999; margin: 0; font-size: 12px;">
-                            &copy; 2024 DalOverflow. All rights reserved.
-                        </p>
-                    </div>
-                </div>
-            </body>
-        </html>
-        """
-        
-        msg.attach(MIMEText(html_body, "html"))
-
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender, app_password)
-            server.send_message(msg)
-            
     def reset_password(self, email, otp, new_password):
-        if not self.check_otp(otp):
-            return False
-        
         user = User.query.filter_by(email=email).first()
-        if user:
-            hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-            user.password = hashed_password.decode('utf-8')
-            db.session.commit()
-            return True
-        return False
-        
-
-    def generate_otp(self):
-        return random.randint(100000, 999999)
+        if not user:
+            return False
+        # Wrong codes are turned away before any bcrypt work; a right one is
+        # kept until the new password is stored, so a reset shed by the
+        # hashing pool can be retried with the same code
+        store = get_otp_store()
+        outcome, _ = store.verify(email, OTPCode.RESET, otp, consume=False)
+        if outcome != VALID:
+            return False
 
-    def check_otp(self, user_otp):
-        return str(self.instance_otp) == user_otp
-    
-    
+        new_hash = get_password_hasher().hash(new_password)
+        if not store.consume(email, OTPCode.RESET, otp):
+            db.session.rollback()
+            return False
+        user.password = new_hash
+        db.session.commit()
+        # Tokens issued with the old password stop working
+        User.revoke_tokens(user.id)
+        return True
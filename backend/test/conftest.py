@@ -0,0 +1,11 @@
+"""
+Description: pytest setup shared by all backend tests.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created; apps built in tests start no background threads.
+"""
+import os
+
+# Read when config/config_postgres.py is imported, so set before any test imports the app
+os.environ['BACKGROUND_WORKERS_ENABLED'] = 'false'
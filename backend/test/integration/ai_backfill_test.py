@@ -0,0 +1,167 @@
+"""
+Description: Integration tests for the AI answer backfill.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created paging, cache reuse, pause/resume and CLI tests.
+    2026-10-19 - Failed questions retried; counters committed with their page.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.backfill_checkpoint import BackfillCheckpoint
+from models.question import Question
+from services.ai_backfill import AIAnswerBackfill, RateLimiter
+from services.ai_response_cache import AIResponseCache
+from services.circuit_breaker import CircuitBreaker
+from services.gemini_client_pool import GeminiClientPool, set_gemini_pool
+from services.gemini_services import GeminiServices
+from services.fake_gemini import FakeGeminiClient
+
+
+class AIBackfillTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for AIAnswerBackfill"""
+
+    def setUp(self):
+        super().setUp()
+        user = self.create_test_user()
+        self.question_ids = [
+            self.create_test_question(user_id=user.id, title=f"Backlog question {n}", body=f"Body {n}").id
+            for n in range(5)
+        ]
+        answered = Question.get_by_id(self.question_ids[1])
+        answered.ai_generated_ans = "<p>Already answered</p>"
+        db.session.commit()
+
+        self.fake = FakeGeminiClient(
+            responder=lambda model, contents, config: f"<p>Answer {contents.count('Backlog')}</p>"
+        )
+        self.pool = GeminiClientPool(self.fake)
+        self.cache = AIResponseCache()
+
+    def _backfill(self, **kwargs):
+        kwargs.setdefault('rate_per_second', 0)
+        return AIAnswerBackfill(GeminiServices(pool=self.pool), self.cache, **kwargs)
+
+    def test_fills_unanswered_questions_in_pages(self):
+        """Test that every question without an AI answer is filled, page by page"""
+        pages = []
+
+        checkpoint = self._backfill(page_size=2, concurrency=2).run(progress=lambda c: pages.append(c.last_id))
+
+        self.assertEqual(checkpoint.status, BackfillCheckpoint.DONE)
+        self.assertEqual((checkpoint.processed, checkpoint.generated, checkpoint.failed), (4, 4, 0))
+        self.assertEqual(pages[:2], [self.question_ids[2], self.question_ids[4]])
+        self.assertEqual(self.fake.calls, 4)
+        db.session.expire_all()
+        self.assertEqual(Question.get_by_id(self.question_ids[1]).ai_generated_ans, "<p>Already answered</p>")
+        self.assertTrue(all(Question.get_by_id(qid).ai_generated_ans for qid in self.question_ids))
+
+    def test_cached_answers_reused(self):
+        """Test that answers already in the AI response cache need no Gemini call"""
+        question = Question.get_by_id(self.question_ids[0])
+        self.cache.generate_answer(GeminiServices(pool=self.pool), question.title, question.body)
+
+        checkpoint = self._backfill().run()
+
+        self.assertEqual((checkpoint.cached, checkpoint.generated), (1, 3))
+        self.assertEqual(self.fake.calls, 4)
+
+    def test_limit_and_resume(self):
+        """Test that a limited run stops part way and the next run resumes after it"""
+        first = self._backfill(page_size=10).run(limit=2)
+        self.assertEqual((first.processed, first.status), (2, BackfillCheckpoint.RUNNING))
+
+        second = self._backfill(page_size=10).run()
+
+        self.assertEqual((second.processed, second.generated, second.status), (4, 4, BackfillCheckpoint.DONE))
+        self.assertEqual(self.fake.calls, 4)
+
+    def test_pauses_while_gemini_unavailable(self):
+        """Test that an open circuit pauses the run, which later resumes where it stopped"""
+        self.pool.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        self.fake.fail_next(1)
+
+        paused = self._backfill(page_size=10, concurrency=1).run()
+
+        self.assertEqual(paused.status, BackfillCheckpoint.PAUSED)
+        self.assertEqual(paused.failed, 1)
+        self.assertEqual(paused.processed, 1)
+        self.assertEqual(paused.last_id, self.question_ids[2] - 1)
+
+        self.pool.breaker = CircuitBreaker()
+        resumed = self._backfill(page_size=10).run()
+
+        # The failed question is retried first, then the rest of the page
+        self.assertEqual(resumed.status, BackfillCheckpoint.DONE)
+        self.assertEqual((resumed.generated, resumed.failed, resumed.get_failed_ids()), (4, 0, []))
+        db.session.expire_all()
+        self.assertTrue(Question.get_by_id(self.question_ids[0]).ai_generated_ans)
+
+    def test_failed_question_retried_next_run(self):
+        """Test that a question whose answer failed is recorded and retried, not skipped for good"""
+        self.fake.fail_next(1)
+
+        first = self._backfill(page_size=10, concurrency=1).run()
+
+        self.assertEqual(first.status, BackfillCheckpoint.DONE)
+        self.assertEqual((first.generated, first.failed), (3, 1))
+        self.assertEqual(first.get_failed_ids(), [self.question_ids[0]])
+
+        second = self._backfill(page_size=10).run()
+
+        self.assertEqual((second.generated, second.failed, second.processed), (4, 0, 4))
+        db.session.expire_all()
+        self.assertTrue(Question.get_by_id(self.question_ids[0]).ai_generated_ans)
+
+    def test_counters_committed_with_page(self):
+        """Test that a page interrupted before its commit leaves no counts behind"""
+        backfill = self._backfill(page_size=10)
+        original = backfill._fill
+
+        def crash(rows, executor):
+            original(rows, executor)
+            raise RuntimeError('Crashed before the page commit')
+
+        backfill._fill = crash
+        with self.assertRaises(RuntimeError):
+            backfill.run()
+        db.session.rollback()
+
+        checkpoint = BackfillCheckpoint.query.one()
+        self.assertEqual((checkpoint.last_id, checkpoint.processed, checkpoint.generated), (0, 0, 0))
+        self.assertEqual(Question.query.filter(Question.ai_generated_ans.isnot(None)).count(), 1)
+
+        resumed = self._backfill(page_size=10).run()
+        self.assertEqual((resumed.processed, resumed.generated, resumed.cached), (4, 0, 4))
+
+    def test_cli_command(self):
+        """Test that `flask ai-backfill` runs the backfill and reports progress"""
+        set_gemini_pool(self.app, self.pool)
+        try:
+            result = self.app.test_cli_runner().invoke(args=['ai-backfill', '--rate', '0', '--page-size', '3'])
+        finally:
+            set_gemini_pool(self.app, None)
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("status: done", result.output)
+        self.assertEqual(BackfillCheckpoint.query.one().generated, 4)
+
+    def test_rate_limiter_spaces_calls(self):
+        """Test that calls beyond the rate wait for their turn"""
+        now = [0.0]
+        sleeps = []
+        limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleeps.append)
+
+        for _ in range(3):
+            limiter.acquire()
+
+        self.assertEqual(sleeps, [0.25, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+"""
+Description: Integration tests for the persistent AI response cache.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created key, TTL, eviction and question population tests.
+    2026-10-19 - Stored answers need a logged in caller and the stored question text.
+    2026-10-19 - Edited question without a cached answer queues a new one.
+    2026-10-19 - Lookups and stores leave the caller's session uncommitted.
+    2026-10-19 - Stats endpoint called as an administrator.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from datetime import timedelta
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.ai_response import AIResponse
+from models.background_job import BackgroundJob
+from models.question import Question
+from services.ai_response_cache import (
+    AIResponseCache, answer_cache_key, summary_cache_key, get_ai_cache
+)
+from services.gemini_client_pool import GeminiClientPool, set_gemini_pool
+from services.fake_gemini import FakeGeminiClient
+from services.gemini_services import GeminiServices, GEMINI_MODEL
+from services.user_login import UserLoginServices
+
+
+class AIResponseCacheTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for AIResponseCache"""
+
+    def setUp(self):
+        super().setUp()
+        self.fake = FakeGeminiClient(text="<p>Cached answer</p>")
+        self.pool = GeminiClientPool(self.fake)
+        self.service = GeminiServices(pool=self.pool)
+
+    def test_answer_key_normalizes_whitespace(self):
+        """Test that whitespace differences share a key but content changes do not"""
+        key = answer_cache_key(GEMINI_MODEL, 'Reverse a list', 'In  Python\n please')
+        self.assertEqual(key, answer_cache_key(GEMINI_MODEL, ' Reverse a list ', 'In Python please'))
+        self.assertNotEqual(key, answer_cache_key(GEMINI_MODEL, 'Reverse a list', 'In Java please'))
+        self.assertNotEqual(key, answer_cache_key('other-model', 'Reverse a list', 'In Python please'))
+
+    def test_summary_key_depends_on_order(self):
+        """Test that summary keys follow the order of the answer bodies"""
+        first = summary_cache_key(GEMINI_MODEL, [{'body': 'a'}, {'body': 'b'}])
+        self.assertEqual(first, summary_cache_key(GEMINI_MODEL, [{'body': 'a', 'comments': []}, {'body': 'b'}]))
+        self.assertNotEqual(first, summary_cache_key(GEMINI_MODEL, [{'body': 'b'}, {'body': 'a'}]))
+
+    def test_answer_generated_once(self):
+        """Test that a repeated answer request is served from the cache"""
+        cache = AIResponseCache()
+
+        first = cache.generate_answer(self.service, 'Title', 'Body')
+        second = cache.generate_answer(self.service, 'Title', 'Body')
+
+        self.assertEqual(first, ('<p>Cached answer</p>', False, False))
+        self.assertEqual(second, ('<p>Cached answer</p>', False, True))
+        self.assertEqual(self.fake.calls, 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+        self.assertEqual(AIResponse.query.one().hit_count, 1)
+
+    def test_summary_generated_once(self):
+        """Test that a repeated summary request is served from the cache"""
+        cache = AIResponseCache()
+        answers = [{'body': 'first answer'}, {'body': 'second answer'}]
+
+        cache.summarize_answers(self.service, answers)
+        summary, _, cached = cache.summarize_answers(self.service, answers)
+
+        self.assertTrue(cached)
+        self.assertEqual(summary, '<p>Cached answer</p>')
+        self.assertEqual(self.fake.calls, 1)
+
+    def test_expired_entries_are_regenerated(self):
+        """Test that entries past their TTL are not served"""
+        cache = AIResponseCache(ttl_seconds=60)
+        cache.generate_answer(self.service, 'Title', 'Body')
+        entry = AIResponse.query.one()
+        entry.expires_at = entry.expires_at - timedelta(seconds=120)
+        db.session.commit()
+
+        _, _, cached = cache.generate_answer(self.service, 'Title', 'Body')
+
+        self.assertFalse(cached)
+        self.assertEqual(self.fake.calls, 2)
+        self.assertEqual(AIResponse.query.count(), 1)
+
+    def test_least_recently_used_evicted(self):
+        """Test that the cache keeps at most max_entries rows"""
+        cache = AIResponseCache(max_entries=2)
+        for title in ('one', 'two', 'three'):
+            cache.generate_answer(self.service, title, 'Body')
+
+        self.assertEqual(AIResponse.query.count(), 2)
+        self.assertIsNone(cache.peek(answer_cache_key(GEMINI_MODEL, 'one', 'Body')))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_lookup_leaves_caller_session_alone(self):
+        """Test that hits and stores do not flush or commit the caller's pending changes"""
+        user = self.create_test_user()
+        question = self.create_test_question(user_id=user.id, title='Original title')
+        db.session.commit()
+        cache = AIResponseCache()
+        cache.put(answer_cache_key(GEMINI_MODEL, 'Title', 'Body'), 'answer', GEMINI_MODEL, 'Stored')
+
+        question.title = 'Uncommitted title'
+        self.assertEqual(cache.get(answer_cache_key(GEMINI_MODEL, 'Title', 'Body')), ('Stored', False))
+        cache.put(answer_cache_key(GEMINI_MODEL, 'Other', 'Body'), 'answer', GEMINI_MODEL, 'Also stored')
+        self.assertIn(question, db.session.dirty)
+        db.session.rollback()
+
+        self.assertEqual(db.session.get(Question, question.id).title, 'Original title')
+        self.assertEqual(sorted(entry.hit_count for entry in AIResponse.query.all()), [0, 1])
+
+    def test_question_filled_from_cache(self):
+        """Test that answering by question_id stores the answer and new questions reuse it"""
+        user = self.create_test_user()
+        question = self.create_test_question(
+            user_id=user.id,
+            title="Cached question title",
+            body="A body long enough to be a valid question."
+        )
+        db.session.commit()
+        question_id, title, body, user_id = question.id, question.title, question.body, user.id
+        login = UserLoginServices()
+        login.current_user = user
+        headers = {'Authorization': f'Bearer {login.generate_token()}'}
+
+        set_gemini_pool(self.app, self.pool)
+        try:
+            response = self.client.post('/api/ai/answer', json={
+                'question_id': question_id, 'title': title, 'body': body
+            }, headers=headers)
+        finally:
+            set_gemini_pool(self.app, None)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Question.get_by_id(question_id).ai_generated_ans, '<p>Cached answer</p>')
+
+        response = self.client.post('/api/questions/', json={
+            'user_id': user_id, 'title': title, 'body': body
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()['question']['ai_generated_ans'], '<p>Cached answer</p>')
+        self.assertEqual(self.fake.calls, 1)
+
+    def test_question_answer_ignores_client_text(self):
+        """Test that a question_id answer uses the stored question and is not saved without login"""
+        prompts = []
+
+        def responder(model, contents, config):
+            prompts.append(str(contents))
+            return '<p>Answer</p>'
+        pool = GeminiClientPool(FakeGeminiClient(responder=responder))
+        user = self.create_test_user()
+        question = self.create_test_question(user_id=user.id, title="Real title", body="Real body of the question.")
+        db.session.commit()
+        question_id = question.id
+
+        set_gemini_pool(self.app, pool)
+        try:
+            response = self.client.post('/api/ai/answer', json={
+                'question_id': question_id, 'title': 'Injected title', 'body': 'Injected body'
+            })
+            missing = self.client.post('/api/ai/answer', json={'question_id': 99999, 'title': 'T'})
+        finally:
+            set_gemini_pool(self.app, None)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['title'], 'Real title')
+        self.assertIn('Real title', prompts[0])
+        self.assertNotIn('Injected', prompts[0])
+        self.assertIsNone(Question.get_by_id(question_id).ai_generated_ans)
+        self.assertEqual(missing.status_code, 404)
+
+    def test_edited_question_queues_new_answer(self):
+        """Test that an edit changing the prompt, with no cached answer, queues AI generation"""
+        user = self.create_test_user()
+        question = self.create_test_question(user_id=user.id, title="Before edit",
+                                             body="A body long enough to be a valid question.")
+        question.ai_generated_ans = '<p>Old answer</p>'
+        db.session.commit()
+        question_id = question.id
+        login = UserLoginServices()
+        login.current_user = user
+
+        response = self.client.put(f'/api/questions/{question_id}', json={'title': 'After edit'},
+                                   headers={'Authorization': f'Bearer {login.generate_token()}'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(Question.get_by_id(question_id).ai_generated_ans)
+        job = BackgroundJob.query.filter_by(dedupe_key=f'ai_answer:{question_id}').one()
+        self.assertEqual((job.status, job.get_payload()), (BackgroundJob.PENDING, {'question_id': question_id}))
+
+    def test_stats_endpoint(self):
+        """Test GET /api/ai/cache/stats reports cache metrics"""
+        get_ai_cache(self.app).generate_answer(self.service, 'Title', 'Body')
+        admin = self.create_test_user(username='cacheadmin', email='cacheadmin@dal.ca')
+        admin.is_admin = True
+        db.session.commit()
+        login = UserLoginServices()
+        login.current_user = admin
+
+        response = self.client.get('/api/ai/cache/stats',
+                                   headers={'Authorization': f'Bearer {login.generate_token()}'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.get_json()['entries'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
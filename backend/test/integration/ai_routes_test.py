@@ -1,13 +1,29 @@
 import unittest
 import sys
 import os
+import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from test.test_base import DatabaseTestCase, TestDataCreation
+from datetime import timedelta
 from unittest.mock import patch
+from database import db
+from models.ai_response import AIResponse
+from services.circuit_breaker import CircuitBreaker
+from services.gemini_client_pool import GeminiClientPool, set_gemini_pool
+from services.fake_gemini import FakeGeminiClient
+from services.user_login import UserLoginServices
 
 
 class AiRoutesTestCase(DatabaseTestCase, TestDataCreation):
+
+    def _admin_headers(self):
+        admin = self.create_test_user(username='aiadmin', email='aiadmin@dal.ca')
+        admin.is_admin = True
+        db.session.commit()
+        login = UserLoginServices()
+        login.current_user = admin
+        return {'Authorization': f'Bearer {login.generate_token()}'}
     
     @patch('routes.gemini_ai_routes.GeminiServices.generate_answer')
     def test_post_ai_ans_success(self, mock_generate):
@@ -61,6 +77,119 @@ class AiRoutesTestCase(DatabaseTestCase, TestDataCreation):
         self.assertIn('summary', data)
         self.assertEqual(data['summary'], "<p>This is a summary of the best answer.</p>")
         mock_summarize.assert_called_once_with(payload['answers'])
+
+    def test_ai_answer_with_fake_transport(self):
+        """Test POST /api/ai/answer end to end through the shared pool and fake client"""
+        pool = GeminiClientPool(FakeGeminiClient(text="<p>Offline answer</p>"))
+        set_gemini_pool(self.app, pool)
+        try:
+            payload = {'title': 'How to create a list in Python?', 'body': 'details'}
+            first = self.client.post('/api/ai/answer', json=payload)
+            second = self.client.post('/api/ai/answer', json=payload)
+        finally:
+            set_gemini_pool(self.app, None)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.get_json()['answer'], "<p>Offline answer</p>")
+        self.assertEqual(second.status_code, 200)
+        self.assertFalse(first.get_json()['cached'])
+        # The repeat is served from the AI response cache
+        self.assertTrue(second.get_json()['cached'])
+        self.assertEqual(pool.stats()['calls'], 1)
+
+    def _sse_events(self, response):
+        """Parse a text/event-stream body into (event, data) pairs"""
+        events = []
+        for block in response.get_data(as_text=True).strip().split('\n\n'):
+            lines = dict(line.split(': ', 1) for line in block.split('\n'))
+            events.append((lines['event'], json.loads(lines['data'])))
+        return events
+
+    def test_stream_ai_answer(self):
+        """Test POST /api/ai/answer/stream sends chunks, then serves the cached answer"""
+        pool = GeminiClientPool(FakeGeminiClient(text="<p>Streamed offline answer</p>", stream_chunk_size=8))
+        set_gemini_pool(self.app, pool)
+        try:
+            payload = {'title': 'How to stream?', 'body': 'details'}
+            first = self.client.post('/api/ai/answer/stream', json=payload)
+            first_events = self._sse_events(first)
+            second_events = self._sse_events(self.client.post('/api/ai/answer/stream', json=payload))
+        finally:
+            set_gemini_pool(self.app, None)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.mimetype, 'text/event-stream')
+        chunks = [data['text'] for event, data in first_events if event == 'chunk']
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(first_events[-1], ('done', {
+            'answer': "<p>Streamed offline answer</p>", 'is_truncated': False, 'cached': False
+        }))
+        self.assertEqual(second_events[-1][1]['cached'], True)
+        self.assertEqual(pool.stats()['calls'], 1)
+
+    def test_ai_answer_503_while_breaker_open(self):
+        """Test that once Gemini keeps failing, requests get 503 without calling it"""
+        fake = FakeGeminiClient()
+        pool = GeminiClientPool(fake, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30))
+        fake.fail_next(1)
+        set_gemini_pool(self.app, pool)
+        try:
+            payload = {'title': 'Is Gemini up?', 'body': 'details'}
+            failed = self.client.post('/api/ai/answer', json=payload)
+            rejected = self.client.post('/api/ai/answer', json=payload)
+            stats = self.client.get('/api/ai/stats', headers=self._admin_headers()).get_json()
+        finally:
+            set_gemini_pool(self.app, None)
+
+        self.assertEqual(failed.status_code, 500)
+        self.assertEqual(rejected.status_code, 503)
+        self.assertEqual(rejected.headers['Retry-After'], '30')
+        self.assertEqual(fake.calls, 1)
+        self.assertEqual(stats['pool']['breaker']['state'], 'open')
+
+    def test_ai_answer_stale_cache_fallback(self):
+        """Test that an expired cached answer is served when Gemini fails"""
+        fake = FakeGeminiClient(text="<p>Earlier answer</p>")
+        set_gemini_pool(self.app, GeminiClientPool(fake))
+        try:
+            payload = {'title': 'Fallback please', 'body': 'details'}
+            self.client.post('/api/ai/answer', json=payload)
+            entry = AIResponse.query.one()
+            # Expired an hour ago, still within the stale grace period
+            entry.expires_at = entry.expires_at - timedelta(days=7, hours=1)
+            db.session.commit()
+            fake.fail_next(1)
+
+            response = self.client.post('/api/ai/answer', json=payload)
+            cache_stats = self.client.get('/api/ai/cache/stats', headers=self._admin_headers()).get_json()
+        finally:
+            set_gemini_pool(self.app, None)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['answer'], "<p>Earlier answer</p>")
+        self.assertTrue(response.get_json()['cached'])
+        self.assertEqual(fake.calls, 2)
+        self.assertEqual(cache_stats['fallbacks'], 1)
+
+    def test_stats_for_admins_only(self):
+        """Test that the AI and cache stats need an administrator"""
+        for url in ('/api/ai/stats', '/api/ai/cache/stats'):
+            self.assertEqual(self.client.get(url).status_code, 401)
+        user = self.create_test_user(username='aiuser', email='aiuser@dal.ca')
+        db.session.commit()
+        login = UserLoginServices()
+        login.current_user = user
+        headers = {'Authorization': f'Bearer {login.generate_token()}'}
+        self.assertEqual(self.client.get('/api/ai/stats', headers=headers).status_code, 403)
+
+        response = self.client.get('/api/ai/cache/stats', headers=self._admin_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.get_json())
+
+    def test_stream_ai_answer_missing_title(self):
+        """Test POST /api/ai/answer/stream fails without title"""
+        response = self.client.post('/api/ai/answer/stream', json={'body': 'details'})
+        self.assertEqual(response.status_code, 400)
         
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -4,6 +4,8 @@ Author: Saayonee Dhepe
 Created: 2025-11-23
 Last Modified: 
     2025-11-23 - Created initial answer routes tests.
+    2026-10-19 - Added pagination and sorting tests.
+    2026-10-19 - Added batch comments tests.
 """
 import unittest
 import sys
@@ -124,5 +126,118 @@ class AnswerRoutesTestCase(DatabaseTestCase, TestDataCreation):
         self.assertIn(self.comment2.id, comment_ids)
         self.assertEqual(len(data['comments']), 2)
 
+    def _create_answer_thread(self):
+        """Create extra answers with distinct timestamps, votes and an accepted answer"""
+        from datetime import datetime, timedelta
+        base_time = datetime(2025, 1, 1, 12, 0, 0)
+        self.answer.created_at = base_time
+        answers = [self.answer]
+        for index in range(1, 5):
+            answer = self.create_test_answer(
+                user_id=self.test_user.id,
+                question_id=self.test_question.id,
+                body=f"Extra answer number {index} for pagination."
+            )
+            answer.created_at = base_time + timedelta(minutes=index)
+            answers.append(answer)
+        answers[1].is_accepted = True
+        db.session.commit()
+
+        voter = self.create_test_user()
+        self.create_test_vote(answers[3].id, voter.id, 'upvote', 'answer')
+        self.create_test_vote(answers[3].id, self.test_user.id, 'upvote', 'answer')
+        self.create_test_vote(answers[2].id, voter.id, 'upvote', 'answer')
+        self.create_test_vote(answers[4].id, voter.id, 'downvote', 'answer')
+        db.session.commit()
+        return answers
+
+    def test_ans_sorted_by_score(self):
+        """Test default ordering is accepted first, then vote score"""
+        answers = self._create_answer_thread()
+
+        response = self.client.get(f'/api/answers/questions/{self.test_question.id}/answers')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        ids = [a['id'] for a in data['answers']]
+        self.assertEqual(ids, [answers[1].id, answers[3].id, answers[2].id, answers[0].id, answers[4].id])
+        self.assertTrue(data['answers'][0]['isAccepted'])
+        self.assertEqual(data['answers'][1]['score'], 2)
+        self.assertEqual(data['answers'][4]['score'], -1)
+        self.assertFalse(data['has_more'])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_ans_sorted_oldest_and_newest(self):
+        """Test oldest and newest ordering keep the accepted answer first"""
+        answers = self._create_answer_thread()
+        url = f'/api/answers/questions/{self.test_question.id}/answers'
+
+        oldest = [a['id'] for a in self.client.get(f'{url}?sort=oldest').get_json()['answers']]
+        newest = [a['id'] for a in self.client.get(f'{url}?sort=newest').get_json()['answers']]
+
+        self.assertEqual(oldest, [answers[1].id, answers[0].id, answers[2].id, answers[3].id, answers[4].id])
+        self.assertEqual(newest, [answers[1].id, answers[4].id, answers[3].id, answers[2].id, answers[0].id])
+
+    def test_ans_cursor_pagination(self):
+        """Test walking every page with the cursor returns each answer once, in order"""
+        self._create_answer_thread()
+        url = f'/api/answers/questions/{self.test_question.id}/answers'
+        expected = [a['id'] for a in self.client.get(url).get_json()['answers']]
+
+        seen = []
+        cursor = None
+        while True:
+            query = f'{url}?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            data = self.client.get(query).get_json()
+            self.assertLessEqual(len(data['answers']), 2)
+            seen.extend(a['id'] for a in data['answers'])
+            cursor = data['next_cursor']
+            if not data['has_more']:
+                break
+
+        self.assertEqual(seen, expected)
+
+    def test_ans_invalid_params(self):
+        """Test invalid sort, limit and cursor values are rejected"""
+        url = f'/api/answers/questions/{self.test_question.id}/answers'
+
+        self.assertEqual(self.client.get(f'{url}?sort=random').status_code, 400)
+        self.assertEqual(self.client.get(f'{url}?limit=0').status_code, 400)
+        self.assertEqual(self.client.get(f'{url}?cursor=not-a-cursor').status_code, 400)
+
+    def test_batch_comments_grouped_by_answer(self):
+        """Test GET /answers/comments returns the first N comments per answer with totals"""
+        answer_id = self.answer.id
+        other = self.create_test_answer(
+            user_id=self.test_user.id,
+            question_id=self.test_question.id,
+            body="Another answer that has no comments."
+        )
+        other_id = other.id
+        self.create_test_comment(answer_id, self.test_user.id, "Third comment on answer.")
+        db.session.commit()
+
+        response = self.client.get(
+            f'/api/answers/comments?answer_ids={answer_id},{other_id}&per_answer=2'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        threads = response.get_json()['comments']
+        self.assertEqual(threads[str(answer_id)]['total'], 3)
+        self.assertTrue(threads[str(answer_id)]['has_more'])
+        contents = [c['content'] for c in threads[str(answer_id)]['comments']]
+        self.assertEqual(contents, ["First comment on answer.", "Second comment on answer."])
+        self.assertIn('username', threads[str(answer_id)]['comments'][0]['user'])
+        self.assertEqual(threads[str(other_id)], {'comments': [], 'total': 0, 'has_more': False})
+
+    def test_batch_comments_invalid_ids(self):
+        """Test GET /answers/comments rejects missing or malformed ids"""
+        self.assertEqual(self.client.get('/api/answers/comments').status_code, 400)
+        self.assertEqual(self.client.get('/api/answers/comments?answer_ids=1,x').status_code, 400)
+        self.assertEqual(
+            self.client.get(f'/api/answers/comments?answer_ids={self.answer.id}&per_answer=0').status_code,
+            400
+        )
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Description: Integration tests for stored, incrementally refreshed answer summaries.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created coverage, refresh and endpoint tests.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.answer import Answer
+from models.answer_summary import AnswerSummary
+from models.background_job import BackgroundJob
+from services.answer_summary_service import ANSWER_SUMMARY_JOB, get_question_summary
+from services.job_queue import get_job_queue
+from services.gemini_client_pool import GeminiClientPool, set_gemini_pool
+from services.fake_gemini import FakeGeminiClient
+
+
+class AnswerSummaryTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for per-question answer summaries"""
+
+    def setUp(self):
+        super().setUp()
+        self.fake = FakeGeminiClient(responder=self._respond)
+        set_gemini_pool(self.app, GeminiClientPool(self.fake))
+
+        user = self.create_test_user()
+        question = self.create_test_question(
+            user_id=user.id,
+            title="Summary question",
+            body="A question body long enough to be valid."
+        )
+        self.answer_ids = [
+            self.create_test_answer(
+                user_id=user.id,
+                question_id=question.id,
+                body=f"<p>Answer number {index} explaining the approach.</p>"
+            ).id
+            for index in range(3)
+        ]
+        db.session.commit()
+        self.question_id = question.id
+        self.prompts = []
+
+    def tearDown(self):
+        set_gemini_pool(self.app, None)
+        super().tearDown()
+
+    def _respond(self, model, contents, config):
+        self.prompts.append(contents)
+        return f"<p>Summary {len(self.prompts)}</p>"
+
+    def test_summary_reused_while_answers_unchanged(self):
+        """Test that the stored summary is served without calling the API again"""
+        first = self.client.get(f'/api/ai/questions/{self.question_id}/summary')
+        second = self.client.get(f'/api/ai/questions/{self.question_id}/summary')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.get_json()['regenerated'])
+        self.assertFalse(second.get_json()['regenerated'])
+        self.assertEqual(second.get_json()['summary'], first.get_json()['summary'])
+        self.assertEqual(second.get_json()['answer_count'], 3)
+        self.assertEqual(self.fake.calls, 1)
+
+    def test_edit_refreshes_summary_in_background(self):
+        """Test that editing an answer queues a refresh that regenerates the summary"""
+        get_question_summary(self.question_id)
+
+        answer = db.session.get(Answer, self.answer_ids[0])
+        answer.update_answer("<p>An edited answer with a different approach.</p>")
+
+        job = BackgroundJob.query.filter_by(job_type=ANSWER_SUMMARY_JOB).one()
+        self.assertEqual(job.dedupe_key, f'{ANSWER_SUMMARY_JOB}:{self.question_id}')
+        get_job_queue(self.app).run_pending()
+
+        record = AnswerSummary.get_for_question(self.question_id)
+        self.assertEqual(record.get_coverage()[str(self.answer_ids[0])], 1)
+        self.assertIn("different approach", self.prompts[-1])
+        self.assertEqual(self.fake.calls, 2)
+
+    def test_unchanged_edit_queues_nothing(self):
+        """Test that resubmitting the same body does not touch the summary"""
+        get_question_summary(self.question_id)
+        answer = db.session.get(Answer, self.answer_ids[1])
+
+        answer.update_answer(answer.body)
+
+        self.assertEqual(BackgroundJob.query.filter_by(job_type=ANSWER_SUMMARY_JOB).count(), 0)
+
+    def test_unsummarized_question_not_refreshed(self):
+        """Test that edits to threads nobody summarized do not queue work"""
+        answer = db.session.get(Answer, self.answer_ids[0])
+        answer.update_answer("<p>An edited answer with a different approach.</p>")
+
+        self.assertEqual(BackgroundJob.query.filter_by(job_type=ANSWER_SUMMARY_JOB).count(), 0)
+
+    def test_long_thread_summarized_in_chunks(self):
+        """Test that threads over the chunk size are summarized map-reduce style"""
+        self.app.config['GEMINI_SUMMARY_CHUNK_CHARS'] = 120
+        try:
+            record, regenerated = get_question_summary(self.question_id)
+        finally:
+            self.app.config.pop('GEMINI_SUMMARY_CHUNK_CHARS')
+
+        self.assertTrue(regenerated)
+        # Two chunk summaries, then one summary of the summaries
+        self.assertEqual(self.fake.calls, 3)
+        # Chunk summaries are sent as compact text
+        self.assertIn("Answer #1: Summary 1", self.prompts[-1])
+        self.assertEqual(record.summary, "<p>Summary 3</p>")
+
+    def test_summary_errors(self):
+        """Test 404 for unknown questions and 400 when there are no answers"""
+        user = self.create_test_user()
+        empty = self.create_test_question(user_id=user.id, title="No answers", body="Nobody answered this one yet.")
+        db.session.commit()
+
+        self.assertEqual(self.client.get('/api/ai/questions/999999/summary').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/ai/questions/{empty.id}/summary').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Description: Integration tests for the email outbox and background sender.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created enqueue, batching, connection reuse, retry and expiry tests.
+    2026-10-19 - Sender does not start without SMTP credentials.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+import socket
+from datetime import timedelta
+from test.test_base import DatabaseTestCase
+from database import db
+from models.email_outbox import EmailOutbox
+from services.email_outbox import EmailOutboxSender, SMTPConnection, _utcnow, start_email_sender, EXTENSION_KEY
+from services.email_templates import VERIFY_EMAIL, PASSWORD_RESET
+from services.local_smtp import LocalSMTPServer
+
+
+def _unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class EmailOutboxTestCase(DatabaseTestCase):
+    """Integration tests for EmailOutboxSender against the local SMTP stand-in"""
+
+    def setUp(self):
+        super().setUp()
+        self.smtp = LocalSMTPServer().start()
+        self.outbox = self._sender(self.smtp.port)
+
+    def tearDown(self):
+        self.outbox.close()
+        self.smtp.stop()
+        super().tearDown()
+
+    def _sender(self, port, **kwargs):
+        kwargs.setdefault('batch_size', 2)
+        return EmailOutboxSender(
+            lambda: SMTPConnection('127.0.0.1', port, username='daloverflow', password='secret', use_ssl=False),
+            sender='daloverflow@dal.ca', **kwargs
+        )
+
+    def test_sender_needs_smtp_password(self):
+        """Test that the sender refuses to start with a username but no password"""
+        saved = {key: self.app.config.get(key) for key in ('SMTP_USERNAME', 'SMTP_PASSWORD')}
+        saved_outbox, self.app.extensions[EXTENSION_KEY] = self.app.extensions[EXTENSION_KEY], self.outbox
+        try:
+            self.app.config.update(SMTP_USERNAME='daloverflow@gmail.com', SMTP_PASSWORD=None)
+            self.assertFalse(start_email_sender(self.app))
+            self.assertEqual(self.outbox._threads, [])
+
+            self.app.config.update(SMTP_PASSWORD='secret')
+            self.assertTrue(start_email_sender(self.app))
+        finally:
+            self.outbox.stop()
+            self.app.config.update(saved)
+            self.app.extensions[EXTENSION_KEY] = saved_outbox
+
+    def test_register_only_enqueues(self):
+        """Test that registering queues the verification email instead of sending it"""
+        response = self.client.post('/api/auth/register', json={'email': 'newbie@dal.ca', 'password': 'pw12345'})
+
+        self.assertEqual(response.status_code, 200)
+        email = EmailOutbox.query.one()
+        self.assertEqual((email.kind, email.recipient, email.status), ('verify_email', 'newbie@dal.ca', 'pending'))
+        self.assertIsNotNone(email.send_before)
+        self.assertEqual(self.smtp.connections, 0)
+
+    def test_batches_share_one_connection(self):
+        """Test that every batch is sent over the same SMTP connection"""
+        for n in range(5):
+            self.outbox.enqueue(VERIFY_EMAIL, f'user{n}@dal.ca', code=100000 + n)
+
+        sent = self.outbox.run_pending()
+
+        self.assertEqual(sent, 5)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 5)
+        sender, recipients, message = self.smtp.messages[0]
+        self.assertEqual(recipients, ['user0@dal.ca'])
+        self.assertEqual(message['Subject'], VERIFY_EMAIL.subject)
+        self.assertIn('100000', message.get_body(('html',)).get_content())
+        self.assertEqual(EmailOutbox.query.filter_by(status=EmailOutbox.SENT).count(), 5)
+
+    def test_rejected_recipient_fails_permanently(self):
+        """Test that a refused recipient is not retried while the rest go out"""
+        self.smtp.reject.add('gone@dal.ca')
+        self.outbox.enqueue(PASSWORD_RESET, 'gone@dal.ca', code=111111)
+        self.outbox.enqueue(PASSWORD_RESET, 'here@dal.ca', code=222222)
+
+        self.assertEqual(self.outbox.run_pending(), 1)
+
+        failed = EmailOutbox.query.filter_by(recipient='gone@dal.ca').one()
+        self.assertEqual((failed.status, failed.attempts), (EmailOutbox.FAILED, 1))
+        self.assertEqual(EmailOutbox.query.filter_by(recipient='here@dal.ca').one().status, EmailOutbox.SENT)
+
+    def test_unreachable_server_retried_with_backoff(self):
+        """Test that connection failures reschedule the email until max_attempts"""
+        outbox = self._sender(_unused_port(), max_attempts=2, backoff_base=30)
+        email_id = outbox.enqueue(VERIFY_EMAIL, 'later@dal.ca', code=333333).id
+
+        self.assertEqual(outbox.run_pending(), 0)
+        email = db.session.get(EmailOutbox, email_id)
+        self.assertEqual((email.status, email.attempts), (EmailOutbox.PENDING, 1))
+        self.assertGreater(email.send_after, _utcnow() + timedelta(seconds=20))
+        self.assertTrue(email.last_error)
+
+        email.send_after = _utcnow()
+        db.session.commit()
+        outbox.run_pending()
+        db.session.expire_all()
+        self.assertEqual(db.session.get(EmailOutbox, email_id).status, EmailOutbox.FAILED)
+
+    def test_expired_email_dropped(self):
+        """Test that an email past its send_before is failed without sending"""
+        email = self.outbox.enqueue(VERIFY_EMAIL, 'late@dal.ca', ttl_seconds=600, code=444444)
+        email.send_before = _utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        self.assertEqual(self.outbox.run_pending(), 0)
+
+        self.assertEqual(EmailOutbox.query.one().status, EmailOutbox.FAILED)
+        self.assertEqual(self.smtp.messages, [])
+
+    def test_template_escapes_values(self):
+        """Test that rendered values are HTML-escaped into the pre-split template"""
+        body = VERIFY_EMAIL.render(code='<b>1</b>')
+
+        self.assertIn('&lt;b&gt;1&lt;/b&gt;', body)
+        self.assertEqual(VERIFY_EMAIL.fields, ('code',))
+
+
+if __name__ == '__main__':
+    unittest.main()
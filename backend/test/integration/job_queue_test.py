@@ -0,0 +1,127 @@
+"""
+Description: Integration tests for the background job queue and AI answer jobs.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created enqueue, retry and AI answer job tests.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from datetime import timedelta
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.background_job import BackgroundJob
+from models.question import Question
+from services.job_queue import JobQueue, get_job_queue
+from services.ai_answer_jobs import AI_ANSWER_JOB
+from services.gemini_client_pool import GeminiClientPool, set_gemini_pool
+from services.fake_gemini import FakeGeminiClient
+
+
+class JobQueueTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for JobQueue"""
+
+    def setUp(self):
+        super().setUp()
+        self.queue = JobQueue(backoff_base=30)
+        self.calls = []
+
+    def test_enqueue_dedupes_waiting_jobs(self):
+        """Test that a job with the same dedupe key is not queued twice"""
+        first = self.queue.enqueue('noop', {'n': 1}, dedupe_key='noop:1')
+        second = self.queue.enqueue('noop', {'n': 1}, dedupe_key='noop:1')
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(BackgroundJob.query.count(), 1)
+
+    def test_run_pending_runs_handler(self):
+        """Test that due jobs run once and are marked done"""
+        self.queue.register('record', lambda payload: self.calls.append(payload['n']))
+        self.queue.enqueue('record', {'n': 1})
+        self.queue.enqueue('record', {'n': 2})
+
+        self.assertEqual(self.queue.run_pending(), 2)
+
+        self.assertEqual(self.calls, [1, 2])
+        self.assertEqual(self.queue.stats()['done'], 2)
+        self.assertEqual(self.queue.run_pending(), 0)
+
+    def test_failed_job_retried_with_backoff(self):
+        """Test that a failure reschedules the job with exponential backoff"""
+        def flaky(payload):
+            self.calls.append(1)
+            raise RuntimeError("API unavailable")
+
+        self.queue.register('flaky', flaky)
+        job_id = self.queue.enqueue('flaky', max_attempts=3).id
+
+        self.queue.run_pending()
+        job = db.session.get(BackgroundJob, job_id)
+        self.assertEqual((job.status, job.attempts, job.last_error), ('pending', 1, 'API unavailable'))
+        self.assertGreater(job.run_after - job.updated_at.replace(tzinfo=None), timedelta(seconds=25))
+
+        # Not due yet, so nothing runs
+        self.assertEqual(self.queue.run_pending(), 0)
+        self.assertEqual(self.queue.backoff(1), 30)
+        self.assertEqual(self.queue.backoff(3), 120)
+
+    def test_job_fails_after_max_attempts(self):
+        """Test that the last failed attempt marks the job failed"""
+        self.queue.register('broken', lambda payload: 1 / 0)
+        job_id = self.queue.enqueue('broken', max_attempts=2).id
+
+        for _ in range(2):
+            job = db.session.get(BackgroundJob, job_id)
+            job.run_after = job.run_after - timedelta(hours=1)
+            db.session.commit()
+            self.queue.run_pending()
+
+        job = db.session.get(BackgroundJob, job_id)
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+    def test_expired_lease_is_reclaimed(self):
+        """Test that a job left running by a dead worker is picked up again"""
+        self.queue.register('record', lambda payload: self.calls.append(payload['n']))
+        job_id = self.queue.enqueue('record', {'n': 7}).id
+        self.assertIsNotNone(self.queue.claim_next())
+        self.assertIsNone(self.queue.claim_next())
+
+        job = db.session.get(BackgroundJob, job_id)
+        job.locked_at = job.locked_at - timedelta(hours=1)
+        db.session.commit()
+
+        self.assertEqual(self.queue.run_pending(), 1)
+        self.assertEqual(self.calls, [7])
+
+    def test_new_question_gets_ai_answer(self):
+        """Test that creating a question queues its AI answer and the job stores it"""
+        user = self.create_test_user()
+        user_id = user.id
+
+        response = self.client.post('/api/questions/', json={
+            'user_id': user_id,
+            'title': 'Queued AI answer question',
+            'body': 'A body long enough to be a valid question.'
+        })
+        self.assertEqual(response.status_code, 201)
+        question_id = response.get_json()['question']['id']
+
+        job = BackgroundJob.query.filter_by(job_type=AI_ANSWER_JOB).one()
+        self.assertEqual(job.dedupe_key, f'{AI_ANSWER_JOB}:{question_id}')
+
+        pool = GeminiClientPool(FakeGeminiClient(text='<p>Background answer</p>'))
+        set_gemini_pool(self.app, pool)
+        try:
+            self.assertEqual(get_job_queue(self.app).run_pending(), 1)
+        finally:
+            set_gemini_pool(self.app, None)
+
+        self.assertEqual(Question.get_by_id(question_id).ai_generated_ans, '<p>Background answer</p>')
+        self.assertEqual(db.session.get(BackgroundJob, job.id).status, 'done')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,17 +4,22 @@ Author: Saayonee Dhepe
 Created: 2025-12-03
 Last Modified: 
     2025-12-03 - Created initial login routes integration tests.
+    2026-10-19 - Added password hashing load shedding test (Bryan Vela).
+    2026-10-19 - Hashing stats need an administrator (Bryan Vela).
 """
 import unittest
 import sys
 import os
 import bcrypt
 from datetime import datetime
+from unittest.mock import patch
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) )
 
 from test.test_base import DatabaseTestCase
 from database import db
 from models.user import User
+from services.password_hasher import PasswordHasher, PasswordHasherBusyError
+from services.user_login import UserLoginServices
 
 
 class LoginRoutesTestCase(DatabaseTestCase):
@@ -44,6 +49,11 @@ class LoginRoutesTestCase(DatabaseTestCase):
             db.session.rollback()
             raise e
 
+    def _auth_headers(self):
+        login = UserLoginServices()
+        login.current_user = self.test_user
+        return {'Authorization': f'Bearer {login.generate_token()}'}
+
     def test_login_endpoint_exists(self):
         """Test that the POST /api/auth/login endpoint exists"""
         payload = {
@@ -153,3 +163,31 @@ class LoginRoutesTestCase(DatabaseTestCase):
         self.assertEqual(response.status_code, 200)
         data = response.get_json()
         self.assertEqual(data['next'], '/api/questions')
+
+    def test_login_shed_when_hashing_busy(self):
+        """Test login answers 503 with Retry-After when the hashing pool is full"""
+        busy = PasswordHasherBusyError("Too many sign-in requests, try again shortly", retry_after=2.5)
+        with patch.object(PasswordHasher, 'verify', side_effect=busy):
+            response = self.client.post('/api/auth/login', json={
+                'email': 'test@dal.ca', 'password': 'testpassword123'
+            })
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '3')
+        self.assertFalse(response.get_json()['success'])
+
+    def test_password_hash_stats(self):
+        """Test the hashing pool reports its queue depth and cost factor"""
+        self.client.post('/api/auth/login', json={'email': 'test@dal.ca', 'password': 'testpassword123'})
+
+        self.assertEqual(self.client.get('/api/auth/password-hash/stats').status_code, 401)
+        self.assertEqual(self.client.get('/api/auth/password-hash/stats',
+                                         headers=self._auth_headers()).status_code, 403)
+
+        self.test_user.is_admin = True
+        db.session.commit()
+        data = self.client.get('/api/auth/password-hash/stats', headers=self._auth_headers()).get_json()
+
+        self.assertEqual(data['queued'], 0)
+        self.assertGreaterEqual(data['verifies'], 1)
+        self.assertIn('rounds', data)
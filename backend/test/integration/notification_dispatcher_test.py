@@ -0,0 +1,168 @@
+"""
+Description: Integration tests for the notification outbox and dispatcher.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created single-commit, rollback, batching and retry tests.
+    2026-10-19 - Answer also queues its follower event.
+    2026-10-19 - Wake-up kept when a SAVEPOINT rolls back.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from unittest.mock import patch
+from sqlalchemy import event
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.notification import Notification
+from models.notification_outbox import NotificationOutbox
+from models.question import Question
+from services.notification_dispatcher import (
+    NotificationDispatcher, DIRECT, EXTENSION_KEY, queue_notification
+)
+from services.notification_stream import EXTENSION_KEY as HUB_KEY, NotificationHub
+from services.user_login import UserLoginServices
+
+
+class NotificationDispatcherTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for NotificationDispatcher and the write endpoints using it"""
+
+    def setUp(self):
+        super().setUp()
+        user = self.create_test_user(username='writer', email='writer@dal.ca')
+        db.session.commit()
+        self.user_id = user.id
+        login = UserLoginServices()
+        login.current_user = user
+        self.headers = {'Authorization': f'Bearer {login.generate_token()}'}
+        self.dispatcher = self.app.extensions[EXTENSION_KEY]
+        self.commits = 0
+        self.statements = []
+        event.listen(db.engine, 'commit', self._count_commit)
+        event.listen(db.engine, 'before_cursor_execute', self._record_statement)
+
+    def tearDown(self):
+        event.remove(db.engine, 'commit', self._count_commit)
+        event.remove(db.engine, 'before_cursor_execute', self._record_statement)
+        super().tearDown()
+
+    def _count_commit(self, conn):
+        self.commits += 1
+
+    def _record_statement(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def _reset_counts(self):
+        self.commits = 0
+        self.statements = []
+
+    def test_create_answer_commits_once(self):
+        """Test that posting an answer writes it and its notification event in one commit"""
+        question = self.create_test_question(self.user_id)
+        db.session.commit()
+        self._reset_counts()
+
+        response = self.client.post(f'/api/answers/questions/{question.id}/answers',
+                                    json={'body': 'An answer that is comfortably long enough.'},
+                                    headers=self.headers)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(Notification.query.count(), 0)
+        self.assertEqual(NotificationOutbox.query.count(), 2)  # Plus the follower event
+
+        self.assertEqual(self.dispatcher.run_pending(), 1)
+        notification = Notification.query.one()
+        self.assertEqual((notification.user_id, notification.header), (self.user_id, 'Answer Submitted'))
+        self.assertEqual(Notification.unread_count(self.user_id), 1)
+        # The follower event waits out its coalescing window
+        self.assertEqual(NotificationOutbox.query.one().kind, 'question_activity')
+
+    def test_create_question_commits_once(self):
+        """Test that a question, its tags, AI job and notification event share one commit"""
+        tag = self.create_test_tag('python')
+        db.session.commit()
+        self._reset_counts()
+
+        response = self.client.post('/api/questions', json={
+            'user_id': self.user_id, 'title': 'One commit?', 'body': 'Question body text',
+            'status': 'open', 'type': 'technical', 'tag_ids': [tag.id, tag.id, 99999]
+        })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.commits, 1)
+        question = Question.query.one()
+        self.assertEqual([t.id for t in question.tags], [tag.id])
+        self.assertEqual(NotificationOutbox.query.one().get_payload()['header'], 'Question Created')
+
+    def test_rolled_back_event_is_not_dispatched(self):
+        """Test that an event added to a transaction that rolls back never becomes a notification"""
+        queue_notification(self.user_id, 'Never', 'Rolled back')
+        db.session.rollback()
+
+        self.assertEqual(self.dispatcher.run_pending(), 0)
+        self.assertEqual(Notification.query.count(), 0)
+
+    def test_savepoint_rollback_keeps_wake(self):
+        """Test that dispatchers are still woken when a SAVEPOINT after the event rolls back"""
+        queue_notification(self.user_id, 'Wake', 'Body')
+        try:
+            with db.session.begin_nested():
+                raise ValueError('Roll back the savepoint')
+        except ValueError:
+            pass
+
+        with patch.object(self.dispatcher, 'wake') as wake:
+            db.session.commit()
+
+        wake.assert_called_once()
+
+    def test_batch_inserts_and_pushes_after_commit(self):
+        """Test that a batch of events becomes notifications with one INSERT and is pushed once committed"""
+        hub = NotificationHub()
+        saved_hub, self.app.extensions[HUB_KEY] = self.app.extensions[HUB_KEY], hub
+        try:
+            subscription = hub.subscribe(self.user_id)
+            for n in range(5):
+                queue_notification(self.user_id, f'Notice {n}', 'Body')
+            db.session.commit()
+            self._reset_counts()
+
+            self.assertEqual(self.dispatcher.dispatch_batch(self.dispatcher.claim_batch()), 5)
+
+            inserts = [s for s in self.statements if s.startswith('INSERT INTO notifications')]
+            self.assertEqual(len(inserts), 1)
+            self.assertEqual(self.commits, 2)  # The claim, then inserts, counters and outbox delete
+            self.assertEqual(subscription.events.qsize(), 5)
+            self.assertEqual(Notification.unread_count(self.user_id), 5)
+        finally:
+            hub.close()
+            self.app.extensions[HUB_KEY] = saved_hub
+
+    def test_failing_event_retried_without_blocking_others(self):
+        """Test that an event whose handler fails is rescheduled while the rest are delivered"""
+        dispatcher = NotificationDispatcher(max_attempts=2)
+
+        def flaky(payload):
+            raise RuntimeError('recipient lookup failed')
+        dispatcher.register('flaky', flaky)
+        dispatcher.add('flaky', {})
+        dispatcher.add(DIRECT, {'user_id': self.user_id, 'header': 'Fine', 'body': 'Body'})
+        db.session.commit()
+
+        self.assertEqual(dispatcher.run_pending(), 1)
+        failed = NotificationOutbox.query.one()
+        self.assertEqual((failed.status, failed.attempts), (NotificationOutbox.PENDING, 1))
+        self.assertIn('recipient lookup failed', failed.last_error)
+
+        failed.dispatch_after = failed.created_at
+        db.session.commit()
+        dispatcher.run_pending()
+        db.session.expire_all()
+        self.assertEqual(NotificationOutbox.query.one().status, NotificationOutbox.FAILED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Description: Integration tests for question follows and follower notification fan-out.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created recipient, coalescing, chunking, follow and comment tests.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from datetime import datetime
+from sqlalchemy import event
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.notification import Notification
+from models.notification_outbox import NotificationOutbox
+from models.question_follow import QuestionFollow
+from services.notification_dispatcher import NotificationDispatcher, EXTENSION_KEY
+from services.notification_fanout import (
+    register_fanout_handlers, queue_question_activity, ANSWER, QUESTION_ACTIVITY
+)
+from services.user_login import UserLoginServices
+
+
+class NotificationFanoutTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for QuestionFollow and the question activity fan-out"""
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_test_user(username='asker', email='asker@dal.ca')
+        self.first = self.create_test_user(username='first', email='first@dal.ca')
+        self.second = self.create_test_user(username='second', email='second@dal.ca')
+        self.reader = self.create_test_user(username='reader', email='reader@dal.ca')
+        db.session.commit()
+        self.question = self.create_test_question(self.author.id, title='Fan out')
+        self.answer = self.create_test_answer(self.first.id, self.question.id)
+        self.create_test_answer(self.second.id, self.question.id)
+        db.session.commit()
+        self.dispatcher = self.app.extensions[EXTENSION_KEY]
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self._record_statement)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._record_statement)
+        super().tearDown()
+
+    def _record_statement(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def _headers(self, user):
+        login = UserLoginServices()
+        login.current_user = user
+        return {'Authorization': f'Bearer {login.generate_token()}'}
+
+    def _notifications(self):
+        return {(n.user_id, n.header, n.body) for n in Notification.query.all()}
+
+    def test_follower_ids_in_one_query(self):
+        """Test that followers are the author, answerers and followers, less the unfollowed"""
+        QuestionFollow.set_following(self.reader.id, self.question.id)
+        QuestionFollow.set_following(self.second.id, self.question.id, following=False)
+        question_id = self.question.id
+        expected = sorted([self.author.id, self.first.id, self.reader.id])
+        self.statements = []
+
+        followers = QuestionFollow.follower_ids(question_id)
+
+        self.assertEqual(sorted(followers), expected)
+        self.assertEqual(len(self.statements), 1)
+
+    def test_burst_coalesced_per_follower(self):
+        """Test that a burst of answers becomes one notification per follower, not counting their own"""
+        for actor in (self.first, self.second, self.first):
+            queue_question_activity(self.question.id, actor.id, ANSWER)
+        db.session.commit()
+        self.assertEqual(self.dispatcher.run_pending(), 0)  # Still inside the coalescing window
+
+        # Only the first event is due; the rest of the burst is claimed with it
+        first_event = NotificationOutbox.query.order_by(NotificationOutbox.id).first()
+        first_event.dispatch_after = datetime(2000, 1, 1)
+        db.session.commit()
+
+        self.assertEqual(self.dispatcher.run_pending(), 3)
+        self.assertEqual(self._notifications(), {
+            (self.author.id, '3 new answers', "3 new answers on 'Fan out'"),
+            (self.first.id, 'New answer', "New answer on 'Fan out'"),
+            (self.second.id, '2 new answers', "2 new answers on 'Fan out'"),
+        })
+        self.assertEqual(NotificationOutbox.query.count(), 0)
+        self.assertEqual(Notification.unread_count(self.author.id), 1)
+
+    def test_fanout_inserted_in_chunks(self):
+        """Test that a large fan-out is inserted in chunked multi-row INSERTs with batched counters"""
+        dispatcher = register_fanout_handlers(NotificationDispatcher(insert_chunk_size=3, coalesce_seconds=0))
+        for n in range(5):
+            follower = self.create_test_user(username=f'follower{n}', email=f'follower{n}@dal.ca')
+            db.session.add(QuestionFollow(user_id=follower.id, question_id=self.question.id))
+        dispatcher.add(QUESTION_ACTIVITY, {'question_id': self.question.id, 'activity': ANSWER,
+                                           'actor_id': self.reader.id},
+                       coalesce_key=f'question:{self.question.id}:{ANSWER}')
+        db.session.commit()
+        self.statements = []
+
+        self.assertEqual(dispatcher.run_pending(), 8)
+
+        inserts = [s for s in self.statements if s.startswith('INSERT INTO notifications')]
+        counters = [s for s in self.statements if 'notification_counters' in s]
+        self.assertEqual(len(inserts), 3)
+        self.assertLessEqual(len(counters), 3)  # Lookup, INSERT for new users, UPDATE for the rest
+        self.assertEqual(Notification.query.filter_by(header='New answer').count(), 8)
+        self.assertEqual(Notification.unread_count(self.first.id), 1)
+
+    def test_follow_and_unfollow_endpoints(self):
+        """Test that following adds a recipient and unfollowing removes an implicit one"""
+        response = self.client.post(f'/api/questions/{self.question.id}/follow', headers=self._headers(self.reader))
+        self.assertEqual((response.status_code, response.get_json()['following']), (200, True))
+        response = self.client.delete(f'/api/questions/{self.question.id}/follow', headers=self._headers(self.author))
+        self.assertEqual((response.status_code, response.get_json()['following']), (200, False))
+        self.assertEqual(self.client.post('/api/questions/99999/follow',
+                                          headers=self._headers(self.reader)).status_code, 404)
+
+        self.assertTrue(QuestionFollow.is_following(self.reader.id, self.question.id))
+        self.assertFalse(QuestionFollow.is_following(self.author.id, self.question.id))
+
+    def test_comment_notifies_followers(self):
+        """Test that posting a comment queues a coalesced event that notifies the question's followers"""
+        response = self.client.post('/api/comments', json={
+            'answer_id': self.answer.id, 'user_id': self.reader.id, 'content': 'Nice one'
+        })
+        self.assertEqual(response.status_code, 201)
+        outbox_event = NotificationOutbox.query.one()
+        self.assertEqual(outbox_event.coalesce_key, f'question:{self.question.id}:comment')
+
+        outbox_event.dispatch_after = datetime(2000, 1, 1)
+        db.session.commit()
+        self.dispatcher.run_pending()
+
+        self.assertIn((self.author.id, 'New comment', "New comment on 'Fan out'"), self._notifications())
+        self.assertNotIn(self.reader.id, {n.user_id for n in Notification.query.all()})
+
+        missing = self.client.post('/api/comments', json={'answer_id': 99999, 'user_id': self.reader.id,
+                                                          'content': 'Lost'})
+        self.assertEqual(missing.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Description: Integration tests for the notification feed, unread count and mark-read.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created feed pagination, unread counter and mark-read tests.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from sqlalchemy import event
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.notification import Notification
+from models.notification_counter import NotificationCounter
+from services.user_login import UserLoginServices
+
+
+class NotificationRoutesTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for the notification endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        user = self.create_test_user(username='bellowner', email='bell@dal.ca')
+        other = self.create_test_user(username='bystander', email='bystander@dal.ca')
+        db.session.commit()
+        self.user_id, self.other_id = user.id, other.id
+        login = UserLoginServices()
+        login.current_user = user
+        self.headers = {'Authorization': f'Bearer {login.generate_token()}'}
+
+    def _notify(self, count, user_id=None):
+        return [Notification.create({
+            'user_id': user_id or self.user_id,
+            'header': f'Notice {n}',
+            'body': f'Body {n}'
+        }).id for n in range(count)]
+
+    def test_empty_feed_is_not_an_error(self):
+        """Test that a user without notifications gets an empty page"""
+        response = self.client.get(f'/api/notifications/{self.user_id}')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual((data['notifications'], data['next_cursor'], data['unread_count']), ([], None, 0))
+
+    def test_feed_pages_newest_first(self):
+        """Test that following next_cursor walks every notification once, newest first"""
+        ids = self._notify(5)
+        self._notify(2, user_id=self.other_id)
+
+        seen, cursor = [], None
+        while True:
+            query = f'?limit=2&cursor={cursor}' if cursor else '?limit=2'
+            data = self.client.get(f'/api/notifications/{self.user_id}{query}').get_json()
+            seen.extend(n['id'] for n in data['notifications'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(seen, list(reversed(ids)))
+        self.assertEqual(self.client.get(f'/api/notifications/{self.user_id}?cursor=bogus').status_code, 400)
+
+    def test_unread_count_reads_counter(self):
+        """Test that the unread count is one counter lookup, not a count of notifications"""
+        self._notify(3)
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get(f'/api/notifications/{self.user_id}/unread_count')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        self.assertEqual(response.get_json(), {'unread_count': 3})
+        self.assertEqual(len(statements), 1)
+        self.assertIn('notification_counters', statements[0])
+
+    def test_mark_read_in_one_update(self):
+        """Test that a batch of notifications is marked read with a single UPDATE"""
+        ids = self._notify(4)
+        updates = []
+        record = lambda conn, cursor, statement, *args: \
+            updates.append(statement) if statement.startswith('UPDATE notifications') else None
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.post(f'/api/notifications/{self.user_id}/read',
+                                        json={'ids': ids[:3]}, headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'marked': 3, 'unread_count': 1})
+        self.assertEqual(len(updates), 1)
+        # Marking again changes nothing
+        again = self.client.post(f'/api/notifications/{self.user_id}/read', json={'ids': ids}, headers=self.headers)
+        self.assertEqual(again.get_json(), {'marked': 1, 'unread_count': 0})
+        unread = self.client.get(f'/api/notifications/{self.user_id}?unread=true').get_json()
+        self.assertEqual(unread['notifications'], [])
+
+    def test_mark_all_read(self):
+        """Test that all: true marks every notification of the user and no one else's"""
+        self._notify(3)
+        self._notify(2, user_id=self.other_id)
+
+        response = self.client.post(f'/api/notifications/{self.user_id}/read', json={'all': True}, headers=self.headers)
+
+        self.assertEqual(response.get_json(), {'marked': 3, 'unread_count': 0})
+        self.assertEqual(Notification.unread_count(self.other_id), 2)
+
+    def test_mark_read_only_own(self):
+        """Test that marking requires login and only covers the caller's notifications"""
+        self._notify(1, user_id=self.other_id)
+
+        self.assertEqual(self.client.post(f'/api/notifications/{self.other_id}/read', json={'all': True}).status_code, 401)
+        forbidden = self.client.post(f'/api/notifications/{self.other_id}/read', json={'all': True}, headers=self.headers)
+        self.assertEqual(forbidden.status_code, 403)
+        invalid = self.client.post(f'/api/notifications/{self.user_id}/read', json={'ids': 'all'}, headers=self.headers)
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_counter_seeded_from_existing_rows(self):
+        """Test that notifications from before the counter existed are counted"""
+        self._notify(2)
+        db.session.query(NotificationCounter).delete()
+        db.session.commit()
+
+        self.assertEqual(Notification.unread_count(self.user_id), 2)
+        self._notify(1)
+        self.assertEqual(Notification.unread_count(self.user_id), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
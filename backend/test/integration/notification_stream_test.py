@@ -0,0 +1,227 @@
+"""
+Description: Integration tests for the notification server-sent events stream.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created push, heartbeat, resume, overflow and broker tests.
+    2026-10-19 - Streams and stats opened with a token; auth tests.
+    2026-10-19 - Pending pushes survive a rolled back SAVEPOINT.
+    2026-10-19 - Stream tickets instead of login tokens in the query string.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+import json
+from unittest.mock import patch
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.notification import Notification
+from models.user import User
+from services.notification_stream import (
+    NotificationHub, NotificationBroker, DatabaseNotificationBroker, EXTENSION_KEY, publish_after_commit
+)
+from services.user_login import UserLoginServices
+import middleware.auth_middleware as auth_middleware
+
+
+class NotificationStreamTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for NotificationHub and GET /api/notifications/<id>/stream"""
+
+    def setUp(self):
+        super().setUp()
+        self.user_id = self.create_test_user(username='listener', email='listener@dal.ca').id
+        self.other_id = self.create_test_user(username='neighbour', email='neighbour@dal.ca').id
+        db.session.commit()
+        self.saved_hub = self.app.extensions[EXTENSION_KEY]
+        self.hub = self._use_hub()
+
+    def tearDown(self):
+        self.hub.close()
+        self.app.extensions[EXTENSION_KEY] = self.saved_hub
+        super().tearDown()
+
+    def _use_hub(self, **kwargs):
+        kwargs.setdefault('heartbeat_seconds', 0.05)
+        kwargs.setdefault('max_seconds', 5)
+        hub = NotificationHub(**kwargs)
+        self.app.extensions[EXTENSION_KEY] = hub
+        return hub
+
+    def _notify(self, user_id=None, header='Ping'):
+        return Notification.create({'user_id': user_id or self.user_id, 'header': header, 'body': 'Body'}).id
+
+    def _token(self, user_id=None):
+        login = UserLoginServices()
+        login.current_user = db.session.get(User, user_id or self.user_id)
+        return login.generate_token()
+
+    def _ticket(self, user_id=None):
+        user_id = user_id or self.user_id
+        response = self.client.post(f'/api/notifications/{user_id}/stream-ticket',
+                                    headers={'Authorization': f'Bearer {self._token(user_id)}'})
+        return response.get_json()['ticket']
+
+    def _open(self, headers=None):
+        headers = {'Authorization': f'Bearer {self._token()}', **(headers or {})}
+        response = self.client.get(f'/api/notifications/{self.user_id}/stream', headers=headers, buffered=False)
+        return response, iter(response.response)
+
+    @staticmethod
+    def _event(chunk):
+        chunk = chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk
+        fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines() if not line.startswith(':'))
+        return fields.get('event'), fields.get('id'), json.loads(fields['data']) if 'data' in fields else None
+
+    def test_pushes_committed_notification(self):
+        """Test that a notification is pushed to the user's open stream when it commits"""
+        response, chunks = self._open()
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertIn('retry:', next(chunks).decode())
+        self.assertEqual(self.hub.stats()['connections'], 1)
+
+        self._notify(user_id=self.other_id)
+        notification_id = self._notify(header='New answer')
+
+        name, event_id, data = self._event(next(chunks))
+        self.assertEqual((name, event_id), ('notification', str(notification_id)))
+        self.assertEqual((data['header'], data['is_read']), ('New answer', False))
+        response.close()
+        self.assertEqual(self.hub.stats()['connections'], 0)
+
+    def test_rolled_back_notification_not_pushed(self):
+        """Test that only committed notifications are pushed; idle streams get heartbeats"""
+        response, chunks = self._open()
+        next(chunks)
+
+        db.session.add(Notification(user_id=self.user_id, header='Never', body='Rolled back'))
+        db.session.flush()
+        db.session.rollback()
+
+        self.assertEqual(next(chunks).decode(), ': heartbeat\n\n')
+        response.close()
+
+    def test_resume_replays_missed(self):
+        """Test that reconnecting with Last-Event-ID replays what was missed, in order"""
+        first, second, third = self._notify(), self._notify(), self._notify()
+
+        response, chunks = self._open(headers={'Last-Event-ID': str(first)})
+        next(chunks)
+        replayed = [self._event(next(chunks))[1] for _ in range(2)]
+        self.assertEqual(replayed, [str(second), str(third)])
+        response.close()
+
+        self.hub.replay_limit = 1
+        response, chunks = self._open(headers={'Last-Event-ID': str(first)})
+        next(chunks)
+        self.assertEqual(self._event(next(chunks))[0], 'reset')
+        response.close()
+
+    def test_savepoint_rollback_keeps_earlier_pushes(self):
+        """Test that a rolled back SAVEPOINT drops only its own notifications from the push"""
+        subscription = self.hub.subscribe(self.user_id)
+        kept = Notification(user_id=self.user_id, header='Kept', body='Body')
+        db.session.add(kept)
+        db.session.flush()
+        publish_after_commit([Notification(id=-1, user_id=self.user_id, header='Bulk', body='Body')])
+        try:
+            with db.session.begin_nested():
+                db.session.add(Notification(user_id=self.user_id, header='Dropped', body='Body'))
+                db.session.flush()
+                raise ValueError('Roll back the savepoint')
+        except ValueError:
+            pass
+        db.session.commit()
+
+        headers = [subscription.events.get_nowait()['header'] for _ in range(subscription.events.qsize())]
+        self.assertEqual(sorted(headers), ['Bulk', 'Kept'])
+
+    def test_stream_closed_when_client_falls_behind(self):
+        """Test that a stream whose buffer overflows ends so the client resumes by replay"""
+        self.hub = self._use_hub(queue_size=1)
+        response, chunks = self._open()
+        next(chunks)
+
+        self.hub.publish([{'id': 1, 'user_id': self.user_id}, {'id': 2, 'user_id': self.user_id}])
+
+        self.assertEqual(self._event(next(chunks))[1], '1')
+        self.assertEqual(list(chunks), [])
+        self.assertEqual(self.hub.stats()['dropped'], 1)
+
+    def test_connection_limit(self):
+        """Test that streams beyond max_connections are refused with 503"""
+        self.hub = self._use_hub(max_connections=1)
+        response, chunks = self._open()
+        next(chunks)
+
+        refused = self.client.get(f'/api/notifications/{self.user_id}/stream?token={self._ticket()}')
+
+        self.assertEqual(refused.status_code, 503)
+        self.assertIn('Retry-After', refused.headers)
+        response.close()
+
+    def test_stream_requires_own_token(self):
+        """Test that a stream needs the streamed user's login token in the header or stream ticket in the URL"""
+        url = f'/api/notifications/{self.user_id}/stream'
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.get(f'{url}?token={self._ticket(self.other_id)}').status_code, 403)
+        headers = {'Authorization': f'Bearer {self._token()}'}
+        self.assertEqual(self.client.post(f'/api/notifications/{self.other_id}/stream-ticket',
+                                          headers=headers).status_code, 403)
+
+        response = self.client.get(f'{url}?token={self._ticket()}', buffered=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('retry:', next(iter(response.response)).decode())
+        response.close()
+
+    def test_stream_ticket_only_opens_streams(self):
+        """Test that login tokens are refused in the URL, tickets as login tokens, and expired tickets"""
+        url = f'/api/notifications/{self.user_id}/stream'
+        ticket = self._ticket()
+
+        self.assertEqual(self.client.get(f'{url}?token={self._token()}').status_code, 401)
+        self.assertEqual(self.client.get('/api/auth/validate',
+                                         headers={'Authorization': f'Bearer {ticket}'}).status_code, 401)
+        with patch.object(auth_middleware, 'STREAM_TICKET_SECONDS', -1):
+            expired = self._ticket()
+        self.assertEqual(self.client.get(f'{url}?token={expired}').status_code, 401)
+
+    def test_stats_for_admins_only(self):
+        """Test that stream stats need an administrator"""
+        self.assertEqual(self.client.get('/api/notifications/stream/stats').status_code, 401)
+        headers = {'Authorization': f'Bearer {self._token()}'}
+        self.assertEqual(self.client.get('/api/notifications/stream/stats', headers=headers).status_code, 403)
+
+        db.session.get(User, self.user_id).is_admin = True
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {self._token()}'}
+        response = self.client.get('/api/notifications/stream/stats', headers=headers)
+        self.assertEqual((response.status_code, response.get_json()['connections']), (200, 0))
+
+    def test_broker_must_implement_publish(self):
+        """Test that a broker without publish cannot be created"""
+        class Incomplete(NotificationBroker):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_database_broker_polls_new_rows(self):
+        """Test that the database broker delivers rows committed after it started, once"""
+        before = self._notify()
+        delivered = []
+        broker = DatabaseNotificationBroker(lookback=10)
+        broker._deliver = delivered.extend
+
+        broker.poll()
+        after = [self._notify(), self._notify(user_id=self.other_id)]
+        self.assertEqual(broker.poll(), 2)
+        self.assertEqual(broker.poll(), 0)
+
+        self.assertEqual([event['id'] for event in delivered], after)
+        self.assertNotIn(before, [event['id'] for event in delivered])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Description: Integration tests for the shared OTP store and the registration
+and password reset flows built on it.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created registration, reset, attempt limit and expiry tests.
+    2026-10-19 - Codes kept when a reset is shed or a registration fails.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+import re
+from datetime import timedelta
+from unittest.mock import patch
+from sqlalchemy.exc import IntegrityError
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.email_outbox import EmailOutbox
+from models.otp_code import OTPCode
+from models.user import User
+from services.otp_store import OTPStore, VALID, INVALID, EXPIRED, LOCKED, MISSING, _utcnow
+from services.password_hasher import PasswordHasher, PasswordHasherBusyError
+from services.user_registration import UserRegistrationService
+
+CODE_PATTERN = re.compile(r"monospace;\">(\d{6})</p>")
+
+
+class OTPStoreTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for OTPStore and UserRegistrationService"""
+
+    def setUp(self):
+        super().setUp()
+        self.saved_hasher = self.app.extensions['password_hasher']
+        self.app.extensions['password_hasher'] = PasswordHasher(rounds=4, workers=1)
+        self.store = OTPStore(max_attempts=3)
+
+    def tearDown(self):
+        self.app.extensions['password_hasher'].shutdown()
+        self.app.extensions['password_hasher'] = self.saved_hasher
+        super().tearDown()
+
+    def _emailed_code(self, recipient):
+        """Code in the latest email queued for a recipient"""
+        email = EmailOutbox.query.filter_by(recipient=recipient).order_by(EmailOutbox.id.desc()).first()
+        return CODE_PATTERN.search(email.html_body).group(1)
+
+    def test_concurrent_registrations_kept_apart(self):
+        """Test that two people registering at once each verify with their own code"""
+        for address in ('first@dal.ca', 'second@dal.ca'):
+            response = self.client.post('/api/auth/register', json={'email': address, 'password': f'{address}-pw'})
+            self.assertEqual(response.status_code, 200)
+
+        first, second = self._emailed_code('first@dal.ca'), self._emailed_code('second@dal.ca')
+        wrong = self.client.post('/api/auth/verify-otp', json={'email': 'first@dal.ca', 'otp': second}) \
+            if first != second else None
+        responses = [
+            self.client.post('/api/auth/verify-otp', json={'email': 'second@dal.ca', 'otp': second}),
+            self.client.post('/api/auth/verify-otp', json={'email': 'first@dal.ca', 'otp': first})
+        ]
+
+        if wrong is not None:
+            self.assertEqual(wrong.status_code, 400)
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+        user = User.query.filter_by(email='first@dal.ca').one()
+        self.assertTrue(PasswordHasher(rounds=4).verify('first@dal.ca-pw', user.password))
+        self.assertEqual(OTPCode.query.count(), 0)
+
+    def test_code_stored_hashed_and_single_use(self):
+        """Test that only a hash is stored and a code works once"""
+        code = self.store.issue('Someone@dal.ca', OTPCode.RESET)
+
+        record = OTPCode.query.one()
+        self.assertEqual(record.email, 'someone@dal.ca')
+        self.assertNotIn(code, record.code_hash)
+        self.assertEqual(self.store.verify('someone@dal.ca', OTPCode.RESET, code), (VALID, None))
+        self.assertEqual(self.store.verify('someone@dal.ca', OTPCode.RESET, code), (MISSING, None))
+
+    def test_attempts_limited(self):
+        """Test that a code is locked after max_attempts wrong guesses"""
+        code = self.store.issue('guess@dal.ca', OTPCode.RESET)
+        wrong = '000000' if code != '000000' else '111111'
+
+        outcomes = [self.store.verify('guess@dal.ca', OTPCode.RESET, wrong)[0] for _ in range(3)]
+
+        self.assertEqual(outcomes, [INVALID] * 3)
+        self.assertEqual(self.store.verify('guess@dal.ca', OTPCode.RESET, code), (LOCKED, None))
+        # A new code starts over
+        fresh = self.store.issue('guess@dal.ca', OTPCode.RESET)
+        self.assertEqual(self.store.verify('guess@dal.ca', OTPCode.RESET, fresh)[0], VALID)
+
+    def test_expired_code_rejected(self):
+        """Test that a code past its expiry is refused"""
+        code = self.store.issue('late@dal.ca', OTPCode.RESET)
+        OTPCode.query.one().expires_at = _utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        self.assertEqual(self.store.verify('late@dal.ca', OTPCode.RESET, code), (EXPIRED, None))
+        self.assertEqual(self.store.purge_expired(), 1)
+
+    def test_resend_keeps_pending_password(self):
+        """Test that a resent registration code replaces the old one but keeps the password"""
+        service = UserRegistrationService()
+        self.assertTrue(service.create_user('resend@dal.ca', 'original-pw'))
+        old = self._emailed_code('resend@dal.ca')
+
+        response = self.client.post('/api/auth/resend-otp', json={'email': 'resend@dal.ca'})
+        new = self._emailed_code('resend@dal.ca')
+
+        self.assertEqual(response.status_code, 200)
+        if old != new:
+            self.assertFalse(UserRegistrationService().verify_and_create_user('resend@dal.ca', old))
+        # Any instance (worker) can finish the registration
+        self.assertTrue(UserRegistrationService().verify_and_create_user('resend@dal.ca', new))
+        user = User.query.filter_by(email='resend@dal.ca').one()
+        self.assertTrue(PasswordHasher(rounds=4).verify('original-pw', user.password))
+
+    def test_password_reset_flow(self):
+        """Test that forgot-password then reset-password changes the password"""
+        user = self.create_test_user(username='forgetful', email='forgetful@dal.ca')
+        db.session.commit()
+
+        self.assertEqual(self.client.post('/api/auth/forgot-password', json={'email': 'forgetful@dal.ca'}).status_code, 200)
+        code = self._emailed_code('forgetful@dal.ca')
+        response = self.client.post('/api/auth/reset-password', json={
+            'email': 'forgetful@dal.ca', 'otp': code, 'new_password': 'Brand-new-pw1'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        db.session.expire_all()
+        user = db.session.get(User, user.id)
+        self.assertTrue(PasswordHasher(rounds=4).verify('Brand-new-pw1', user.password))
+        self.assertEqual(user.token_version, 1)
+
+    def test_shed_reset_keeps_code(self):
+        """Test that a reset shed by the hashing pool can be retried with the same code"""
+        user = self.create_test_user(username='patient', email='patient@dal.ca')
+        db.session.commit()
+        code = self.store.issue('patient@dal.ca', OTPCode.RESET)
+        body = {'email': 'patient@dal.ca', 'otp': code, 'new_password': 'Retried-pw1'}
+
+        with patch.object(self.app.extensions['password_hasher'], 'hash',
+                          side_effect=PasswordHasherBusyError('Busy')):
+            self.assertEqual(self.client.post('/api/auth/reset-password', json=body).status_code, 503)
+        self.assertEqual(OTPCode.query.one().attempts, 0)
+
+        self.assertEqual(self.client.post('/api/auth/reset-password', json=body).status_code, 200)
+        self.assertEqual(OTPCode.query.count(), 0)
+        db.session.expire_all()
+        self.assertTrue(PasswordHasher(rounds=4).verify('Retried-pw1', db.session.get(User, user.id).password))
+
+    def test_failed_registration_keeps_code(self):
+        """Test that a registration code is used up only when the user is created"""
+        self.assertTrue(UserRegistrationService().create_user('taken@dal.ca', 'taken-pw'))
+        code = self._emailed_code('taken@dal.ca')
+        self.create_test_user(username='taken', email='other@dal.ca')  # Same generated username
+        db.session.commit()
+
+        with self.assertRaises(IntegrityError):
+            UserRegistrationService().verify_and_create_user('taken@dal.ca', code)
+        db.session.rollback()
+
+        self.assertEqual(OTPCode.query.filter_by(email='taken@dal.ca').count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Description: Integration tests for the auth middleware's principal cache.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created cache hit, invalidation, TTL and LRU tests.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+import jwt
+from sqlalchemy import event
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.user import User
+from middleware.principal_cache import PrincipalCache, get_principal_cache, load_principal
+
+
+class PrincipalCacheTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for PrincipalCache and the auth decorators"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_test_user(username='cacheduser', email='cached@dal.ca')
+        db.session.commit()
+        self.user_id = self.user.id
+        token = jwt.encode({'username': 'cacheduser'}, self.app.config['SECRET_KEY'], algorithm='HS256')
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.user_queries = []
+        event.listen(db.engine, 'before_cursor_execute', self._record_user_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._record_user_query)
+        super().tearDown()
+
+    def _record_user_query(self, conn, cursor, statement, parameters, context, executemany):
+        if 'FROM users' in statement:
+            self.user_queries.append(statement)
+
+    def test_repeat_requests_skip_user_query(self):
+        """Test that only the first authenticated request looks the user up"""
+        hits = get_principal_cache().stats()['hits']
+        first = self.client.get('/api/auth/validate', headers=self.headers)
+        second = self.client.get('/api/auth/validate', headers=self.headers)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.get_json()['user'], {
+            'user_id': self.user_id, 'username': 'cacheduser', 'email': 'cached@dal.ca'
+        })
+        self.assertEqual(len(self.user_queries), 1)
+        self.assertEqual(get_principal_cache().stats()['hits'], hits + 1)
+
+    def test_cached_user_loads_other_columns_on_access(self):
+        """Test that columns left out of the snapshot still load when used"""
+        load_principal('cacheduser')
+        db.session.expunge_all()
+
+        user = load_principal('cacheduser')
+
+        self.assertEqual(user.id, self.user_id)
+        self.assertTrue(user.password)
+        self.assertEqual(user.reputation, 0)
+
+    def test_update_fields_invalidates(self):
+        """Test that a profile update is seen by the next authenticated request"""
+        invalidations = get_principal_cache().stats()['invalidations']
+        self.client.get('/api/auth/validate', headers=self.headers)
+
+        User.update_fields(self.user_id, {'email': 'changed@dal.ca'})
+        response = self.client.get('/api/auth/validate', headers=self.headers)
+
+        self.assertEqual(response.get_json()['user']['email'], 'changed@dal.ca')
+        self.assertEqual(get_principal_cache().stats()['invalidations'], invalidations + 1)
+
+    def test_ttl_and_lru_bounds(self):
+        """Test that entries expire after the TTL and the oldest are evicted"""
+        now = [0.0]
+        cache = PrincipalCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+        cache.put('a', {'id': 1})
+        cache.put('b', {'id': 2})
+        cache.get('a')
+        cache.put('c', {'id': 3})
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'id': 1})
+        now[0] = 11
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
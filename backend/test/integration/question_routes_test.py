@@ -4,6 +4,7 @@ Author: Bryan Vela
 Created: 2025-11-09
 Last Modified: 
     2025-11-09 - Endpoint tests.
+    2026-10-19 - Added stored excerpt tests for list views.
 """
 import unittest
 import sys
@@ -178,5 +179,43 @@ class QuestionRoutesTestCase(DatabaseTestCase, TestDataCreation):
         response = self.client.post('/api/questions/99999/view')
         self.assertEqual(response.status_code, 404)
         
+    def test_question_list_uses_excerpt(self):
+        """Test that the question list returns excerpts instead of full bodies"""
+        self.create_test_answer(self.test_user.id, self.question1.id, "An answer that is long enough.")
+        db.session.commit()
+
+        response = self.client.get('/api/questions')
+
+        self.assertEqual(response.status_code, 200)
+        questions = {q['title']: q for q in response.get_json()['questions']}
+        first = questions["How to implement Python fuzzy search?"]
+        self.assertNotIn('body', first)
+        self.assertNotIn('answers', first)
+        self.assertEqual(first['excerpt'], "I need help with fuzzy search implementation")
+        self.assertEqual(first['answerCount'], 1)
+        self.assertEqual(questions["Database optimization techniques?"]['answerCount'], 0)
+
+    def test_excerpt_stored_at_write_time(self):
+        """Test that the excerpt is derived when the body is written"""
+        from models.question import Question
+        long_body = '<p>' + ' '.join(['word'] * 100) + '</p><script>alert(1)</script>'
+        question = Question.create_with_sanitized_body({
+            'title': 'Long question',
+            'body': long_body,
+            'user_id': self.test_user.id
+        })
+
+        self.assertLessEqual(len(question.excerpt), 200)
+        self.assertTrue(' '.join(['word'] * 100).startswith(question.excerpt))
+        self.assertNotIn('<', question.excerpt)
+
+    def test_search_results_use_excerpt(self):
+        """Test that search results carry the excerpt, not the body"""
+        response = self.client.get('/api/questions/search?query=what is python best practices?')
+
+        first_result = response.get_json()['results'][0]
+        self.assertNotIn('body', first_result)
+        self.assertEqual(first_result['excerpt'], "The best Python coding practices")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
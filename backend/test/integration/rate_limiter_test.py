@@ -0,0 +1,138 @@
+"""
+Description: Integration tests for rate limiting of the auth endpoints.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created endpoint, sliding window and backend tests.
+    2026-10-19 - Added trusted proxy client IP and abstract backend tests.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from flask import Flask, request
+from test.test_base import DatabaseTestCase
+from models.rate_limit_counter import RateLimitCounter
+from middleware.rate_limiter import (
+    DatabaseRateLimitBackend, MemoryRateLimitBackend, RateLimitBackend, RateLimiter, get_rate_limiter,
+    sliding_window, trust_proxy_headers
+)
+
+
+class RateLimiterTestCase(DatabaseTestCase):
+    """Integration tests for RateLimiter and the declared auth limits"""
+
+    def setUp(self):
+        super().setUp()
+        self.limiter = get_rate_limiter(self.app)
+        self.saved_overrides = self.limiter.overrides
+
+    def tearDown(self):
+        self.limiter.overrides = self.saved_overrides
+        super().tearDown()
+
+    def test_login_limited_per_email(self):
+        """Test that repeated logins for one email get 429 with Retry-After"""
+        self.limiter.overrides = {'login': {'email': '2/60'}}
+        payload = {'email': 'Victim@dal.ca', 'password': 'guess'}
+
+        statuses = [self.client.post('/api/auth/login', json=payload).status_code for _ in range(3)]
+        other = self.client.post('/api/auth/login', json={'email': 'other@dal.ca', 'password': 'guess'})
+        limited = self.client.post('/api/auth/login', json={'email': 'victim@dal.ca ', 'password': 'guess'})
+
+        self.assertEqual(statuses, [200, 200, 429])
+        self.assertEqual(other.status_code, 200)
+        self.assertEqual(limited.status_code, 429)
+        self.assertGreaterEqual(int(limited.headers['Retry-After']), 1)
+        self.assertFalse(limited.get_json()['success'])
+
+    def test_register_limited_per_ip(self):
+        """Test that one IP is limited across different emails"""
+        self.limiter.overrides = {'register_user': {'ip': '2/600', 'email': None}}
+
+        statuses = [
+            self.client.post('/api/auth/register', json={'email': f'user{n}@gmail.com', 'password': 'pw'}).status_code
+            for n in range(3)
+        ]
+        elsewhere = self.client.post('/api/auth/register', json={'email': 'user9@gmail.com', 'password': 'pw'},
+                                     environ_base={'REMOTE_ADDR': '10.0.0.2'})
+
+        self.assertEqual(statuses, [400, 400, 429])
+        self.assertEqual(elsewhere.status_code, 400)
+
+    def test_unlisted_methods_and_endpoints_not_limited(self):
+        """Test that GET /login and other endpoints are left alone"""
+        self.limiter.overrides = {'login': {'ip': '1/60'}}
+        self.client.post('/api/auth/login', json={'email': 'a@dal.ca', 'password': 'pw'})
+
+        self.assertEqual(self.client.get('/api/auth/login').status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/check-login').status_code, 200)
+
+    def test_sliding_window(self):
+        """Test that the previous window counts in proportion to its overlap"""
+        self.assertEqual(sliding_window(0, 4, 5, 60, 10), (True, 0.0))
+        # 10 hits last window, 30 s in: 10 * 0.5 + 0 = 5, one more would exceed 5
+        allowed, retry_after = sliding_window(10, 0, 5, 60, 30)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 6.0)
+        allowed, retry_after = sliding_window(0, 5, 5, 60, 50)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 10 + 12)
+
+    def test_memory_backend_recovers(self):
+        """Test that a limited key is let through again once the window slides on"""
+        now = [1000 * 60.0]
+        limiter = RateLimiter(MemoryRateLimitBackend(), clock=lambda: now[0])
+        limits = {'ip': (2, 60)}
+
+        self.assertEqual([limiter.check('x', limits, {'ip': '1.1.1.1'}) for _ in range(2)], [0.0, 0.0])
+        wait = limiter.check('x', limits, {'ip': '1.1.1.1'})
+        self.assertGreater(wait, 0)
+
+        now[0] += wait
+        self.assertEqual(limiter.check('x', limits, {'ip': '1.1.1.1'}), 0.0)
+        self.assertEqual(limiter.stats()['limited'], 1)
+
+    def test_database_backend_shared(self):
+        """Test that limiters on the database backend share their counters"""
+        now = [1000 * 60.0 + 5]
+        first = RateLimiter(DatabaseRateLimitBackend(cleanup_rate=0), clock=lambda: now[0])
+        second = RateLimiter(DatabaseRateLimitBackend(cleanup_rate=0), clock=lambda: now[0])
+        limits = {'email': (3, 60)}
+
+        waits = [limiter.check('login', limits, {'email': 'a@dal.ca'}) for limiter in (first, second, first, second)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertGreater(waits[3], 0)
+        self.assertEqual(RateLimitCounter.query.one().hits, 3)
+
+    def test_disabled(self):
+        """Test that a disabled limiter lets everything through"""
+        limiter = RateLimiter(enabled=False)
+        self.assertEqual([limiter.check('x', {'ip': (1, 60)}, {'ip': 'a'}) for _ in range(3)], [0.0] * 3)
+
+    def test_client_ip_from_trusted_proxy(self):
+        """Test that X-Forwarded-For is used only when a trusted proxy hop is configured"""
+        def client_ip(hops):
+            app = Flask(__name__)
+            app.config['TRUSTED_PROXY_HOPS'] = hops
+            app.add_url_rule('/ip', 'ip', lambda: request.remote_addr)
+            trust_proxy_headers(app)
+            return app.test_client().get('/ip', headers={'X-Forwarded-For': '203.0.113.7'},
+                                         environ_base={'REMOTE_ADDR': '127.0.0.1'}).get_data(as_text=True)
+
+        self.assertEqual(client_ip(0), '127.0.0.1')
+        self.assertEqual(client_ip(1), '203.0.113.7')
+
+    def test_backend_must_implement_hit(self):
+        """Test that a backend without hit cannot be created"""
+        class Incomplete(RateLimitBackend):
+            pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Description: Integration tests for versioned JWT claims and token revocation.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created claims, no-lookup, revocation and legacy token tests.
+    2026-10-19 - Revocation by another process seen once the version cache expires.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+import jwt
+from sqlalchemy import event, update
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from models.user import User
+from middleware.principal_cache import PrincipalCache, TOKEN_VERSIONS_KEY
+from services.user_login import UserLoginServices, TOKEN_CLAIMS_VERSION
+
+
+class TokenClaimsTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for claims version 2 tokens"""
+
+    def setUp(self):
+        super().setUp()
+        user = self.create_test_user(username='claimsuser', email='claims@dal.ca')
+        db.session.commit()
+        self.user_id = user.id
+        login = UserLoginServices()
+        login.current_user = user
+        self.token = login.generate_token()
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+        self.user_queries = []
+        event.listen(db.engine, 'before_cursor_execute', self._record_user_query)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self._record_user_query)
+        super().tearDown()
+
+    def _record_user_query(self, conn, cursor, statement, parameters, context, executemany):
+        if 'FROM users' in statement:
+            self.user_queries.append(statement)
+
+    def test_token_carries_identity_claims(self):
+        """Test that a new token carries user id, admin flag and token version"""
+        data = jwt.decode(self.token, self.app.config['SECRET_KEY'], algorithms=['HS256'])
+
+        self.assertEqual(data['ver'], TOKEN_CLAIMS_VERSION)
+        self.assertEqual(data['user_id'], self.user_id)
+        self.assertEqual(data['username'], 'claimsuser')
+        self.assertFalse(data['is_admin'])
+        self.assertEqual(data['tv'], 0)
+        self.assertIn('iat', data)
+
+    def test_login_required_skips_user_row(self):
+        """Test that login_required reads only the cached token version, not the user"""
+        first = self.client.get('/api/answers/999/edit', headers=self.headers)
+        second = self.client.get('/api/answers/999/edit', headers=self.headers)
+
+        self.assertEqual((first.status_code, second.status_code), (404, 404))
+        # One token_version lookup, then served from the cache
+        self.assertEqual(len(self.user_queries), 1)
+        self.assertIn('token_version', self.user_queries[0])
+        self.assertNotIn('users.password', self.user_queries[0])
+
+    def test_revoked_token_rejected(self):
+        """Test that bumping the token version rejects tokens issued before"""
+        self.assertEqual(self.client.get('/api/auth/validate', headers=self.headers).status_code, 200)
+
+        self.assertTrue(User.revoke_tokens(self.user_id))
+
+        response = self.client.get('/api/answers/999/edit', headers=self.headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('revoked', response.get_json()['error'])
+        self.assertEqual(self.client.get('/api/auth/validate', headers=self.headers).status_code, 401)
+
+    def test_revocation_in_other_process_seen_after_ttl(self):
+        """Test that a token revoked elsewhere is refused once its cached version expires"""
+        now = [0.0]
+        saved = self.app.extensions[TOKEN_VERSIONS_KEY]
+        self.app.extensions[TOKEN_VERSIONS_KEY] = PrincipalCache(ttl_seconds=2, clock=lambda: now[0])
+        try:
+            self.assertEqual(self.client.get('/api/auth/validate', headers=self.headers).status_code, 200)
+            # Another worker revokes: the row changes but this process's cache is not cleared
+            db.session.execute(update(User).where(User.id == self.user_id).values(token_version=1))
+            db.session.commit()
+
+            self.assertEqual(self.client.get('/api/auth/validate', headers=self.headers).status_code, 200)
+            now[0] = 2.5
+            self.assertEqual(self.client.get('/api/auth/validate', headers=self.headers).status_code, 401)
+        finally:
+            self.app.extensions[TOKEN_VERSIONS_KEY] = saved
+
+    def test_logout_all_revokes(self):
+        """Test that /logout-all signs out every token and new logins work again"""
+        response = self.client.post('/api/auth/logout-all', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/validate', headers=self.headers).status_code, 401)
+
+        login = UserLoginServices()
+        login.current_user = db.session.get(User, self.user_id)
+        fresh = {'Authorization': f'Bearer {login.generate_token()}'}
+        self.assertEqual(self.client.get('/api/auth/validate', headers=fresh).status_code, 200)
+
+    def test_legacy_token_still_accepted(self):
+        """Test that tokens issued before claims version 2 resolve by username"""
+        token = jwt.encode({'username': 'claimsuser'}, self.app.config['SECRET_KEY'], algorithm='HS256')
+
+        response = self.client.get('/api/auth/validate', headers={'Authorization': f'Bearer {token}'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['user']['user_id'], self.user_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Description: Integration tests for batched author hydration.
+Author: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created hydration and listing tests.
+"""
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # this is to ensure imports work correctly
+
+from sqlalchemy import event
+from test.test_base import DatabaseTestCase, TestDataCreation
+from database import db
+from utils.user_hydration import hydrate_users, author_summary
+
+
+class UserHydrationTestCase(DatabaseTestCase, TestDataCreation):
+    """Integration tests for hydrate_users and the listings that use it"""
+
+    def setUp(self):
+        """Set up a question answered and commented on by several users"""
+        super().setUp()
+
+        try:
+            self.users = [self.create_test_user() for _ in range(3)]
+            self.test_question = self.create_test_question(
+                user_id=self.users[0].id,
+                title="Test Question for Hydration",
+                body="This is a test question body that needs answers."
+            )
+            self.answers = [
+                self.create_test_answer(
+                    user_id=user.id,
+                    question_id=self.test_question.id,
+                    body=f"Answer number {index} with enough length."
+                )
+                for index, user in enumerate(self.users)
+            ]
+            for user in self.users:
+                self.create_test_comment(
+                    answer_id=self.answers[0].id,
+                    user_id=user.id,
+                    content="Comment on the first answer."
+                )
+            db.session.commit()
+
+            # Plain values, so assertions never touch expired instances
+            self.usernames = {user.id: user.username for user in self.users}
+            self.first_answer_id = self.answers[0].id
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+    def _count_selects(self, func):
+        """Run func and return (result, number of SELECT statements issued)"""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            result = func()
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        return result, len(statements)
+
+    def test_hydrate_users_single_query(self):
+        """Test that all authors are loaded with one query"""
+        user_ids = list(self.usernames)
+        ids = user_ids + [user_ids[0], None]
+
+        with self.app.test_request_context():
+            authors, selects = self._count_selects(lambda: hydrate_users(ids))
+
+        self.assertEqual(selects, 1)
+        self.assertEqual(set(authors.keys()), set(user_ids))
+        self.assertEqual(authors[user_ids[1]]['username'], self.usernames[user_ids[1]])
+        self.assertEqual(authors[user_ids[1]]['reputation'], 0)
+
+    def test_hydrate_users_request_cache(self):
+        """Test that authors seen earlier in the request are not re-fetched"""
+        ids = list(self.usernames)
+
+        with self.app.test_request_context():
+            hydrate_users(ids)
+            authors, selects = self._count_selects(lambda: hydrate_users(ids))
+
+        self.assertEqual(selects, 0)
+        self.assertEqual(len(authors), 3)
+
+    def test_author_summary_unknown(self):
+        """Test that a missing author falls back to Unknown"""
+        self.assertEqual(
+            author_summary({}, 999),
+            {'username': 'Unknown', 'reputation': 0}
+        )
+
+    def test_answers_listing_embeds_authors(self):
+        """Test GET answers embeds each answer's author"""
+        response = self.client.get(f'/api/answers/questions/{self.test_question.id}/answers')
+
+        self.assertEqual(response.status_code, 200)
+        for answer in response.get_json()['answers']:
+            self.assertEqual(answer['user']['username'], self.usernames[answer['user_id']])
+
+    def test_comments_listing_embeds_authors(self):
+        """Test GET comments embeds each comment's author"""
+        response = self.client.get(f'/api/answers/{self.first_answer_id}/comments')
+
+        self.assertEqual(response.status_code, 200)
+        comments = response.get_json()['comments']
+        self.assertEqual(len(comments), 3)
+        for comment in comments:
+            self.assertEqual(comment['user']['username'], self.usernames[comment['user_id']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,10 +4,15 @@ Author: Bryan Vela
 Created: 2025-11-09
 Last Modified: 
     2025-11-09 - Created reusable database setup for integration tests.
+    2026-10-19 - Clear the auth principal cache along with the tables.
+    2026-10-19 - Test apps start no background worker threads.
 """
 import unittest
 import os
 import time
+
+# Before the config is imported, also when run with unittest instead of pytest
+os.environ.setdefault('BACKGROUND_WORKERS_ENABLED', 'false')
 from app import create_app
 from database import db
 
@@ -78,6 +83,15 @@ class DatabaseTestCase(unittest.TestCase):
                 db.session.execute(table.delete())
             
             db.session.commit()
+            # Row ids are reused after the delete; drop stale identities
+            db.session.expunge_all()
+            # ...and cached principals of the deleted users
+            from middleware.principal_cache import clear_principal_caches
+            clear_principal_caches(self.app)
+            # ...and rate limit counters, so tests do not throttle each other
+            rate_limiter = self.app.extensions.get('rate_limiter')
+            if rate_limiter is not None:
+                rate_limiter.reset()
         except Exception as e:
             # If drop fails, try to clean up manually
             try:
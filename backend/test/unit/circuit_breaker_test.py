@@ -0,0 +1,87 @@
+"""
+Description: Unit tests for the circuit breaker.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created state transition and counter tests.
+"""
+import unittest
+from services.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    """Test cases for CircuitBreaker"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the circuit opens only after failure_threshold failures in a row"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.retry_after(), 10)
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    def test_half_open_trial_closes_on_success(self):
+        """Test that one trial call is let through after the reset timeout"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 10
+
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_half_open_trial_failure_reopens(self):
+        """Test that a failed trial call opens the circuit for another reset timeout"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 12
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.retry_after(), 10)
+        self.assertEqual(self.breaker.stats()['opened'], 2)
+
+    def test_release_frees_trial_slot(self):
+        """Test that an abandoned trial call lets another trial through"""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 10
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.release()
+
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Description: Unit tests for the shared Gemini client pool and fake transport.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created concurrency, timeout and fake transport tests.
+    2026-10-19 - Added circuit breaker and injected failure tests.
+"""
+import unittest
+import os
+import threading
+from unittest.mock import patch
+from google.genai import errors
+from services.gemini_client_pool import (
+    GeminiClientPool, GeminiBusyError, GeminiCircuitOpenError, is_api_failure
+)
+from services.circuit_breaker import CircuitBreaker, OPEN, CLOSED
+from services.fake_gemini import FakeGeminiClient, FakeGeminiError
+from services.gemini_services import GeminiServices
+from google.genai.types import FinishReason
+
+
+class GeminiClientPoolTestCase(unittest.TestCase):
+    """Test cases for GeminiClientPool"""
+
+    def test_concurrency_is_capped(self):
+        """Test that no more than max_concurrency calls run at once"""
+        pool = GeminiClientPool(FakeGeminiClient(latency=0.05), max_concurrency=2)
+
+        threads = [
+            threading.Thread(target=pool.models.generate_content, args=('m', 'prompt'))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = pool.stats()
+        self.assertEqual(stats['calls'], 6)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertLessEqual(stats['peak_in_flight'], 2)
+        self.assertEqual(pool.client.calls, 6)
+
+    def test_busy_when_no_slot_frees_up(self):
+        """Test that waiting past acquire_timeout raises GeminiBusyError"""
+        pool = GeminiClientPool(FakeGeminiClient(), max_concurrency=1, acquire_timeout=0.01)
+
+        with pool.slot():
+            with self.assertRaises(GeminiBusyError):
+                pool.models.generate_content('m', 'prompt')
+
+        self.assertEqual(pool.stats()['rejected'], 1)
+
+    def test_call_timeout_added_to_config(self):
+        """Test that every call carries the pool's timeout"""
+        seen = []
+        client = FakeGeminiClient(responder=lambda model, contents, config: seen.append(config) or 'ok')
+        pool = GeminiClientPool(client, call_timeout=2.5)
+
+        pool.models.generate_content('m', 'prompt', config={'max_output_tokens': 10})
+        pool.models.generate_content('m', 'prompt', config={'http_options': {'timeout': 100}})
+
+        self.assertEqual(seen[0], {'max_output_tokens': 10, 'http_options': {'timeout': 2500}})
+        self.assertEqual(seen[1]['http_options']['timeout'], 100)
+
+    def test_fake_transport_times_out(self):
+        """Test that the fake client honours the per-call timeout"""
+        pool = GeminiClientPool(FakeGeminiClient(latency=0.2), call_timeout=0.01)
+
+        with self.assertRaises(TimeoutError):
+            pool.models.generate_content('m', 'prompt')
+        self.assertEqual(pool.stats()['in_flight'], 0)
+
+    def test_from_config_fake_transport(self):
+        """Test that GEMINI_TRANSPORT=fake builds the offline client"""
+        pool = GeminiClientPool.from_config({'GEMINI_TRANSPORT': 'fake', 'GEMINI_MAX_CONCURRENCY': 3})
+
+        self.assertIsInstance(pool.client, FakeGeminiClient)
+        self.assertEqual(pool.max_concurrency, 3)
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_from_config_requires_api_key(self):
+        """Test that the real transport needs GEMINI_API_KEY"""
+        with self.assertRaises(ValueError):
+            GeminiClientPool.from_config({})
+
+    @patch.dict(os.environ, {'GEMINI_API_KEY': 'test-api-key-12345'})
+    @patch('services.gemini_client_pool.genai.Client')
+    def test_from_config_builds_one_client(self, mock_client):
+        """Test that the real client is built once with timeout and keep-alive limits"""
+        pool = GeminiClientPool.from_config({'GEMINI_TIMEOUT_SECONDS': 5, 'GEMINI_MAX_CONCURRENCY': 4})
+
+        mock_client.assert_called_once()
+        http_options = mock_client.call_args.kwargs['http_options']
+        self.assertEqual(http_options.timeout, 5000)
+        self.assertEqual(http_options.client_args['limits'].max_keepalive_connections, 4)
+        self.assertEqual(pool.api_key, 'test-api-key-12345')
+
+    def test_services_use_shared_pool(self):
+        """Test that GeminiServices built on a pool calls through it"""
+        client = FakeGeminiClient(responder=lambda model, contents, config: ('<p>Answer</p>', FinishReason.STOP))
+        pool = GeminiClientPool(client)
+
+        first = GeminiServices(pool=pool)
+        second = GeminiServices(pool=pool)
+        self.assertEqual(first.generate_answer('Title', 'Body'), ('<p>Answer</p>', False))
+        self.assertEqual(second.summarize_answers([{'body': 'one'}]), ('<p>Answer</p>', False))
+
+        self.assertIs(first.client, second.client)
+        self.assertEqual(pool.stats()['calls'], 2)
+
+    def test_breaker_fails_fast_after_failures(self):
+        """Test that once the breaker opens, calls fail without reaching the API"""
+        client = FakeGeminiClient()
+        pool = GeminiClientPool(client, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        client.fail_next(2)
+
+        for _ in range(2):
+            with self.assertRaises(FakeGeminiError):
+                pool.models.generate_content('m', 'prompt')
+        with self.assertRaises(GeminiCircuitOpenError) as context:
+            pool.models.generate_content('m', 'prompt')
+
+        self.assertEqual(client.calls, 2)
+        self.assertGreater(context.exception.retry_after, 0)
+        stats = pool.stats()
+        self.assertEqual(stats['failures'], 2)
+        self.assertEqual(stats['breaker']['state'], OPEN)
+        self.assertEqual(stats['breaker']['rejected'], 1)
+
+    def test_bad_requests_do_not_open_breaker(self):
+        """Test that 4xx errors other than 408/429 are not counted as API failures"""
+        client = FakeGeminiClient()
+        pool = GeminiClientPool(client, breaker=CircuitBreaker(failure_threshold=1))
+        client.fail_next(1, errors.ClientError(400, {'error': {'message': 'bad request'}}))
+
+        with self.assertRaises(errors.ClientError):
+            pool.models.generate_content('m', 'prompt')
+
+        self.assertEqual(pool.breaker.state, CLOSED)
+        self.assertTrue(is_api_failure(errors.ClientError(429, {'error': {'message': 'quota'}})))
+        self.assertTrue(is_api_failure(TimeoutError()))
+
+    def test_slow_calls_count_as_failures(self):
+        """Test that calls running past the call timeout trip the breaker"""
+        pool = GeminiClientPool(FakeGeminiClient(latency=0.2), call_timeout=0.01,
+                                breaker=CircuitBreaker(failure_threshold=1))
+
+        with self.assertRaises(TimeoutError):
+            pool.models.generate_content('m', 'prompt')
+
+        self.assertEqual(pool.breaker.state, OPEN)
+
+    def test_random_error_rate(self):
+        """Test that the fake client fails about error_rate of its calls"""
+        client = FakeGeminiClient(error_rate=0.5, seed=7)
+        failures = 0
+        for _ in range(200):
+            try:
+                client.models.generate_content('m', 'prompt')
+            except FakeGeminiError:
+                failures += 1
+
+        self.assertTrue(60 < failures < 140)
+
+
+if __name__ == '__main__':
+    unittest.main()
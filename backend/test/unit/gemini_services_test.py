@@ -4,12 +4,23 @@ Last Modified By: Bryan Vela
 Created: 2025-12-03
 Last Modified: 
     2025-12-03 - Refactored to unit tests for gemini_services function only.
+    2026-10-19 - Added streaming answer tests.
+    2026-10-19 - Added continuation, token budget and call statistics tests.
+    2026-10-19 - Added hierarchical summarization tests.
+    2026-10-19 - Added prompt compaction and input token budget tests.
+    2026-10-19 - generate_answer raises API errors; added deadline tests.
+    2026-10-19 - Streamed answers respect the output token budget.
 """
 import unittest
 import os
 from unittest.mock import patch, MagicMock
-from services.gemini_services import GeminiServices
+from services.gemini_services import (
+    GeminiServices, stitch_segments, gemini_call_stats, reset_gemini_call_stats, chunk_answers,
+    compact_text, estimate_tokens, budget_answers
+)
 from google.genai.types import FinishReason
+from services.fake_gemini import FakeGeminiClient
+from services.gemini_client_pool import GeminiClientPool, GeminiDeadlineError
 
 
 class GeminiServicesTestCase(unittest.TestCase):
@@ -122,18 +133,19 @@ class GeminiServicesTestCase(unittest.TestCase):
     @patch('services.gemini_services.genai.Client')
     @patch('services.gemini_services.logging')
     def test_generate_ans_api_err(self, mock_logging, mock_client):
-        """Test answer generation handles API errors"""
+        """Test answer generation logs and raises API errors"""
         mock_client_instance = mock_client.return_value
         mock_client_instance.models.generate_content.side_effect = Exception("API Error")
         
         service = GeminiServices()
         
-        # Should not raise, but log error
-        result = service.generate_answer("Test", "Test body")
+        # Raised rather than returning None, so callers can fall back or answer 503
+        with self.assertRaises(Exception) as context:
+            service.generate_answer("Test", "Test body")
         
         # Check that error was logged
         mock_logging.error.assert_called()
-        self.assertIsNone(result)
+        self.assertIn("API Error", str(context.exception))
 
     @patch('services.gemini_services.genai.Client')
     def test_summarize_ans_with_list(self, mock_client):
@@ -282,5 +294,251 @@ class GeminiServicesTestCase(unittest.TestCase):
         self.assertFalse(result)
 
 
+    def test_stream_answer_chunks(self):
+        """Test that stream_answer yields chunks then the full answer"""
+        client = FakeGeminiClient(text="<p>A streamed answer.</p>", stream_chunk_size=5)
+        service = GeminiServices(pool=GeminiClientPool(client))
+
+        events = list(service.stream_answer('Title', 'Body'))
+
+        chunks = [event['text'] for event in events if event['type'] == 'chunk']
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(events[-1], {'type': 'done', 'text': "<p>A streamed answer.</p>", 'is_truncated': False})
+        self.assertEqual(''.join(chunks), events[-1]['text'])
+
+    def test_stream_answer_continues_after_truncation(self):
+        """Test that a truncated stream is continued instead of regenerated"""
+        replies = [("<p>First half", FinishReason.MAX_TOKENS), (" second half</p>", FinishReason.STOP)]
+        prompts = []
+
+        def responder(model, contents, config):
+            prompts.append(contents)
+            return replies[len(prompts) - 1]
+
+        service = GeminiServices(pool=GeminiClientPool(FakeGeminiClient(responder=responder)))
+
+        events = list(service.stream_answer('Title', 'Body'))
+
+        self.assertIn({'type': 'continuation', 'round': 1}, events)
+        self.assertEqual(events[-1]['text'], "<p>First half second half</p>")
+        self.assertFalse(events[-1]['is_truncated'])
+        self.assertIn("<p>First half", prompts[1])
+
+    def test_stream_answer_stops_after_max_continuations(self):
+        """Test that continuations are bounded and the answer is flagged truncated"""
+        client = FakeGeminiClient(responder=lambda model, contents, config: ("part ", FinishReason.MAX_TOKENS))
+        service = GeminiServices(pool=GeminiClientPool(client))
+
+        events = list(service.stream_answer('Title', 'Body', max_continuations=1))
+
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(events[-1], {'type': 'done', 'text': "part part ", 'is_truncated': True})
+
+
+    def _scripted_service(self, replies, **kwargs):
+        """Service on a fake client answering with replies in order; returns (service, prompts)"""
+        prompts = []
+
+        def responder(model, contents, config):
+            prompts.append((contents, config))
+            return replies[min(len(prompts), len(replies)) - 1]
+
+        return GeminiServices(pool=GeminiClientPool(FakeGeminiClient(responder=responder)), **kwargs), prompts
+
+    def test_generate_ans_continues_from_partial(self):
+        """Test that a truncated answer is continued and stitched, not regenerated"""
+        service, prompts = self._scripted_service([
+            ("<p>Use a list comprehension", FinishReason.MAX_TOKENS),
+            (" or map() to transform items.</p>", FinishReason.STOP)
+        ])
+
+        answer, is_truncated = service.generate_answer("Transform a list", "How?")
+
+        self.assertEqual(answer, "<p>Use a list comprehension or map() to transform items.</p>")
+        self.assertFalse(is_truncated)
+        self.assertEqual(len(prompts), 2)
+        self.assertIn("<p>Use a list comprehension", prompts[1][0])
+        self.assertIn("Continue the answer", prompts[1][0])
+        self.assertEqual(service.last_call_stats['rounds'], 2)
+
+    def test_continuation_overlap_is_trimmed(self):
+        """Test that text restated at the start of a continuation is not duplicated"""
+        self.assertEqual(
+            stitch_segments("first part of the sentence", "of the sentence and the rest"),
+            "first part of the sentence and the rest"
+        )
+        self.assertEqual(stitch_segments("ends with a", "a new word"), "ends with aa new word")
+        self.assertEqual(stitch_segments("", "text"), "text")
+
+    def test_generate_ans_stops_at_max_rounds(self):
+        """Test that continuation is bounded by max_rounds"""
+        service, prompts = self._scripted_service([("more ", FinishReason.MAX_TOKENS)], max_rounds=2)
+
+        answer, is_truncated = service.generate_answer("Title", "Body")
+
+        self.assertEqual(len(prompts), 2)
+        self.assertTrue(is_truncated)
+        self.assertEqual(answer, "more more ")
+
+    def test_generate_ans_respects_token_budget(self):
+        """Test that rounds stop once the output token budget is spent"""
+        long_segment = "x" * 400  # ~100 tokens
+        service, prompts = self._scripted_service(
+            [(long_segment, FinishReason.MAX_TOKENS)], max_rounds=5, token_budget=150
+        )
+
+        _, is_truncated = service.generate_answer("Title", "Body")
+
+        self.assertEqual(len(prompts), 2)
+        self.assertEqual(prompts[1][1]['max_output_tokens'], 50)
+        self.assertTrue(is_truncated)
+
+    def test_stream_answer_respects_token_budget(self):
+        """Test that streamed continuations stop once the output token budget is spent"""
+        service, prompts = self._scripted_service(
+            [("x" * 400, FinishReason.MAX_TOKENS)], max_rounds=5, token_budget=150
+        )
+
+        events = list(service.stream_answer("Title", "Body"))
+
+        self.assertEqual(len(prompts), 2)
+        self.assertEqual(prompts[1][1]['max_output_tokens'], 50)
+        self.assertTrue(events[-1]['is_truncated'])
+
+    def test_call_stats_recorded(self):
+        """Test that token and latency statistics are kept per operation"""
+        reset_gemini_call_stats()
+        service, _ = self._scripted_service([("<p>" + "y" * 96 + "</p>", FinishReason.STOP)])
+
+        service.generate_answer("Title", "Body")
+        service.summarize_answers([{'body': 'one'}])
+
+        stats = gemini_call_stats()
+        self.assertEqual(stats['answer']['calls'], 1)
+        self.assertEqual(stats['answer']['output_tokens'], 25)
+        self.assertGreater(stats['answer']['prompt_tokens'], 0)
+        self.assertEqual(stats['summary']['rounds'], 1)
+        self.assertGreaterEqual(service.last_call_stats['latency_ms'], 0)
+        self.assertEqual(service.last_call_stats['operation'], 'summary')
+
+
+    def test_chunk_answers_bounded(self):
+        """Test that answers are packed in order into chunks within the size limit"""
+        answers = [{'body': 'a' * 40}, {'body': 'b' * 40}, {'body': 'c' * 40}, {'body': 'd' * 500}]
+
+        chunks = chunk_answers(answers, 100)
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1, 1])
+        self.assertEqual(chunks[2][0]['body'], 'd' * 100)
+
+    def test_summarize_hierarchical_single_chunk(self):
+        """Test that small threads are summarized with one request"""
+        calls = []
+        service = GeminiServices(pool=GeminiClientPool(FakeGeminiClient()))
+
+        service.summarize_hierarchical(
+            [{'body': 'short'}, {'body': 'answers'}],
+            chunk_chars=100,
+            summarize=lambda chunk: calls.append(chunk) or ('summary', False)
+        )
+
+        self.assertEqual(calls, [[{'body': 'short'}, {'body': 'answers'}]])
+
+    def test_summarize_hierarchical_reduces_levels(self):
+        """Test that partial summaries are summarized again until they fit"""
+        calls = []
+
+        def summarize(chunk):
+            calls.append(len(chunk))
+            return 's' * 30, len(calls) == 1
+
+        service = GeminiServices(pool=GeminiClientPool(FakeGeminiClient()))
+        summary, is_truncated = service.summarize_hierarchical(
+            [{'body': 'x' * 50} for _ in range(8)], chunk_chars=100, summarize=summarize
+        )
+
+        # 8 answers -> 4 chunks -> 4 partials (120 chars) -> 2 chunks -> 2 partials -> 1
+        self.assertEqual(calls, [2, 2, 2, 2, 3, 1, 2])
+        self.assertEqual(summary, 's' * 30)
+        self.assertTrue(is_truncated)
+
+    def test_compact_text_strips_html(self):
+        """Test that HTML becomes plain text with code indentation kept"""
+        text = compact_text("<p>Use <b>pip</b> &amp; venv</p><p></p><p></p><pre><code>def f():\n    return 1</code></pre>")
+
+        self.assertEqual(text, "Use pip & venv\n\ndef f():\n    return 1")
+        self.assertEqual(compact_text(None), '')
+        self.assertEqual(estimate_tokens('x' * 9), 3)
+
+    def test_budget_answers_ranks_and_drops(self):
+        """Test that accepted and high-score answers are kept first and the rest reported"""
+        answers = [
+            {'id': 1, 'body': 'a' * 400, 'score': 1},
+            {'id': 2, 'body': 'b' * 400, 'score': 9},
+            {'id': 3, 'body': 'c' * 400, 'is_accepted': True},
+            {'id': 4, 'body': 'd' * 400, 'score': 0},
+        ]
+
+        kept, report = budget_answers(answers, 250)
+
+        self.assertEqual(report['kept'], [2, 1])
+        self.assertEqual(kept[0]['body'], 'c' * 400)
+        self.assertEqual([d['id'] for d in report['dropped']], [1, 4])
+        self.assertEqual(report['estimated_tokens'], 200)
+
+    def test_budget_answers_cuts_when_room_left(self):
+        """Test that an answer is cut to the remaining budget when enough is left"""
+        kept, report = budget_answers([{'body': 'short answer'}, {'body': 'word ' * 400}], 300)
+
+        self.assertEqual(len(kept), 2)
+        self.assertEqual(report['truncated'][0]['index'], 1)
+        self.assertLessEqual(report['estimated_tokens'], 300)
+
+    def test_summarize_ans_within_input_budget(self):
+        """Test that summary prompts carry compact text and only answers within the budget"""
+        prompts = []
+        fake = FakeGeminiClient(responder=lambda model, contents, config: prompts.append(contents) or "summary")
+        service = GeminiServices(pool=GeminiClientPool(fake), summary_input_tokens=50)
+
+        service.summarize_answers([
+            {'id': 1, 'body': '<p>' + 'low ' * 100 + '</p>', 'score': -2},
+            {'id': 2, 'body': '<p>best <b>answer</b></p>', 'isAccepted': True},
+        ])
+
+        self.assertIn("Answer #1: best answer", prompts[0])
+        self.assertNotIn("<b>", prompts[0].split("Collected Answer Bodies")[1])
+        self.assertEqual([d['id'] for d in service.last_input_report['dropped']], [1])
+
+    def test_round_timeout_bounded_by_deadline(self):
+        """Test that each round's timeout is the time left before the deadline"""
+        configs = []
+        fake = FakeGeminiClient(responder=lambda model, contents, config: configs.append(config) or "done")
+        service = GeminiServices(pool=GeminiClientPool(fake, call_timeout=60), deadline_seconds=5)
+
+        service.generate_answer("Title", "Body")
+
+        self.assertLessEqual(configs[0]['http_options']['timeout'], 5000)
+        self.assertGreater(configs[0]['http_options']['timeout'], 4000)
+
+    def test_deadline_keeps_partial_answer(self):
+        """Test that a continuation past the deadline returns the partial, truncated text"""
+        fake = FakeGeminiClient(responder=lambda model, contents, config: ("partial answer", FinishReason.MAX_TOKENS))
+        service = GeminiServices(pool=GeminiClientPool(fake), deadline_seconds=0.05)
+        fake.latency = 0.03
+
+        answer, is_truncated = service.generate_answer("Title", "Body")
+
+        self.assertEqual(answer, "partial answer")
+        self.assertTrue(is_truncated)
+        self.assertEqual(fake.calls, 2)
+
+    def test_deadline_without_text_raises(self):
+        """Test that running out of time before any text raises GeminiDeadlineError"""
+        service = GeminiServices(pool=GeminiClientPool(FakeGeminiClient(latency=0.2)), deadline_seconds=0.02)
+
+        with self.assertRaises(GeminiDeadlineError):
+            service.generate_answer("Title", "Body")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -5,10 +5,16 @@ Last Modified By: Bryan Vela
 Created: 2025-11-01
 Last Modified: 
     2025-11-09 - Refactored to unit tests for sanitization function only.
+    2026-10-19 - Added sanitize_content pipeline tests.
+    2026-10-19 - Added memo cache and adversarial input tests.
 """
 
+import time
 import unittest
-from utils.html_sanitizer import sanitize_html_body
+from utils.html_sanitizer import (
+    sanitize_html_body, sanitize_content, strip_script_blocks,
+    sanitize_cache_info, clear_sanitize_cache
+)
 
 class TestHtmlSanitization(unittest.TestCase):
     
@@ -111,5 +117,74 @@ class TestHtmlSanitization(unittest.TestCase):
         self.assertIn('class="highlight"', result)
         self.assertIn('print("hello")', result)
         
+
+class TestSanitizeContent(unittest.TestCase):
+
+    def test_returns_html_and_text(self):
+        """Test that one call returns sanitized HTML and its plain text"""
+        result = sanitize_content('<p>Use <b>list</b> &amp; <i>dict</i></p><script>alert(1)</script>')
+
+        self.assertEqual(result.html, '<p>Use <b>list</b> &amp; <i>dict</i></p>')
+        self.assertEqual(result.text, 'Use list & dict')
+
+    def test_text_separates_blocks(self):
+        """Test that block elements do not run their words together"""
+        result = sanitize_content('<h1>Title</h1><p>First</p><ul><li>one</li><li>two</li></ul>line<br>break')
+
+        self.assertEqual(result.text, 'Title First one two line break')
+
+    def test_text_excludes_stripped_markup(self):
+        """Test that disallowed tags are stripped from the text but keep their content"""
+        result = sanitize_content('<div onclick="x()">Hello <img src="x"> <span>there</span></div>')
+
+        self.assertNotIn('<', result.text)
+        self.assertEqual(result.text, 'Hello there')
+        self.assertEqual(result.html, sanitize_html_body('<div onclick="x()">Hello <img src="x"> <span>there</span></div>'))
+
+    def test_empty_content(self):
+        """Test handling of empty content"""
+        for value in ('', None):
+            result = sanitize_content(value)
+            self.assertEqual(result.html, '')
+            self.assertEqual(result.text, '')
+
+
+class TestSanitizerPerformance(unittest.TestCase):
+
+    def setUp(self):
+        clear_sanitize_cache()
+
+    def test_strip_script_blocks(self):
+        """Test script blocks end at the first closing tag, case-insensitively"""
+        self.assertEqual(strip_script_blocks('a<script>x</script>b<SCRIPT src="y"></Script>c'), 'abc')
+        self.assertEqual(strip_script_blocks('a<script><script>x</script></script>b'), 'a</script>b')
+        self.assertEqual(strip_script_blocks('a<scripts>b'), 'a<scripts>b')
+        self.assertEqual(strip_script_blocks('a<script>never closed'), 'a<script>never closed')
+
+    def test_unclosed_script_run_is_fast(self):
+        """Test a long run of unterminated script tags does not backtrack"""
+        start = time.perf_counter()
+        strip_script_blocks('<script>' * 20000)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_repeat_content_served_from_cache(self):
+        """Test sanitizing the same body twice returns the memoized result"""
+        body = '<p>Some body that is resubmitted unchanged.</p>'
+
+        first = sanitize_content(body)
+        second = sanitize_content(body)
+
+        self.assertIs(first, second)
+        info = sanitize_cache_info()
+        self.assertEqual(info['hits'], 1)
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['entries'], 1)
+
+    def test_different_content_not_shared(self):
+        """Test distinct bodies get distinct results"""
+        self.assertEqual(sanitize_content('<p>one</p>').text, 'one')
+        self.assertEqual(sanitize_content('<p>two</p>').text, 'two')
+        self.assertEqual(sanitize_cache_info()['misses'], 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Description: Unit tests for the bounded password hashing pool.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - Created hashing, cost factor, load shedding and timeout tests.
+"""
+import threading
+import unittest
+from unittest.mock import patch
+import bcrypt
+from services.password_hasher import PasswordHasher, PasswordHasherBusyError
+
+
+class PasswordHasherTestCase(unittest.TestCase):
+    """Test cases for PasswordHasher"""
+
+    def setUp(self):
+        self.hasher = PasswordHasher(rounds=4, workers=1, max_queue=1, wait_timeout=5)
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.hasher.shutdown()
+
+    def _blocking_hashpw(self, password, salt):
+        """Stand-in for bcrypt.hashpw that holds its worker until released"""
+        self.started.set()
+        self.release.wait(5)
+        return b'$2b$04$' + b'x' * 53
+
+    def _occupy(self, count):
+        """Start `count` hashes that block; returns their threads"""
+        threads = [threading.Thread(target=self.hasher.hash, args=('secret',)) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def test_hash_and_verify(self):
+        """Test that a hash uses the configured cost and verifies its password only"""
+        hashed = self.hasher.hash('correct horse')
+
+        self.assertTrue(hashed.startswith('$2b$04$'))
+        self.assertTrue(self.hasher.verify('correct horse', hashed))
+        self.assertFalse(self.hasher.verify('wrong horse', hashed))
+        stats = self.hasher.stats()
+        self.assertEqual((stats['hashes'], stats['verifies'], stats['queued']), (1, 2, 0))
+
+    def test_needs_rehash(self):
+        """Test that hashes with another cost factor are flagged for rehashing"""
+        self.assertFalse(self.hasher.needs_rehash(bcrypt.hashpw(b'pw', bcrypt.gensalt(rounds=4)).decode()))
+        self.assertTrue(self.hasher.needs_rehash(bcrypt.hashpw(b'pw', bcrypt.gensalt(rounds=5)).decode()))
+        self.assertFalse(self.hasher.needs_rehash('not a hash'))
+
+    def test_sheds_load_when_queue_full(self):
+        """Test that work beyond the busy workers and full queue is refused"""
+        with patch('services.password_hasher.bcrypt.hashpw', side_effect=self._blocking_hashpw):
+            threads = self._occupy(1)
+            self.assertTrue(self.started.wait(5))
+            threads += self._occupy(1)
+            while self.hasher.stats()['queued'] < 1:
+                pass
+
+            with self.assertRaises(PasswordHasherBusyError) as raised:
+                self.hasher.hash('one too many')
+
+            self.release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        stats = self.hasher.stats()
+        self.assertEqual((stats['rejected'], stats['hashes'], stats['peak_queued']), (1, 2, 1))
+
+    def test_wait_timeout(self):
+        """Test that a caller stops waiting after wait_timeout"""
+        self.hasher.wait_timeout = 0.05
+        with patch('services.password_hasher.bcrypt.hashpw', side_effect=self._blocking_hashpw):
+            with self.assertRaises(PasswordHasherBusyError):
+                self.hasher.hash('slow')
+            self.release.set()
+
+        self.assertEqual(self.hasher.stats()['timeouts'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
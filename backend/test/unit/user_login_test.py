@@ -7,7 +7,7 @@ class TestUserLogin(unittest.TestCase):
     def setUp(self):
         self.mock_db = MagicMock()
 
-    @patch('services.user_login.bcrypt.checkpw')
+    @patch('services.password_hasher.bcrypt.checkpw')
     def test_verify_credential_success(self, mock_checkpw):
         mock_user = MagicMock()
         mock_user.email = "test@dal.ca"
@@ -26,7 +26,7 @@ class TestUserLogin(unittest.TestCase):
         assert result is True
         mock_checkpw.assert_called_once()
 
-    @patch('services.user_login.bcrypt.checkpw')
+    @patch('services.password_hasher.bcrypt.checkpw')
     def test_verify_cred_wrg_pswd(self, mock_checkpw):
         mock_user = MagicMock()
         mock_user.email = "test@dal.ca"
@@ -48,14 +48,23 @@ class TestUserRegistration(unittest.TestCase):
         #should return false because user should not be created if already exists
         assert result is False
 
-    def test_create_user_not_exists(self):
+    @patch('services.user_registration.enqueue_email')
+    @patch('services.user_registration.get_otp_store')
+    @patch('services.user_registration.get_password_hasher')
+    def test_create_user_not_exists(self, mock_get_password_hasher, mock_get_otp_store, mock_enqueue_email):
         registration = UserRegistrationService()
         registration.user_exists = MagicMock(return_value=False)
+        mock_get_password_hasher.return_value.hash.return_value = "$2b$12$hashedpassword123456789"
+        mock_get_otp_store.return_value.issue.return_value = "123456"
 
         result = registration.create_user("test@dal.ca", "testpass")
 
         #should return true as user should be created
         assert result is True
+        # The hashed password waits with the code, which is queued for emailing
+        mock_get_password_hasher.return_value.hash.assert_called_once_with("testpass")
+        assert mock_get_otp_store.return_value.issue.call_args[1]['pending_password'] == "$2b$12$hashedpassword123456789"
+        assert mock_enqueue_email.call_args[1]['code'] == "123456"
 
     def test_validate_email_contains(self):
         registration = UserRegistrationService()
@@ -68,28 +77,28 @@ class TestUserRegistration(unittest.TestCase):
         #this test should return false since dal.ca is not present in the email id
         assert result is False
 
+    @patch('services.user_registration.get_otp_store')
     @patch('services.user_registration.db.session')
-    def test_verify_and_create_user_correct_otp(self, mock_db_session):
+    def test_verify_and_create_user_correct_otp(self, mock_db_session, mock_get_otp_store):
         registration = UserRegistrationService()
-        #user entered correct otp
-        registration.check_otp = MagicMock(return_value=True)
-        # Set the pending email and password that verify_and_create_user needs
-        registration.pending_email = "test@dal.ca"
-        registration.pending_password = "$2b$12$hashedpassword123456789"
+        #user entered correct otp; the store hands back the pending password
+        mock_get_otp_store.return_value.verify.return_value = ('valid', "$2b$12$hashedpassword123456789")
 
-        result = registration.verify_and_create_user("123456")
+        result = registration.verify_and_create_user("test@dal.ca", "123456")
         #since user entered correct otp, this should return true
         assert result is True
         # Verify that db.session.add and db.session.commit were called
         mock_db_session.add.assert_called_once()
         mock_db_session.commit.assert_called_once()
+        assert mock_db_session.add.call_args[0][0].password == "$2b$12$hashedpassword123456789"
 
-    def test_verify_and_create_user_incorrect_otp(self):
+    @patch('services.user_registration.get_otp_store')
+    def test_verify_and_create_user_incorrect_otp(self, mock_get_otp_store):
         registration = UserRegistrationService()
         #user entered incorrect otp
-        registration.check_otp = MagicMock(return_value=False)
+        mock_get_otp_store.return_value.verify.return_value = ('invalid', None)
 
-        result = registration.verify_and_create_user("123456")
+        result = registration.verify_and_create_user("test@dal.ca", "123456")
         #since user entered incorrect otp, this should return false
         assert result is False
 
@@ -4,15 +4,22 @@ Last Modified By: Bryan Vela
 Created: 2025-11-07
 Last Modified: 
     2025-11-07 - Creation and logic.
+    2026-10-19 - Search reads stored excerpts instead of full bodies.
 """
 import re
 
 def get_all_questions():
-    """Get all questions from the database."""
+    """Get all questions from the database in list (summary) form."""
     try:
         from models.question import Question
         questions = Question.get_all()
-        return [question.to_dict() for question in questions] if questions else []
+        if not questions:
+            return []
+        answer_counts = Question.answer_counts([question.id for question in questions])
+        return [
+            question.to_summary_dict(answer_count=answer_counts[question.id])
+            for question in questions
+        ]
     except Exception:
         return []
 
@@ -76,7 +83,7 @@ def search_questions(query):
             result = {
                 'id': question['id'],
                 'title': question['title'],
-                'body': question.get('body'),
+                'excerpt': question.get('excerpt'),
                 'tags': question.get('tags', []),
                 'answerCount': question.get('answerCount', 0),
                 'voteCount': question.get('voteCount', 0),
@@ -3,48 +3,249 @@ Description: HTML sanitizer for question body content.
 Removes dangerous HTML while preserving safe formatting.
 Last Modified By: Bryan Vela
 Created: 2025-11-01
-Last Modified: 
+Last Modified:
     2025-10-26 - File created with add_sanitization_function logic.
+    2026-10-19 - Added single-parse sanitize_content pipeline returning
+                 sanitized HTML and plain text together.
+    2026-10-19 - Added excerpt to SanitizedContent.
+    2026-10-19 - Linear-time script stripping and content-hash memo cache.
 """
 
 import bleach
+import hashlib
+import html
 import re
+import threading
+from bleach.html5lib_shim import Filter
+from cachetools import LRUCache
+
+# Allowed tags for question body
+ALLOWED_TAGS = frozenset([
+    'p', 'br', 'strong', 'b', 'em', 'i', 'u',
+    'code', 'pre', 'blockquote', 'ul', 'ol', 'li',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'a'
+])
+
+# Allowed attributes
+ALLOWED_ATTRIBUTES = {
+    'a': ['href', 'title'],
+    'code': ['class'],
+    'pre': ['class', 'data-language']
+}
+
+ALLOWED_PROTOCOLS = frozenset(['http', 'https', 'mailto'])
+
+# Longest plain-text preview stored for list views
+EXCERPT_LENGTH = 200
+
+# Tags that end a line of text in the plain-text rendering
+_BLOCK_TAGS = frozenset([
+    'p', 'br', 'pre', 'blockquote', 'ul', 'ol', 'li',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6'
+])
+
+_SCRIPT_OPEN_RE = re.compile(r'<script\b', re.IGNORECASE)
+_SCRIPT_CLOSE_RE = re.compile(r'</script>', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# bleach Cleaners keep parser state, so each thread reuses its own
+_local = threading.local()
+
+# Memo of recent results keyed by content hash; edits often resubmit an
+# unchanged body. Bounded by the total characters held, and single bodies
+# above MAX_CACHED_CONTENT_LENGTH are not cached.
+SANITIZE_CACHE_MAX_CHARS = 16_000_000
+MAX_CACHED_CONTENT_LENGTH = 1_000_000
+_cache = LRUCache(
+    maxsize=SANITIZE_CACHE_MAX_CHARS,
+    getsizeof=lambda result: len(result.html) + len(result.text) + 1
+)
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+
+class SanitizedContent:
+    """
+    Result of running user HTML through the content pipeline.
+
+    Attributes:
+        html (str): Sanitized HTML, safe to store and render.
+        text (str): Plain text of the sanitized HTML, whitespace collapsed.
+    """
+    __slots__ = ('html', 'text')
+
+    def __init__(self, html, text):
+        self.html = html
+        self.text = text
+
+    @property
+    def excerpt(self):
+        """Plain-text preview of at most EXCERPT_LENGTH characters, cut at a word boundary"""
+        return make_excerpt(self.text)
+
+    def __repr__(self):
+        return f"SanitizedContent(html={self.html!r}, text={self.text!r})"
+
+
+class _TextCollectorFilter(Filter):
+    """html5lib filter that records the text of the sanitized token stream"""
+
+    def __iter__(self):
+        parts = _local.text_parts
+        for token in super().__iter__():
+            token_type = token['type']
+            if token_type in ('Characters', 'SpaceCharacters'):
+                parts.append(token['data'])
+            elif token_type == 'Entity':
+                parts.append(html.unescape(f"&{token['name']};"))
+            elif token_type in ('EndTag', 'EmptyTag') and token['name'] in _BLOCK_TAGS:
+                parts.append('\n')
+            yield token
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """
+    Shorten plain text to a preview, preferring to cut between words.
+
+    Args:
+        text (str): Plain text.
+        length (int): Maximum preview length.
+
+    Returns:
+        str: The preview (the whole text if it is short enough).
+    """
+    if not text or len(text) <= length:
+        return text or ''
+    cut = text[:length]
+    space = cut.rfind(' ')
+    if space > length // 2:
+        cut = cut[:space]
+    return cut.rstrip()
+
+
+def _get_cleaner():
+    """Get this thread's reusable bleach Cleaner"""
+    cleaner = getattr(_local, 'cleaner', None)
+    if cleaner is None:
+        cleaner = bleach.Cleaner(
+            tags=ALLOWED_TAGS,
+            attributes=ALLOWED_ATTRIBUTES,
+            protocols=ALLOWED_PROTOCOLS,
+            strip=True,
+            filters=[_TextCollectorFilter]
+        )
+        _local.cleaner = cleaner
+    return cleaner
+
+
+def strip_script_blocks(content):
+    """
+    Remove <script ...>...</script> blocks, case-insensitively.
+
+    Each block runs from an opening tag to the first closing tag after it.
+    Scans forward once, so unterminated <script runs cost linear time.
+
+    Args:
+        content (str): Raw HTML content
+
+    Returns:
+        str: Content without script blocks
+    """
+    pieces = []
+    position = 0
+    while True:
+        opening = _SCRIPT_OPEN_RE.search(content, position)
+        if not opening:
+            break
+        closing = _SCRIPT_CLOSE_RE.search(content, opening.end())
+        if not closing:
+            # No closing tag after this one, so none after later ones either
+            break
+        pieces.append(content[position:opening.start()])
+        position = closing.end()
+    pieces.append(content[position:])
+    return ''.join(pieces)
+
+
+def _sanitize_uncached(content):
+    content = strip_script_blocks(content)
+
+    _local.text_parts = []
+    try:
+        clean_content = _get_cleaner().clean(content)
+        text = _WHITESPACE_RE.sub(' ', ''.join(_local.text_parts)).strip()
+    finally:
+        _local.text_parts = None
+
+    return SanitizedContent(clean_content, text)
+
+
+def sanitize_content(content):
+    """
+    Sanitize user HTML and extract its plain text in a single parse.
+
+    Results are memoized by content hash, so sanitizing an unchanged body
+    again is a dictionary lookup.
+
+    Args:
+        content (str): Raw HTML content
+
+    Returns:
+        SanitizedContent: Sanitized HTML and its plain text.
+    """
+    if not content:
+        return SanitizedContent('', '')
+
+    if len(content) > MAX_CACHED_CONTENT_LENGTH:
+        return _sanitize_uncached(content)
+
+    key = hashlib.sha256(content.encode('utf-8')).digest()
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache_stats['hits'] += 1
+            return result
+        _cache_stats['misses'] += 1
+
+    result = _sanitize_uncached(content)
+    with _cache_lock:
+        _cache[key] = result
+    return result
+
+
+def sanitize_cache_info():
+    """
+    Get memo cache statistics.
+
+    Returns:
+        dict: hits, misses, cached entries, and characters held / allowed.
+    """
+    with _cache_lock:
+        return {
+            'hits': _cache_stats['hits'],
+            'misses': _cache_stats['misses'],
+            'entries': len(_cache),
+            'chars': _cache.currsize,
+            'max_chars': _cache.maxsize
+        }
+
+
+def clear_sanitize_cache():
+    """Empty the memo cache and reset its statistics."""
+    with _cache_lock:
+        _cache.clear()
+        _cache_stats['hits'] = 0
+        _cache_stats['misses'] = 0
+
 
 def sanitize_html_body(content):
     """
     Sanitize HTML content for safe storage in question body.
-    
+
     Args:
         content (str): Raw HTML content
-        
+
     Returns:
         str: Sanitized HTML content
     """
-    if not content:
-        return ''
-    
-    content = re.sub(r'<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>', '', content, flags=re.IGNORECASE)
-    # Allowed tags for question body
-    allowed_tags = [
-        'p', 'br', 'strong', 'b', 'em', 'i', 'u', 
-        'code', 'pre', 'blockquote', 'ul', 'ol', 'li',
-        'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'a'
-    ]
-    
-    # Allowed attributes
-    allowed_attributes = {
-        'a': ['href', 'title'],
-        'code': ['class'],
-        'pre': ['class', 'data-language']
-    }
-    
-    # Clean the content
-    clean_content = bleach.clean(
-        content,
-        tags=allowed_tags,
-        attributes=allowed_attributes,
-        protocols=['http', 'https', 'mailto'],
-        strip=True
-    )
-    
-    return clean_content
\ No newline at end of file
+    return sanitize_content(content).html
@@ -0,0 +1,128 @@
+"""
+Description: Keyset (cursor) pagination helpers for list endpoints.
+Cursors are opaque url-safe tokens holding the sort key of the last row
+of a page, so the next page is found with an indexed WHERE clause instead
+of an OFFSET scan.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with cursor encoding and keyset filter.
+"""
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def parse_limit(raw_limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Parse a page size query parameter.
+
+    Args:
+        raw_limit (str|int|None): Raw value from the request.
+        default (int): Page size used when no value is given.
+        maximum (int): Largest page size allowed.
+
+    Returns:
+        int: Page size between 1 and maximum.
+
+    Raises:
+        ValueError: If the value is not a positive integer.
+    """
+    if raw_limit is None or raw_limit == '':
+        return default
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a positive integer")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, maximum)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(values):
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+
+    Args:
+        values (list): Sort key values, in ordering order.
+
+    Returns:
+        str: url-safe cursor token.
+    """
+    payload = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, expected_length):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): Cursor token from the request.
+        expected_length (int): Number of sort keys of the current ordering.
+
+    Returns:
+        list: Sort key values.
+
+    Raises:
+        ValueError: If the cursor is malformed or does not match the ordering.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = [_decode_value(value) for value in values]
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != expected_length:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the WHERE clause selecting the rows that come after a cursor.
+
+    Args:
+        ordering (list[tuple]): (column expression, descending) pairs, the same
+                                ones used in ORDER BY. The last key must be
+                                unique (normally the primary key).
+        values (list): Sort key values of the last row of the previous page.
+
+    Returns:
+        ColumnElement: Expression usable in Query.filter().
+    """
+    clauses = []
+    for index, (column, descending) in enumerate(ordering):
+        equal_prefix = [ordering[i][0] == values[i] for i in range(index)]
+        after = column < values[index] if descending else column > values[index]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+def order_by_clauses(ordering):
+    """
+    Convert (column expression, descending) pairs to ORDER BY clauses.
+
+    Args:
+        ordering (list[tuple]): (column expression, descending) pairs.
+
+    Returns:
+        list: Clauses usable in Query.order_by().
+    """
+    return [column.desc() if descending else column.asc() for column, descending in ordering]
@@ -0,0 +1,76 @@
+"""
+Description: Batched author hydration for listings that embed user info.
+Collects the author ids of a listing and loads them with a single IN query,
+caching the compact projection for the rest of the request.
+Last Modified By: Bryan Vela
+Created: 2026-10-19
+Last Modified:
+    2026-10-19 - File created with hydrate_users and author_summary helpers.
+"""
+from flask import request, has_request_context
+
+UNKNOWN_AUTHOR = {'username': 'Unknown', 'reputation': 0}
+
+
+def _request_cache():
+    """
+    Get the per-request identity cache of author projections.
+
+    Returns:
+        dict: Mapping of user id to {username, reputation}. A throwaway dict
+              is returned outside of a request context.
+    """
+    if not has_request_context():
+        return {}
+    if not hasattr(request, 'author_cache'):
+        request.author_cache = {}
+    return request.author_cache
+
+
+def hydrate_users(user_ids):
+    """
+    Load the compact author projection for every id in one query.
+
+    Ids already seen during the current request are served from the cache;
+    only the missing ones are fetched, using a single IN query.
+
+    Args:
+        user_ids (iterable): User ids referenced by a listing (duplicates and
+                             None values are ignored).
+
+    Returns:
+        dict: Mapping of user id to {'username': str, 'reputation': int}.
+              Ids with no matching user are absent from the mapping.
+    """
+    from models.user import User
+    from database import db
+
+    cache = _request_cache()
+    wanted = {user_id for user_id in user_ids if user_id is not None}
+    missing = wanted - cache.keys()
+
+    if missing:
+        rows = db.session.query(User.id, User.username, User.reputation) \
+            .filter(User.id.in_(missing)) \
+            .all()
+        for user_id, username, reputation in rows:
+            cache[user_id] = {
+                'username': username,
+                'reputation': reputation or 0
+            }
+
+    return {user_id: cache[user_id] for user_id in wanted if user_id in cache}
+
+
+def author_summary(authors, user_id):
+    """
+    Get the embedded author dict for a row, falling back to 'Unknown'.
+
+    Args:
+        authors (dict): Result of hydrate_users.
+        user_id (int): Author id of the row being serialized.
+
+    Returns:
+        dict: {'username': str, 'reputation': int}
+    """
+    return dict(authors.get(user_id, UNKNOWN_AUTHOR))
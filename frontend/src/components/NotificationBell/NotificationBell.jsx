@@ -15,46 +15,110 @@ const NotificationBell = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const { id } = useParams();
-  const readNotificationsKey = "readNotifications";
+  const [unreadCount, setUnreadCount] = useState(0);
 
-  // Fetch notifications on component mount
+  const getCurrentUserId = () => {
+    const stored = localStorage.getItem("user");
+    return stored ? JSON.parse(stored).id : null;
+  };
+
+  // Fetch the unread count on component mount (one counter lookup)
   useEffect(() => {
-    const fetchNotifications = async () => {
+    const fetchUnreadCount = async () => {
       try {
-        const stored = localStorage.getItem("user");
-        if (!stored) {
+        const currentUserId = getCurrentUserId();
+        if (!currentUserId) {
           return;
         }
-        const currentUser = JSON.parse(stored);
-        const currentUserId = currentUser.id;
-
         const response = await apiFetch(
-          `${API_BASE_URL}/notifications/${currentUserId}`
+          `${API_BASE_URL}/notifications/${currentUserId}/unread_count`
         );
         if (!response.ok) {
-          throw new Error("Failed to fetch notifications");
+          throw new Error("Failed to fetch unread count");
         }
         const data = await response.json();
-        // Load read notifications from localStorage
-        const readNotifs = JSON.parse(
-          localStorage.getItem(readNotificationsKey) || "[]"
+        setUnreadCount(data.unread_count || 0);
+      } catch (err) {
+        // Error loading unread count
+      }
+    };
+
+    fetchUnreadCount();
+
+    // New notifications are pushed over server-sent events instead of polled.
+    // EventSource cannot send an Authorization header, so each connection is
+    // opened with a short-lived stream ticket rather than the login token
+    const currentUserId = getCurrentUserId();
+    const token = localStorage.getItem("token");
+    if (!currentUserId || !token || typeof EventSource === "undefined") {
+      return undefined;
+    }
+    let source = null;
+    let lastEventId = null;
+    let reconnectTimer = null;
+    let closed = false;
+
+    const openStream = async () => {
+      try {
+        const response = await apiFetch(
+          `${API_BASE_URL}/notifications/${currentUserId}/stream-ticket`,
+          {
+            method: "POST",
+            headers: { Authorization: `Bearer ${token}` },
+          }
         );
-        // Mark notifications as read if they're in the read list
-        const notificationsWithReadState = (data.notifications || []).map(
-          (notif) => ({
-            ...notif,
-            unread: !readNotifs.includes(notif.id),
-          })
+        if (!response.ok) {
+          return;
+        }
+        const { ticket } = await response.json();
+        if (closed) {
+          return;
+        }
+        const params = new URLSearchParams({ token: ticket });
+        // A new EventSource sends no Last-Event-ID; the server also takes it here
+        if (lastEventId) {
+          params.set("last_event_id", lastEventId);
+        }
+        source = new EventSource(
+          `${API_BASE_URL}/notifications/${currentUserId}/stream?${params}`
         );
-        // Sort by newest first (reverse order)
-        notificationsWithReadState.reverse();
-        setNotifications(notificationsWithReadState);
       } catch (err) {
-        // Error loading notifications
+        return;
       }
+      source.addEventListener("notification", (event) => {
+        lastEventId = event.lastEventId || lastEventId;
+        const notif = JSON.parse(event.data);
+        setNotifications((prevNotifications) =>
+          prevNotifications.some((n) => n.id === notif.id)
+            ? prevNotifications
+            : [{ ...notif, unread: !notif.is_read }, ...prevNotifications]
+        );
+        if (!notif.is_read) {
+          setUnreadCount((count) => count + 1);
+        }
+      });
+      source.addEventListener("reset", () => {
+        fetchUnreadCount();
+      });
+      // The ticket has expired by the time the stream ends, so reconnect
+      // with a new one instead of letting EventSource retry the old URL
+      source.onerror = () => {
+        source.close();
+        if (!closed) {
+          reconnectTimer = setTimeout(openStream, 3000);
+        }
+      };
     };
 
-    fetchNotifications();
+    openStream();
+
+    return () => {
+      closed = true;
+      clearTimeout(reconnectTimer);
+      if (source) {
+        source.close();
+      }
+    };
   }, []);
 
   // 计算下拉框位置
@@ -71,36 +135,28 @@ const NotificationBell = () => {
         setLoading(true);
         setError("");
         try {
-          const stored = localStorage.getItem("user");
-          if (!stored) {
+          const currentUserId = getCurrentUserId();
+          if (!currentUserId) {
             setError("Not logged in: no user in storage");
             setLoading(false);
             return;
           }
-          const currentUser = JSON.parse(stored);
-          const currentUserId = currentUser.id;
 
+          // Newest first, one page at a time
           const response = await apiFetch(
-            `${API_BASE_URL}/notifications/${currentUserId}`
+            `${API_BASE_URL}/notifications/${currentUserId}?limit=20`
           );
           if (!response.ok) {
             throw new Error("Failed to fetch notifications");
           }
           const data = await response.json();
-          // Load read notifications from localStorage
-          const readNotifs = JSON.parse(
-            localStorage.getItem(readNotificationsKey) || "[]"
-          );
-          // Mark notifications as read if they're in the read list
-          const notificationsWithReadState = (data.notifications || []).map(
-            (notif) => ({
+          setNotifications(
+            (data.notifications || []).map((notif) => ({
               ...notif,
-              unread: !readNotifs.includes(notif.id),
-            })
+              unread: !notif.is_read,
+            }))
           );
-          // Sort by newest first (reverse order)
-          notificationsWithReadState.reverse();
-          setNotifications(notificationsWithReadState);
+          setUnreadCount(data.unread_count || 0);
         } catch (err) {
           setError("Could not load notifications");
         } finally {
@@ -136,19 +192,35 @@ const NotificationBell = () => {
     setShowDropdown(!showDropdown);
   };
 
-  const handleMarkAsRead = (notificationId) => {
+  const handleMarkAsRead = async (notificationId) => {
+    const target = notifications.find((notif) => notif.id === notificationId);
+    if (!target || !target.unread) {
+      return;
+    }
     setNotifications((prevNotifications) =>
       prevNotifications.map((notif) =>
         notif.id === notificationId ? { ...notif, unread: false } : notif
       )
     );
-    // Save to localStorage
-    const readNotifs = JSON.parse(
-      localStorage.getItem(readNotificationsKey) || "[]"
-    );
-    if (!readNotifs.includes(notificationId)) {
-      readNotifs.push(notificationId);
-      localStorage.setItem(readNotificationsKey, JSON.stringify(readNotifs));
+    setUnreadCount((count) => Math.max(count - 1, 0));
+    try {
+      const response = await apiFetch(
+        `${API_BASE_URL}/notifications/${getCurrentUserId()}/read`,
+        {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+            Authorization: `Bearer ${localStorage.getItem("token")}`,
+          },
+          body: JSON.stringify({ ids: [notificationId] }),
+        }
+      );
+      if (response.ok) {
+        const data = await response.json();
+        setUnreadCount(data.unread_count);
+      }
+    } catch (err) {
+      // Error marking notification read
     }
   };
 
@@ -186,7 +258,7 @@ const NotificationBell = () => {
         </svg>
 
         {/* 未读数量徽章 */}
-        {notifications.filter((n) => n.unread).length > 0 && (
+        {unreadCount > 0 && (
           <span
             style={{
               position: "absolute",
@@ -205,7 +277,7 @@ const NotificationBell = () => {
               boxShadow: "0 2px 4px rgba(0,0,0,0.2)",
             }}
           >
-            {notifications.filter((n) => n.unread).length}
+            {unreadCount}
           </span>
         )}
       </button>
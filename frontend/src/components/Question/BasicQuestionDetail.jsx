@@ -11,6 +11,40 @@ import AiSummariseSec from "./aiSummarise";
 import API_BASE_URL from "../../constants/apiConfig";
 import { useNavigate } from "react-router-dom";
 
+// Answers rendered per page; later pages are requested on demand
+const ANSWER_PAGE_SIZE = 20;
+
+// Fetch one page of a question's answers
+const fetchAnswerPage = async (questionId, cursor = null) => {
+  const params = new URLSearchParams({ limit: ANSWER_PAGE_SIZE });
+  if (cursor) params.set("cursor", cursor);
+  const response = await apiFetch(
+    `${API_BASE_URL}/answers/questions/${questionId}/answers?${params}`
+  );
+  const data = await response.json();
+  return { answers: data.answers || [], nextCursor: data.next_cursor || null };
+};
+
+// Comments shown under each answer before "Show all"
+const COMMENTS_PER_ANSWER = 3;
+
+// Fetch the first page of answers together with the server's answer count
+const fetchFirstAnswerPage = async (questionId) => {
+  const countPromise = apiFetch(
+    `${API_BASE_URL}/answers/questions/${questionId}/answers/count`
+  )
+    .then((response) => (response.ok ? response.json() : {}))
+    .catch(() => ({}));
+
+  const { answers, nextCursor } = await fetchAnswerPage(questionId);
+  const countData = await countPromise;
+  const answerCount =
+    typeof countData.answer_count === "number"
+      ? countData.answer_count
+      : answers.length;
+  return { answers, nextCursor, answerCount };
+};
+
 const BasicQuestionDetail = () => {
   const { id } = useParams();
   const draftKey = `draftAnswer_${id}`;
@@ -18,6 +52,9 @@ const BasicQuestionDetail = () => {
   const [users, setUsers] = useState({});
   const [loading, setLoading] = useState(true);
   const [relatedQuestions, setRelatedQuestions] = useState([]);
+  const [answersCursor, setAnswersCursor] = useState(null);
+  const [loadingMoreAnswers, setLoadingMoreAnswers] = useState(false);
+  const [answerComments, setAnswerComments] = useState({});
   const navigate = useNavigate();
   const [canEdit, setCanEdit] = useState(false);
   const [editingAnswerId, setEditingAnswerId] = useState(null);
@@ -73,19 +110,19 @@ const BasicQuestionDetail = () => {
 
   const fetchAnswers = async () => {
     try {
-      const answersResponse = await apiFetch(
-        `${API_BASE_URL}/answers/questions/${id}/answers`
+      const { answers, nextCursor, answerCount } = await fetchFirstAnswerPage(
+        id
       );
-      const answersData = await answersResponse.json();
-      const answers = answersData.answers || [];
 
       setQuestion((prevQuestion) => ({
         ...prevQuestion,
         answers: answers,
-        answerCount: answers.length,
-        isAnswered: answers.length > 0,
+        answerCount: answerCount,
+        isAnswered: answerCount > 0,
         hasAcceptedAnswer: answers.some((a) => a.isAccepted),
       }));
+      setAnswersCursor(nextCursor);
+      fetchAnswerComments(answers);
 
       return answers;
     } catch (error) {
@@ -93,6 +130,86 @@ const BasicQuestionDetail = () => {
     }
   };
 
+  // Load the first comments of a page of answers in one request
+  const fetchAnswerComments = async (answers) => {
+    if (!answers.length) return;
+    const params = new URLSearchParams({
+      answer_ids: answers.map((answer) => answer.id).join(","),
+      per_answer: COMMENTS_PER_ANSWER,
+    });
+    try {
+      const response = await apiFetch(
+        `${API_BASE_URL}/answers/comments?${params}`
+      );
+      if (!response.ok) return;
+      const data = await response.json();
+      setAnswerComments((prev) => ({ ...prev, ...data.comments }));
+    } catch (error) {
+      // Error fetching answer comments
+    }
+  };
+
+  // Replace an answer's first comments with its full thread
+  const showAllComments = async (answerId) => {
+    try {
+      const response = await apiFetch(
+        `${API_BASE_URL}/answers/${answerId}/comments`
+      );
+      if (!response.ok) return;
+      const data = await response.json();
+      const comments = data.comments || [];
+      setAnswerComments((prev) => ({
+        ...prev,
+        [answerId]: { comments, total: comments.length, has_more: false },
+      }));
+    } catch (error) {
+      // Error fetching comments
+    }
+  };
+
+  // Add user info for authors on a newly loaded answer page
+  const fetchMissingUsers = async (answers) => {
+    const missingIds = [
+      ...new Set(answers.map((answer) => answer.user_id)),
+    ].filter((userId) => userId && !users[userId]);
+
+    const loaded = {};
+    for (const userId of missingIds) {
+      try {
+        const response = await apiFetch(`${API_BASE_URL}/users/${userId}`);
+        const userData = response.ok ? await response.json() : {};
+        loaded[userId] = {
+          ...userData?.user,
+          username: userData?.user?.username || `User ${userId}`,
+          reputation: userData?.user?.reputation || 0,
+        };
+      } catch (error) {
+        loaded[userId] = { username: `User ${userId}`, reputation: 0 };
+      }
+    }
+    setUsers((prev) => ({ ...prev, ...loaded }));
+  };
+
+  // Append the next page of answers
+  const loadMoreAnswers = async () => {
+    if (!answersCursor || loadingMoreAnswers) return;
+    setLoadingMoreAnswers(true);
+    try {
+      const { answers, nextCursor } = await fetchAnswerPage(id, answersCursor);
+      setQuestion((prev) => ({
+        ...prev,
+        answers: [...prev.answers, ...answers],
+      }));
+      setAnswersCursor(nextCursor);
+      fetchAnswerComments(answers);
+      await fetchMissingUsers(answers);
+    } catch (error) {
+      // Error loading more answers
+    } finally {
+      setLoadingMoreAnswers(false);
+    }
+  };
+
   const fetchRelatedQuestions = async (currentQuestionId, tags) => {
     try {
       const response = await apiFetch(`${API_BASE_URL}/questions`);
@@ -146,21 +263,20 @@ const BasicQuestionDetail = () => {
             return;
           }
 
-          const answersResponse = await apiFetch(
-            `${API_BASE_URL}/answers/questions/${id}/answers`
-          );
-          const answersData = await answersResponse.json();
-          const answers = answersData.answers || [];
+          const { answers, nextCursor, answerCount } =
+            await fetchFirstAnswerPage(id);
 
           const enhancedQuestion = {
             ...data.question,
             answers: answers,
-            answerCount: answers.length,
-            isAnswered: answers.length > 0,
+            answerCount: answerCount,
+            isAnswered: answerCount > 0,
             hasAcceptedAnswer: answers.some((a) => a.isAccepted),
           };
 
           setQuestion(enhancedQuestion);
+          setAnswersCursor(nextCursor);
+          fetchAnswerComments(answers);
           const currentUser = JSON.parse(localStorage.getItem("user") || "{}");
           const canUserEdit =
             data.question.can_edit || currentUser.id === data.question.user_id;
@@ -1123,7 +1239,7 @@ const BasicQuestionDetail = () => {
 
             {/*summary provided by ai*/}
             {question?.answers?.length >= 2 && (
-              <AiSummariseSec ans={question.answers} />
+              <AiSummariseSec ans={question.answers} questionId={question.id} />
             )}
 
             {/* Answers Section */}
@@ -1131,8 +1247,8 @@ const BasicQuestionDetail = () => {
             <div className="answers-section">
               <div className="answers-header-container">
                 <h2 className="answers-title">
-                  {question.answers ? question.answers.length : 0} Answer
-                  {question.answers?.length !== 1 ? "s" : ""}
+                  {question.answerCount || 0} Answer
+                  {question.answerCount !== 1 ? "s" : ""}
                 </h2>
               </div>
 
@@ -1149,6 +1265,7 @@ const BasicQuestionDetail = () => {
                     );
                     const canEdit =
                       answer.can_edit || currentUser.id === answer.user_id;
+                    const commentThread = answerComments[answer.id];
 
                     return (
                       <div
@@ -1307,6 +1424,37 @@ const BasicQuestionDetail = () => {
                                     )}
                                   </div>
                                 </div>
+
+                                {commentThread?.comments?.length > 0 && (
+                                  <div className="answer-comments">
+                                    {commentThread.comments.map((comment) => (
+                                      <div
+                                        key={comment.id}
+                                        className="answer-comment"
+                                      >
+                                        <span className="answer-comment-content">
+                                          {comment.content}
+                                        </span>
+                                        <span className="answer-comment-meta">
+                                          {" – "}
+                                          {comment.user?.username ||
+                                            `User ${comment.user_id}`}{" "}
+                                          {formatDate(comment.created_at)}
+                                        </span>
+                                      </div>
+                                    ))}
+                                    {commentThread.has_more && (
+                                      <button
+                                        className="answer-comments-more"
+                                        onClick={() =>
+                                          showAllComments(answer.id)
+                                        }
+                                      >
+                                        Show all {commentThread.total} comments
+                                      </button>
+                                    )}
+                                  </div>
+                                )}
                               </>
                             ) : (
                               <>
@@ -1449,6 +1597,17 @@ const BasicQuestionDetail = () => {
                   </div>
                 )}
               </div>
+              {answersCursor && (
+                <div className="load-more-answers">
+                  <button
+                    className="action-button"
+                    onClick={loadMoreAnswers}
+                    disabled={loadingMoreAnswers}
+                  >
+                    {loadingMoreAnswers ? "Loading..." : "Load more answers"}
+                  </button>
+                </div>
+              )}
               <form
                 className="user-ans-input"
                 ref={ansForm}
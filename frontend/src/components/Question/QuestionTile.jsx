@@ -241,9 +241,7 @@ export default function QuestionTile() {
                   <div className="answer">
                     {(() => {
                       const text =
-                        question.body
-                          ?.replace(/<[^>]*>/g, "")
-                          .substring(0, 200) || "No description available";
+                        question.excerpt || "No description available";
                       return text.charAt(0).toUpperCase() + text.slice(1);
                     })()}
                     ...
@@ -22,7 +22,7 @@ const mdToHtml = (txt) => {
 };
 
 //kept mock if we wanna use diff url just in case
-const aiAnsSec = ({ questionTitle, questionBody, aiAnsMockUrl }) => {
+const aiAnsSec = ({ questionId, questionTitle, questionBody, aiAnsMockUrl }) => {
   const [genState, setGenState] = useState("loading");
   const [aiTxt, setAiTxt] = useState("");
 
@@ -31,10 +31,16 @@ const aiAnsSec = ({ questionTitle, questionBody, aiAnsMockUrl }) => {
 
     try {
       const endpoint = aiAnsMockUrl || `${API_BASE_URL}/ai/answer`;
+      const token = localStorage.getItem("token");
       const response = await apiFetch(endpoint, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          // The answer is saved on the question only for a logged in user
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
         body: JSON.stringify({
+          question_id: questionId,
           title: questionTitle,
           body: questionBody,
         }),
@@ -21,7 +21,7 @@ const mdToHtml = (txt) => {
     .replace(/\n/g, "<br/>");
 };
 
-const aiSummariseSec = ({ ans, summMockUrl }) => {
+const aiSummariseSec = ({ ans, questionId, summMockUrl }) => {
   const [isOpen, setIsOpen] = useState(false);
   const [sumTxt, setSumTxt] = useState("");
   const [loading, setLoading] = useState(false);
@@ -40,14 +40,26 @@ const aiSummariseSec = ({ ans, summMockUrl }) => {
     setLoading(true);
 
     try {
-      const ansMultibody = ans.map((a) => ({ body: a.content }));
+      let res;
+      if (questionId && !summMockUrl) {
+        //stored summary, only regenerated when the answers changed
+        res = await apiFetch(
+          `${API_BASE_URL}/ai/questions/${questionId}/summary`
+        );
+      } else {
+        //accepted answers are kept first when the thread is over the AI input budget
+        const ansMultibody = ans.map((a) => ({
+          body: a.content,
+          is_accepted: Boolean(a.isAccepted),
+        }));
 
-      const url = summMockUrl || `${API_BASE_URL}/ai/summarize`;
-      const res = await apiFetch(url, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ answers: ansMultibody }),
-      });
+        const url = summMockUrl || `${API_BASE_URL}/ai/summarize`;
+        res = await apiFetch(url, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ answers: ansMultibody }),
+        });
+      }
 
       if (res.ok) {
         const data = await res.json();
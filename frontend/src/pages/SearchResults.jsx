@@ -111,7 +111,7 @@ export default function SearchResults() {
         const searchResults = allQuestions
           .map((question) => ({
             ...question,
-            score: calculateScore(query, question.title, question.body),
+            score: calculateScore(query, question.title, question.excerpt),
           }))
           .filter((q) => q.score > 0.5)
           .sort((a, b) => b.score - a.score);
@@ -332,7 +332,7 @@ export default function SearchResults() {
                     <div className="result-content">
                       <h2 className="result-title">{question.title}</h2>
                       <p className="result-excerpt">
-                        {question.body?.substring(0, 150) ||
+                        {question.excerpt?.substring(0, 150) ||
                           "No description available"}
                         ...
                       </p>
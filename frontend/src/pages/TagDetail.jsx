@@ -80,7 +80,7 @@ export default function TagDetail() {
                                 {question.title}
                               </h3>
                               <p className="question-preview">
-                                {question.body?.substring(0, 150) ||
+                                {question.excerpt?.substring(0, 150) ||
                                   "No description available"}
                                 ...
                               </p>